@@ -1,4 +1,9 @@
 import pandas as pd
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex import regras
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 
@@ -11,57 +16,31 @@ df = pd.read_excel(FILE_PATH, sheet_name='GetNet - Oracle Databases', engine='op
 # Limpar dados
 df = df[df['PRIMARY HOSTNAME'].notna()]
 
-# Normalizar situação
-def get_situacao(val):
-    if pd.isna(val): return 'Desconhecido'
-    val = str(val).strip()
-    if 'Ativo' in val: return 'Ativo'
-    if 'Descontinuado' in val: return 'Descontinuado'
-    return val
-
-df['Situacao'] = df['SITUAÇÃO'].apply(get_situacao)
-
-# Normalizar entorno
-def get_entorno(val):
-    if pd.isna(val): return 'Desconhecido'
-    val = str(val).strip()
-    if 'Prod' in val: return 'Produção'
-    if 'Homolog' in val: return 'Homologação'
-    if 'Desenv' in val: return 'Desenvolvimento'
-    if 'Trans' in val: return 'Transacional'
-    if 'Descontinuado' in val: return 'Descontinuado'
-    return val
-
-df['Entorno'] = df['ENVIROMENT'].apply(get_entorno)
-
-# Extrair versão PSU
-def get_psu_version(val):
-    if pd.isna(val): return None
-    val = str(val).strip()
-    if 'Descontinuado' in val: return 'Descontinuado'
-    if '19.' in val:
-        # Extrair número
-        import re
-        match = re.search(r'19\.(\d+)', val)
-        if match:
-            return f"19.{match.group(1)}"
-    return val
-
-df['PSU_Version'] = df['GRID/PSU VERSION'].apply(get_psu_version)
+# Normalizar situação, entorno e versão PSU (regras em cmdb/oraex/regras.py)
+df['Situacao'] = regras.SITUACAO.aplicar(df['SITUAÇÃO'])
+
+# Aqui o entorno desconhecido mantém o texto original e "Descontinuado" vira categoria
+ENTORNO_ANALISE = regras.TabelaRegras(
+    regras.ENTORNO.regras + [regras.Regra(5, 'Descontinuado', 'Descontinuado')],
+    nulo='Desconhecido'
+)
+df['Entorno'] = ENTORNO_ANALISE.aplicar(df['ENVIROMENT'])
+
+df['PSU_Version'] = regras.PSU.aplicar(df['GRID/PSU VERSION'])
 
 # Versão mais recente (19.29 é a mais atual)
 LATEST_PSU = '19.29'
 QUARTERS_2025 = ['19.25', '19.26', '19.27', '19.28', '19.29']
 
 def is_outdated(version):
-    if version is None or version == 'Descontinuado':
+    if pd.isna(version) or version == 'Descontinuado':
         return False
     if version not in QUARTERS_2025:
         return True  # Versão de 2024 ou anterior
     return False
 
 def get_quarters_behind(version):
-    if version is None or version == 'Descontinuado':
+    if pd.isna(version) or version == 'Descontinuado':
         return None
     try:
         current_idx = QUARTERS_2025.index(LATEST_PSU)
@@ -74,8 +53,8 @@ def get_quarters_behind(version):
     except:
         return None
 
-df['Is_Outdated'] = df['PSU_Version'].apply(is_outdated)
-df['Quarters_Behind'] = df['PSU_Version'].apply(get_quarters_behind)
+df['Is_Outdated'] = df['PSU_Version'].map(is_outdated).astype(bool)
+df['Quarters_Behind'] = df['PSU_Version'].map(get_quarters_behind).astype(float)
 
 # Filtrar apenas ativos
 df_ativos = df[df['Situacao'] == 'Ativo'].copy()
@@ -89,12 +68,14 @@ print(f"  Servidores Descontinuados: {len(df[df['Situacao'] == 'Descontinuado'])
 print(f"\n🌐 DISTRIBUIÇÃO POR ENTORNO (Ativos):")
 print("-"*70)
 entorno_counts = df_ativos['Entorno'].value_counts()
+entorno_counts = entorno_counts[entorno_counts > 0]
 for ent, count in entorno_counts.items():
     print(f"  {ent}: {count}")
 
 print(f"\n📦 DISTRIBUIÇÃO POR VERSÃO PSU (Ativos):")
 print("-"*70)
 psu_counts = df_ativos['PSU_Version'].value_counts().sort_index()
+psu_counts = psu_counts[psu_counts > 0]
 for psu, count in psu_counts.items():
     behind = get_quarters_behind(psu)
     behind_str = f" ({behind} quarter(s) atrás)" if behind and behind > 0 else " ✅ ATUAL"
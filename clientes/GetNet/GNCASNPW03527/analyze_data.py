@@ -1,5 +1,11 @@
 import pandas as pd
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'cmdb'))
+from oraex.tamanhos import parse_tamanhos, COLUNAS_TAMANHO
+from oraex.numeros import coagir_numerico
 
 xl = pd.ExcelFile('GNCASNPW03527_espaco_tabelas.xlsx')
 
@@ -14,11 +20,11 @@ for sheet in xl.sheet_names:
     db_name = sheet.replace('GNCASNPW03527.', '')
     total_tabelas += len(df)
     
-    # Converter Total Rows para número
-    df['Total Rows Num'] = pd.to_numeric(
-        df['Total Rows'].astype(str).str.replace('.', '', regex=False).str.replace(',', '', regex=False), 
-        errors='coerce'
-    ).fillna(0).astype(int)
+    # Converter Total Rows para número (separadores detectados uma vez por coluna)
+    total_rows_num, falhas_rows = coagir_numerico(df['Total Rows'])
+    df['Total Rows Num'] = total_rows_num.fillna(0).astype('int64')
+    if falhas_rows.any():
+        print(f'⚠️ {sheet}: {int(falhas_rows.sum())} valor(es) de Total Rows não reconhecidos (considerados 0)')
     
     total_rows = df['Total Rows Num'].sum()
     total_registros += total_rows
@@ -50,20 +56,17 @@ for db, stats in db_stats.items():
 # Combine all tables
 all_df = pd.concat(all_tables, ignore_index=True)
 
-# Helper para limpar e converter tamanho
-def clean_size(size_str):
-    if not isinstance(size_str, str): return 0
-    clean = size_str.upper().replace('.', '').replace(',', '.')
-    if 'GB' in clean: return float(clean.replace(' GB', '').strip()) * 1024 * 1024
-    if 'MB' in clean: return float(clean.replace(' MB', '').strip()) * 1024
-    if 'KB' in clean: return float(clean.replace(' KB', '').strip())
-    return 0
-
-# Calcular colunas numéricas de tamanho (KB)
-all_df['TotalReserved_KB'] = all_df['Total Reserved Size'].apply(clean_size)
-all_df['Unused_KB'] = all_df['Unused'].apply(clean_size)
-all_df['Data_KB'] = all_df['Data'].apply(clean_size)
-all_df['Index_KB'] = all_df['Indexes'].apply(clean_size)
+# Calcular colunas numéricas de tamanho (KB) - as quatro colunas num único passo
+tamanhos_kb, falhas_tamanho = parse_tamanhos(all_df, COLUNAS_TAMANHO, unidade='KB')
+all_df[['TotalReserved_KB', 'Unused_KB', 'Data_KB', 'Index_KB']] = tamanhos_kb.fillna(0).to_numpy()
+
+if falhas_tamanho.any().any():
+    print('\n⚠️ Células de tamanho não reconhecidas (consideradas 0):')
+    for col, qtd in falhas_tamanho.sum().items():
+        if qtd: print(f'  {col}: {qtd}')
+
+# % Index Weight pode vir como fração (0.6) ou texto ("60%", "0,6")
+all_df['% Index Weight'] = coagir_numerico(all_df['% Index Weight'], inteiro=False)[0]
 
 # === ANÁLISE DE SCHEMA ===
 all_df['Schema'] = all_df['Full Table Name'].apply(lambda x: x.split('.')[0] if '.' in str(x) else 'dbo')
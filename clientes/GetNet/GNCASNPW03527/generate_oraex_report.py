@@ -2,14 +2,20 @@ import json
 import pandas as pd
 from datetime import datetime
 import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'cmdb'))
+from oraex.tamanhos import parse_tamanhos
+from oraex.numeros import coagir_numerico
 
 # Carregar dados
 with open('data_summary.json', 'r', encoding='utf-8') as f:
     data = json.load(f)
 
 # Garantir tipos numéricos
-data['total_registros'] = int(str(data['total_registros']).replace('.', '').replace(',', ''))
-data['total_tabelas'] = int(str(data['total_tabelas']))
+totais, _ = coagir_numerico(pd.Series([data['total_registros'], data['total_tabelas']], dtype=object), inteiro=True)
+data['total_registros'], data['total_tabelas'] = (int(v) for v in totais)
 
 # Carregar logo (tenta ler do arquivo local se existir, senão usa placeholder ou string vazia)
 try:
@@ -28,29 +34,13 @@ db_sizes = [] # Precisaríamos do tamanho total por DB, vamos estimar somando as
 
 top_tables = data['top20_tables']
 top_labels = [t['Full Table Name'].split('.')[-1] for t in top_tables[:10]]
-top_data_size = []
-top_index_size = []
-
-def parse_size(size_str):
-    if not isinstance(size_str, str): return 0
-    # Remove pontos de milhar e substitui virgula decimal por ponto
-    clean_str = size_str.upper().replace('.', '').replace(',', '.')
-    
-    if 'GB' in clean_str:
-        return float(clean_str.replace(' GB', '').strip()) * 1024
-    elif 'MB' in clean_str:
-        return float(clean_str.replace(' MB', '').strip())
-    elif 'KB' in clean_str:
-        return float(clean_str.replace(' KB', '').strip()) / 1024
-    # Tenta converter apenas o numero se nao tiver unidade (bytes)
-    try:
-        return float(clean_str.replace(' BYTES', '').strip()) / (1024*1024)
-    except:
-        return 0
 
-for t in top_tables[:10]:
-    top_data_size.append(parse_size(t['Data']))
-    top_index_size.append(parse_size(t['Indexes']))
+# Tamanhos em MB (Data e Indexes convertidos juntos)
+tamanhos_mb, falhas_tamanho = parse_tamanhos(pd.DataFrame(top_tables[:10]), ['Data', 'Indexes'], unidade='MB')
+if falhas_tamanho.any().any():
+    print(f"⚠️ {int(falhas_tamanho.to_numpy().sum())} célula(s) de tamanho não reconhecidas (consideradas 0)")
+top_data_size = tamanhos_mb['Data'].fillna(0).tolist()
+top_index_size = tamanhos_mb['Indexes'].fillna(0).tolist()
 
 # Gerar HTML
 html_content = f"""<!DOCTYPE html>
@@ -0,0 +1,235 @@
+"""
+Agendamento automático das vagas PSU 2026
+=========================================
+Preenche as vagas livres das abas mensais (STATUS NOVO, sem GMUD, título com
+{HOSTNAME}) com os pares ativos do inventário GetNet, do mais atrasado para o
+menos atrasado (ver oraex/agendador.py), e grava Agenda_PSU_2026.xlsx: uma aba
+por mês com as mesmas colunas e linhas da planilha, pronta para colar.
+
+Linhas já preenchidas contam como compromisso: o par já está planejado
+naquele RU e o executor designado está ocupado naquele horário (linhas
+CANCELADA ou REPLANEJAR devolvem o par para o agendamento).
+
+Cada RU respeita as ondas DEV → HML → PROD com soak entre camadas e STANDBY
+antes do PRIMARY (ver oraex/ondas.py): as camadas são agendadas em ordem e
+cada uma só ocupa vagas a partir da data viável dada pelas anteriores.
+
+Ao final, a agenda é simulada por Monte Carlo com os desfechos das GMUDs de
+2025 no mesmo mês (ver oraex/previsao.py): P10/P50/P90 da data em que a frota
+atinge a meta no RU alvo e a chance de atingir dentro do ano.
+
+USO:
+    python agendar_psu.py                       # vagas a partir de hoje
+    python agendar_psu.py --desde 01/01/2026 --horas-semana 36 --soak 7 14
+    python agendar_psu.py --replanejar GNCASSPL04272=20/11/2026
+    python agendar_psu.py --alvo 19.31 --meta 90
+"""
+
+import argparse
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from gerar_relatorio_html import ARQUIVO_2025, ARQUIVO_PLANILHA, BASE_DIR, carregar_gmuds, montar_janelas
+from oraex.agendador import HORAS_SEMANA, MARCADOR_HOST, agendar, preencher_abas
+from oraex.conformidade import chave_versao
+from oraex.executores import carregar_aliases
+from oraex.historico import MESES_DO_ANO
+from oraex.hosts import explodir_hosts
+from oraex.metricas_2025 import carregar_inventario
+from oraex.ondas import CAMADA_DO_ENTORNO, SOAK_DIAS, ULTIMA_CAMADA, PlanoOndas, hosts_da_agenda
+from oraex.previsao import SIMULACOES, dias_replanejamento, simular, taxas_mensais
+
+ARQUIVO_AGENDA = os.path.join(BASE_DIR, 'Agenda_PSU_2026.xlsx')
+COLUNAS_INTERNAS = ['MES_REF', 'LINHA']
+STATUS_SEM_COMPROMISSO = ['CANCELADA', 'REPLANEJAR']
+META_CONFORMIDADE = 95
+
+
+def carregar_pares():
+    """Pares ativos (PRIMARY + STANDBYs de cada linha do inventário GetNet) e a tabela de hosts."""
+    inventario = carregar_inventario(ARQUIVO_PLANILHA)
+    ativos = inventario[inventario['Situacao'] == 'Ativo']
+    hosts = explodir_hosts(ativos, 'PRIMARY HOSTNAME', 'STANDBY HOSTNAME')
+    pares = hosts.groupby('Linha')['Hostname'].agg(list).to_frame('Hostnames')
+    pares['Entorno'] = ativos.loc[pares.index, 'Entorno'].astype(str)
+    pares['Versao'] = ativos.loc[pares.index, 'PSU_Version'].astype(object)
+    return pares, hosts
+
+
+def montar_vagas(df_gmud, janelas, desde):
+    """Vagas livres a partir de ``desde`` e os compromissos das linhas já preenchidas."""
+    status = df_gmud['STATUS GMUD'].fillna('NOVO').astype(str).str.upper().str.strip()
+    alvo = df_gmud['TÍTULO'].astype(str).str.extract(r'PSU\s+(\d+\.\d+)')[0]
+    livre = ((status == 'NOVO') & df_gmud['GMUD'].isna() & (janelas['Hosts'].map(len) == 0) &
+             df_gmud['TÍTULO'].astype(str).str.contains(MARCADOR_HOST, regex=False))
+    vagas = pd.DataFrame({'Inicio': janelas['Inicio'], 'Fim': janelas['Fim'],
+                          'Entorno': df_gmud['ENTORNO'].astype(str).str.strip().str.upper(), 'Alvo': alvo})
+    vagas = vagas[livre & (janelas['Inicio'] >= desde)]
+    fixas = janelas.assign(Alvo=alvo)[~livre & ~status.isin(STATUS_SEM_COMPROMISSO)]
+    return vagas, fixas
+
+
+def aplicar_fixas(pares, fixas):
+    """Pares citados em linhas já preenchidas passam a valer o RU daquela linha."""
+    if 'Pares' not in fixas.columns:
+        return pares
+    citados = fixas[['Pares', 'Alvo']].explode('Pares').dropna()
+    if citados.empty:
+        return pares
+    citados = citados.assign(Chave=chave_versao(citados['Alvo'])).sort_values('Chave')
+    planejado = citados.drop_duplicates('Pares', keep='last').set_index('Pares')
+    planejado = planejado[planejado.index.isin(pares.index)]
+    atual = chave_versao(pares.loc[planejado.index, 'Versao'])
+    avancou = planejado.index[planejado['Chave'].to_numpy() > atual.to_numpy()]
+    pares.loc[avancou, 'Versao'] = planejado.loc[avancou, 'Alvo']
+    return pares
+
+
+def agendar_em_ondas(vagas, pares, hosts, executores, ocupacao, horas_semana, soak):
+    """
+    Agenda camada por camada (DEV, HML, PROD). Em cada RU, os pares de uma camada
+    só são liberados a partir da data viável do plano de ondas montado com as
+    camadas anteriores já agendadas; os executores delas ficam ocupados.
+    """
+    camada_par = pares['Entorno'].map(CAMADA_DO_ENTORNO).fillna(ULTIMA_CAMADA)
+    camada_vaga = vagas['Entorno'].map(CAMADA_DO_ENTORNO).fillna(ULTIMA_CAMADA)
+    agendas, agendadores = [], []
+    for camada in range(ULTIMA_CAMADA + 1):
+        da_camada = pares[camada_par == camada]
+        novos = hosts[hosts['Linha'].isin(da_camada.index)].assign(
+            Entorno=lambda h: h['Linha'].map(da_camada['Entorno']))
+        liberacao = {}
+        feitas = pd.concat(agendas) if agendas else None
+        for alvo in (vagas['Alvo'].dropna().unique() if agendas else []):
+            plano = PlanoOndas(pd.concat([hosts_da_agenda(feitas[feitas['Alvo'] == alvo], hosts), novos]), soak=soak)
+            for linha, data in plano.inicio_pares().reindex(da_camada.index).dropna().items():
+                liberacao[(linha, alvo)] = data
+        compromissos = pd.concat([c for c in [ocupacao] + [a[['Executor', 'Inicio', 'Fim']] for a in agendas]
+                                  if c is not None])
+        agendador = agendar(vagas[camada_vaga == camada], da_camada, executores, compromissos,
+                            horas_semana=horas_semana, liberacao=liberacao)
+        agendadores.append(agendador)
+        agenda_camada = agendador.agenda()
+        if len(agenda_camada):
+            agendas.append(agenda_camada)
+
+    agenda = pd.concat(agendas).sort_values('Inicio', kind='stable') if agendas else agenda_camada
+    planos = {alvo: PlanoOndas(hosts_da_agenda(parte, hosts), soak=soak) for alvo, parte in agenda.groupby('Alvo')}
+    return agendadores, agenda, planos
+
+
+def replanejar(planos, escorregadas):
+    """Aplica 'HOST=dd/mm/aaaa' na primeira onda do host e mostra quem muda de data."""
+    for item in escorregadas:
+        host, _, data = item.partition('=')
+        host = host.strip().upper()
+        plano = next((p for _, p in sorted(planos.items()) if host in p.indice), None)
+        if plano is None:
+            print(f"{host}: não está na agenda")
+            continue
+        mudaram = plano.replanejar(host, pd.to_datetime(data, dayfirst=True))
+        atrasados = int(plano.datas()['Atrasado'].sum())
+        print(f"\n{host} -> {data}: {len(mudaram)} host(s) mudam de data; {atrasados} passam do fim da janela agendada")
+        if not mudaram.empty:
+            print(mudaram.head(20).to_string(index=False))
+
+
+def carregar_desfechos():
+    """Taxas mensais de desfecho e dias até a nova data das GMUDs de 2025."""
+    if not os.path.exists(ARQUIVO_2025):
+        return None, None
+    df_25 = pd.read_excel(ARQUIVO_2025)
+    mes = df_25['Mes_Origem'].astype(str).str.upper().str.strip().map({m: i + 1 for i, m in enumerate(MESES_DO_ANO)})
+    inicio = pd.to_datetime(df_25['DATA INICIO'], errors='coerce').fillna(
+        pd.to_datetime(df_25['Data_Inicio'], errors='coerce'))
+    replanejadas = df_25['Status_Normalizado'] == 'REPLANEJADA'
+    return (taxas_mensais(df_25['Status_Normalizado'], mes),
+            dias_replanejamento(inicio[replanejadas], df_25.loc[replanejadas, 'Nova Data inicial']))
+
+
+def prever_conformidade(agenda, fixas, hosts, versao, desde, alvo=None, meta=META_CONFORMIDADE,
+                        simulacoes=SIMULACOES):
+    """Simula a agenda (mais as linhas já preenchidas) e mostra quando a frota atinge ``meta``% no RU ``alvo``."""
+    taxas, dias_replanejar = carregar_desfechos()
+    if taxas is None:
+        print(f"Previsão de conformidade: {ARQUIVO_2025} não encontrado")
+        return None
+    alvos = pd.concat([agenda['Alvo'], fixas['Alvo']]).dropna()
+    if alvo is None:
+        if alvos.empty:
+            return None
+        alvo = alvos.loc[chave_versao(alvos).idxmin()]
+    chave = chave_versao(pd.Series([alvo]))[0]
+
+    # GMUDs que deixam os hosts no alvo: agenda nova + linhas já preenchidas com hosts, no alvo ou além
+    gmuds = pd.concat([agenda[['Inicio', 'Alvo', 'Hostnames']],
+                       fixas[['Inicio', 'Alvo', 'Hosts']].rename(columns={'Hosts': 'Hostnames'})])
+    gmuds = gmuds[(chave_versao(gmuds['Alvo']) >= chave) & (gmuds['Inicio'] >= desde) &
+                  (gmuds['Hostnames'].str.len() > 0)]
+    frota = hosts[['Hostname']].assign(
+        Conforme=(chave_versao(hosts['Linha'].map(versao)) >= chave).to_numpy())
+    previsao = simular(gmuds, frota, taxas, meta=meta / 100, simulacoes=simulacoes,
+                       dias_replanejar=dias_replanejar, origem=desde)
+
+    fim_do_ano = pd.Timestamp(year=desde.year, month=12, day=31, hour=23, minute=59)
+    quantis = previsao.quantis().map(lambda d: 'não atinge' if pd.isna(d) else d.strftime('%d/%m/%Y'))
+    print(f"\nPrevisão de conformidade {alvo} ({len(previsao)} simulações, {len(gmuds)} GMUDs, "
+          f"replanejamento em {dias_replanejar:.0f} dias): hoje {previsao.conformes:.1%} da frota")
+    print(f"Meta {meta:g}%: " + ' | '.join(f"{q} {d}" for q, d in quantis.items()) +
+          f" | chance até {fim_do_ano:%d/%m/%Y}: {previsao.probabilidade(fim_do_ano):.0%}")
+    return previsao
+
+
+def gerar_agenda(desde, horas_semana=HORAS_SEMANA, soak=None, escorregadas=(), alvo=None, meta=META_CONFORMIDADE):
+    df_gmud = carregar_gmuds()
+    pares, hosts = carregar_pares()
+    janelas = montar_janelas(df_gmud, hosts)
+    vagas, fixas = montar_vagas(df_gmud, janelas, desde)
+    versao = pares['Versao'].copy()
+    pares = aplicar_fixas(pares, fixas)
+    executores = list(carregar_aliases()['executores'])
+    ocupacao = fixas[['Executor', 'Inicio', 'Fim']] if 'Executor' in fixas.columns else None
+
+    agendadores, agenda, planos = agendar_em_ondas(vagas, pares, hosts, executores, ocupacao, horas_semana, soak)
+    pendentes = pd.concat([a.pendentes() for a in agendadores])
+    melhorias = sum(a.melhorias for a in agendadores)
+
+    print(f"Vagas livres: {len(vagas)} | pares ativos: {len(pares)} | executores: {len(executores)}")
+    print(f"Vagas preenchidas: {len(agenda)} | trocas/antecipações na melhoria local: {melhorias}")
+    atrasados = sum(int(p.datas()['Atrasado'].sum()) for p in planos.values())
+    print(f"Ondas DEV → HML → PROD: {atrasados} host(s) agendado(s) antes da data viável")
+    if not agenda.empty:
+        print(agenda.groupby(['Alvo', 'Entorno']).agg(Pares=('Linha', 'size'), Atraso_Medio=('Atraso', 'mean'),
+                                                      Ultima_Janela=('Inicio', 'max')).round({'Atraso_Medio': 1}).to_string())
+    print(f"Pares que continuam atrás do RU mais novo planejado: {len(pendentes)}")
+    # A última camada enxerga as anteriores como ocupação: a carga dela é a do ano inteiro
+    if agendadores:
+        carga = agendadores[-1].carga.resumo()
+        print(carga[['Horas_Pico', 'Semana_Pico', 'Media_Semanal', 'Pct_Noturno', 'Horas_Sobrepostas']].to_string())
+
+    preenchidas = preencher_abas(df_gmud, agenda)
+    with pd.ExcelWriter(ARQUIVO_AGENDA) as escritor:
+        for mes, linhas in preenchidas.groupby('MES_REF', sort=False):
+            # Cabeçalho na linha 3, como nas abas da planilha
+            linhas.drop(columns=COLUNAS_INTERNAS).to_excel(escritor, sheet_name=mes, index=False, startrow=2)
+    print(f"Agenda gravada em: {ARQUIVO_AGENDA}")
+    replanejar(planos, escorregadas)
+    prever_conformidade(agenda, fixas, hosts, versao, desde, alvo, meta)
+    return agenda
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Agendamento automático das vagas PSU 2026')
+    parser.add_argument('--desde', help='Primeira data a agendar (dd/mm/aaaa); padrão: hoje')
+    parser.add_argument('--horas-semana', type=float, default=HORAS_SEMANA, help='Horas de janela por executor por semana')
+    parser.add_argument('--soak', type=float, nargs=2, metavar=('DEV', 'HML'),
+                        default=[SOAK_DIAS[0], SOAK_DIAS[1]], help='Dias de soak após DEV e após HML')
+    parser.add_argument('--replanejar', action='append', default=[], metavar='HOST=dd/mm/aaaa',
+                        help='GMUD que escorregou: mostra os hosts afetados (pode repetir)')
+    parser.add_argument('--alvo', help='RU da previsão de conformidade (ex.: 19.31); padrão: o mais antigo da agenda')
+    parser.add_argument('--meta', type=float, default=META_CONFORMIDADE, help='Meta de conformidade da frota (%%)')
+    args = parser.parse_args()
+    desde = pd.to_datetime(args.desde, dayfirst=True) if args.desde else pd.Timestamp(datetime.now().date())
+    gerar_agenda(desde, args.horas_semana, dict(enumerate(args.soak)), args.replanejar, args.alvo, args.meta)
@@ -65,35 +65,34 @@ def enviar_slack(mensagem: str, webhook_url: str = None) -> bool:
         return False
 
 
-def carregar_servidores_criticos(planilha_path: str) -> list:
-    """Carrega servidores com status 'Crítico' da planilha."""
-    if not os.path.exists(planilha_path):
-        print(f"❌ Planilha não encontrada: {planilha_path}")
-        return []
-        
+def carregar_servidores_criticos(limite: int = 15) -> tuple:
+    """
+    Os ``limite`` hosts de maior risco do inventário (ver oraex/risco.py) e quantos
+    estão na faixa Crítico, a partir do artefato do relatório.
+    """
     try:
-        wb = openpyxl.load_workbook(planilha_path)
-        ws = wb['Servidores']
-        criticos = []
-        # iter_rows começa da linha 1. Se cabeçalho está na 3, dados começam na 4.
-        for row in ws.iter_rows(min_row=4, values_only=True):
-            if not row[0]: continue # Pular vazio
-            
-            # Ajustar índices conforme colunas reais da planilha (A=0, E=4...)
-            # Assumindo: Hostname(0), Ambiente(1), PSU(2), Status(4)
-            status_val = row[4] if len(row) > 4 else None
-            
-            if status_val == 'Crítico':
-                criticos.append({
-                    'hostname': row[0],
-                    'ambiente': row[1],
-                    'psu_atual': row[2],
-                    'ultima_atualizacao': row[5] if len(row) > 5 else 'N/A'
-                })
-        return criticos
+        from gerar_relatorio_html import obter_metricas
+        from oraex.risco import top_k
+        artefato = obter_metricas()
+        if 'riscos' not in artefato.nomes_tabelas:
+            print("Riscos indisponíveis no artefato.")
+            return [], 0
+        riscos = artefato.tabela('riscos')
     except Exception as e:
-        print(f"Erro ao carregar planilha: {e}")
-        return []
+        print(f"Erro ao carregar riscos: {e}")
+        return [], 0
+
+    criticos = riscos[riscos['Faixa'] == 'Crítico']
+    piores = top_k(criticos, limite)
+    dias = piores['Dias_Sem_Sucesso'].astype(object).where(piores['Dias_Sem_Sucesso'].notna(), None)
+    return [{
+        'hostname': hostname,
+        'ambiente': ambiente,
+        'psu_atual': versao,
+        'risco': risco,
+        'dias': d,
+    } for hostname, ambiente, versao, risco, d in zip(piores['Hostname'], piores['Entorno'],
+                                                     piores['Versao'].fillna('N/A'), piores['Risco'], dias)], len(criticos)
 
 
 def lembrete_diario():
@@ -169,24 +168,25 @@ def lembrete_diario():
 
 
 def alerta_servidores_criticos():
-    """Envia alerta sobre servidores em estado crítico."""
-    criticos = carregar_servidores_criticos(PLANILHA_PATH)
+    """Envia alerta com os servidores de maior risco (faixa Crítico, do pior para o melhor)."""
+    criticos, total = carregar_servidores_criticos(15) # Limitar a 15 para não spammar
     
     if not criticos:
         print("Nenhum servidor crítico encontrado.")
         return True
     
     lista_servidores = "\n".join([
-        f"• `{s['hostname']}` - {s['ambiente']} - PSU {s['psu_atual']}"
-        for s in criticos[:15] # Limitar a 15 para não spammar
+        f"• `{s['hostname']}` - {s['ambiente']} - PSU {s['psu_atual']} - risco {s['risco']:.0f}"
+        + (" - nunca atualizado" if s['dias'] is None else f" - {s['dias']:.0f} dias sem patch")
+        for s in criticos
     ])
     
-    truncado = "... (e mais)" if len(criticos) > 15 else ""
+    truncado = f"... (e mais {total - len(criticos)})" if total > len(criticos) else ""
     
     mensagem = f"""
 :rotating_light: *ALERTA: SERVIDORES CRÍTICOS*
 
-Os seguintes servidores estão com PSU desatualizado (3+ quarters):
+Maior risco primeiro (atraso de RU, ambiente, suporte da versão, standby e tempo desde o último patch):
 
 {lista_servidores}
 {truncado}
@@ -196,14 +196,105 @@ Os seguintes servidores estão com PSU desatualizado (3+ quarters):
     return enviar_slack(mensagem)
 
 
+def carregar_metricas() -> dict:
+    """KPIs do artefato de métricas do relatório (o mesmo cálculo do dashboard)."""
+    try:
+        from gerar_relatorio_html import obter_metricas
+        return obter_metricas().metricas
+    except Exception as e:
+        print(f"Métricas indisponíveis: {e}")
+        return {}
+
+
+def carregar_cubo():
+    """Cubo de GMUDs 2026 do artefato (ver oraex/cubo.py), ou None se indisponível."""
+    try:
+        from gerar_relatorio_html import obter_metricas
+        from oraex.cubo import CuboOlap
+        artefato = obter_metricas()
+        if 'cubo' not in artefato.nomes_tabelas:
+            return None
+        return CuboOlap.de_agregados(artefato.tabela('cubo'))
+    except Exception as e:
+        print(f"Cubo indisponível: {e}")
+        return None
+
+
+def formatar_data(valor) -> str:
+    """dd/mm HH:MM de um datetime/Timestamp (ou o próprio valor como texto)."""
+    return valor.strftime('%d/%m %H:%M') if hasattr(valor, 'strftime') else str(valor)
+
+
+def alerta_conflitos(dias: int = 7):
+    """Pré-execução: GMUDs dos próximos dias com janela sobreposta no mesmo host, par ou executor."""
+    try:
+        from gerar_relatorio_html import obter_metricas
+        from oraex.conflitos import proximos
+        artefato = obter_metricas()
+        if 'conflitos' not in artefato.nomes_tabelas:
+            print("Conflitos indisponíveis no artefato.")
+            return True
+        conflitos = proximos(artefato.tabela('conflitos'), datetime.now().date(), dias)
+    except Exception as e:
+        print(f"Erro ao verificar conflitos: {e}")
+        return False
+
+    if conflitos.empty:
+        print(f"Nenhum conflito de janela nos próximos {dias} dias.")
+        return True
+
+    lista = "\n".join([
+        f"• *{c['Tipo']}* `{c['Chave']}`: {c['Id_A']} ({formatar_data(c['Inicio_A'])}) x {c['Id_B']} ({formatar_data(c['Inicio_B'])}) - {c['Horas_Sobreposicao']}h"
+        for _, c in conflitos.head(15).iterrows() # Limitar a 15 para não spammar
+    ])
+    truncado = f"... (e mais {len(conflitos) - 15})" if len(conflitos) > 15 else ""
+
+    mensagem = f"""
+:warning: *PRÉ-EXECUÇÃO: CONFLITOS DE JANELA (próximos {dias} dias)*
+
+{lista}
+{truncado}
+
+:point_right: *Ação necessária:* Reagendar uma das GMUDs ou redistribuir o executor.
+"""
+    return enviar_slack(mensagem)
+
+
 def resumo_semanal():
     """Envia resumo semanal às segundas-feiras."""
     hoje = datetime.now()
     semana_passada = hoje - timedelta(days=7)
     
+    metricas = carregar_metricas()
+    indicadores = ""
+    # 'gmud' sempre traz coluna_status (mesmo sem GMUDs): os KPIs só existem se houver o total
+    g = metricas.get('gmud') or {}
+    if 'total' in g:
+        indicadores += f":clipboard: *GMUDs:* {g['total']} | Encerradas: {g['sucesso']} | Falhas: {g['falhas']} | Taxa de sucesso: {g['taxa_sucesso']:.1f}%\n"
+    i = metricas.get('inventario') or {}
+    if 'total' in i:
+        indicadores += f":computer: *Inventário:* {i['total']} servidores | Atualizados: {i['atualizados']} | Críticos: {i['criticos']}\n"
+
+    # PSU do mês corrente por entorno e executor, direto do cubo (sem abrir a planilha)
+    cubo = carregar_cubo()
+    if cubo is not None:
+        from oraex.executores import NAO_ATRIBUIDO
+        from oraex.historico import MESES_DO_ANO
+        mes = f"{MESES_DO_ANO[hoje.month - 1]}-{hoje:%y}"
+        por_entorno = cubo.rollup('Entorno', ['GMUDs', 'Sucessos'], Categoria='PSU', Mes=mes)
+        if len(por_entorno):
+            entornos = " | ".join(f"{e}: {r['Sucessos']}/{r['GMUDs']}" for e, r in por_entorno.iterrows())
+            indicadores += f":package: *PSU {mes.capitalize()} (encerradas/planejadas):* {entornos}\n"
+            por_executor = cubo.rollup('Executor', 'GMUDs', Categoria='PSU', Mes=mes)['GMUDs']
+            por_executor = por_executor.drop(NAO_ATRIBUIDO, errors='ignore').nlargest(3)
+            if len(por_executor):
+                executores = " | ".join(f"{e}: {n}" for e, n in por_executor.items())
+                indicadores += f":bust_in_silhouette: *Executores no mês:* {executores}\n"
+    
     mensagem = f"""
 :bar_chart: *RESUMO SEMANAL PSU - Semana {semana_passada.strftime('%d/%m')} a {hoje.strftime('%d/%m/%Y')}*
 
+{indicadores}
 Acesse o Dashboard completo para ver os indicadores:
 https://jonathanfferreira.github.io/oraex/
 
@@ -221,7 +312,7 @@ def testar_conexao():
 # ============ EXECUÇÃO ============
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Gestão de Alertas Slack PSU')
-    parser.add_argument('--action', choices=['test', 'daily', 'critical', 'weekly'], help='Ação a ser executada')
+    parser.add_argument('--action', choices=['test', 'daily', 'critical', 'weekly', 'preflight'], help='Ação a ser executada')
     args = parser.parse_args()
 
     print("=" * 50)
@@ -234,6 +325,7 @@ if __name__ == "__main__":
         elif args.action == 'daily': lembrete_diario()
         elif args.action == 'critical': alerta_servidores_criticos()
         elif args.action == 'weekly': resumo_semanal()
+        elif args.action == 'preflight': alerta_conflitos()
     else:
         # Modo Interativo (Menu)
         print("\nEscolha uma opção:")
@@ -241,7 +333,8 @@ if __name__ == "__main__":
         print("2. Enviar lembrete diário")
         print("3. Enviar alerta de servidores críticos")
         print("4. Enviar resumo semanal")
-        print("5. Sair")
+        print("5. Enviar alerta de conflitos de janela")
+        print("6. Sair")
         
         opcao = input("\nOpção: ").strip()
         
@@ -249,5 +342,6 @@ if __name__ == "__main__":
         elif opcao == "2": lembrete_diario()
         elif opcao == "3": alerta_servidores_criticos()
         elif opcao == "4": resumo_semanal()
-        elif opcao == "5": print("Até mais!")
+        elif opcao == "5": alerta_conflitos()
+        elif opcao == "6": print("Até mais!")
         else: print("Opção inválida.")
@@ -0,0 +1,81 @@
+"""
+Consulta ao cubo de GMUDs
+=========================
+Responde perguntas de drill-down (roll-up e fatia) a partir do cubo gravado
+no artefato de métricas (ver oraex/cubo.py), sem reler as planilhas enquanto
+elas não mudarem.
+
+Dimensões: Categoria, Status, Mes, Trimestre, Entorno, Executor, Versao, Cliente
+Medidas:   GMUDs, Servidores, Horas, Sucessos
+
+USO:
+    python consultar_cubo.py --por Executor --filtro Categoria=PSU Entorno=Produção Trimestre=Q3
+    python consultar_cubo.py --ano 2026 --por Mes Entorno --medidas GMUDs Horas
+    python consultar_cubo.py --por Versao --filtro "Status=SUCESSO,CANCELADA"
+    python consultar_cubo.py --valores Executor
+    python consultar_cubo.py --arquivo "ORAEX - Consolidação GetTech 2025 (1).xlsm" --por Mes
+"""
+
+import argparse
+import time
+
+from oraex.cubo import DIMENSOES_CUBO, MEDIDAS_CUBO, CuboOlap
+
+
+def carregar(ano: int, arquivo: str = None) -> CuboOlap:
+    """Cubo do artefato do ano (recalculado só se a planilha mudou); 2025: ``arquivo`` ou a última revisão."""
+    if ano == 2025:
+        from oraex.metricas_2025 import obter_artefato
+        from transicoes_gmud import revisoes
+        artefato = obter_artefato(arquivo or revisoes()[-1])
+    else:
+        from gerar_relatorio_html import obter_metricas
+        artefato = obter_metricas()
+    return CuboOlap.de_agregados(artefato.tabela('cubo'))
+
+
+def filtros_da_linha(pares: list) -> dict:
+    """['Entorno=Produção', 'Status=SUCESSO,CANCELADA'] -> {'Entorno': 'Produção', 'Status': [...]}."""
+    filtros = {}
+    for par in pares or []:
+        if '=' not in par:
+            raise SystemExit(f"Filtro inválido: {par} (use Dimensao=valor)")
+        dim, valor = par.split('=', 1)
+        if dim.strip() not in DIMENSOES_CUBO:
+            raise SystemExit(f"Dimensão desconhecida: {dim} (use {', '.join(DIMENSOES_CUBO)})")
+        valores = [v.strip() for v in valor.split(',')]
+        filtros[dim.strip()] = valores if len(valores) > 1 else valores[0]
+    return filtros
+
+
+def main(ano: int, por: list, filtros: dict, medidas: list, valores: str = None, arquivo: str = None):
+    cubo = carregar(ano, arquivo)
+    if valores:
+        print('\n'.join(cubo.valores(valores)))
+        return
+    inicio = time.perf_counter()
+    if por:
+        resultado = cubo.rollup(por, medidas, **filtros)
+    else:
+        resultado = {m: cubo.total(m, **filtros) for m in medidas}
+    decorrido = (time.perf_counter() - inicio) * 1e6
+
+    filtro_texto = ', '.join(f"{d}={v}" for d, v in filtros.items()) or 'sem filtro'
+    print(f"Cubo {ano}: {len(cubo)} células | {filtro_texto} | consulta em {decorrido:.0f} µs\n")
+    if por:
+        print(resultado.round(1).to_string() if len(resultado) else "Nenhuma GMUD nesta fatia")
+    else:
+        for medida, valor in resultado.items():
+            print(f"{medida}: {valor:,.1f}" if medida == 'Horas' else f"{medida}: {valor}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Roll-up e fatia do cubo de GMUDs')
+    parser.add_argument('--ano', type=int, choices=[2025, 2026], default=2025, help='Artefato consultado')
+    parser.add_argument('--por', nargs='*', choices=DIMENSOES_CUBO, default=[], help='Dimensões da quebra (vazio = total)')
+    parser.add_argument('--filtro', nargs='*', help='Dimensao=valor (vários valores separados por vírgula)')
+    parser.add_argument('--medidas', nargs='+', choices=MEDIDAS_CUBO, default=MEDIDAS_CUBO)
+    parser.add_argument('--valores', choices=DIMENSOES_CUBO, help='Só lista os valores de uma dimensão')
+    parser.add_argument('--arquivo', help='Planilha 2025; padrão: a última revisão da consolidação')
+    args = parser.parse_args()
+    main(args.ano, args.por, filtros_da_linha(args.filtro), args.medidas, args.valores, args.arquivo)
@@ -2,17 +2,35 @@ import pandas as pd
 import plotly.express as px
 import plotly.io as pio
 from jinja2 import Template
-from datetime import datetime
+from datetime import date, datetime
 import os
+import sys
 import base64
 
+from oraex.executores import resolver_executores, NAO_ATRIBUIDO, ARQUIVO_ALIASES
+from oraex.normalizacao import normalizar_gmuds, normalizar_status, otimizar_tipos
+from oraex.artefato import obter_artefato
+from oraex.hosts import COLUNAS_HOSTS, IndiceHosts, explodir_hosts, atributos_hosts, separar_hostnames
+from oraex.conflitos import detectar_conflitos
+from oraex.anual import CuboAnual, canonizar, mes_da_linha
+from oraex.agregados import ArmazemKpis
+from oraex.duplicidade import deduplicar
+from oraex.historico import MESES_DO_ANO
+from oraex.risco import pontuar, top_k
+from oraex import regras
+
 # Configuração
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ARQUIVO_PLANILHA = os.path.join(BASE_DIR, 'ORAEX_Planejamento_GetNet_2026.xlsx')
 ARQUIVO_SAIDA = os.path.join(BASE_DIR, 'Relatorio_GMUDs_2026.html')
 ARQUIVO_LOGO = os.path.join(BASE_DIR, 'oraex_logo.png')
 ARQUIVO_TEMPLATE = os.path.join(BASE_DIR, 'template_relatorio.html')
+ARQUIVO_2025 = os.path.join(BASE_DIR, 'consolidated_gmuds_2025.xlsx')
+PASTA_ARTEFATO = os.path.join(BASE_DIR, '.cache', 'metricas_2026')
+PASTA_ANUAL = os.path.join(BASE_DIR, '.cache', 'anual')
+PASTA_CACHE = os.path.join(BASE_DIR, '.cache')
 ABA_INVENTARIO = 'INVENTÁRIO SERVIDORES'
+TOP_RISCO = 50 # hosts na tabela "Servidores Desatualizados / Críticos"
 
 MESES = [
     'JANEIRO-26', 'FEVEREIRO-26', 'MARÇO-26', 'ABRIL-26', 'MAIO-26', 'JUNHO-26',
@@ -39,6 +57,7 @@ def carregar_gmuds():
             df = pd.read_excel(ARQUIVO_PLANILHA, sheet_name=mes, header=2)
             df.columns = df.columns.astype(str).str.strip().str.upper()
             df['MES_REF'] = mes
+            df['LINHA'] = df.index + 4 # linha da aba no Excel (cabeçalho na linha 3)
             df = df.dropna(subset=['CLIENTE'])
             dfs.append(df)
         except: pass
@@ -54,44 +73,120 @@ def carregar_inventario():
         print(f"Erro ao ler inventário: {e}")
         return pd.DataFrame()
 
-def gerar_relatorio():
-    print("Gerando Relatório Completo...")
+def montar_janelas(df_gmud, hosts=None):
+    """Janelas das abas mensais para o detector de conflitos: Id, Inicio, Fim, Hosts, Pares, Executor."""
+    col_fim = next((c for c in ['DATA TÉRMINO', 'DATA FIM'] if c in df_gmud.columns), None)
+    ids = df_gmud['MES_REF'].astype(str) + ' L' + df_gmud['LINHA'].astype(str)
+    if 'GMUD' in df_gmud.columns:
+        ids = df_gmud['GMUD'].astype(object).where(df_gmud['GMUD'].notna(), ids)
+    janelas = pd.DataFrame({
+        'Id': ids,
+        'Inicio': pd.to_datetime(df_gmud['DATA INICIO'], dayfirst=True, errors='coerce'),
+        'Fim': pd.to_datetime(df_gmud[col_fim], dayfirst=True, errors='coerce') if col_fim else pd.NaT,
+    }, index=df_gmud.index)
+
+    # Hosts: coluna HOSTS + hostnames do inventário citados no título
+    citados = df_gmud['HOSTS'].map(separar_hostnames) if 'HOSTS' in df_gmud.columns else pd.Series([[]] * len(df_gmud), index=df_gmud.index)
+    if hosts is not None and len(hosts):
+        no_titulo = IndiceHosts(hosts['Hostname']).extrair_serie(df_gmud['TÍTULO'])
+        citados = citados + no_titulo
+        # Par primary/standby = linha do inventário de onde o host veio
+        par = dict(zip(hosts['Hostname'], hosts['Linha']))
+        janelas['Pares'] = [sorted({par[h] for h in lista if h in par}) for lista in citados]
+    janelas['Hosts'] = [sorted(set(lista)) for lista in citados]
+
+    col_resp = 'DESIGNADO A' if 'DESIGNADO A' in df_gmud.columns else None
+    if col_resp:
+        executores = resolver_executores(df_gmud[col_resp])
+        janelas['Executor'] = executores.astype(object).where(executores != NAO_ATRIBUIDO)
+    return janelas
+
+def gmuds_do_cubo(df_gmud, col_status, janelas):
+    """Abas 2026 -> colunas das GMUDs normalizadas (Status_Final, Versao_PSU...) + hosts e janela de montar_janelas."""
+    df = pd.DataFrame({
+        'Status': df_gmud[col_status].astype(str),
+        'Titulo': df_gmud['TÍTULO'].astype(str),
+        'Mes': df_gmud['MES_REF'].astype(str),
+        'Entorno': df_gmud['ENTORNO'],
+        'Cliente': df_gmud['CLIENTE'],
+        'Data_Inicio': janelas['Inicio'],
+        'Data_Termino': janelas['Fim'],
+        'Num_Servers': janelas['Hosts'].map(len),
+        'GMUD_ID': janelas['Id'],
+    }, index=df_gmud.index)
+    if 'DESIGNADO A' in df_gmud.columns:
+        df['Responsavel'] = df_gmud['DESIGNADO A']
+    return normalizar_gmuds(df)
+
+def ler_2025():
+    """Consolidação 2025 com Data_Inicio única."""
+    df = pd.read_excel(ARQUIVO_2025)
+    # A consolidação junta abas com cabeçalhos diferentes ('DATA INICIO' / 'Data_Inicio'):
+    # a data de início é a primeira preenchida entre elas
+    cols_dt = [c for c in ('DATA INICIO', 'Data_Inicio') if c in df.columns]
+    return df.assign(Data_Inicio=df[cols_dt].apply(pd.to_datetime, errors='coerce').bfill(axis=1).iloc[:, 0])
+
+def fragmento_2025():
+    """Consolidação 2025 -> fragmento do cubo anual, com as CHGs repetidas entre abas descartadas."""
+    df = ler_2025()
+    df, _ = deduplicar(df.assign(Mes=df['Mes_Origem']))
+    return canonizar(2025, df['Status'], mes_da_linha(df['Data_Inicio'], df['Mes']), df['Titulo'], df['Entorno'])
+
+def ultimos_sucessos(df_gmud, col_status, janelas):
+    """Data da última GMUD de sucesso de cada host: consolidação 2025 + abas 2026 (hosts de montar_janelas)."""
+    partes = []
+    if os.path.exists(ARQUIVO_2025):
+        df = ler_2025()
+        # Hostnames da consolidação estão gravados como texto "['HOST1', 'HOST2']"
+        partes.append(pd.DataFrame({'Hostname': df['Hostnames'].astype(str).str.findall(r"'([^']+)'"),
+                                    'Data': df['Data_Inicio'], 'Status': df['Status']}))
+    if janelas is not None:
+        partes.append(pd.DataFrame({'Hostname': janelas['Hosts'], 'Data': janelas['Inicio'], 'Status': df_gmud[col_status]}))
+    if not partes:
+        return pd.Series(dtype='datetime64[ns]')
+    eventos = pd.concat(partes, ignore_index=True)
+    eventos = eventos[normalizar_status(eventos['Status']).astype(str) == 'SUCESSO']
+    eventos = eventos.explode('Hostname').dropna(subset=['Hostname', 'Data'])
+    return eventos.groupby(eventos['Hostname'].astype(str).str.upper())['Data'].max()
+
+def _contagem(serie, nomes):
+    """value_counts como DataFrame de duas colunas (para os gráficos)."""
+    df = serie.value_counts().reset_index()
+    df.columns = nomes
+    return df
+
+def calcular_metricas(hoje=None):
+    """Análise completa (GMUDs 2026, retrospectiva 2025, inventário): devolve (metricas, tabelas) para o artefato; ``hoje`` é a data de referência do risco."""
+    print("Calculando métricas...")
+    metricas = {'gmud': {}, 'inventario': {}, 'retro_2025': {}}
+    tabelas = {}
     
     # --- GMUDS ---
     df_gmud = carregar_gmuds()
     
     # Calcular KPIs GMUD
+    col_status = 'STATUS GMUD'
     if not df_gmud.empty:
-        col_status = 'STATUS GMUD'
         if col_status not in df_gmud.columns: col_status = 'STATUS' # Fallback
         
         df_gmud[col_status] = df_gmud[col_status].fillna('NOVO').astype(str).str.upper().str.strip()
+        df_gmud['MES_REF'] = pd.Categorical(df_gmud['MES_REF'], categories=MESES, ordered=True)
+        otimizar_tipos(df_gmud, [col_status, 'ENTORNO', 'CLIENTE', 'TIPO DB', 'DESIGNADO A', 'ABERTO POR'],
+                       ['TÍTULO', 'OBSERVAÇÃO'])
         
         total_gmuds = len(df_gmud)
         sucesso_count = len(df_gmud[df_gmud[col_status] == 'ENCERRADA'])
         falha_count = len(df_gmud[df_gmud[col_status].isin(['REPLANEJAR', 'CANCELADA', 'FALHA'])])
         base_calc = sucesso_count + falha_count
         taxa = (sucesso_count / base_calc * 100) if base_calc > 0 else 0
+        metricas['gmud'] = {'total': total_gmuds, 'sucesso': sucesso_count, 'falhas': falha_count, 'taxa_sucesso': taxa,
+                            'por_status': df_gmud[col_status].value_counts().to_dict()}
         
-        # Plots GMUD
-        color_map = {'ENCERRADA': '#198754', 'REPLANEJAR': '#dc3545', 'NOVO': '#e9ecef', 'PROGRAMADA': '#0d6efd', 'AUTORIZAR': '#ffc107', 'AVALIAR': '#fd7e14'}
-        
-        fig_m = px.bar(df_gmud.groupby(['MES_REF', col_status]).size().reset_index(name='QTD'), 
-                      x='MES_REF', y='QTD', color=col_status, color_discrete_map=color_map)
-        fig_m.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Segoe UI", margin=dict(t=10,l=10,r=10,b=10))
-        plot_mensal = pio.to_html(fig_m, full_html=False, include_plotlyjs='cdn', config={'displayModeBar': False})
-        
-        fig_p = px.pie(df_gmud, names=col_status, color=col_status, color_discrete_map=color_map, hole=0.5)
-        fig_p.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Segoe UI", margin=dict(t=10,l=10,r=10,b=10))
-        plot_pizza = pio.to_html(fig_p, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
-        
-        # Tabela GMUD
-        cols = ['DATA INICIO', 'CLIENTE', 'ENTORNO', 'GMUD', 'TÍTULO', col_status, 'DESIGNADO A']
-        cols = [c for c in cols if c in df_gmud.columns]
-        gmud_html = df_gmud[df_gmud[col_status]!='NOVO'].tail(50).to_html(classes='table table-hover table-sm small', index=False, border=0)
+        tabelas['gmud_mensal'] = df_gmud.groupby(['MES_REF', col_status], observed=True).size().reset_index(name='QTD')
+        tabelas['gmud_status'] = _contagem(df_gmud[col_status], [col_status, 'QTD'])
+        tabelas['gmuds_recentes'] = df_gmud[df_gmud[col_status]!='NOVO'].drop(columns='LINHA').tail(50)
 
         # Timeline
-        plot_timeline = ""
         try:
              range_cols = ['DATA INICIO', 'DATA FIM']
              if all(c in df_gmud.columns for c in range_cols):
@@ -99,56 +194,33 @@ def gerar_relatorio():
                  df_gmud[range_cols[1]] = pd.to_datetime(df_gmud[range_cols[1]], errors='coerce')
                  df_tl = df_gmud.dropna(subset=range_cols)
                  df_tl = df_tl[~df_tl[col_status].isin(['NOVO', 'CANCELADA'])]
-                 
-                 if not df_tl.empty:
-                     y_ax = 'AMBIENTE' if 'AMBIENTE' in df_tl.columns else 'CLIENTE'
-                     fig_tl = px.timeline(df_tl, x_start=range_cols[0], x_end=range_cols[1], y=y_ax, color=col_status, 
-                                          color_discrete_map=color_map, hover_name='TÍTULO')
-                     fig_tl.update_yaxes(autorange="reversed")
-                     fig_tl.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", 
-                                          showlegend=True, margin=dict(t=10,l=10,r=10,b=10), height=350)
-                     plot_timeline = pio.to_html(fig_tl, full_html=False, include_plotlyjs=False, config={'displayModeBar': True, 'responsive': True})
+                 y_ax = 'AMBIENTE' if 'AMBIENTE' in df_tl.columns else 'CLIENTE'
+                 tabelas['timeline'] = df_tl[range_cols + [y_ax, col_status, 'TÍTULO']]
         except Exception as e: print(f"Erro Timeline: {e}")
-    else:
-        total_gmuds = 0; sucesso_count=0; falha_count=0; taxa=0; plot_mensal=""; plot_pizza=""; gmud_html="<p>Sem dados</p>"; plot_timeline=""
+    metricas['gmud']['coluna_status'] = col_status
 
-    # --- RETRO 2025 ---
-    plot_2025_mensal = ""
-    plot_2025_status = ""
-    kpi_2025_total = 0
-    kpi_2025_sucesso = "0%"
+    # --- RETRO 2025 e ANO A ANO ---
+    # Cada ano é um fragmento do cubo anual (.cache/anual): a consolidação 2025 só é relida se mudar
     try:
-        file_2025 = os.path.join(DIR_BASE, 'consolidated_gmuds_2025.xlsx')
-        if os.path.exists(file_2025):
-            df_25 = pd.read_excel(file_2025)
-            # Normalizar
-            df_25.columns = df_25.columns.astype(str).str.strip().str.upper()
-            col_dt_25 = next((c for c in df_25.columns if 'DATA' in c or 'INICIO' in c), None)
-            col_st_25 = next((c for c in df_25.columns if 'STATUS' in c or 'SITU' in c), None)
-            
-            if col_dt_25 and col_st_25:
-                df_25[col_dt_25] = pd.to_datetime(df_25[col_dt_25], errors='coerce')
-                df_25 = df_25.dropna(subset=[col_dt_25]) # Drop invalid dates
-                kpi_2025_total = len(df_25)
-                
-                # Sucesso Rate
-                suc_25 = df_25[df_25[col_st_25].astype(str).str.contains('SUCESSO|CONCLU|REALIZAD', case=False, na=False)]
-                if kpi_2025_total > 0:
-                    kpi_2025_sucesso = f"{(len(suc_25)/kpi_2025_total)*100:.1f}%"
-                
-                # Plot Mensal 2025
-                df_25['Mes'] = df_25[col_dt_25].dt.to_period('M').astype(str)
-                df_mes_25 = df_25.groupby('Mes').size().reset_index(name='Qtd')
-                fig_m25 = px.bar(df_mes_25, x='Mes', y='Qtd', text='Qtd', title='', color_discrete_sequence=['#3b82f6'])
-                fig_m25.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", margin=dict(t=10,l=10,r=10,b=20))
-                plot_2025_mensal = pio.to_html(fig_m25, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
-                
-                # Plot Status 2025
-                df_st_25 = df_25[col_st_25].value_counts().reset_index()
-                df_st_25.columns = ['Status', 'Qtd']
-                fig_s25 = px.pie(df_st_25, names='Status', values='Qtd', hole=0.7, color_discrete_sequence=px.colors.qualitative.Pastel)
-                fig_s25.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", showlegend=True, margin=dict(t=0,l=0,r=0,b=0))
-                plot_2025_status = pio.to_html(fig_s25, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+        cubo = CuboAnual(PASTA_ANUAL)
+        if os.path.exists(ARQUIVO_2025):
+            cubo.obter(2025, [ARQUIVO_2025], fragmento_2025, codigo=[__file__])
+        if not df_gmud.empty:
+            cubo.obter(2026, [ARQUIVO_PLANILHA], lambda: canonizar(
+                2026, df_gmud[col_status], mes_da_linha(df_gmud.get('DATA INICIO'), df_gmud['MES_REF']),
+                df_gmud['TÍTULO'], df_gmud['ENTORNO']), codigo=[__file__])
+        tabelas['anual'] = cubo.tabela
+
+        if 2025 in cubo.anos:
+            mensal_25 = cubo.mensal()[2025]
+            status_25 = cubo.tabela[cubo.tabela['Ano'] == 2025].groupby('Status')['GMUDs'].sum()
+            kpi_2025_total = int(mensal_25.sum())
+            metricas['retro_2025']['total'] = kpi_2025_total
+            if kpi_2025_total > 0:
+                metricas['retro_2025']['sucesso'] = f"{status_25.get('SUCESSO', 0) / kpi_2025_total * 100:.1f}%"
+            tabelas['mensal_2025'] = pd.DataFrame({'Mes': MESES_DO_ANO, 'Qtd': mensal_25.to_numpy()})
+            status_25 = status_25[status_25 > 0].sort_values(ascending=False)
+            tabelas['status_2025'] = pd.DataFrame({'Status': status_25.index.astype(str), 'Qtd': status_25.to_numpy()})
     except Exception as e:
         print(f"Erro 2025: {e}")
 
@@ -173,52 +245,251 @@ def gerar_relatorio():
                 if 'PSU' in c and 'VER' in c: rename_map[c] = 'PSU VERSION'
                 if 'SITUA' in c: rename_map[c] = 'STATUS PSU' # Situação costuma ser o status
             
+            # PagoNxt usa NAME / CONTINGENT (mesmo mapeamento do índice de hosts)
+            primario, standby = COLUNAS_HOSTS[sh]
+            rename_map.setdefault(primario.upper(), 'HOSTNAME')
+            rename_map.setdefault(standby.upper(), 'STANDBY')
             d = d.rename(columns=rename_map)
             # Dedup columns (keep first)
             d = d.loc[:, ~d.columns.duplicated()]
+            # Aba GetNet é só Oracle; a PagoNxt mistura PostgreSQL/SQL Server/Mongo e só diz o SGBD no texto
+            if 'TIPO DB' not in d.columns:
+                texto = d.reindex(columns=['SERVICE', 'DESCRIPTION', 'PRODUCT']).fillna('').astype(str).agg(' '.join, axis=1)
+                d['TIPO DB'] = 'Oracle' if 'ORACLE' in sh.upper() else regras.TIPO_DB.aplicar(texto).astype(object)
             df_inv_list.append(d)
         except Exception as e:
             print(f"Erro ao ler aba {sh}: {e}")
 
     df_raw = pd.concat(df_inv_list, ignore_index=True) if df_inv_list else pd.DataFrame()
+    hosts = None
     
-    inv_total = 0; inv_criticos = 0; inv_atualizados = 0
-    plot_inv_env=""; plot_inv_ver=""; plot_inv_status=""; plot_inv_psu=""; plot_inv_type=""; inv_html="<p>Sem dados</p>"
-
     if not df_raw.empty:
-        # Lógica de Explosão (Unpivot) para Contagem Real
-        # Criar DF de Primários
-        df_p = df_raw.copy()
-        df_p['TYPE'] = 'PRIMARY'
-        
-        # Criar DF de Standbys (onde houver)
-        if 'STANDBY' in df_raw.columns:
-            df_s = df_raw[df_raw['STANDBY'].notna()].copy()
-            df_s['HOSTNAME'] = df_s['STANDBY'] # O hostname passa a ser o do standby
-            df_s['TYPE'] = 'STANDBY'
-            # Manter as outras colunas (Ambiente, Versão, etc assumimos iguais ao primary)
-        else:
-            df_s = pd.DataFrame()
-        
-        # Juntar tudo para estatísticas
-        df_full_servers = pd.concat([df_p, df_s], ignore_index=True)
-        
-        # Filtrar hostnames vazios
-        df_full_servers = df_full_servers.dropna(subset=['HOSTNAME'])
-        
-        inv_total = len(df_full_servers)
-        
         # KPIs baseados em STATUS PSU (coluna SITUAÇÃO/STATUS)
         col_status_psu = 'STATUS PSU'
-        if col_status_psu not in df_full_servers.columns:
+        if col_status_psu not in df_raw.columns:
             # Tentar achar
-            poss = [c for c in df_full_servers.columns if 'SITUA' in c or 'STATUS' in c]
+            poss = [c for c in df_raw.columns if 'SITUA' in c or 'STATUS' in c]
             if poss: col_status_psu = poss[0]
+        col_psu = 'PSU VERSION'
+        if col_psu not in df_raw.columns:
+            poss_psu = [c for c in df_raw.columns if 'PSU' in c and 'VER' in c]
+            if poss_psu: col_psu = poss_psu[0]
+        
+        # Explosão Primary + Standby: tabela estreita (hostname, papel, linha do inventário) via melt;
+        # standbys múltiplos na mesma célula viram um host cada. Só as colunas usadas abaixo são juntadas.
+        # Host repetido entre linhas fica na linha Ativa/Running (depois a primeira), não só na primeira.
+        ativa = (regras.SITUACAO.aplicar(df_raw.get(col_status_psu, pd.Series(None, index=df_raw.index))) == 'Ativo') | \
+            df_raw.get('STATUS', pd.Series('', index=df_raw.index)).astype(str).str.contains('Running', case=False)
+        hosts = explodir_hosts(df_raw, 'HOSTNAME', 'STANDBY', prioridade=~ativa)
+        # Frota = só Oracle; `hosts` inteiro segue para o casamento com as GMUDs (conflitos)
+        oracle = df_raw['TIPO DB'].astype(str).eq('Oracle')
+        if (~oracle).any():
+            print(f"  Inventário: {int((~oracle).sum())} linha(s) não-Oracle fora da frota: "
+                  f"{df_raw.loc[~oracle, 'TIPO DB'].fillna('Não informado').value_counts().to_dict()}")
+        df_full_servers = atributos_hosts(hosts[hosts['Linha'].isin(df_raw.index[oracle])], df_raw,
+                                          ['AMBIENTE', 'VERSION', col_status_psu, col_psu])
+        df_full_servers = df_full_servers.rename(columns={'Hostname': 'HOSTNAME', 'Papel': 'TYPE'})
+        
+        inv_total = len(df_full_servers)
+        inv_criticos = 0; inv_atualizados = 0 # críticos: faixa de risco, ver RISCO POR HOST
             
         if col_status_psu in df_full_servers.columns:
-            inv_criticos = len(df_full_servers[df_full_servers[col_status_psu].astype(str).str.contains('Desatualizado|Atenção', case=False, na=False)])
             inv_atualizados = len(df_full_servers[df_full_servers[col_status_psu].astype(str).str.contains('Atualizado|Ok', case=False, na=False)])
+            tabelas['inv_status'] = _contagem(df_full_servers[col_status_psu], ['Status', 'Qtd'])
+        metricas['inventario'] = {'total': inv_total, 'criticos': inv_criticos, 'atualizados': inv_atualizados}
+
+        # Quebras para os gráficos
+        if 'AMBIENTE' in df_full_servers.columns:
+            tabelas['inv_ambiente'] = _contagem(df_full_servers['AMBIENTE'], ['Ambiente', 'Qtd'])
+        if 'VERSION' in df_full_servers.columns:
+            tabelas['inv_versao'] = _contagem(df_full_servers['VERSION'].astype(str).str.extract(r'(\d+(?:\.\d+)?)')[0], ['Versao', 'Qtd'])
+        if col_psu in df_full_servers.columns:
+            # Normalize to string to handle mixed types (float/str) in Excel
+            psu = df_full_servers[col_psu].astype(str).str.strip().replace('nan', 'Unknown')
+            tabelas['inv_psu'] = _contagem(psu, ['PSU', 'Qtd'])
+        tabelas['inv_tipo'] = _contagem(df_full_servers['TYPE'], ['Tipo', 'Qtd'])
+
+    # --- EXECUTORES ---
+    try:
+        col_resp = 'DESIGNADO A'
+        if col_resp not in df_gmud.columns: col_resp = 'ABERTO POR'
+        
+        if col_resp in df_gmud.columns:
+            executores = resolver_executores(df_gmud[col_resp])
+            top_exec = executores[executores != NAO_ATRIBUIDO].value_counts().head(5).reset_index()
+            top_exec.columns = ['Executor', 'Qtd']
+            tabelas['top_executores'] = top_exec
+    except Exception as e: 
+        print(f"Erro Executores: {e}")
+
+    # --- CONFLITOS DE JANELA (mesmo host, par primary/standby ou executor) ---
+    janelas = None
+    try:
+        if not df_gmud.empty:
+            janelas = montar_janelas(df_gmud, hosts)
+            conflitos = detectar_conflitos(janelas)
+            tabelas['conflitos'] = conflitos
+            metricas['conflitos'] = conflitos['Tipo'].value_counts().to_dict()
+    except Exception as e:
+        print(f"Erro Conflitos: {e}")
 
+    # --- RISCO POR HOST (ver oraex.risco): críticos = faixa Crítico, tabela = top-K por risco ---
+    try:
+        if hosts is not None:
+            vazio = pd.Series(None, index=df_full_servers.index, dtype=object)
+            riscos = pontuar(pd.DataFrame({
+                'Hostname': df_full_servers['HOSTNAME'].astype(str).str.upper(),
+                'Linha': df_full_servers['Linha'],
+                'Entorno': regras.ENTORNO.aplicar(df_full_servers.get('AMBIENTE', vazio)).astype(str),
+                'Versao': regras.PSU.aplicar(df_full_servers.get(col_psu, vazio)).astype(object),
+                'Versao_DB': df_full_servers.get('VERSION', vazio),
+                'TYPE': df_full_servers['TYPE'],
+            }), ultimos_sucessos(df_gmud, col_status, janelas), data_ref=hoje)
+            tabelas['riscos'] = riscos
+            metricas['inventario']['criticos'] = int((riscos['Faixa'] == 'Crítico').sum())
+            piores = top_k(riscos, TOP_RISCO)
+            tabelas['inv_criticos'] = pd.DataFrame({
+                'HOSTNAME': piores['Hostname'], 'TYPE': piores['TYPE'], 'AMBIENTE': piores['Entorno'],
+                'VERSION': piores['Versao_DB'], 'PSU': piores['Versao'],
+                'DIAS SEM PATCH': piores['Dias_Sem_Sucesso'].map(lambda d: 'nunca' if pd.isna(d) else f'{d:.0f}'),
+                'RISCO': piores['Risco'], 'FAIXA': piores['Faixa'],
+            })
+    except Exception as e:
+        print(f"Erro Risco: {e}")
+
+    # --- CUBO (status × mês × entorno × executor × RU × categoria × cliente, ver oraex.cubo) ---
+    # Agregados do armazém incremental (só o delta de CHGs é aplicado); alertas Slack leem este cubo
+    try:
+        if janelas is not None:
+            armazem = ArmazemKpis(PASTA_CACHE, 'kpis_2026')
+            delta = armazem.sincronizar(gmuds_do_cubo(df_gmud, col_status, janelas))
+            print(f"  Armazém de KPIs: {delta['inseridas']} inseridas, {delta['alteradas']} alteradas, {delta['removidas']} removidas")
+            tabelas['cubo'] = armazem.agregados
+    except Exception as e:
+        print(f"Erro Cubo: {e}")
+
+    return metricas, tabelas
+
+def obter_metricas(forcar=False):
+    """Artefato de métricas (cmdb/.cache/metricas_2026); recalcula se as planilhas, os aliases, as regras ou o código mudaram ou se virou o dia (risco)."""
+    hoje = date.today()
+    return obter_artefato(PASTA_ARTEFATO, [ARQUIVO_PLANILHA, ARQUIVO_2025, ARQUIVO_ALIASES],
+                          lambda: calcular_metricas(hoje), forcar=forcar, data_ref=hoje,
+                          codigo=[__file__])
+
+def gerar_relatorio(forcar=False):
+    print("Gerando Relatório Completo...")
+    artefato = obter_metricas(forcar=forcar)
+    tem = set(artefato.nomes_tabelas)
+    
+    # --- GMUDS ---
+    kpi_gmud = artefato.metricas['gmud']
+    col_status = kpi_gmud['coluna_status']
+    if 'gmud_mensal' in tem:
+        total_gmuds = kpi_gmud['total']; sucesso_count = kpi_gmud['sucesso']; falha_count = kpi_gmud['falhas']; taxa = kpi_gmud['taxa_sucesso']
+        
+        # Plots GMUD
+        color_map = {'ENCERRADA': '#198754', 'REPLANEJAR': '#dc3545', 'NOVO': '#e9ecef', 'PROGRAMADA': '#0d6efd', 'AUTORIZAR': '#ffc107', 'AVALIAR': '#fd7e14'}
+        
+        fig_m = px.bar(artefato.tabela('gmud_mensal'), 
+                      x='MES_REF', y='QTD', color=col_status, color_discrete_map=color_map)
+        fig_m.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Segoe UI", margin=dict(t=10,l=10,r=10,b=10))
+        plot_mensal = pio.to_html(fig_m, full_html=False, include_plotlyjs='cdn', config={'displayModeBar': False})
+        
+        fig_p = px.pie(artefato.tabela('gmud_status'), names=col_status, values='QTD', color=col_status, color_discrete_map=color_map, hole=0.5)
+        fig_p.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Segoe UI", margin=dict(t=10,l=10,r=10,b=10))
+        plot_pizza = pio.to_html(fig_p, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+        
+        # Tabela GMUD
+        gmud_html = artefato.tabela('gmuds_recentes').to_html(classes='table table-hover table-sm small', index=False, border=0)
+
+        # Timeline
+        plot_timeline = ""
+        try:
+             if 'timeline' in tem:
+                 df_tl = artefato.tabela('timeline')
+                 if not df_tl.empty:
+                     x_start, x_end, y_ax = df_tl.columns[:3]
+                     fig_tl = px.timeline(df_tl, x_start=x_start, x_end=x_end, y=y_ax, color=col_status, 
+                                          color_discrete_map=color_map, hover_name='TÍTULO')
+                     fig_tl.update_yaxes(autorange="reversed")
+                     fig_tl.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", 
+                                          showlegend=True, margin=dict(t=10,l=10,r=10,b=10), height=350)
+                     plot_timeline = pio.to_html(fig_tl, full_html=False, include_plotlyjs=False, config={'displayModeBar': True, 'responsive': True})
+        except Exception as e: print(f"Erro Timeline: {e}")
+    else:
+        total_gmuds = 0; sucesso_count=0; falha_count=0; taxa=0; plot_mensal=""; plot_pizza=""; gmud_html="<p>Sem dados</p>"; plot_timeline=""
+
+    # --- CONFLITOS DE JANELA ---
+    conflitos_html = "<p>Sem dados</p>"
+    if 'conflitos' in tem:
+        df_conf = artefato.tabela('conflitos')
+        if df_conf.empty:
+            conflitos_html = "<div class='p-4 text-green-600 bg-green-50 rounded-lg'>✅ Nenhuma janela sobreposta no mesmo host, par primary/standby ou executor.</div>"
+        else:
+            conflitos_html = df_conf.head(200).to_html(classes='w-full text-sm text-left', index=False, border=0)
+
+    # --- RETRO 2025 ---
+    plot_2025_mensal = ""
+    plot_2025_status = ""
+    kpi_2025_total = artefato.metricas['retro_2025'].get('total', 0)
+    kpi_2025_sucesso = artefato.metricas['retro_2025'].get('sucesso', "0%")
+    try:
+        if 'mensal_2025' in tem:
+            # Plot Mensal 2025
+            fig_m25 = px.bar(artefato.tabela('mensal_2025'), x='Mes', y='Qtd', text='Qtd', title='', color_discrete_sequence=['#3b82f6'])
+            fig_m25.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", margin=dict(t=10,l=10,r=10,b=20))
+            plot_2025_mensal = pio.to_html(fig_m25, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+            
+            # Plot Status 2025
+            fig_s25 = px.pie(artefato.tabela('status_2025'), names='Status', values='Qtd', hole=0.7, color_discrete_sequence=px.colors.qualitative.Pastel)
+            fig_s25.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", showlegend=True, margin=dict(t=0,l=0,r=0,b=0))
+            plot_2025_status = pio.to_html(fig_s25, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+    except Exception as e:
+        print(f"Erro 2025: {e}")
+
+    # --- ANO A ANO ---
+    plot_anual_mensal = ""; plot_anual_acumulado = ""; periodo_anual = ""
+    tabela_anual_periodo = "<p>Sem dados</p>"; tabela_anual_delta = "<p>Sem dados</p>"
+    try:
+        if 'anual' in tem:
+            cubo = CuboAnual.de_tabela(artefato.tabela('anual'))
+            if len(cubo.anos) >= 2:
+                ano, base = cubo.anos[-1], cubo.anos[-2]
+                nomes = [m.capitalize() for m in MESES_DO_ANO]
+                cores = ['#94a3b8', '#3b82f6']
+                layout = dict(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter",
+                              margin=dict(t=10,l=10,r=10,b=20), legend_title_text='')
+
+                mensal = cubo.mensal()[[base, ano]].set_axis(nomes).rename(columns=str).rename_axis('Mes').reset_index()
+                fig_am = px.bar(mensal, x='Mes', y=[str(base), str(ano)], barmode='group', color_discrete_sequence=cores)
+                fig_am.update_layout(yaxis_title='GMUDs', xaxis_title='', **layout)
+                plot_anual_mensal = pio.to_html(fig_am, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+
+                acumulado = cubo.acumulado()[[base, ano]].set_axis(nomes).rename(columns=str).rename_axis('Mes').reset_index()
+                fig_aa = px.line(acumulado, x='Mes', y=[str(base), str(ano)], markers=True, color_discrete_sequence=cores)
+                fig_aa.update_layout(yaxis_title='GMUDs acumuladas', xaxis_title='', **layout)
+                plot_anual_acumulado = pio.to_html(fig_aa, full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+
+                # Mesmo período: de janeiro até o mês corrente (ano inteiro se o ano já acabou)
+                agora = datetime.now()
+                ate_mes = agora.month if agora.year == ano else 12
+                periodo_anual = f"Jan–{nomes[ate_mes - 1][:3]}"
+                periodo = cubo.mesmo_periodo(ano, ate_mes, base)
+                periodo = periodo.loc[:, (periodo != 0).any()].rename_axis('Ano').reset_index()
+                tabela_anual_periodo = periodo.to_html(classes='w-full text-sm text-left', index=False, border=0)
+                delta = cubo.delta(ano, base, Categoria='PSU').set_axis(nomes).rename(columns=str)
+                tabela_anual_delta = delta.rename_axis('Mês (PSU)').reset_index().to_html(
+                    classes='w-full text-sm text-left', index=False, border=0, na_rep='–')
+    except Exception as e:
+        print(f"Erro Ano a Ano: {e}")
+
+    # --- INVENTÁRIO ---
+    kpi_inv = artefato.metricas['inventario']
+    inv_total = kpi_inv.get('total', 0); inv_criticos = kpi_inv.get('criticos', 0); inv_atualizados = kpi_inv.get('atualizados', 0)
+    plot_inv_env=""; plot_inv_ver=""; plot_inv_status=""; plot_inv_psu=""; plot_inv_type=""; inv_html="<p>Sem dados</p>"
+
+    if 'inv_tipo' in tem:
         # Plots (AGORA REFINADOS)
         
         # Paleta Inspirada no Protótipo
@@ -228,9 +499,8 @@ def gerar_relatorio():
 
         # 1. Por Ambiente (Horizontal Bar)
         try:
-            if 'AMBIENTE' in df_full_servers.columns:
-                df_env = df_full_servers['AMBIENTE'].value_counts().reset_index()
-                df_env.columns = ['Ambiente', 'Qtd']
+            if 'inv_ambiente' in tem:
+                df_env = artefato.tabela('inv_ambiente')
                 df_env = df_env.sort_values('Qtd', ascending=True)
                 
                 fig_env = px.bar(df_env, x='Qtd', y='Ambiente', text='Qtd', orientation='h', color='Ambiente',
@@ -246,11 +516,8 @@ def gerar_relatorio():
 
         # 2. Por Versão
         try:
-            if 'VERSION' in df_full_servers.columns:
-                df_full_servers['VerShort'] = df_full_servers['VERSION'].astype(str).str.extract(r'(\d+(?:\.\d+)?)')
-                df_ver = df_full_servers['VerShort'].value_counts().reset_index()
-                df_ver.columns = ['Versao', 'Qtd']
-                fig_ver = px.bar(df_ver, x='Versao', y='Qtd', text='Qtd')
+            if 'inv_versao' in tem:
+                fig_ver = px.bar(artefato.tabela('inv_versao'), x='Versao', y='Qtd', text='Qtd')
                 fig_ver.update_traces(marker_color='#3b82f6', marker_cornerradius=5)
                 fig_ver.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", margin=dict(t=20,l=0,r=0,b=20))
                 fig_ver.update_yaxes(visible=False)
@@ -261,9 +528,8 @@ def gerar_relatorio():
 
         # 3. PSU Status Overview
         try:
-            if col_status_psu in df_full_servers.columns:
-                df_stat = df_full_servers[col_status_psu].value_counts().reset_index()
-                df_stat.columns = ['Status', 'Qtd']
+            if 'inv_status' in tem:
+                df_stat = artefato.tabela('inv_status')
                 
                 fig_stat = px.pie(df_stat, names='Status', values='Qtd', hole=0.7, 
                                  color='Status', color_discrete_map=colors_proto)
@@ -276,28 +542,15 @@ def gerar_relatorio():
                     annotations=[dict(text=f"{total_psu}<br><span style='font-size:12px; color:gray'>Servidores</span>", x=0.5, y=0.5, font_size=24, showarrow=False)]
                 )
                 plot_inv_status = pio.to_html(fig_stat, full_html=False, include_plotlyjs=False, config={'displayModeBar': False, 'responsive': True})
-        except Exception as e: 
-            print(f"Erro Plot Status: {e}")
         except Exception as e: 
             print(f"Erro Plot Status: {e}")
             plot_inv_status = ""
 
         # 4. Por Versão PSU (Novo Pedido)
         try:
-             col_psu = 'PSU VERSION'
-             if col_psu not in df_full_servers.columns:
-                 poss_psu = [c for c in df_full_servers.columns if 'PSU' in c and 'VER' in c]
-                 if poss_psu: col_psu = poss_psu[0]
-            
-             if col_psu in df_full_servers.columns:
-                 # Normalize to string to handle mixed types (float/str) in Excel
-                 df_full_servers[col_psu] = df_full_servers[col_psu].astype(str).str.strip()
-                 
-                 df_psu = df_full_servers[col_psu].replace('nan', 'Unknown').value_counts().reset_index()
-                 df_psu.columns = ['PSU', 'Qtd']
-                 
+             if 'inv_psu' in tem:
                  # Ordenar por Versão (String comparison works well for 19.x)
-                 df_psu = df_psu.sort_values('PSU', ascending=True)
+                 df_psu = artefato.tabela('inv_psu').sort_values('PSU', ascending=True)
 
                  fig_psu = px.bar(df_psu, x='Qtd', y='PSU', text='Qtd', orientation='h', title='')
                  fig_psu.update_traces(marker_color='#8b5cf6')
@@ -310,9 +563,7 @@ def gerar_relatorio():
 
         # 5. Por Tipo (Primary/Standby) - "Soma dos Servidores"
         try:
-             df_type = df_full_servers['TYPE'].value_counts().reset_index()
-             df_type.columns = ['Tipo', 'Qtd']
-             fig_type = px.pie(df_type, names='Tipo', values='Qtd', hole=0.5, color_discrete_sequence=['#3b82f6', '#93c5fd'])
+             fig_type = px.pie(artefato.tabela('inv_tipo'), names='Tipo', values='Qtd', hole=0.5, color_discrete_sequence=['#3b82f6', '#93c5fd'])
              fig_type.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_family="Inter", 
                                    showlegend=True, margin=dict(t=10,l=10,r=10,b=10), autosize=True,
                                    legend=dict(orientation="h", yanchor="bottom", y=-0.1, xanchor="center", x=0.5), # Legend bottom to save width
@@ -320,30 +571,18 @@ def gerar_relatorio():
              plot_inv_type = pio.to_html(fig_type, full_html=False, include_plotlyjs=False, config={'displayModeBar': False, 'responsive': True})
         except: pass
 
-        # Tabela CRÍTICA (Filtro)
-        try:
-            cols_inv = ['HOSTNAME', 'TYPE', 'AMBIENTE', 'VERSION', col_status_psu]
-            cols_to_show = [c for c in cols_inv if c in df_full_servers.columns]
-            
-            # Filtro de Criticidade
-            mask_crit = df_full_servers[col_status_psu].astype(str).str.contains('Desatualizado|Atenção|Baixo|Crítico', case=False, na=False)
-            df_critical = df_full_servers[mask_crit].copy()
-            
+        # Tabela CRÍTICA
+        if 'inv_criticos' in tem:
+            df_critical = artefato.tabela('inv_criticos')
             if df_critical.empty:
                 inv_html = "<div class='p-4 text-green-600 bg-green-50 rounded-lg'>✅ Nenhum servidor crítico encontrado! Parabéns!</div>"
             else:
-                inv_html = df_critical[cols_to_show].head(1000).to_html(classes='w-full text-sm text-left', index=False, border=0)
-        except: 
-            inv_html="<p>Sem dados</p>"
+                inv_html = df_critical.to_html(classes='w-full text-sm text-left', index=False, border=0)
 
     # --- EXECUTORES ---
     try:
-        col_resp = 'DESIGNADO A'
-        if col_resp not in df_gmud.columns: col_resp = 'ABERTO POR'
-        
-        if col_resp in df_gmud.columns:
-            top_exec = df_gmud[col_resp].value_counts().head(5).reset_index()
-            top_exec.columns = ['Executor', 'Qtd']
+        if 'top_executores' in tem:
+            top_exec = artefato.tabela('top_executores')
             fig_exec = px.pie(top_exec, names='Executor', values='Qtd', hole=0.7, title='')
             fig_exec.update_traces(textinfo='percent')
             fig_exec.update_layout(
@@ -368,14 +607,17 @@ def gerar_relatorio():
         # GMUD Data
         total_gmuds=total_gmuds, total_sucesso=sucesso_count, total_falhas=falha_count, taxa_sucesso=f"{taxa:.1f}",
         plot_mensal=plot_mensal, plot_pizza=plot_pizza, tabela_gmuds=gmud_html,
-        plot_executores=plot_executores, plot_timeline=plot_timeline,
+        plot_executores=plot_executores, plot_timeline=plot_timeline, tabela_conflitos=conflitos_html,
         # Inv Data
         inv_total=inv_total, inv_criticos=inv_criticos, inv_atualizados=inv_atualizados,
         plot_inv_env=plot_inv_env, plot_inv_ver=plot_inv_ver, plot_inv_status=plot_inv_status, 
         plot_inv_psu=plot_inv_psu, plot_inv_type=plot_inv_type, tabela_inv=inv_html,
         # 2025 Data
         plot_2025_mensal=plot_2025_mensal, plot_2025_status=plot_2025_status, 
-        kpi_2025_total=kpi_2025_total, kpi_2025_sucesso=kpi_2025_sucesso
+        kpi_2025_total=kpi_2025_total, kpi_2025_sucesso=kpi_2025_sucesso,
+        # Ano a ano
+        plot_anual_mensal=plot_anual_mensal, plot_anual_acumulado=plot_anual_acumulado, periodo_anual=periodo_anual,
+        tabela_anual_periodo=tabela_anual_periodo, tabela_anual_delta=tabela_anual_delta
     )
 
     with open(ARQUIVO_SAIDA, 'w', encoding='utf-8') as f:
@@ -384,4 +626,5 @@ def gerar_relatorio():
     print(f"Relatório Completo gerado em: {ARQUIVO_SAIDA}")
 
 if __name__ == '__main__':
-    gerar_relatorio()
+    # --recalcular ignora o artefato em cache (ex.: depois de mudar a lógica de cálculo)
+    gerar_relatorio(forcar='--recalcular' in sys.argv)
@@ -0,0 +1,8 @@
+"""
+Biblioteca compartilhada ORAEX
+==============================
+Rotinas de normalização e análise usadas pelos relatórios e alertas PSU.
+
+Os scripts da pasta cmdb importam direto (``from oraex.executores import ...``);
+os scripts da raiz e de clientes/ adicionam a pasta cmdb ao sys.path.
+"""
@@ -0,0 +1,381 @@
+"""
+Agendamento automático das janelas PSU
+======================================
+As abas mensais 2026 vêm com as vagas de GMUD já abertas (uma linha por vaga,
+título "... PSU 19.30 ... | {HOSTNAME}") e eram preenchidas à mão; o único
+sinal de prioridade era a lista ``criticos`` (``Quarters_Behind >= 4``).
+
+O agendador distribui os pares do inventário (PRIMARY + STANDBYs da mesma
+linha, atualizados na mesma GMUD) pelas vagas livres:
+
+- janela = vagas com o mesmo início, término e ENTORNO; cada vaga recebe um
+  par e a janela tem um teto de hosts (``HOSTS_POR_VAGA`` por vaga);
+- um par só entra em janela do seu entorno (Transacional nas de Produção) e
+  cujo RU do título seja mais novo que o RU planejado do par;
+- cada vaga recebe um executor livre naquele horário (sem outra janela
+  sobreposta) e com horas sobrando na semana (array executor × semana de
+  ``oraex.capacidade``, consulta O(1)).
+
+Objetivo: reduzir o atraso de conformidade, ou seja, quarters atrás × tempo
+até a janela. A heurística tem duas fases:
+
+1. gulosa: janelas em ordem cronológica; um heap por entorno, chaveado pelo
+   RU planejado, entrega primeiro o par mais atrasado. Depois de agendado, o
+   par volta ao heap com o RU da janela e concorre pelo RU seguinte;
+2. melhoria local: dentro de cada onda (entorno × RU), pares mais atrasados
+   passam para vagas livres anteriores ou trocam de vaga com pares menos
+   atrasados de janelas anteriores quando o teto de hosts e as horas dos
+   executores permitem.
+
+Um ano de vagas com milhares de hosts agenda em segundos: cada vaga custa um
+punhado de operações de heap.
+"""
+
+import heapq
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from oraex.capacidade import HORAS_SEMANA, CargaExecutores
+from oraex.conflitos import em_minutos, pares_sobrepostos
+from oraex.conformidade import chave_versao
+
+# ENTORNO das abas mensais por entorno do inventário
+JANELA_DO_ENTORNO = {'Desenvolvimento': 'D', 'Homologação': 'H', 'Produção': 'P', 'Transacional': 'P'}
+HOSTS_POR_VAGA = 2
+MARCADOR_HOST = '{HOSTNAME}'
+PASSADAS_MELHORIA = 3
+COLUNAS_AGENDA = ['Janela', 'Inicio', 'Fim', 'Entorno', 'Alvo', 'Linha', 'Hostnames', 'Executor', 'Atraso']
+
+
+class Agendador:
+    """
+    Estado do agendamento de ``pares`` nas ``vagas``.
+
+    ``vagas``: uma linha por vaga livre (índice = id da vaga) com Inicio, Fim,
+    Entorno (código da aba: D/H/P) e Alvo (RU do título); ``Limite_Hosts``
+    opcional sobrepõe o teto de hosts da janela.
+    ``pares``: uma linha por par (índice = Linha do inventário) com Hostnames
+    (lista), Entorno (do inventário ou código da aba) e Versao (RU atual); ``Horas`` opcional estima o
+    esforço do par (sem ela, vale a duração da janela).
+    ``executores``: nomes ou {nome: horas por semana}.
+    ``ocupacao``: compromissos já assumidos (Executor, Inicio, Fim).
+    ``liberacao``: {(Linha, RU): data} — o par só entra em janela daquele RU a
+    partir da data (ex.: soak das camadas anteriores, ver ``oraex.ondas``).
+    """
+
+    def __init__(self, vagas: pd.DataFrame, pares: pd.DataFrame, executores, ocupacao: pd.DataFrame = None,
+                 horas_semana: float = HORAS_SEMANA, hosts_por_vaga: int = HOSTS_POR_VAGA, liberacao: dict = None):
+        self._montar_janelas(vagas, hosts_por_vaga)
+        self._montar_pares(pares)
+        self.liberacao = {}
+        if liberacao:
+            posicao = {linha: par for par, linha in enumerate(self.ids)}
+            chaves = chave_versao(pd.Series([ru for _, ru in liberacao]))
+            datas = em_minutos(pd.Series(list(liberacao.values())))
+            for (linha, _), chave, data in zip(liberacao, chaves, datas):
+                if linha in posicao:
+                    self.liberacao[(posicao[linha], chave)] = data
+
+        if ocupacao is None:
+            ocupacao = pd.DataFrame(columns=['Executor', 'Inicio', 'Fim'])
+        # Horas agendadas por executor × semana, já com as dos compromissos prévios
+        periodo = (self.datas['Inicio'].min(), self.datas['Fim'].max()) if self.n_janelas else None
+        self.carga = CargaExecutores(ocupacao, executores, horas_semana, periodo=periodo)
+        self.codigo = {executor: i for i, executor in enumerate(self.carga.executores)}
+        self.semana = self.carga.coluna(self.inicio)
+        self.ocupadas = defaultdict(set)       # executor -> janelas em que já está
+        self.bloqueadas = defaultdict(set)     # executor -> janelas que colidem com compromissos prévios
+        if len(ocupacao):
+            self._registrar_ocupacao(ocupacao)
+
+        self.alocacao = {}                     # vaga -> (par, executor)
+        self.na_onda = {}                      # (par, onda) -> vaga
+        self.versao_antes = {}                 # (par, onda) -> RU do par antes da janela
+        self.cap_livre = self.limite_hosts.copy()
+        self.vagas_livres = [list(v) for v in self.vagas_janela]
+        self.melhorias = 0
+
+    # ----------------------------------------------------------- montagem
+    def _montar_janelas(self, vagas: pd.DataFrame, hosts_por_vaga: int):
+        alvo = chave_versao(vagas['Alvo'])
+        validas = vagas.assign(_alvo=alvo, Inicio=pd.to_datetime(vagas['Inicio']), Fim=pd.to_datetime(vagas['Fim']))
+        validas = validas.dropna(subset=['Inicio', 'Fim', 'Entorno', '_alvo'])
+        validas = validas[validas['Fim'] > validas['Inicio']]
+        # Janelas numeradas em ordem cronológica (a fase gulosa depende disso)
+        janela = validas.groupby(['Inicio', 'Fim', 'Entorno'], sort=True).ngroup()
+        self.janela_da_vaga = dict(zip(janela.index, janela.tolist()))
+        primeiras = validas.groupby(janela).first()
+
+        self.n_janelas = len(primeiras)
+        self.inicio = em_minutos(primeiras['Inicio'])
+        self.fim = em_minutos(primeiras['Fim'])
+        self.entorno = primeiras['Entorno'].astype(str).to_numpy()
+        self.alvo = primeiras['_alvo'].to_numpy()
+        self.rotulo_alvo = primeiras['Alvo'].astype(str).to_numpy()
+        self.duracao = (self.fim - self.inicio) / 60
+        self.datas = primeiras[['Inicio', 'Fim']]
+
+        contagem = validas.groupby(janela).size().to_numpy()
+        limite = contagem * hosts_por_vaga
+        if 'Limite_Hosts' in validas.columns:
+            informado = validas.groupby(janela)['Limite_Hosts'].max().to_numpy()
+            limite = np.where(pd.notna(informado), informado, limite)
+        self.limite_hosts = limite.astype(int)
+        self.vagas_janela = [[] for _ in range(self.n_janelas)]
+        for vaga, j in self.janela_da_vaga.items():
+            self.vagas_janela[j].append(vaga)
+
+        # Janelas que se sobrepõem no tempo (um executor não está em duas ao mesmo tempo)
+        self.sobrepostas = [set() for _ in range(self.n_janelas)]
+        i, j = pares_sobrepostos(np.zeros(self.n_janelas, dtype=np.int64), self.inicio, self.fim)
+        for a, b in zip(i.tolist(), j.tolist()):
+            self.sobrepostas[a].add(b)
+            self.sobrepostas[b].add(a)
+
+        # Onda = entorno × RU; janelas de cada onda em ordem cronológica
+        self.ondas = defaultdict(list)
+        for j in range(self.n_janelas):
+            self.ondas[(self.entorno[j], self.alvo[j])].append(j)
+
+    def _montar_pares(self, pares: pd.DataFrame):
+        versao = chave_versao(pares['Versao'])
+        # RU de outra linha de versão (ex.: 12c) não é atualizado pelo RU 19 das janelas
+        familias = set((self.alvo // 1000).tolist())
+        elegiveis = versao.notna() & (versao // 1000).isin(familias) & pares['Entorno'].notna()
+        pares = pares[elegiveis]
+        self.pares = pares
+        self.ids = pares.index.to_numpy()
+        self.versao = versao[elegiveis].to_numpy(dtype=float).copy()
+        self.hosts_par = pares['Hostnames'].map(len).clip(lower=1).to_numpy()
+        self.entorno_par = pares['Entorno'].astype(str).to_numpy()
+        self.horas_par = (pares['Horas'].to_numpy(dtype=float) if 'Horas' in pares.columns
+                          else np.full(len(pares), np.nan))
+
+    def _registrar_ocupacao(self, ocupacao: pd.DataFrame):
+        ocupacao = ocupacao.dropna(subset=['Executor', 'Inicio', 'Fim'])
+        inicio, fim = em_minutos(ocupacao['Inicio']), em_minutos(ocupacao['Fim'])
+        for executor, ini, f in zip(ocupacao['Executor'], inicio, fim):
+            self.bloqueadas[executor].update(np.flatnonzero((self.inicio < f) & (self.fim > ini)).tolist())
+
+    # ----------------------------------------------------------- executores
+    def _horas(self, par: int, janela: int) -> float:
+        horas = self.horas_par[par]
+        return self.duracao[janela] if np.isnan(horas) else horas
+
+    def _livre(self, executor, janela: int, horas: float) -> bool:
+        if janela in self.bloqueadas[executor]:
+            return False
+        ocupadas = self.ocupadas[executor]
+        if janela in ocupadas or not ocupadas.isdisjoint(self.sobrepostas[janela]):
+            return False
+        return self.carga.cabe(self.codigo[executor], self.semana[janela], horas)
+
+    def _executor(self, janela: int, horas: float):
+        """Executor livre na janela com menos horas na semana (reparte a carga)."""
+        semana = self.semana[janela]
+        na_semana = self.carga.horas[:, semana]
+        for executor in sorted(self.codigo, key=lambda e: (na_semana[self.codigo[e]], e)):
+            if self._livre(executor, janela, horas):
+                return executor
+        return None
+
+    def _liberado(self, par: int, janela: int) -> bool:
+        return self.liberacao.get((par, self.alvo[janela]), -np.inf) <= self.inicio[janela]
+
+    # ----------------------------------------------------------- alocação
+    def _alocar(self, vaga, par: int, executor, versao_antes: float):
+        janela = self.janela_da_vaga[vaga]
+        onda = (self.entorno[janela], self.alvo[janela])
+        self.alocacao[vaga] = (par, executor)
+        self.na_onda[(par, onda)] = vaga
+        self.versao_antes[(par, onda)] = versao_antes
+        self.cap_livre[janela] -= self.hosts_par[par]
+        self.carga.reservar(self.codigo[executor], self.semana[janela], self._horas(par, janela))
+        self.ocupadas[executor].add(janela)
+
+    def _liberar(self, vaga):
+        par, executor = self.alocacao.pop(vaga)
+        janela = self.janela_da_vaga[vaga]
+        onda = (self.entorno[janela], self.alvo[janela])
+        del self.na_onda[(par, onda)]
+        versao_antes = self.versao_antes.pop((par, onda))
+        self.cap_livre[janela] += self.hosts_par[par]
+        self.carga.reservar(self.codigo[executor], self.semana[janela], -self._horas(par, janela))
+        self.ocupadas[executor].discard(janela)
+        return par, executor, versao_antes
+
+    def gulosa(self):
+        """Fase 1: janelas em ordem cronológica, par mais atrasado primeiro (heap por entorno)."""
+        heaps = defaultdict(list)
+        for par, (entorno, versao) in enumerate(zip(self.entorno_par, self.versao)):
+            destino = JANELA_DO_ENTORNO.get(entorno, entorno)
+            heaps[destino].append((versao, par))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        # Pares ainda não liberados para o RU da janela esperam fora do heap, por data de liberação
+        espera = defaultdict(list)
+        for janela in range(self.n_janelas):
+            heap = heaps.get(self.entorno[janela])
+            fila = espera[self.entorno[janela]]
+            while fila and fila[0][0] <= self.inicio[janela]:
+                _, versao, par = heapq.heappop(fila)
+                heapq.heappush(heap, (versao, par))
+            livres = self.vagas_livres[janela]
+            adiados = []
+            # Topo do heap = RU mais antigo; se nem ele está atrás do alvo, ninguém está
+            while livres and heap and heap[0][0] < self.alvo[janela]:
+                versao, par = heapq.heappop(heap)
+                if not self._liberado(par, janela):
+                    heapq.heappush(fila, (self.liberacao[(par, self.alvo[janela])], versao, par))
+                    continue
+                if self.hosts_par[par] > self.cap_livre[janela]:
+                    adiados.append((versao, par))
+                    continue
+                executor = self._executor(janela, self._horas(par, janela))
+                if executor is None:
+                    adiados.append((versao, par))
+                    break
+                self._alocar(livres.pop(0), par, executor, versao)
+                heapq.heappush(heap, (self.alvo[janela], par))
+            for item in adiados:
+                heapq.heappush(heap, item)
+        return self
+
+    def _atraso(self, par: int, onda) -> float:
+        return onda[1] - self.versao_antes[(par, onda)]
+
+    def _trocar(self, vaga_a, vaga_b) -> bool:
+        """Troca os pares de duas vagas da mesma onda (executores ficam com as vagas), se couber."""
+        janela_a, janela_b = self.janela_da_vaga[vaga_a], self.janela_da_vaga[vaga_b]
+        par_a, ex_a = self.alocacao[vaga_a]
+        par_b, ex_b = self.alocacao[vaga_b]
+        if not (self._liberado(par_b, janela_a) and self._liberado(par_a, janela_b)):
+            return False
+        delta_hosts = self.hosts_par[par_b] - self.hosts_par[par_a]
+        if delta_hosts > self.cap_livre[janela_a] or -delta_hosts > self.cap_livre[janela_b]:
+            return False
+        delta_a = self._horas(par_b, janela_a) - self._horas(par_a, janela_a)
+        delta_b = self._horas(par_a, janela_b) - self._horas(par_b, janela_b)
+        if not (self.carga.cabe(self.codigo[ex_a], self.semana[janela_a], delta_a) and
+                self.carga.cabe(self.codigo[ex_b], self.semana[janela_b], delta_b)):
+            return False
+        _, _, antes_a = self._liberar(vaga_a)
+        _, _, antes_b = self._liberar(vaga_b)
+        self._alocar(vaga_a, par_b, ex_a, antes_b)
+        self._alocar(vaga_b, par_a, ex_b, antes_a)
+        return True
+
+    def _mover(self, vaga_b, janela_a: int) -> bool:
+        """Leva o par da vaga ``vaga_b`` para uma vaga livre de ``janela_a``, se couber."""
+        par, _ = self.alocacao[vaga_b]
+        livres = self.vagas_livres[janela_a]
+        if not livres or self.hosts_par[par] > self.cap_livre[janela_a] or not self._liberado(par, janela_a):
+            return False
+        executor = self._executor(janela_a, self._horas(par, janela_a))
+        if executor is None:
+            return False
+        _, _, versao_antes = self._liberar(vaga_b)
+        self.vagas_livres[self.janela_da_vaga[vaga_b]].append(vaga_b)
+        self._alocar(livres.pop(0), par, executor, versao_antes)
+        return True
+
+    def melhorar(self, passadas: int = PASSADAS_MELHORIA):
+        """
+        Fase 2: em cada onda, do par mais atrasado para o menos atrasado, tenta
+        antecipá-lo para uma vaga livre ou trocá-lo com um par menos atrasado de
+        uma janela anterior. Para quando uma passada não melhora nada.
+        """
+        for _ in range(passadas):
+            mudou = False
+            por_onda = defaultdict(dict)
+            for (par, onda), vaga in self.na_onda.items():
+                por_onda[onda][vaga] = par
+            for onda, alocados in por_onda.items():
+                janelas = self.ondas[onda]
+                posicao = {j: k for k, j in enumerate(janelas)}
+                atraso = {par: self._atraso(par, onda) for par in alocados.values()}
+
+                def minimo(janela):
+                    return min((atraso[self.alocacao[v][0]] for v in self.vagas_janela[janela] if v in self.alocacao),
+                               default=np.inf)
+
+                menor = {j: minimo(j) for j in janelas}
+                # Janelas sem executor livre: só voltam a ser tentadas depois de uma antecipação
+                saturadas = set()
+                for vaga_b, par in sorted(alocados.items(), key=lambda item: -atraso[item[1]]):
+                    if self.alocacao.get(vaga_b, (None,))[0] != par:
+                        continue  # já trocado nesta passada
+                    janela_b = self.janela_da_vaga[vaga_b]
+                    for janela_a in janelas[:posicao[janela_b]]:
+                        melhorou = False
+                        if self.vagas_livres[janela_a] and janela_a not in saturadas:
+                            melhorou = self._mover(vaga_b, janela_a)
+                            if melhorou:
+                                saturadas.clear()
+                            elif self.hosts_par[par] <= self.cap_livre[janela_a]:
+                                saturadas.add(janela_a)
+                        if not melhorou and menor[janela_a] < atraso[par]:
+                            melhorou = any(self._trocar(v, vaga_b) for v in self.vagas_janela[janela_a]
+                                           if v in self.alocacao and atraso[self.alocacao[v][0]] < atraso[par])
+                        if melhorou:
+                            menor[janela_a], menor[janela_b] = minimo(janela_a), minimo(janela_b)
+                            self.melhorias += 1
+                            mudou = True
+                            break
+            if not mudou:
+                break
+        return self
+
+    # ----------------------------------------------------------- saída
+    def agenda(self) -> pd.DataFrame:
+        """Uma linha por vaga preenchida (índice = id da vaga), em ordem cronológica."""
+        if not self.alocacao:
+            return pd.DataFrame(columns=COLUNAS_AGENDA)
+        vagas = list(self.alocacao)
+        pares = np.array([self.alocacao[v][0] for v in vagas])
+        janelas = np.array([self.janela_da_vaga[v] for v in vagas])
+        ondas = list(zip(self.entorno[janelas], self.alvo[janelas]))
+        agenda = pd.DataFrame({
+            'Janela': janelas,
+            'Inicio': self.datas['Inicio'].to_numpy()[janelas],
+            'Fim': self.datas['Fim'].to_numpy()[janelas],
+            'Entorno': self.entorno[janelas],
+            'Alvo': self.rotulo_alvo[janelas],
+            'Linha': self.ids[pares],
+            'Hostnames': self.pares['Hostnames'].to_numpy()[pares],
+            'Executor': [self.alocacao[v][1] for v in vagas],
+            'Atraso': [int(round(self._atraso(p, o))) for p, o in zip(pares.tolist(), ondas)],
+        }, index=pd.Index(vagas, name='Vaga'))
+        return agenda.sort_values(['Inicio', 'Janela'], kind='stable')
+
+    def pendentes(self) -> pd.DataFrame:
+        """Pares que ainda ficam atrás do RU mais novo das janelas do seu entorno."""
+        planejada = self.versao.copy()
+        for (par, onda) in self.na_onda:
+            planejada[par] = max(planejada[par], onda[1])
+        alvo_max = pd.Series(self.alvo).groupby(self.entorno).max()
+        destino = pd.Series(self.entorno_par).map(lambda e: JANELA_DO_ENTORNO.get(e, e))
+        atras = planejada < destino.map(alvo_max).fillna(-np.inf).to_numpy()
+        return self.pares[atras]
+
+
+def agendar(vagas: pd.DataFrame, pares: pd.DataFrame, executores, ocupacao: pd.DataFrame = None,
+            **kwargs) -> Agendador:
+    """Gulosa + melhoria local; ver ``Agendador`` para o formato das entradas."""
+    return Agendador(vagas, pares, executores, ocupacao, **kwargs).gulosa().melhorar()
+
+
+def preencher_abas(abas: pd.DataFrame, agenda: pd.DataFrame, coluna_titulo: str = 'TÍTULO') -> pd.DataFrame:
+    """Linhas das abas mensais com título, HOSTS e DESIGNADO A das vagas agendadas."""
+    preenchidas = abas.copy()
+    nomes = agenda['Hostnames'].map(' e '.join)
+    titulos = preenchidas.loc[agenda.index, coluna_titulo].astype(str)
+    preenchidas[coluna_titulo] = preenchidas[coluna_titulo].astype(object)
+    preenchidas.loc[agenda.index, coluna_titulo] = [t.replace(MARCADOR_HOST, n) for t, n in zip(titulos, nomes)]
+    for coluna, valores in (('HOSTS', nomes), ('DESIGNADO A', agenda['Executor'])):
+        preenchidas[coluna] = preenchidas[coluna].astype(object) if coluna in preenchidas.columns else None
+        preenchidas.loc[agenda.index, coluna] = valores
+    return preenchidas
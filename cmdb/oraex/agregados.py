@@ -0,0 +1,164 @@
+"""
+Armazém incremental de KPIs
+===========================
+Taxa de sucesso, totais por status, contagens por mês e por executor eram
+recalculados do zero a cada execução, mas de uma execução para outra só as
+GMUDs do mês corrente mudam.
+
+O armazém guarda agregados aditivos (GMUDs, servidores, sucessos e horas)
+por categoria × status × mês × entorno × executor × versão × cliente. Cada
+sincronização compara a planilha com o último retrato, chave a chave (CHG +
+mês, ver ``chaves_gmud``), e aplica só o delta:
+
+- inserção: soma a contribuição da linha nova;
+- alteração: subtrai a contribuição antiga e soma a nova;
+- remoção: subtrai a contribuição antiga.
+
+Relatórios e alertas leem os agregados materializados (``total`` / ``por``,
+ou o cubo compacto de ``oraex.cubo``) sem varrer o histórico.
+"""
+
+import os
+
+import pandas as pd
+
+from oraex import regras
+from oraex.cache import hash_linhas
+from oraex.duracao import horas_janela
+
+DIMENSOES = ['Is_PSU', 'Status_Final', 'Mes', 'Entorno', 'Responsavel_Norm', 'Versao_PSU', 'Cliente']
+TIPOS_MEDIDAS = {'GMUDs': 'int64', 'Servidores': 'int64', 'Sucessos': 'int64', 'Horas': 'float64'}
+MEDIDAS = list(TIPOS_MEDIDAS)
+# Valor de dimensão ausente (NaN não serve como chave de agregação)
+VAZIO = ''
+# CHG de linhas sem GMUD_ID: cada uma vira SEM-ID#0, SEM-ID#1... (não colapsam numa chave só)
+SEM_ID = 'SEM-ID'
+
+
+def chaves_gmud(df: pd.DataFrame) -> pd.Series:
+    """
+    Chave única por linha: CHG + mês (aba) + ocorrência. A mesma CHG pode
+    aparecer replanejada em outra aba; com o mês na chave, uma linha incluída
+    numa aba não renumera as ocorrências das outras. Linhas sem CHG contam como
+    ``SEM_ID``.
+
+    Limitação: repetições da mesma CHG dentro de uma mesma aba ainda são
+    numeradas pela ordem em que aparecem; inserir uma delas acima de outra
+    troca as chaves entre si (e gera "alteradas" no delta).
+    """
+    chg = df['GMUD_ID'].astype('string').str.strip().str.upper()
+    chg = chg.mask(chg.fillna('') == '', SEM_ID).astype(str)
+    if 'Mes' in df.columns:
+        chg = chg + '@' + df['Mes'].astype('string').fillna(VAZIO).str.strip().str.upper().astype(str)
+    return chg + '#' + chg.groupby(chg).cumcount().astype('int64').astype(str)
+
+
+def contribuicoes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    GMUDs normalizadas -> dimensões (texto, '' quando ausente) + medidas por linha.
+    Horas: coluna ``Horas`` (esforço estimado) se houver, senão a janela Data_Inicio → Data_Termino.
+    """
+    contrib = pd.DataFrame(index=df.index)
+    for dim in DIMENSOES:
+        valores = df[dim] if dim in df.columns else pd.Series(VAZIO, index=df.index)
+        if dim == 'Entorno':
+            valores = regras.ENTORNO.aplicar(valores)
+        contrib[dim] = valores.astype(object).where(valores.notna(), VAZIO).astype(str)
+    contrib['GMUDs'] = 1
+    contrib['Servidores'] = df['Num_Servers'].fillna(0).astype('int64') if 'Num_Servers' in df.columns else 0
+    contrib['Sucessos'] = (df['Status_Final'].astype(str) == 'SUCESSO').astype('int64')
+    horas = df['Horas'] if 'Horas' in df.columns else horas_janela(df)
+    contrib['Horas'] = pd.to_numeric(horas, errors='coerce').fillna(0).astype('float64')
+    return contrib
+
+
+def agregar(df: pd.DataFrame) -> pd.DataFrame:
+    """Agregados de ``df`` de uma vez (sem armazém): uma linha por combinação de DIMENSOES."""
+    return contribuicoes(df).groupby(DIMENSOES, as_index=False)[MEDIDAS].sum()
+
+
+class ArmazemKpis:
+    """Agregados aditivos de GMUDs mantidos por deltas (inserção/alteração/remoção)."""
+
+    def __init__(self, pasta: str, nome: str = 'kpis'):
+        self.pasta = pasta
+        self.arquivo_linhas = os.path.join(pasta, f'{nome}_linhas.parquet')
+        self.arquivo_agregados = os.path.join(pasta, f'{nome}_agregados.parquet')
+        self.linhas = self._ler(self.arquivo_linhas, ['_chave', '_hash'] + DIMENSOES + MEDIDAS).set_index('_chave')
+        self.agregados = self._ler(self.arquivo_agregados, DIMENSOES + MEDIDAS)
+        if list(self.agregados.columns) != DIMENSOES + MEDIDAS or not self.linhas.index.is_unique:
+            # Gravado com outras dimensões/medidas (ou chaves repetidas): a próxima sincronização reconstrói tudo
+            self.linhas = pd.DataFrame(columns=['_chave', '_hash'] + DIMENSOES + MEDIDAS).set_index('_chave')
+            self.agregados = pd.DataFrame(columns=DIMENSOES + MEDIDAS)
+        self.ultimo_delta = {'inseridas': 0, 'alteradas': 0, 'removidas': 0}
+
+    @staticmethod
+    def _ler(arquivo: str, colunas: list) -> pd.DataFrame:
+        if os.path.exists(arquivo):
+            try:
+                return pd.read_parquet(arquivo)
+            except Exception as e:
+                print(f"Armazém de KPIs ignorado ({arquivo}): {e}")
+        return pd.DataFrame(columns=colunas)
+
+    def sincronizar(self, df: pd.DataFrame) -> dict:
+        """
+        Leva o armazém ao estado de ``df`` (GMUDs normalizadas, com Num_Servers)
+        aplicando só as diferenças em relação ao último retrato.
+        """
+        atual = contribuicoes(df)
+        atual.index = pd.Index(chaves_gmud(df), name='_chave')
+        atual.insert(0, '_hash', hash_linhas(atual, DIMENSOES + MEDIDAS))
+
+        anterior = self.linhas
+        novas = pd.Series(~atual.index.isin(anterior.index), index=atual.index)
+        comuns = atual.index[~novas.to_numpy()]
+        alteradas = pd.Series(False, index=atual.index)
+        alteradas.loc[comuns] = (anterior.loc[comuns, '_hash'].to_numpy(dtype='uint64')
+                                 != atual.loc[comuns, '_hash'].to_numpy(dtype='uint64'))
+        removidas = anterior.index.difference(atual.index)
+
+        saem = pd.concat([anterior.loc[alteradas[alteradas].index], anterior.loc[removidas]])
+        entram = atual[novas | alteradas]
+        delta = pd.concat([
+            saem[DIMENSOES + MEDIDAS].assign(**{m: -saem[m].astype(t) for m, t in TIPOS_MEDIDAS.items()}),
+            entram[DIMENSOES + MEDIDAS],
+        ])
+        if len(delta):
+            self.agregados = (
+                pd.concat([self.agregados, delta])
+                .astype(TIPOS_MEDIDAS)
+                .groupby(DIMENSOES, as_index=False)[MEDIDAS].sum()
+            )
+            self.agregados = self.agregados[self.agregados['GMUDs'] != 0].reset_index(drop=True)
+            self.linhas = atual
+            self._gravar()
+
+        self.ultimo_delta = {'inseridas': int(novas.sum()), 'alteradas': int(alteradas.sum()), 'removidas': len(removidas)}
+        return self.ultimo_delta
+
+    def _gravar(self):
+        os.makedirs(self.pasta, exist_ok=True)
+        try:
+            self.linhas.reset_index().to_parquet(self.arquivo_linhas, index=False)
+            self.agregados.to_parquet(self.arquivo_agregados, index=False)
+        except Exception as e:
+            print(f"Não foi possível gravar o armazém de KPIs: {e}")
+
+    def _filtrar(self, filtros: dict) -> pd.DataFrame:
+        agregados = self.agregados
+        for dim, valor in filtros.items():
+            agregados = agregados[agregados[dim] == str(valor)]
+        return agregados
+
+    def total(self, medida: str = 'GMUDs', **filtros) -> int:
+        """Soma da medida nos agregados que batem com os filtros (ex.: Status_Final='SUCESSO')."""
+        return int(self._filtrar(filtros)[medida].sum())
+
+    def por(self, dimensoes, medidas=MEDIDAS, **filtros) -> pd.DataFrame:
+        """Medidas quebradas por uma ou mais dimensões (sem linhas de dimensão vazia)."""
+        dimensoes = [dimensoes] if isinstance(dimensoes, str) else list(dimensoes)
+        agregados = self._filtrar(filtros)
+        for dim in dimensoes:
+            agregados = agregados[agregados[dim] != VAZIO]
+        return agregados.groupby(dimensoes)[list(medidas)].sum()
@@ -0,0 +1,155 @@
+"""
+Comparativo ano a ano (retro 2025 × plano 2026)
+===============================================
+O relatório 2026 mostrava o bloco "RETRO 2025" (colunas adivinhadas na
+consolidação) e os KPIs 2026 lado a lado, sem alinhar um ao outro.
+
+Cada ano vira um fragmento canônico, já agregado:
+(Ano, Mes 1–12, Status, Categoria, Entorno) -> GMUDs, com
+
+- Status: ``STATUS_FINAIS`` (ENCERRADA -> SUCESSO, REPLANEJAR -> REPLANEJADA...);
+- Categoria: PSU quando o título cita PSU, senão Outras;
+- Entorno: ``regras.ENTORNO`` (nomes do inventário e códigos D/H/P das abas).
+
+O cubo é a concatenação dos fragmentos; deltas, curvas acumuladas e o mesmo
+período do ano anterior saem de um pivot sobre ele (dezenas de linhas por
+ano). Cada fragmento fica em Parquet com a assinatura dos arquivos de
+origem e do cálculo (``artefato.versao_calculo``): incluir um terceiro ano é calcular só o fragmento dele.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from oraex import regras
+from oraex.artefato import assinatura_arquivos, versao_calculo
+from oraex.historico import MESES_DO_ANO
+from oraex.normalizacao import STATUS_FINAIS, normalizar_status
+
+DIMENSOES_ANUAIS = ['Ano', 'Mes', 'Status', 'Categoria', 'Entorno']
+
+
+def mes_do_texto(serie: pd.Series) -> pd.Series:
+    """'MARÇO', 'MARÇO-26' -> 3 (Int64; NaN se não for nome de mês)."""
+    nome = serie.astype('string').str.upper().str.strip().str.split('-').str[0]
+    return nome.map({mes: i + 1 for i, mes in enumerate(MESES_DO_ANO)}).astype('Int64')
+
+
+def mes_da_linha(datas, abas: pd.Series) -> pd.Series:
+    """Mês da DATA INICIO; sem data (ou sem a coluna, ``datas=None``), o mês da aba em que a GMUD está."""
+    mes = mes_do_texto(abas)
+    if datas is None:
+        return mes
+    return pd.to_datetime(datas, errors='coerce').dt.month.astype('Int64').fillna(mes)
+
+
+def canonizar(ano: int, status: pd.Series, mes: pd.Series, titulo: pd.Series, entorno: pd.Series) -> pd.DataFrame:
+    """Linhas de GMUD de um ano -> fragmento do cubo (contagem por dimensão canônica)."""
+    linhas = pd.DataFrame({
+        'Ano': int(ano),
+        'Mes': mes.astype('Int64').to_numpy(),
+        'Status': normalizar_status(status).astype(str).to_numpy(),
+        'Categoria': titulo.astype('string').str.contains('PSU', case=False, na=False)
+                           .map({True: 'PSU', False: 'Outras'}).to_numpy(),
+        'Entorno': regras.ENTORNO.aplicar(entorno).astype(str).to_numpy(),
+    }).dropna(subset=['Mes'])
+    return linhas.groupby(DIMENSOES_ANUAIS).size().rename('GMUDs').reset_index()
+
+
+class CuboAnual:
+    """GMUDs por (ano, mês, status, categoria, entorno), um fragmento por ano."""
+
+    def __init__(self, pasta: str = None):
+        self.pasta = pasta
+        self.fragmentos = {}
+        self.origens = {}
+        if pasta and os.path.exists(self._arquivo_origens()):
+            with open(self._arquivo_origens(), encoding='utf-8') as f:
+                self.origens = {int(ano): origem for ano, origem in json.load(f).items()}
+
+    @classmethod
+    def de_tabela(cls, tabela: pd.DataFrame) -> 'CuboAnual':
+        """Cubo em memória a partir de ``tabela`` (ex.: a tabela 'anual' do artefato)."""
+        cubo = cls()
+        for ano, fragmento in tabela.groupby('Ano'):
+            cubo.fragmentos[int(ano)] = fragmento.reset_index(drop=True)
+        return cubo
+
+    def _arquivo_origens(self) -> str:
+        return os.path.join(self.pasta, 'origens.json')
+
+    def _arquivo_fragmento(self, ano: int) -> str:
+        return os.path.join(self.pasta, f'anual_{ano}.parquet')
+
+    def anexar(self, ano: int, fragmento: pd.DataFrame, origem: list = None):
+        """Inclui (ou substitui) o fragmento de ``ano``."""
+        self.fragmentos[int(ano)] = fragmento
+        if self.pasta:
+            os.makedirs(self.pasta, exist_ok=True)
+            fragmento.to_parquet(self._arquivo_fragmento(ano), index=False)
+            self.origens[int(ano)] = origem
+            with open(self._arquivo_origens(), 'w', encoding='utf-8') as f:
+                json.dump(self.origens, f)
+
+    def obter(self, ano: int, entradas: list, calcular, codigo: tuple = ()) -> pd.DataFrame:
+        """
+        Fragmento de ``ano``: do disco se ``entradas``, regras e código
+        (``versao_calculo(*codigo)``) não mudaram, senão ``calcular()`` (e grava).
+        """
+        origem = assinatura_arquivos(*entradas) + [['calculo', versao_calculo(*codigo)]]
+        if self.pasta and self.origens.get(int(ano)) == origem and os.path.exists(self._arquivo_fragmento(ano)):
+            self.fragmentos[int(ano)] = pd.read_parquet(self._arquivo_fragmento(ano))
+        else:
+            self.anexar(ano, calcular(), origem)
+        return self.fragmentos[int(ano)]
+
+    # ----------------------------------------------------------- consultas
+    @property
+    def anos(self) -> list:
+        return sorted(self.fragmentos)
+
+    @property
+    def tabela(self) -> pd.DataFrame:
+        partes = [self.fragmentos[ano] for ano in self.anos if len(self.fragmentos[ano])]
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=DIMENSOES_ANUAIS + ['GMUDs'])
+
+    def mensal(self, **filtros) -> pd.DataFrame:
+        """GMUDs por mês (linhas 1–12) e ano (colunas), com filtros por dimensão (ex.: Categoria='PSU')."""
+        tabela = self.tabela
+        for dim, valor in filtros.items():
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            tabela = tabela[tabela[dim].isin(valores)]
+        return (tabela.pivot_table(index='Mes', columns='Ano', values='GMUDs', aggfunc='sum', fill_value=0)
+                .reindex(index=range(1, 13), columns=self.anos, fill_value=0))
+
+    def acumulado(self, **filtros) -> pd.DataFrame:
+        """Curva acumulada de GMUDs ao longo do ano, um ano por coluna."""
+        return self.mensal(**filtros).cumsum()
+
+    def delta(self, ano: int, base: int = None, **filtros) -> pd.DataFrame:
+        """Mês a mês: GMUDs de ``ano`` e de ``base`` (padrão: ano anterior), diferença e variação %."""
+        base = ano - 1 if base is None else base
+        mensal = self.mensal(**filtros)
+        # Ano ausente do cubo conta como zero em todos os meses (Series, não o int 0)
+        vazio = pd.Series(0, index=mensal.index)
+        atual, anterior = mensal.get(ano, vazio), mensal.get(base, vazio)
+        return pd.DataFrame({
+            ano: atual, base: anterior,
+            'Delta': atual - anterior,
+            'Delta_Pct': ((atual - anterior) / anterior.where(anterior > 0) * 100).round(1),
+        })
+
+    def mesmo_periodo(self, ano: int, ate_mes: int, base: int = None, **filtros) -> pd.DataFrame:
+        """Janeiro..``ate_mes`` de ``ano`` × mesmo período de ``base``: GMUDs por status e taxa de sucesso."""
+        base = ano - 1 if base is None else base
+        linhas = {}
+        for rotulo in (ano, base):
+            por_status = pd.Series({s: int(self.mensal(Status=s, **filtros).loc[:ate_mes, rotulo].sum())
+                                    if rotulo in self.anos else 0 for s in STATUS_FINAIS})
+            decididas = por_status[['SUCESSO', 'CANCELADA', 'REPLANEJADA', 'INSUCESSO']].sum()
+            linhas[rotulo] = {'GMUDs': int(por_status.sum()), **por_status.to_dict(),
+                              'Taxa_Sucesso': round(por_status['SUCESSO'] / decididas * 100, 1) if decididas else 0.0}
+        resultado = pd.DataFrame.from_dict(linhas, orient='index')
+        resultado.loc['Delta'] = resultado.loc[ano] - resultado.loc[base]
+        return resultado.astype({s: int for s in ['GMUDs'] + STATUS_FINAIS})
@@ -0,0 +1,165 @@
+"""
+Artefato de métricas (calcula uma vez, renderiza várias)
+========================================================
+Cada variante de relatório (v2…v6, generate_html_report, gerar_relatorio_html)
+relia as abas e recalculava as próprias métricas antes de renderizar.
+
+A etapa de cálculo agora grava um artefato versionado numa pasta:
+
+- ``metricas.json``: versão, origem (assinatura dos arquivos de entrada),
+  KPIs e séries pequenas — legível só com a biblioteca padrão (alertas Slack);
+- ``<tabela>.parquet``: tabelas normalizadas e quebras usadas nos gráficos.
+
+Os relatórios só renderizam a partir do artefato. Enquanto as entradas não
+mudarem (tamanho/data de modificação), o artefato é reaproveitado: cinco estilos
+de relatório custam uma análise e cinco renderizações. Métricas que dependem do
+dia (risco, dias sem patch) passam ``data_ref``, que entra na origem: o artefato
+de ontem não é servido hoje.
+
+A origem também leva ``versao_calculo()``: assinatura de ``VERSAO_NORMALIZACAO``,
+de ``regras.tabelas()`` e do conteúdo dos módulos de ``oraex`` (mais os scripts
+passados em ``codigo``). Mudou uma regra ou o cálculo, o artefato é refeito sem
+depender de alguém lembrar de subir ``VERSAO_ARTEFATO``.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from oraex import regras
+from oraex.cache import assinatura, restaurar_listas
+from oraex.normalizacao import VERSAO_NORMALIZACAO
+
+# Suba só quando o formato do metricas.json mudar; mudanças de cálculo entram por versao_calculo()
+VERSAO_ARTEFATO = 16
+ARQUIVO_METRICAS = 'metricas.json'
+
+
+def assinatura_arquivos(*caminhos) -> list:
+    """[nome, tamanho, mtime] de cada arquivo de entrada (ausente = None)."""
+    assinatura = []
+    for caminho in caminhos:
+        if os.path.exists(caminho):
+            info = os.stat(caminho)
+            assinatura.append([os.path.basename(caminho), info.st_size, info.st_mtime_ns])
+        else:
+            assinatura.append([os.path.basename(caminho), None, None])
+    return assinatura
+
+
+def versao_calculo(*codigo) -> str:
+    """Assinatura de normalização, regras e código (módulos de ``oraex`` + scripts em ``codigo``)."""
+    fontes = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))) + list(codigo)
+    conteudos = []
+    for fonte in fontes:
+        with open(fonte, 'rb') as f:
+            conteudos.append([os.path.basename(fonte), hashlib.sha1(f.read()).hexdigest()])
+    return assinatura(VERSAO_NORMALIZACAO, regras.tabelas(), conteudos)
+
+
+def _para_parquet(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas object com tipos misturados (número e texto na mesma coluna do Excel) viram texto."""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        amostra = df[col].dropna()
+        if len(amostra) and isinstance(amostra.iloc[0], (list, tuple)):
+            continue
+        if pd.api.types.infer_dtype(amostra, skipna=True) not in ('string', 'empty'):
+            df[col] = df[col].astype('string')
+    df.columns = [str(c) for c in df.columns]
+    return df
+
+
+def _json_padrao(valor):
+    """Conversões para json.dump (numpy, datas)."""
+    if hasattr(valor, 'item'):
+        return valor.item()
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+
+class Artefato:
+    """Métricas (dict serializável em JSON) + tabelas (DataFrames em Parquet)."""
+
+    def __init__(self, pasta: str, metricas: dict = None, tabelas: dict = None, origem: list = None):
+        self.pasta = pasta
+        self.metricas = metricas or {}
+        self.origem = origem or []
+        self._tabelas = dict(tabelas or {})
+        self.gerado_em = None
+
+    @property
+    def nomes_tabelas(self) -> list:
+        return sorted(self._tabelas)
+
+    def tabela(self, nome: str) -> pd.DataFrame:
+        """DataFrame ``nome`` (lido do Parquet na primeira vez; cada chamada devolve uma cópia)."""
+        df = self._tabelas[nome]
+        if df is None:
+            df = restaurar_listas(pd.read_parquet(os.path.join(self.pasta, f'{nome}.parquet')))
+            self._tabelas[nome] = df
+        return df.copy()
+
+    def gravar(self) -> 'Artefato':
+        os.makedirs(self.pasta, exist_ok=True)
+        for nome, df in self._tabelas.items():
+            if df is not None:
+                _para_parquet(df).to_parquet(os.path.join(self.pasta, f'{nome}.parquet'), index=False)
+        self.gerado_em = datetime.now().isoformat(timespec='seconds')
+        conteudo = {
+            'versao': VERSAO_ARTEFATO,
+            'gerado_em': self.gerado_em,
+            'origem': self.origem,
+            'tabelas': self.nomes_tabelas,
+            'metricas': self.metricas,
+        }
+        # JSON por último: só existe artefato "válido" depois que as tabelas foram gravadas
+        with open(os.path.join(self.pasta, ARQUIVO_METRICAS), 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False, indent=2, default=_json_padrao)
+        return self
+
+    @classmethod
+    def carregar(cls, pasta: str):
+        """Artefato gravado em ``pasta`` (tabelas lidas sob demanda) ou None se ausente/de outra versão."""
+        caminho = os.path.join(pasta, ARQUIVO_METRICAS)
+        if not os.path.exists(caminho):
+            return None
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Artefato ignorado ({caminho}): {e}")
+            return None
+        if conteudo.get('versao') != VERSAO_ARTEFATO:
+            return None
+        artefato = cls(pasta, conteudo.get('metricas'), dict.fromkeys(conteudo.get('tabelas', [])),
+                       conteudo.get('origem'))
+        artefato.gerado_em = conteudo.get('gerado_em')
+        return artefato
+
+
+def obter_artefato(pasta: str, entradas: list, calcular, forcar: bool = False, data_ref=None,
+                   codigo: tuple = ()) -> Artefato:
+    """
+    Artefato de ``pasta`` se ele foi gerado a partir das mesmas ``entradas``,
+    com as mesmas regras e o mesmo código (``versao_calculo(*codigo)``) e na
+    mesma ``data_ref``, quando informada; senão chama ``calcular()`` (que
+    devolve ``(metricas, tabelas)``) e grava.
+    """
+    origem = assinatura_arquivos(*entradas)
+    origem.append(['calculo', versao_calculo(*codigo)])
+    if data_ref is not None:
+        origem.append(['data_ref', str(data_ref)])
+    if not forcar:
+        artefato = Artefato.carregar(pasta)
+        if artefato is not None and artefato.origem == origem:
+            return artefato
+    metricas, tabelas = calcular()
+    return Artefato(pasta, metricas, tabelas, origem).gravar()
@@ -0,0 +1,127 @@
+"""
+Cache de normalização por hash de linha
+=======================================
+Entre uma execução e outra só algumas GMUDs mudam, mas os scripts
+normalizavam o histórico inteiro (status, título, executor, versão...).
+
+O cache calcula um hash vetorizado (``pd.util.hash_pandas_object``) das colunas
+brutas de cada linha. Só linhas novas ou alteradas passam pela função de
+normalização; o resultado das demais é reaproveitado do Parquet em disco.
+
+Mudou a regra de normalização (código, ``regras.tabelas()``, aliases,
+inventário...)? Passe outra ``versao`` (ex.: ``assinatura`` de tudo isso): ela
+entra no nome do arquivo e invalida o cache anterior.
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+COLUNA_HASH = '_hash_linha'
+
+
+def assinatura(*partes) -> str:
+    """Hash curto e estável de qualquer conjunto de valores (para ``versao``)."""
+    h = hashlib.sha1()
+    for parte in partes:
+        h.update(repr(parte).encode('utf-8'))
+    return h.hexdigest()[:12]
+
+
+def hash_linhas(df: pd.DataFrame, colunas: list) -> np.ndarray:
+    """Hash uint64 por linha das ``colunas`` (como texto, para não depender do dtype lido)."""
+    projetado = df[[c for c in colunas if c in df.columns]].astype('string')
+    return pd.util.hash_pandas_object(projetado, index=False).to_numpy()
+
+
+def restaurar_listas(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas de listas (ex.: Hostnames) voltam do Parquet como ndarray; devolve listas."""
+    for col in df.columns:
+        if df[col].dtype == object and len(df) and isinstance(df[col].iloc[0], np.ndarray):
+            df[col] = df[col].map(list)
+    return df
+
+
+def _concatenar(partes: list, colunas: list) -> pd.DataFrame:
+    """concat que preserva categóricos mesmo com categorias diferentes entre as partes."""
+    partes = [p for p in partes if len(p)]
+    if not partes:
+        return pd.DataFrame(columns=colunas)
+    if len(partes) == 1:
+        return partes[0]
+    resultado = pd.concat(partes)
+    for col in partes[0].columns:
+        if all(isinstance(p[col].dtype, pd.CategoricalDtype) for p in partes):
+            resultado[col] = pd.Series(union_categoricals([p[col] for p in partes]).astype('category'),
+                                       index=resultado.index)
+    return resultado
+
+
+class CacheNormalizacao:
+    """Resultado da normalização guardado por hash das colunas brutas."""
+
+    def __init__(self, pasta: str, nome: str, colunas_brutas: list, colunas_saida: list, versao: str = ''):
+        self.pasta = pasta
+        self.nome = nome
+        self.colunas_brutas = list(colunas_brutas)
+        self.colunas_saida = list(colunas_saida)
+        self.versao = versao or 'v0'
+        self.arquivo = os.path.join(pasta, f'{nome}-{self.versao}.parquet')
+        self.ultimos_recalculados = 0
+
+    def _ler(self) -> pd.DataFrame:
+        if not os.path.exists(self.arquivo):
+            return pd.DataFrame(columns=[COLUNA_HASH] + self.colunas_saida)
+        try:
+            tabela = pd.read_parquet(self.arquivo)
+        except Exception as e:
+            print(f"Cache ignorado ({self.arquivo}): {e}")
+            return pd.DataFrame(columns=[COLUNA_HASH] + self.colunas_saida)
+        return restaurar_listas(tabela)
+
+    def _gravar(self, tabela: pd.DataFrame):
+        os.makedirs(self.pasta, exist_ok=True)
+        # Versões antigas do mesmo cache deixam de valer
+        for antigo in glob.glob(os.path.join(self.pasta, f'{self.nome}-*.parquet')):
+            if antigo != self.arquivo:
+                os.remove(antigo)
+        try:
+            tabela.to_parquet(self.arquivo, index=False)
+        except Exception as e:
+            print(f"Não foi possível gravar o cache ({self.arquivo}): {e}")
+
+    def aplicar(self, df: pd.DataFrame, normalizar) -> pd.DataFrame:
+        """
+        Preenche ``colunas_saida`` em ``df`` (mesmo índice) usando o cache.
+
+        ``normalizar(df_parcial)`` recebe só as linhas novas/alteradas e deve
+        devolver um DataFrame com as ``colunas_saida``.
+        """
+        hashes = hash_linhas(df, self.colunas_brutas)
+        cache = self._ler()
+        cache = cache.drop_duplicates(COLUNA_HASH).set_index(COLUNA_HASH)
+
+        em_cache = np.isin(hashes, cache.index.to_numpy(dtype='uint64'))
+        self.ultimos_recalculados = int((~em_cache).sum())
+
+        reaproveitado = cache.loc[hashes[em_cache], self.colunas_saida]
+        reaproveitado.index = df.index[em_cache]
+
+        partes = [reaproveitado]
+        if self.ultimos_recalculados:
+            novos = normalizar(df[~em_cache].copy())[self.colunas_saida]
+            partes.append(novos)
+        saida = _concatenar(partes, self.colunas_saida).reindex(df.index)
+
+        # O cache passa a refletir exatamente as linhas desta execução
+        tabela = saida.copy()
+        tabela.insert(0, COLUNA_HASH, hashes)
+        self._gravar(tabela.drop_duplicates(COLUNA_HASH))
+
+        for col in self.colunas_saida:
+            df[col] = saida[col]
+        return df
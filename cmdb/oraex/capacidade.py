@@ -0,0 +1,182 @@
+"""
+Carga semanal dos executores
+============================
+A tabela ``executores`` do relatório 2025 só tem totais por pessoa (GMUDs,
+servidores, horas): não mostra semana sobrecarregada, janela sobreposta a
+outra do mesmo executor nem o peso do turno da noite.
+
+As janelas (Executor, Inicio, Fim) são distribuídas em baldes semanais num
+array denso executor × semana (semana começa na segunda 00:00), com
+``np.add.at`` e sem laço por janela:
+
+- Horas: cada janela é cortada nas fronteiras de semana;
+- Noturnas: horas dentro da faixa ``INICIO_NOITE``–``FIM_NOITE``. Com
+  N(t) = minutos noturnos desde a época (conta fechada por dia), a parte
+  noturna de [a, b) é N(b) − N(a), sem percorrer os dias;
+- Sobreposicao: horas em que o executor está em duas ou mais janelas ao mesmo
+  tempo (varredura de eventos +1/−1 ordenados por executor e instante);
+- Janelas: quantas janelas começam na semana.
+
+Horas de um executor numa semana, ou se cabe mais uma janela, é um acesso ao
+array: O(1). O ``oraex.agendador`` guarda as horas agendadas aqui.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oraex.conflitos import em_minutos
+
+HORAS_SEMANA = 40
+INICIO_NOITE = 22
+FIM_NOITE = 6
+COLUNAS_CARGA = ['Executor', 'Semana', 'Horas', 'Noturnas', 'Sobreposicao', 'Janelas', 'Utilizacao']
+
+_MINUTOS_DIA = 24 * 60
+_MINUTOS_SEMANA = 7 * _MINUTOS_DIA
+# 1970-01-01 foi quinta-feira: +3 dias alinha as semanas na segunda
+_SEGUNDA = 3 * _MINUTOS_DIA
+_NOITE_POR_DIA = (24 - INICIO_NOITE + FIM_NOITE) * 60
+
+
+def semana_de(minutos) -> np.ndarray:
+    """Número absoluto da semana (desde a época) de instantes em minutos."""
+    return (np.asarray(minutos, dtype=np.int64) + _SEGUNDA) // _MINUTOS_SEMANA
+
+
+def _minutos_noturnos(minutos: np.ndarray) -> np.ndarray:
+    # Minutos noturnos acumulados desde a época: dias inteiros + parte do dia corrente
+    dia, resto = np.divmod(minutos, _MINUTOS_DIA)
+    return dia * _NOITE_POR_DIA + np.minimum(resto, FIM_NOITE * 60) + np.maximum(resto - INICIO_NOITE * 60, 0)
+
+
+def _em_semanas(inicio: np.ndarray, fim: np.ndarray):
+    """Corta cada [inicio, fim) nas fronteiras de semana: (origem, semana, inicio, fim) por pedaço."""
+    primeira, ultima = semana_de(inicio), semana_de(fim - 1)
+    quantos = ultima - primeira + 1
+    origem = np.repeat(np.arange(len(inicio)), quantos)
+    semana = primeira[origem] + np.arange(quantos.sum()) - np.repeat(np.cumsum(quantos) - quantos, quantos)
+    base = semana * _MINUTOS_SEMANA - _SEGUNDA
+    return origem, semana, np.maximum(inicio[origem], base), np.minimum(fim[origem], base + _MINUTOS_SEMANA)
+
+
+def _trechos_sobrepostos(codigos: np.ndarray, inicio: np.ndarray, fim: np.ndarray):
+    """Trechos [a, b) em que o mesmo código está em duas ou mais janelas ao mesmo tempo."""
+    n = len(codigos)
+    codigo = np.concatenate([codigos, codigos])
+    instante = np.concatenate([inicio, fim])
+    delta = np.concatenate([np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)])
+    # No mesmo instante, fim (-1) antes de início (+1): janelas encostadas não se sobrepõem
+    ordem = np.lexsort((delta, instante, codigo))
+    codigo, instante = codigo[ordem], instante[ordem]
+    # Cada executor soma zero, então o acumulado global recomeça em 0 a cada executor
+    nivel = np.cumsum(delta[ordem])
+    trecho = (codigo[:-1] == codigo[1:]) & (nivel[:-1] >= 2) & (instante[1:] > instante[:-1])
+    return codigo[:-1][trecho], instante[:-1][trecho], instante[1:][trecho]
+
+
+class CargaExecutores:
+    """
+    Arrays executor × semana de horas agendadas, noturnas, sobrepostas e janelas.
+
+    ``janelas``: Executor, Inicio, Fim (janelas sem executor ou sem datas são ignoradas).
+    ``executores``: nomes a considerar (padrão: os de ``janelas``), ou {nome: horas por semana}.
+    ``periodo``: (inicio, fim) extra a cobrir, ex.: as vagas ainda a agendar.
+    """
+
+    def __init__(self, janelas: pd.DataFrame, executores=None, horas_semana: float = HORAS_SEMANA, periodo=None):
+        validas = janelas.dropna(subset=['Executor', 'Inicio', 'Fim'])
+        validas = validas[pd.to_datetime(validas['Fim']) > pd.to_datetime(validas['Inicio'])]
+        if executores is None:
+            executores = sorted(validas['Executor'].astype(str).unique())
+        if not isinstance(executores, dict):
+            executores = {nome: horas_semana for nome in executores}
+        self.executores = pd.Index(list(executores))
+        self.limite = np.array(list(executores.values()), dtype=float)
+
+        codigos = self.executores.get_indexer(validas['Executor'])
+        validas, codigos = validas[codigos >= 0], codigos[codigos >= 0]
+        inicio, fim = em_minutos(validas['Inicio']), em_minutos(validas['Fim'])
+        limites = [inicio.min(), fim.max() - 1] if len(inicio) else []
+        if periodo is not None:
+            limites += list(em_minutos(pd.Series(periodo)))
+        self.primeira = int(semana_de(min(limites))) if limites else 0
+        n_semanas = int(semana_de(max(limites))) - self.primeira + 1 if limites else 0
+
+        forma = (len(self.executores), n_semanas)
+        self.horas = np.zeros(forma)
+        self.noturnas = np.zeros(forma)
+        self.sobreposicao = np.zeros(forma)
+        self.janelas = np.zeros(forma, dtype=np.int32)
+
+        np.add.at(self.janelas, (codigos, semana_de(inicio) - self.primeira), 1)
+        self._somar(self.horas, codigos, inicio, fim, noturnas=self.noturnas)
+        self._somar(self.sobreposicao, *_trechos_sobrepostos(codigos, inicio, fim))
+
+    def _somar(self, destino: np.ndarray, codigos, inicio, fim, noturnas: np.ndarray = None):
+        origem, semana, ini, f = _em_semanas(inicio, fim)
+        indice = (codigos[origem], semana - self.primeira)
+        np.add.at(destino, indice, (f - ini) / 60)
+        if noturnas is not None:
+            np.add.at(noturnas, indice, (_minutos_noturnos(f) - _minutos_noturnos(ini)) / 60)
+
+    # ----------------------------------------------------------- consultas O(1)
+    @property
+    def semanas(self) -> pd.DatetimeIndex:
+        """Segunda-feira 00:00 de cada coluna dos arrays."""
+        numeros = np.arange(self.primeira, self.primeira + self.horas.shape[1])
+        return pd.to_datetime(numeros * _MINUTOS_SEMANA - _SEGUNDA, unit='m')
+
+    def codigo(self, executor) -> int:
+        """Linha do executor nos arrays (-1 se desconhecido)."""
+        return self.executores.get_indexer([executor])[0]
+
+    def coluna(self, minutos) -> np.ndarray:
+        """Coluna dos arrays da semana de instantes em minutos (ver ``oraex.conflitos.em_minutos``)."""
+        return semana_de(minutos) - self.primeira
+
+    def disponivel(self, codigo: int, coluna: int) -> float:
+        """Horas que ainda cabem para o executor na semana."""
+        return self.limite[codigo] - self.horas[codigo, coluna]
+
+    def cabe(self, codigo: int, coluna: int, horas: float) -> bool:
+        return self.horas[codigo, coluna] + horas <= self.limite[codigo]
+
+    def reservar(self, codigo: int, coluna: int, horas: float):
+        """Soma (ou, com horas negativas, devolve) horas do executor na semana."""
+        self.horas[codigo, coluna] += horas
+
+    # ----------------------------------------------------------- saída
+    def utilizacao(self) -> pd.DataFrame:
+        """% das horas semanais de cada executor já agendadas (executor × semana), para o heatmap."""
+        limite = np.where(self.limite > 0, self.limite, np.nan)[:, None]
+        return pd.DataFrame((self.horas / limite * 100).round(1), index=self.executores, columns=self.semanas)
+
+    def tabela(self) -> pd.DataFrame:
+        """Formato longo, uma linha por executor × semana com alguma janela."""
+        executor, coluna = np.nonzero(self.horas > 0)
+        return pd.DataFrame({
+            'Executor': self.executores[executor],
+            'Semana': self.semanas[coluna],
+            'Horas': self.horas[executor, coluna].round(1),
+            'Noturnas': self.noturnas[executor, coluna].round(1),
+            'Sobreposicao': self.sobreposicao[executor, coluna].round(1),
+            'Janelas': self.janelas[executor, coluna],
+            'Utilizacao': (self.horas[executor, coluna] / self.limite[executor] * 100).round(1),
+        }, columns=COLUNAS_CARGA)
+
+    def resumo(self) -> pd.DataFrame:
+        """Por executor: semana de pico, média das semanas com janela, % noturno e horas sobrepostas."""
+        ativas = self.horas > 0
+        total = self.horas.sum(axis=1)
+        semanas_ativas = ativas.sum(axis=1)
+        pico = self.horas.argmax(axis=1) if self.horas.size else np.zeros(len(self.executores), dtype=int)
+        return pd.DataFrame({
+            'Horas_Pico': self.horas.max(axis=1, initial=0).round(1),
+            'Semana_Pico': self.semanas[pico] if self.horas.size else pd.NaT,
+            'Media_Semanal': np.divide(total, semanas_ativas, out=np.zeros_like(total),
+                                       where=semanas_ativas > 0).round(1),
+            'Semanas_Acima': (self.horas > self.limite[:, None]).sum(axis=1),
+            'Pct_Noturno': np.divide(self.noturnas.sum(axis=1) * 100, total, out=np.zeros_like(total),
+                                     where=total > 0).round(1),
+            'Horas_Sobrepostas': self.sobreposicao.sum(axis=1).round(1),
+        }, index=self.executores.rename('Executor'))
@@ -0,0 +1,100 @@
+"""
+Conflitos de janela de manutenção
+=================================
+Nada verificava se duas GMUDs (DATA INICIO → DATA TÉRMINO) se sobrepõem no
+mesmo host, no mesmo par primary/standby ou com o mesmo executor; o
+``px.timeline`` do relatório só mostra a sobreposição visualmente.
+
+O detector é um índice de intervalos por varredura ordenada (sort-and-sweep):
+
+1. as janelas são ordenadas por (chave, início) — O(n log n);
+2. para cada janela, ``searchsorted`` acha a primeira janela da mesma chave que
+   começa depois do seu término; todas as anteriores a ela se sobrepõem.
+
+Os pares são enumerados sem laço Python, em O(n log n + k) para k conflitos.
+Colunas de lista (hosts, pares) são explodidas antes: uma GMUD com dois hosts
+entra uma vez em cada host.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Tipo de conflito -> coluna das janelas com a chave (escalar ou lista)
+DIMENSOES = {'Host': 'Hosts', 'Par': 'Pares', 'Executor': 'Executor'}
+COLUNAS_CONFLITOS = ['Tipo', 'Chave', 'Id_A', 'Inicio_A', 'Fim_A', 'Id_B', 'Inicio_B', 'Fim_B', 'Horas_Sobreposicao']
+
+
+def pares_sobrepostos(chaves: np.ndarray, inicio: np.ndarray, fim: np.ndarray):
+    """
+    Índices (i, j) de intervalos [inicio, fim) da mesma chave que se sobrepõem.
+
+    ``chaves``: códigos inteiros >= 0; ``inicio``/``fim``: inteiros (ex.: minutos).
+    """
+    n = len(chaves)
+    if n < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    ordem = np.lexsort((inicio, chaves))
+    c, s, e = chaves[ordem].astype(np.int64), inicio[ordem], fim[ordem]
+
+    # (chave, instante) num único inteiro ordenável: chave * amplitude + deslocamento
+    base = s.min()
+    amplitude = int(max(s.max(), e.max()) - base) + 1
+    composto = c * amplitude + (s - base)
+    limite = np.searchsorted(composto, c * amplitude + (e - base), side='left')
+
+    # Janela k se sobrepõe às janelas k+1 .. limite[k]-1 (mesma chave, começam antes do fim de k)
+    posicoes = np.arange(n)
+    quantos = np.clip(limite - posicoes - 1, 0, None)
+    total = int(quantos.sum())
+    i = np.repeat(posicoes, quantos)
+    deslocamento = np.arange(total) - np.repeat(np.cumsum(quantos) - quantos, quantos)
+    j = i + 1 + deslocamento
+    return ordem[i], ordem[j]
+
+
+def em_minutos(serie: pd.Series) -> np.ndarray:
+    return pd.to_datetime(serie).to_numpy().astype('datetime64[m]').astype(np.int64)
+
+
+def detectar_conflitos(janelas: pd.DataFrame, dimensoes: dict = None) -> pd.DataFrame:
+    """
+    Pares de janelas sobrepostas em ``janelas`` (colunas Id, Inicio, Fim e as de ``dimensoes``).
+
+    Devolve uma linha por (tipo, chave, par de janelas), com as horas de sobreposição.
+    """
+    dimensoes = DIMENSOES if dimensoes is None else dimensoes
+    validas = janelas.dropna(subset=['Inicio', 'Fim'])
+    validas = validas[validas['Fim'] > validas['Inicio']]
+    partes = []
+    for tipo, coluna in dimensoes.items():
+        if coluna not in validas.columns:
+            continue
+        longo = validas[['Id', 'Inicio', 'Fim', coluna]].explode(coluna).dropna(subset=[coluna])
+        longo = longo[longo[coluna].astype(str).str.strip() != ''].reset_index(drop=True)
+        if len(longo) < 2:
+            continue
+        codigos, valores = pd.factorize(longo[coluna].astype(str))
+        i, j = pares_sobrepostos(codigos, em_minutos(longo['Inicio']), em_minutos(longo['Fim']))
+        a, b = longo.iloc[i].reset_index(drop=True), longo.iloc[j].reset_index(drop=True)
+        sobreposicao = (np.minimum(a['Fim'], b['Fim']) - np.maximum(a['Inicio'], b['Inicio'])).dt.total_seconds() / 3600
+        partes.append(pd.DataFrame({
+            'Tipo': tipo,
+            'Chave': valores[codigos[i]],
+            'Id_A': a['Id'], 'Inicio_A': a['Inicio'], 'Fim_A': a['Fim'],
+            'Id_B': b['Id'], 'Inicio_B': b['Inicio'], 'Fim_B': b['Fim'],
+            'Horas_Sobreposicao': sobreposicao.round(1),
+        }))
+    partes = [p for p in partes if len(p)]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_CONFLITOS)
+    return pd.concat(partes, ignore_index=True).sort_values(['Inicio_A', 'Tipo', 'Chave'], kind='stable',
+                                                             ignore_index=True)
+
+
+def proximos(conflitos: pd.DataFrame, inicio, dias: int = 7) -> pd.DataFrame:
+    """Conflitos com alguma das janelas começando em [inicio, inicio + dias) — para o alerta pré-execução."""
+    inicio = pd.Timestamp(inicio)
+    fim = inicio + pd.Timedelta(days=dias)
+    inicios = conflitos[['Inicio_A', 'Inicio_B']].apply(pd.to_datetime)
+    no_periodo = ((inicios >= inicio) & (inicios < fim)).any(axis=1)
+    return conflitos[no_periodo]
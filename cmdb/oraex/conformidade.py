@@ -0,0 +1,116 @@
+"""
+Série semanal de conformidade PSU
+=================================
+A aba de inventário só diz a versão PSU de *hoje* de cada host, então
+``pct_atualizados`` é um ponto único, sem tendência.
+
+A série é reconstruída a partir do histórico de GMUDs (``oraex.historico``):
+as GMUDs de PSU concluídas com sucesso são eventos (host, data, RU aplicado).
+Para cada fronteira de semana, o RU vigente de cada host é o do último evento
+até aquela data — um ``merge_asof`` ordenado da grade semana × host contra os
+eventos, sem laço por host:
+
+- host que nunca aparece numa GMUD mantém a versão atual do inventário;
+- host com GMUD, antes da primeira delas, está numa versão anterior (não conforme).
+
+Conforme = RU >= alvo. Sem ``alvo`` fixo, o alvo de cada semana é o RU mais
+novo que já roda em pelo menos ``ADOCAO_MINIMA`` dos hosts naquela semana. Usar
+"o RU mais novo aplicado em qualquer host" fazia a série despencar a cada
+piloto (um host no RU novo tornava a frota inteira não conforme) e voltar
+quando o piloto não seguia, um serrote sem relação com o rollout. A adoção é
+uma matriz semana × RU candidato (poucos RUs); o alvo nunca volta atrás
+(máximo acumulado), então uma semana de rollback não baixa a régua.
+
+Saída: percentual de hosts conformes por entorno e no total, mais o RU alvo
+(Alvo), uma linha por semana.
+"""
+
+import numpy as np
+import pandas as pd
+
+TOTAL = 'Total'
+# Fração dos hosts que precisa estar num RU para ele virar o alvo da semana
+ADOCAO_MINIMA = 0.2
+
+
+def chave_versao(serie: pd.Series) -> pd.Series:
+    """'19.29' -> 19029.0 (ordenável numericamente); versões ilegíveis viram NaN."""
+    # Regex só sobre os valores distintos (poucos RUs, muitas linhas)
+    codigos, unicos = pd.factorize(serie)
+    partes = pd.Series(unicos, dtype=object).astype('string').str.extract(r'(\d+)\.(\d+)')
+    chaves = (pd.to_numeric(partes[0]) * 1000 + pd.to_numeric(partes[1])).to_numpy(dtype=float, na_value=np.nan)
+    return pd.Series(np.append(chaves, np.nan)[codigos], index=serie.index)
+
+
+def semanas(inicio, fim) -> pd.DatetimeIndex:
+    """Fronteiras semanais (segunda-feira 00:00) cobrindo [inicio, fim]."""
+    return pd.date_range(pd.Timestamp(inicio).normalize(), pd.Timestamp(fim) + pd.Timedelta(days=7), freq='W-MON')
+
+
+def alvo_por_adocao(chaves: np.ndarray, minimo: float = ADOCAO_MINIMA) -> np.ndarray:
+    """
+    Alvo de cada semana a partir de ``chaves`` (semanas × hosts, NaN = sem RU):
+    o RU mais novo com adoção >= ``minimo``, sem voltar atrás entre semanas.
+    Sem RU que atinja o mínimo, o alvo é o RU mais antigo da frota.
+    """
+    candidatos = np.unique(chaves[~np.isnan(chaves)])
+    if not len(candidatos):
+        return np.full(len(chaves), np.nan)
+    # adocao[s, r]: fração dos hosts na semana s com RU >= candidatos[r]
+    adocao = (chaves[:, :, None] >= candidatos).mean(axis=1)
+    ultimo = np.where(adocao >= minimo, np.arange(len(candidatos)), 0).max(axis=1)
+    return candidatos[np.maximum.accumulate(ultimo)]
+
+
+def serie_conformidade(eventos: pd.DataFrame, hosts: pd.DataFrame, alvo: str = None,
+                       fronteiras: pd.DatetimeIndex = None, grupo: str = 'Entorno',
+                       adocao_minima: float = ADOCAO_MINIMA) -> pd.DataFrame:
+    """
+    Percentual de hosts com RU >= ``alvo`` em cada fronteira de semana
+    (``alvo=None``: o RU mais novo com adoção >= ``adocao_minima``, ver ``alvo_por_adocao``).
+
+    ``eventos``: Hostname, Data e Versao (GMUDs de PSU concluídas).
+    ``hosts``: Hostname, Versao (atual, do inventário) e ``grupo``; um host por linha.
+    Devolve Semana + uma coluna por valor de ``grupo`` + ``Total`` + ``Alvo`` ('19.27').
+    """
+    hosts = hosts.drop_duplicates('Hostname').reset_index(drop=True)
+    eventos = eventos.dropna(subset=['Hostname', 'Data', 'Versao'])
+    # Hosts e versões viram inteiros/números antes do merge: a grade pode ter milhões de linhas
+    eventos = pd.DataFrame({
+        'Host': pd.Index(hosts['Hostname'].astype(str)).get_indexer(eventos['Hostname'].astype(str)),
+        'Data': eventos['Data'].to_numpy(),
+        'Chave': chave_versao(eventos['Versao']).to_numpy(),
+    })
+    eventos = eventos[eventos['Host'] >= 0].sort_values('Data', kind='stable')
+    if fronteiras is None:
+        if eventos.empty:
+            return pd.DataFrame(columns=['Semana', TOTAL, 'Alvo'])
+        fronteiras = semanas(eventos['Data'].min(), eventos['Data'].max())
+
+    # Grade semana × host ordenada pela semana (exigência do merge_asof)
+    n_hosts = len(hosts)
+    grade = pd.DataFrame({
+        'Semana': np.repeat(fronteiras.to_numpy(), n_hosts),
+        'Host': np.tile(np.arange(n_hosts), len(fronteiras)),
+    })
+    estado = pd.merge_asof(grade, eventos, left_on='Semana', right_on='Data', by='Host',
+                           direction='backward', allow_exact_matches=False)
+
+    # Sem evento até a semana: versão do inventário para quem nunca foi atualizado
+    atualizados = np.bincount(eventos['Host'], minlength=n_hosts) > 0
+    versao_fixa = np.where(atualizados, np.nan, chave_versao(hosts['Versao']).to_numpy())
+    chaves = estado['Chave'].to_numpy()
+    chaves = np.where(np.isnan(chaves), versao_fixa[estado['Host'].to_numpy()], chaves)
+
+    if alvo is None:
+        alvos = alvo_por_adocao(chaves.reshape(len(fronteiras), n_hosts), adocao_minima)
+    else:
+        alvos = np.full(len(fronteiras), chave_versao(pd.Series([alvo])).iloc[0])
+    conforme = pd.Series(chaves >= np.repeat(alvos, n_hosts), index=pd.Index(estado['Semana'], name='Semana'))
+
+    grupos = np.tile(hosts[grupo].astype(str).to_numpy(), len(fronteiras))
+    serie = conforme.groupby([conforme.index, grupos]).mean().unstack()
+    serie[TOTAL] = conforme.groupby(level=0).mean()
+    serie = (serie.astype(float) * 100).round(1)
+    serie['Alvo'] = [f'{a // 1000:.0f}.{a % 1000:02.0f}' if np.isfinite(a) else None for a in alvos]
+    return serie.rename_axis(index='Semana', columns=None).reset_index()
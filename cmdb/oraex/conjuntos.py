@@ -0,0 +1,222 @@
+"""
+Conjuntos de hosts em bitsets
+=============================
+Servidores únicos eram ``len(set(all_hosts))`` sobre listas Python e as
+checagens de cobertura comparavam listas de hostnames: serve para ~450 hosts
+GetNet, não para o parque multi-cliente.
+
+Cada hostname ganha um id denso (0..n-1, ``UniversoHosts``) e um conjunto de
+hosts vira um bitset: n bits em palavras uint64 (100k hosts = 12,5 KB).
+União, interseção, diferença e complemento são operações bit a bit sobre as
+palavras; a cardinalidade é um popcount.
+
+``ConjuntosHosts`` monta de uma vez, a partir do histórico host × GMUD
+(``oraex.historico``) e dos hosts do inventário:
+
+- um bitset por célula Trimestre × Status_Final (hosts com GMUD ali);
+- um bitset por valor de cada atributo do inventário (ex.: Entorno);
+- o bitset do inventário inteiro.
+
+"Atualizados no Q1 e no Q2" é o AND de duas células; "nunca atualizados" é o
+inventário menos o OR das células de sucesso; cobertura por entorno é um
+popcount por valor.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oraex.historico import TRIMESTRES
+
+_POPCOUNT_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(palavras: np.ndarray) -> int:
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(palavras).sum())
+    return int(_POPCOUNT_BYTE[palavras.view(np.uint8)].sum())
+
+
+def _empacotar(bits: np.ndarray) -> np.ndarray:
+    """Matriz bool (k × n) -> palavras uint64 (k × ceil(n/64)), bit i do host de id i."""
+    k, n = bits.shape
+    completo = np.zeros((k, -(-n // 64) * 64), dtype=bool)
+    completo[:, :n] = bits
+    return np.packbits(completo, axis=1, bitorder='little').view(np.uint64)
+
+
+def _codigos(serie: pd.Series):
+    """(códigos, valores distintos) de uma coluna; categórico já traz os seus."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64), list(serie.cat.categories)
+    codigos, valores = pd.factorize(serie.astype(object))
+    return codigos, list(valores)
+
+
+class UniversoHosts:
+    """Hostnames com ids densos, na ordem em que aparecem."""
+
+    def __init__(self, hostnames):
+        self.hosts = pd.Index(pd.unique(pd.Series(hostnames, dtype=object).dropna()), name='Hostname')
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def ids(self, hostnames) -> np.ndarray:
+        """Ids dos hostnames (-1 para host fora do universo)."""
+        return self.hosts.get_indexer(pd.Index(hostnames, dtype=object))
+
+    def conjunto(self, hostnames) -> 'ConjuntoHosts':
+        ids = self.ids(hostnames)
+        return ConjuntoHosts.de_ids(self, ids[ids >= 0])
+
+    def vazio(self) -> 'ConjuntoHosts':
+        return ConjuntoHosts(self, np.zeros(-(-len(self) // 64), dtype=np.uint64))
+
+    def todos(self) -> 'ConjuntoHosts':
+        return ~self.vazio()
+
+
+class ConjuntoHosts:
+    """Bitset de hosts de um ``UniversoHosts``."""
+
+    __slots__ = ('universo', 'palavras')
+
+    def __init__(self, universo: UniversoHosts, palavras: np.ndarray):
+        self.universo = universo
+        self.palavras = palavras
+
+    @classmethod
+    def de_ids(cls, universo: UniversoHosts, ids) -> 'ConjuntoHosts':
+        bits = np.zeros((1, len(universo)), dtype=bool)
+        bits[0, np.asarray(ids, dtype=np.int64)] = True
+        return cls(universo, _empacotar(bits)[0])
+
+    def _outro(self, outro: 'ConjuntoHosts') -> np.ndarray:
+        if outro.universo is not self.universo:
+            raise ValueError("Conjuntos de universos de hosts diferentes")
+        return outro.palavras
+
+    def __and__(self, outro):
+        return ConjuntoHosts(self.universo, self.palavras & self._outro(outro))
+
+    def __or__(self, outro):
+        return ConjuntoHosts(self.universo, self.palavras | self._outro(outro))
+
+    def __sub__(self, outro):
+        return ConjuntoHosts(self.universo, self.palavras & ~self._outro(outro))
+
+    def __xor__(self, outro):
+        return ConjuntoHosts(self.universo, self.palavras ^ self._outro(outro))
+
+    def __invert__(self):
+        palavras = ~self.palavras
+        sobra = len(self.universo) % 64
+        if sobra and len(palavras):
+            # Bits além do último host não pertencem ao universo
+            palavras[-1] &= np.uint64((1 << sobra) - 1)
+        return ConjuntoHosts(self.universo, palavras)
+
+    def __len__(self) -> int:
+        return _popcount(self.palavras)
+
+    def __bool__(self) -> bool:
+        return bool(self.palavras.any())
+
+    def __contains__(self, hostname) -> bool:
+        i = self.universo.ids([hostname])[0]
+        return i >= 0 and bool((int(self.palavras[i // 64]) >> (i % 64)) & 1)
+
+    def ids(self) -> np.ndarray:
+        bits = np.unpackbits(self.palavras.view(np.uint8), bitorder='little')[:len(self.universo)]
+        return np.flatnonzero(bits)
+
+    def hostnames(self) -> pd.Index:
+        return self.universo.hosts[self.ids()]
+
+
+class ConjuntosHosts:
+    """Bitsets de hosts por Trimestre × Status_Final (histórico) e por atributo do inventário."""
+
+    def __init__(self, universo: UniversoHosts, celulas: dict, atributos: dict, inventario: ConjuntoHosts):
+        self.universo = universo
+        self.celulas = celulas
+        self.atributos = atributos
+        self.inventario_todo = inventario
+
+    @classmethod
+    def montar(cls, longo: pd.DataFrame, inventario: pd.DataFrame = None) -> 'ConjuntosHosts':
+        """
+        ``longo``: histórico host × GMUD (Hostname, Trimestre, Status_Final);
+        ``inventario``: um host por linha (Hostname + atributos, ex.: Entorno).
+        """
+        inventario = inventario if inventario is not None else pd.DataFrame(columns=['Hostname'])
+        codigos_host, nomes = _codigos(longo['Hostname'])
+        # Hosts do inventário primeiro: ids estáveis enquanto o inventário não muda
+        universo = UniversoHosts(pd.concat([inventario['Hostname'].astype(object), pd.Series(nomes, dtype=object)]))
+        # Cada hostname distinto é procurado uma vez; as linhas herdam pelo código (-1 = sem host)
+        ids = np.append(universo.ids(nomes), -1)[codigos_host]
+
+        trimestre, trimestres = _codigos(longo['Trimestre'])
+        status, todos_status = _codigos(longo['Status_Final'])
+        celula = np.where((trimestre >= 0) & (status >= 0), trimestre * len(todos_status) + status, -1)
+        chaves = [(t, s) for t in trimestres for s in todos_status]
+        celulas = cls._por_valor(universo, ids, celula, chaves)
+
+        ids_inv = universo.ids(inventario['Hostname'].astype(object))
+        atributos = {col: cls._por_valor(universo, ids_inv, *_codigos(inventario[col]))
+                     for col in inventario.columns if col != 'Hostname'}
+        return cls(universo, celulas, atributos, ConjuntoHosts.de_ids(universo, ids_inv[ids_inv >= 0]))
+
+    @staticmethod
+    def _por_valor(universo: UniversoHosts, ids: np.ndarray, codigos: np.ndarray, valores) -> dict:
+        """Um bitset por valor: matriz bool valor × host preenchida de uma vez e empacotada."""
+        validos = (codigos >= 0) & (ids >= 0)
+        bits = np.zeros((len(valores), len(universo)), dtype=bool)
+        bits[codigos[validos], ids[validos]] = True
+        return {valor: ConjuntoHosts(universo, palavras) for valor, palavras in zip(valores, _empacotar(bits))}
+
+    def _uniao(self, conjuntos) -> ConjuntoHosts:
+        resultado = self.universo.vazio()
+        for conjunto in conjuntos:
+            resultado = resultado | conjunto
+        return resultado
+
+    # ----------------------------------------------------------- consultas
+    def inventario(self, **atributos) -> ConjuntoHosts:
+        """Hosts do inventário com os atributos (valor ou lista, ex.: ``Entorno='Produção'``)."""
+        resultado = self.inventario_todo
+        for col, valor in atributos.items():
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            resultado = resultado & self._uniao(self.atributos[col][v] for v in valores if v in self.atributos[col])
+        return resultado
+
+    def com_gmud(self, Trimestre=None, Status_Final=None, **atributos) -> ConjuntoHosts:
+        """Hosts com GMUD nos trimestres/status pedidos (None = qualquer), opcionalmente só os do inventário filtrado."""
+        def aceita(valor, filtro):
+            return filtro is None or valor in (filtro if isinstance(filtro, (list, tuple, set)) else [filtro])
+        resultado = self._uniao(c for (trimestre, status), c in self.celulas.items()
+                                if aceita(trimestre, Trimestre) and aceita(status, Status_Final))
+        return resultado & self.inventario(**atributos) if atributos else resultado
+
+    def em_todos(self, trimestres=TRIMESTRES, Status_Final='SUCESSO', **atributos) -> ConjuntoHosts:
+        """Hosts com GMUD em cada um dos ``trimestres`` (ex.: atualizados no Q1 e no Q2)."""
+        resultado = self.inventario(**atributos) if atributos else self.universo.todos()
+        for trimestre in trimestres:
+            resultado = resultado & self.com_gmud(trimestre, Status_Final)
+        return resultado
+
+    def nunca_atualizados(self, **atributos) -> ConjuntoHosts:
+        """Hosts do inventário sem nenhuma GMUD de sucesso no histórico."""
+        return self.inventario(**atributos) - self.com_gmud(Status_Final='SUCESSO')
+
+    def cobertura(self, por: str = 'Entorno', Status_Final='SUCESSO') -> pd.DataFrame:
+        """Por valor do atributo: hosts, atualizados em cada trimestre e no ano, nunca atualizados e % coberto."""
+        por_trimestre = {t: self.com_gmud(t, Status_Final) for t in TRIMESTRES}
+        algum = self.com_gmud(Status_Final=Status_Final)
+        linhas = {}
+        for valor, hosts in self.atributos[por].items():
+            atualizados = len(hosts & algum)
+            linhas[valor] = {'Hosts': len(hosts), **{t: len(hosts & c) for t, c in por_trimestre.items()},
+                             'Atualizados': atualizados, 'Nunca': len(hosts) - atualizados,
+                             'Pct_Coberto': round(atualizados / len(hosts) * 100, 1) if len(hosts) else 0.0}
+        return pd.DataFrame.from_dict(linhas, orient='index').rename_axis(por).sort_index()
@@ -0,0 +1,131 @@
+"""
+Cubo OLAP das GMUDs
+===================
+Cada pergunta nova ("GMUDs PSU em produção por executor no Q3") virava um
+script que relia e renormalizava a planilha inteira.
+
+O cubo materializa os agregados do armazém (``oraex.agregados``) com as
+dimensões
+
+    Categoria × Status × Mes (→ Trimestre) × Entorno × Executor × Versao × Cliente
+
+e as medidas GMUDs, Servidores, Horas e Sucessos. Fica em formato
+dicionário: cada dimensão é um array de códigos (uint8/uint16) + a lista de
+rótulos, e cada medida um array. Trimestre não é guardado: é uma tabela de
+códigos indexada pelos códigos de Mes (hierarquia Mes → Trimestre).
+
+- fatia (slice/dice): máscara por comparação de códigos;
+- roll-up: índice linear das dimensões pedidas (``ravel_multi_index``) e um
+  ``np.bincount`` por medida.
+
+São algumas centenas de células (não linhas de GMUD): uma consulta custa
+dezenas de microssegundos em numpy; montar o DataFrame de saída custa mais
+do que a consulta. Nos artefatos o cubo é gravado na forma longa (tabela
+``cubo``), que o Parquet já guarda com dicionário.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oraex.agregados import DIMENSOES, MEDIDAS, VAZIO
+from oraex.historico import MESES_DO_ANO, TRIMESTRES
+
+# Dimensões do armazém -> nomes do cubo
+NOMES = {'Is_PSU': 'Categoria', 'Status_Final': 'Status', 'Responsavel_Norm': 'Executor', 'Versao_PSU': 'Versao'}
+DIMENSOES_CUBO = ['Categoria', 'Status', 'Mes', 'Trimestre', 'Entorno', 'Executor', 'Versao', 'Cliente']
+MEDIDAS_CUBO = MEDIDAS
+_CATEGORIAS = {'True': 'PSU', 'False': 'Outras'}
+
+
+def _trimestre(mes: str) -> str:
+    # 'AGOSTO' e 'AGOSTO-26' -> 'Q3'
+    nome = mes.split('-')[0].strip().upper()
+    return TRIMESTRES[MESES_DO_ANO.index(nome) // 3] if nome in MESES_DO_ANO else VAZIO
+
+
+class CuboOlap:
+    """Agregados de GMUDs codificados em dicionário, com fatia e roll-up vetorizados."""
+
+    def __init__(self, rotulos: dict, codigos: dict, medidas: dict):
+        self.rotulos = rotulos
+        self.codigos = codigos
+        self.medidas = medidas
+        self._posicao = {dim: {r: i for i, r in enumerate(rotulos[dim])} for dim in rotulos}
+
+    @classmethod
+    def de_agregados(cls, agregados: pd.DataFrame) -> 'CuboOlap':
+        """Tabela longa do armazém (DIMENSOES + MEDIDAS, ver ``ArmazemKpis.agregados``) -> cubo."""
+        rotulos, codigos = {}, {}
+        for dim in DIMENSOES:
+            valores = agregados[dim].astype(str) if dim in agregados.columns else pd.Series(VAZIO, index=agregados.index)
+            if dim == 'Is_PSU':
+                valores = valores.map(_CATEGORIAS).fillna(VAZIO)
+            categorico = pd.Categorical(valores)
+            nome = NOMES.get(dim, dim)
+            rotulos[nome] = np.asarray(categorico.categories, dtype=object)
+            codigos[nome] = categorico.codes.astype(np.min_scalar_type(max(len(categorico.categories) - 1, 0)))
+        # Hierarquia Mes -> Trimestre: código do trimestre de cada código de mês
+        trimestre_do_mes = pd.Categorical([_trimestre(m) for m in rotulos['Mes']])
+        rotulos['Trimestre'] = np.asarray(trimestre_do_mes.categories, dtype=object)
+        codigos['Trimestre'] = trimestre_do_mes.codes.astype(np.uint8)[codigos['Mes']] if len(agregados) \
+            else np.zeros(0, dtype=np.uint8)
+        medidas = {m: agregados[m].to_numpy(dtype='float64' if m == 'Horas' else 'int64') for m in MEDIDAS}
+        return cls(rotulos, codigos, medidas)
+
+    def __len__(self) -> int:
+        return len(self.medidas['GMUDs'])
+
+    def valores(self, dimensao: str) -> list:
+        """Rótulos de uma dimensão presentes no cubo."""
+        return [r for r in self.rotulos[dimensao] if r != VAZIO]
+
+    # ----------------------------------------------------------- fatia
+    def mascara(self, **filtros) -> np.ndarray:
+        """Células que batem com os filtros (valor ou lista de valores por dimensão, ex.: Trimestre='Q3')."""
+        mascara = np.ones(len(self), dtype=bool)
+        for dim, valor in filtros.items():
+            if dim not in self.codigos:
+                raise KeyError(f"Dimensão desconhecida: {dim} (use {', '.join(DIMENSOES_CUBO)})")
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            posicoes = [self._posicao[dim][str(v)] for v in valores if str(v) in self._posicao[dim]]
+            if len(posicoes) == 1:
+                mascara &= self.codigos[dim] == posicoes[0]
+            else:
+                mascara &= np.isin(self.codigos[dim], posicoes)
+        return mascara
+
+    def fatia(self, **filtros) -> 'CuboOlap':
+        """Sub-cubo só com as células dos filtros (mesmos rótulos)."""
+        mascara = self.mascara(**filtros)
+        return CuboOlap(self.rotulos, {d: c[mascara] for d, c in self.codigos.items()},
+                        {m: v[mascara] for m, v in self.medidas.items()})
+
+    def total(self, medida: str = 'GMUDs', **filtros):
+        """Soma de uma medida nas células dos filtros."""
+        valores = self.medidas[medida]
+        soma = valores[self.mascara(**filtros)].sum() if filtros else valores.sum()
+        return float(soma) if medida == 'Horas' else int(soma)
+
+    # ----------------------------------------------------------- roll-up
+    def rollup(self, por, medidas=MEDIDAS_CUBO, **filtros) -> pd.DataFrame:
+        """
+        Medidas somadas por uma ou mais dimensões (ex.: ``rollup('Executor', Categoria='PSU',
+        Trimestre='Q3')``); combinações sem GMUD e rótulos vazios ficam de fora.
+        """
+        por = [por] if isinstance(por, str) else list(por)
+        medidas = [medidas] if isinstance(medidas, str) else list(medidas)
+        mascara = self.mascara(**filtros)
+        for dim in por:
+            vazio = self._posicao[dim].get(VAZIO)
+            if vazio is not None:
+                mascara &= self.codigos[dim] != vazio
+        tamanhos = tuple(len(self.rotulos[dim]) for dim in por)
+        celula = np.ravel_multi_index(tuple(self.codigos[dim][mascara].astype(np.intp) for dim in por), tamanhos)
+        n = int(np.prod(tamanhos))
+        somas = {m: np.bincount(celula, weights=self.medidas[m][mascara], minlength=n) for m in set(medidas) | {'GMUDs'}}
+        ocupadas = np.flatnonzero(somas['GMUDs'])
+        posicoes = np.unravel_index(ocupadas, tamanhos)
+        indice = pd.MultiIndex.from_arrays([self.rotulos[dim][p] for dim, p in zip(por, posicoes)], names=por) \
+            if len(por) > 1 else pd.Index(self.rotulos[por[0]][posicoes[0]], name=por[0])
+        return pd.DataFrame({m: somas[m][ocupadas] if m == 'Horas' else somas[m][ocupadas].astype('int64')
+                             for m in medidas}, index=indice)
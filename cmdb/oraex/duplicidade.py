@@ -0,0 +1,70 @@
+"""
+GMUDs repetidas entre abas mensais
+==================================
+A mesma CHG às vezes aparece duas vezes: a linha é copiada para o mês
+seguinte (ou mais abaixo na mesma aba) depois de um REPLANEJAR, com o status
+novo. ``total`` e ``taxa_sucesso`` contavam as duas linhas.
+
+A chave de duplicidade é o hash de CHG + título normalizado (caixa, acentos e
+espaços): a mesma CHG com outro título (ex.: outro RU) continua sendo outra
+GMUD. Das linhas repetidas vale a mais recente — maior Data_Inicio, depois o
+mês da aba, depois a posição na planilha —, que traz o último status.
+
+Só operações vetorizadas (hash, ordenação e ``duplicated``); o ``groupby`` do
+relatório roda apenas sobre as linhas repetidas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oraex.cache import hash_linhas
+
+COLUNAS_DUPLICADAS = ['GMUD_ID', 'Titulo', 'Ocorrencias', 'Meses', 'Status', 'Mes_Mantido', 'Status_Mantido']
+
+
+def titulo_normalizado(serie: pd.Series) -> pd.Series:
+    """Título sem acentos, em minúsculas e com espaços colapsados."""
+    titulo = serie.astype('string').str.normalize('NFKD').str.replace('[\u0300-\u036f]', '', regex=True)
+    return titulo.str.lower().str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def chave_duplicidade(df: pd.DataFrame) -> np.ndarray:
+    """Hash uint64 de CHG + título normalizado por linha."""
+    return hash_linhas(pd.DataFrame({
+        'GMUD_ID': df['GMUD_ID'].astype('string').str.strip().str.upper(),
+        'Titulo': titulo_normalizado(df['Titulo']) if 'Titulo' in df.columns else '',
+    }), ['GMUD_ID', 'Titulo'])
+
+
+def deduplicar(df: pd.DataFrame):
+    """
+    ``(df sem as linhas repetidas, relatório)``: uma linha por CHG + título,
+    a mais recente; o relatório lista cada CHG repetida com meses e status na ordem.
+    """
+    # Mês da aba só desempata se for categórico ordenado (ver tipar_gmuds)
+    mes = df['Mes'] if 'Mes' in df.columns else pd.Series(0, index=df.index)
+    mes = mes.cat.codes.to_numpy() if isinstance(mes.dtype, pd.CategoricalDtype) else np.zeros(len(df), dtype=int)
+    ordem = pd.DataFrame({
+        'Chave': chave_duplicidade(df),
+        'Data': pd.to_datetime(df['Data_Inicio'], errors='coerce') if 'Data_Inicio' in df.columns else pd.NaT,
+        'Mes': mes,
+        'Posicao': np.arange(len(df)),
+    }, index=df.index).sort_values(['Chave', 'Data', 'Mes', 'Posicao'], na_position='first', kind='stable')
+
+    descartadas = ordem.index[ordem['Chave'].duplicated(keep='last').to_numpy()]
+    repetidas = ordem[ordem['Chave'].duplicated(keep=False).to_numpy()]
+    if repetidas.empty:
+        return df, pd.DataFrame(columns=COLUNAS_DUPLICADAS)
+
+    linhas = df.loc[repetidas.index, ['GMUD_ID', 'Titulo', 'Mes', 'Status']].astype(str)
+    grupos = linhas.groupby(repetidas['Chave'].to_numpy(), sort=False)
+    relatorio = pd.DataFrame({
+        'GMUD_ID': grupos['GMUD_ID'].first(),
+        'Titulo': grupos['Titulo'].first(),
+        'Ocorrencias': grupos.size(),
+        'Meses': grupos['Mes'].agg(' → '.join),
+        'Status': grupos['Status'].agg(' → '.join),
+        'Mes_Mantido': grupos['Mes'].last(),
+        'Status_Mantido': grupos['Status'].last(),
+    }).sort_values('GMUD_ID', ignore_index=True)
+    return df.drop(index=descartadas), relatorio
@@ -0,0 +1,147 @@
+"""
+Modelo de duração de execução das GMUDs
+=======================================
+O esforço era estimado com uma taxa fixa (3 h por servidor atualizado), igual
+para um DEV de um host e para um RAC de produção com standby.
+
+O modelo é ajustado das janelas reais (Data_Inicio → Data_Termino) das GMUDs
+concluídas: mediana e p90 das horas por ambiente × RU × faixa de hosts ×
+executor. Combinações com poucas amostras caem para um nível mais geral:
+
+1. Entorno, Versao_PSU, Faixa_Hosts, Responsavel_Norm
+2. Entorno, Versao_PSU, Faixa_Hosts
+3. Entorno, Faixa_Hosts
+4. Entorno
+5. geral
+
+Cada nível é um ``groupby().quantile()``; a estimativa é um merge por nível.
+
+Limitação: a janela é a agendada na GMUD, não o tempo de mão na massa — uma
+GMUD de vários hosts reserva a noite inteira. As somas são "horas de janela"
+(é assim que os relatórios as rotulam) e não devem ser lidas como horas
+trabalhadas; não há apontamento de horas por host para calibrar a diferença.
+O modelo ajustado fica em cache por hash das linhas usadas no ajuste e dos
+parâmetros do ajuste (``NIVEIS``, faixas, limite de horas, mínimo de amostras,
+``VERSAO_MODELO``) em ``duracao-<hash>.parquet``: é reajustado quando os dados
+ou a forma de ajustar mudam.
+"""
+
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from oraex.cache import assinatura, hash_linhas
+
+NIVEIS = [
+    ['Entorno', 'Versao_PSU', 'Faixa_Hosts', 'Responsavel_Norm'],
+    ['Entorno', 'Versao_PSU', 'Faixa_Hosts'],
+    ['Entorno', 'Faixa_Hosts'],
+    ['Entorno'],
+    [],
+]
+DIMENSOES = NIVEIS[0]
+FAIXAS_HOSTS = ['1', '2', '3-4', '5+']
+# Janelas fora de (0, 24h] são datas digitadas erradas (término no mês seguinte etc.)
+LIMITE_HORAS = 24
+MINIMO_AMOSTRAS = 5
+VAZIO = ''
+# Suba quando o cálculo do ajuste mudar sem mexer nos parâmetros acima: modelos em cache são refeitos
+VERSAO_MODELO = 1
+
+
+def faixa_hosts(num_servers: pd.Series) -> pd.Series:
+    """Quantidade de hosts da GMUD -> faixa ('1', '2', '3-4', '5+'); sem host conta como 1."""
+    return pd.cut(num_servers.fillna(0).clip(lower=1), bins=[0, 1, 2, 4, np.inf], labels=FAIXAS_HOSTS)
+
+
+def horas_janela(df: pd.DataFrame) -> pd.Series:
+    """Horas entre Data_Inicio e Data_Termino; NaN quando ausente ou fora de (0, LIMITE_HORAS]."""
+    if 'Data_Inicio' not in df.columns or 'Data_Termino' not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    inicio = pd.to_datetime(df['Data_Inicio'], errors='coerce')
+    termino = pd.to_datetime(df['Data_Termino'], errors='coerce')
+    horas = (termino - inicio).dt.total_seconds() / 3600
+    return horas.where((horas > 0) & (horas <= LIMITE_HORAS))
+
+
+def _chaves(df: pd.DataFrame) -> pd.DataFrame:
+    """Dimensões do modelo como texto (NaN não casa em merge)."""
+    chaves = pd.DataFrame(index=df.index)
+    for dim in DIMENSOES:
+        if dim == 'Faixa_Hosts':
+            valores = faixa_hosts(df['Num_Servers'] if 'Num_Servers' in df.columns else pd.Series(1, index=df.index))
+        else:
+            valores = df[dim] if dim in df.columns else pd.Series(VAZIO, index=df.index)
+        chaves[dim] = valores.astype(object).where(valores.notna(), VAZIO).astype(str)
+    return chaves
+
+
+class ModeloDuracao:
+    """Quantis de duração (horas) por nível da hierarquia de ``NIVEIS``."""
+
+    COLUNAS = ['Nivel'] + DIMENSOES + ['p50', 'p90', 'n']
+
+    def __init__(self, tabela: pd.DataFrame, minimo: int = MINIMO_AMOSTRAS):
+        self.tabela = tabela
+        self.minimo = minimo
+
+    @classmethod
+    def ajustar(cls, df: pd.DataFrame, minimo: int = MINIMO_AMOSTRAS) -> 'ModeloDuracao':
+        """Ajusta com as GMUDs de ``df`` que têm janela válida (ver ``horas_janela``)."""
+        amostras = _chaves(df).assign(Horas=horas_janela(df)).dropna(subset=['Horas'])
+        partes = []
+        for nivel, dims in enumerate(NIVEIS):
+            grupos = amostras.groupby(dims)['Horas'] if dims else amostras.assign(_g=0).groupby('_g')['Horas']
+            quantis = grupos.quantile([0.5, 0.9]).unstack()
+            parte = pd.DataFrame({'p50': quantis[0.5], 'p90': quantis[0.9], 'n': grupos.size()})
+            parte = parte.reset_index(drop=not dims).assign(Nivel=nivel)
+            partes.append(parte)
+        tabela = pd.concat(partes, ignore_index=True).reindex(columns=cls.COLUNAS)
+        tabela[DIMENSOES] = tabela[DIMENSOES].fillna(VAZIO)
+        return cls(tabela, minimo)
+
+    def estimar(self, df: pd.DataFrame, quantil: str = 'p50') -> pd.Series:
+        """Horas estimadas por linha de ``df``, do nível mais específico com amostras suficientes."""
+        chaves = _chaves(df)
+        estimativa = pd.Series(np.nan, index=df.index)
+        confiaveis = self.tabela[self.tabela['n'] >= self.minimo]
+        for nivel, dims in enumerate(NIVEIS):
+            faltam = estimativa.isna()
+            if not faltam.any():
+                break
+            tabela = confiaveis.loc[confiaveis['Nivel'] == nivel, dims + [quantil]]
+            if dims:
+                valores = chaves.loc[faltam, dims].merge(tabela, on=dims, how='left')[quantil].to_numpy()
+            else:
+                valores = tabela[quantil].iloc[0] if len(tabela) else np.nan
+            estimativa[faltam] = valores
+        return estimativa
+
+    def esforco(self, df: pd.DataFrame, quantil: str = 'p50') -> pd.Series:
+        """Horas de cada GMUD: a janela real quando válida, senão a estimativa do modelo."""
+        return horas_janela(df).fillna(self.estimar(df, quantil))
+
+
+def obter_modelo(df: pd.DataFrame, pasta: str, nome: str = 'duracao') -> ModeloDuracao:
+    """Modelo ajustado em ``df``, reaproveitado do cache enquanto as linhas e os parâmetros de ajuste forem os mesmos."""
+    colunas = DIMENSOES + ['Num_Servers', 'Data_Inicio', 'Data_Termino']
+    versao = assinatura(VERSAO_MODELO, NIVEIS, FAIXAS_HOSTS, LIMITE_HORAS, MINIMO_AMOSTRAS,
+                        hash_linhas(df, colunas).tobytes())
+    arquivo = os.path.join(pasta, f'{nome}-{versao}.parquet')
+    if os.path.exists(arquivo):
+        try:
+            return ModeloDuracao(pd.read_parquet(arquivo))
+        except Exception as e:
+            print(f"Modelo de duração ignorado ({arquivo}): {e}")
+
+    modelo = ModeloDuracao.ajustar(df)
+    os.makedirs(pasta, exist_ok=True)
+    for antigo in glob.glob(os.path.join(pasta, f'{nome}-*.parquet')):
+        os.remove(antigo)
+    try:
+        modelo.tabela.to_parquet(arquivo, index=False)
+    except Exception as e:
+        print(f"Não foi possível gravar o modelo de duração ({arquivo}): {e}")
+    return modelo
@@ -0,0 +1,114 @@
+"""
+Resolução de executores (DESIGNADO A / Responsavel)
+===================================================
+Os nomes de executores chegam das planilhas em várias grafias ("guilherme",
+"Guilherme F.", "gfonseca"...). Em vez de testar um dicionário fixo linha a
+linha, o resolvedor:
+
+1. deduplica os valores brutos da coluna (pd.factorize);
+2. resolve cada valor distinto uma única vez (tabela de aliases + fuzzy com cache);
+3. devolve o resultado para todas as linhas como categórico.
+
+A tabela de aliases fica em ``aliases_executores.json`` (dado, não código).
+"""
+
+import difflib
+import json
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+ARQUIVO_ALIASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aliases_executores.json')
+NAO_ATRIBUIDO = 'Não Atribuído'
+
+# Similaridade mínima para aceitar um token como erro de digitação de um alias
+# (0.9 aceita "Guilerme" -> "Guilherme", mas não "Lucas" -> "Luca").
+CORTE_FUZZY = 0.9
+
+
+def _chave(texto: str) -> str:
+    """Normaliza texto para comparação: minúsculo, sem acentos e espaços extras."""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def carregar_aliases(caminho: str = None) -> dict:
+    """Lê o JSON de aliases e devolve {'nao_atribuido': str, 'executores': {canonico: [aliases]}}."""
+    with open(caminho or ARQUIVO_ALIASES, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ResolvedorExecutores:
+    """Resolve nomes brutos de executores para o nome canônico."""
+
+    def __init__(self, executores: dict, nao_atribuido: str = NAO_ATRIBUIDO, corte_fuzzy: float = CORTE_FUZZY):
+        self.nao_atribuido = nao_atribuido
+        self.corte_fuzzy = corte_fuzzy
+        # alias normalizado -> nome canônico
+        self._aliases = {}
+        for canonico, aliases in executores.items():
+            self._aliases[_chave(canonico)] = canonico
+            for alias in aliases:
+                self._aliases[_chave(alias)] = canonico
+        self._chaves = list(self._aliases)
+        self._cache = {}
+
+    @classmethod
+    def do_arquivo(cls, caminho: str = None) -> 'ResolvedorExecutores':
+        dados = carregar_aliases(caminho)
+        return cls(dados['executores'], dados.get('nao_atribuido', NAO_ATRIBUIDO))
+
+    def _fuzzy(self, token: str):
+        if token in self._cache:
+            return self._cache[token]
+        match = difflib.get_close_matches(token, self._chaves, n=1, cutoff=self.corte_fuzzy)
+        self._cache[token] = self._aliases[match[0]] if match else None
+        return self._cache[token]
+
+    def resolver(self, valor) -> str:
+        """Resolve um único valor bruto."""
+        if valor is None or pd.isna(valor) or not str(valor).strip():
+            return self.nao_atribuido
+        chave = _chave(valor)
+        if chave in self._aliases:
+            return self._aliases[chave]
+        tokens = chave.replace('.', ' ').replace('@', ' ').split()
+        # Primeiro token conhecido vence ("Bruno F." -> Bruno Ferreira)
+        for token in tokens:
+            if token in self._aliases:
+                return self._aliases[token]
+        for token in tokens:
+            if len(token) >= 4:
+                canonico = self._fuzzy(token)
+                if canonico:
+                    return canonico
+        return str(valor).strip().title()
+
+    def resolver_serie(self, serie: pd.Series) -> pd.Series:
+        """Resolve uma coluna inteira; custo proporcional aos nomes distintos."""
+        codigos, unicos = pd.factorize(serie)
+        resolvidos = [self.resolver(v) for v in unicos]
+        categorias = sorted(set(resolvidos) | {self.nao_atribuido})
+        posicao = {nome: i for i, nome in enumerate(categorias)}
+        # Tabela "código do valor bruto -> código da categoria"; a última posição
+        # recebe o sentinela -1 do factorize (valores nulos).
+        tabela = np.array([posicao[r] for r in resolvidos] + [posicao[self.nao_atribuido]], dtype=np.int64)
+        novos_codigos = tabela[codigos]
+        return pd.Series(pd.Categorical.from_codes(novos_codigos, categories=categorias),
+                         index=serie.index, name=serie.name)
+
+
+_RESOLVEDOR_PADRAO = None
+
+
+def resolver_executores(serie: pd.Series, caminho_aliases: str = None) -> pd.Series:
+    """Atalho usado pelos relatórios: resolve a coluna com a tabela de aliases padrão."""
+    global _RESOLVEDOR_PADRAO
+    if caminho_aliases:
+        return ResolvedorExecutores.do_arquivo(caminho_aliases).resolver_serie(serie)
+    if _RESOLVEDOR_PADRAO is None:
+        _RESOLVEDOR_PADRAO = ResolvedorExecutores.do_arquivo()
+    return _RESOLVEDOR_PADRAO.resolver_serie(serie)
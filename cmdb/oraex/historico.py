@@ -0,0 +1,98 @@
+"""
+Histórico de patches por host (host × trimestre)
+================================================
+"Quais hosts receberam qual RU, e quando?" era respondido varrendo as listas
+de ``Hostnames`` das GMUDs em laços Python (``all_hosts.extend(h)``) a cada
+relatório.
+
+O histórico é uma tabela longa com uma linha por (host, GMUD): Hostname,
+Trimestre, Mes, Data_Inicio, Versao_PSU (RU aplicado), GMUD_ID, Status_Final,
+Is_PSU e Ordem (posição da GMUD na planilha, que segue a ordem cronológica das abas).
+É montada uma vez com ``explode`` e gravada no artefato de métricas; as
+perguntas viram reduções de coluna:
+
+- servidores únicos atualizados: ``nunique`` de Hostname;
+- hosts repatchados: contagem por Hostname;
+- último patch por host: última linha de cada Hostname por Ordem;
+- matriz host × trimestre: ``pivot`` do RU aplicado.
+"""
+
+import numpy as np
+import pandas as pd
+
+MESES_DO_ANO = [
+    'JANEIRO', 'FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO',
+    'JULHO', 'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO'
+]
+TRIMESTRES = ['Q1', 'Q2', 'Q3', 'Q4']
+COLUNAS_HISTORICO = ['Hostname', 'Trimestre', 'Mes', 'Data_Inicio', 'Versao_PSU', 'GMUD_ID', 'Status_Final', 'Is_PSU', 'Ordem']
+
+_TRIMESTRE_DO_MES = {mes: TRIMESTRES[i // 3] for i, mes in enumerate(MESES_DO_ANO)}
+
+
+def trimestre(mes: pd.Series) -> pd.Series:
+    """'MARÇO' / 'MARÇO-25' -> 'Q1' (categórico ordenado)."""
+    nomes = mes.astype('string').str.upper().str.split('-').str[0].str.strip()
+    return pd.Series(pd.Categorical(nomes.map(_TRIMESTRE_DO_MES), categories=TRIMESTRES, ordered=True),
+                     index=mes.index)
+
+
+def montar_historico(df: pd.DataFrame, coluna_hosts: str = 'Hostnames') -> pd.DataFrame:
+    """Tabela longa host × GMUD a partir das GMUDs normalizadas (listas em ``coluna_hosts``)."""
+    colunas = [c for c in COLUNAS_HISTORICO if c in df.columns]
+    longo = df[colunas].assign(Ordem=np.arange(len(df)), Hostname=df[coluna_hosts])
+    longo = longo.explode('Hostname').dropna(subset=['Hostname'])
+    longo['Hostname'] = longo['Hostname'].astype('category')
+    if 'Mes' in longo.columns:
+        longo['Trimestre'] = trimestre(longo['Mes'])
+    return longo[[c for c in COLUNAS_HISTORICO if c in longo.columns]].reset_index(drop=True)
+
+
+class HistoricoPatches:
+    """Consultas sobre a tabela longa de ``montar_historico``."""
+
+    def __init__(self, longo: pd.DataFrame):
+        self.longo = longo
+
+    @classmethod
+    def das_gmuds(cls, df: pd.DataFrame, coluna_hosts: str = 'Hostnames') -> 'HistoricoPatches':
+        return cls(montar_historico(df, coluna_hosts))
+
+    def __len__(self):
+        return len(self.longo)
+
+    def filtrar(self, **filtros) -> 'HistoricoPatches':
+        """Subconjunto por igualdade de colunas (ex.: ``Status_Final='SUCESSO', Is_PSU=True``)."""
+        mascara = np.ones(len(self.longo), dtype=bool)
+        for coluna, valor in filtros.items():
+            mascara &= (self.longo[coluna] == valor).to_numpy(dtype=bool, na_value=False)
+        return HistoricoPatches(self.longo[mascara])
+
+    def atualizacoes(self) -> int:
+        """Quantidade de (host, GMUD): um servidor atualizado duas vezes conta duas."""
+        return len(self.longo)
+
+    def servidores_unicos(self) -> int:
+        return int(self.longo['Hostname'].nunique())
+
+    def patches_por_host(self) -> pd.Series:
+        """GMUDs por host (só hosts com pelo menos uma), da maior para a menor."""
+        contagem = self.longo['Hostname'].value_counts()
+        return contagem[contagem > 0]
+
+    def repatchados(self, minimo: int = 2) -> pd.Series:
+        """Hosts com ``minimo`` ou mais GMUDs no histórico."""
+        contagem = self.patches_por_host()
+        return contagem[contagem >= minimo]
+
+    def ultimo_patch(self) -> pd.DataFrame:
+        """Última GMUD de cada host (pela ordem da planilha), indexada por Hostname."""
+        ultimos = self.longo.sort_values('Ordem', kind='stable').drop_duplicates('Hostname', keep='last')
+        return ultimos.set_index('Hostname').sort_index()
+
+    def matriz(self, valor: str = 'Versao_PSU') -> pd.DataFrame:
+        """Host × trimestre com o ``valor`` da última GMUD do host no trimestre (vazio = nenhuma)."""
+        ultimos = (self.longo.sort_values('Ordem', kind='stable')
+                   .drop_duplicates(['Hostname', 'Trimestre'], keep='last'))
+        matriz = ultimos.pivot(index='Hostname', columns='Trimestre', values=valor)
+        return matriz.reindex(columns=TRIMESTRES).sort_index()
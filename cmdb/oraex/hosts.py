@@ -0,0 +1,190 @@
+"""
+Resolução de hostnames a partir do inventário
+=============================================
+Os títulos das GMUDs citam os servidores ("... | GNCASSPL04272 e GNCASNPL04273").
+Em vez de uma regex fixa por cliente, o conjunto de hosts conhecidos vem do
+próprio inventário (PRIMARY e STANDBY das abas GetNet e PagoNxt):
+
+- cada token do título é procurado num set (O(1));
+- token com cara de hostname (prefixo de ``TAMANHO_PREFIXO`` letras de algum
+  host do inventário, ex.: "GNCAS") que não casa é tentado com duas letras
+  vizinhas trocadas ("GNCASNLP04273" -> "GNCASNPL04273"). Só transposição: uma
+  letra diferente é outro servidor (GNCASSPL01029 é o standby de GNCASNPL01029);
+- se nem assim casar, o host é mantido como citado (a GMUD mexeu nele) e
+  registrado em ``IndiceHosts.nao_encontrados`` para revisão do cadastro.
+
+Tokens sem prefixo conhecido (ex.: "PGDM-8509", número de chamado) são ignorados.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Colunas de hostname por aba do inventário (primário, standby)
+COLUNAS_HOSTS = {
+    'GetNet - Oracle Databases': ('PRIMARY HOSTNAME', 'STANDBY HOSTNAME'),
+    'PagoNxt - Databases': ('NAME', 'CONTINGENT'),
+}
+
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9_-]*')
+# Início do hostname que identifica o padrão de nomes do cliente ("gncas", "gmsp1")
+TAMANHO_PREFIXO = 5
+TAMANHO_MINIMO_HOST = 8
+
+
+def separar_hostnames(valor) -> list:
+    """Quebra uma célula do inventário em hostnames limpos (maiúsculos).
+
+    Aceita células com vários hosts ("HOST1 e HOST2", "HOST1 / HOST2", quebras
+    de linha) e descarta anotações como "(RAC)", emojis e o domínio após o ponto.
+    """
+    if valor is None or pd.isna(valor):
+        return []
+    hosts = []
+    # Anotações entre parênteses ("(RAC)", "(G)") e emojis não fazem parte do nome
+    texto = re.sub(r'\([^)]*\)', ' ', str(valor))
+    for parte in re.split(r'[^\w.-]+', texto):
+        parte = parte.split('.')[0].strip('-_')
+        if len(parte) >= 4 and any(c.isdigit() for c in parte):
+            hosts.append(parte.upper())
+    return hosts
+
+
+def hosts_do_inventario(abas: dict) -> list:
+    """Reúne os hostnames PRIMARY e STANDBY de {nome_aba: DataFrame}."""
+    hosts = []
+    for nome, df in abas.items():
+        for col in COLUNAS_HOSTS.get(nome, ()):
+            if col in df.columns:
+                for valor in df[col].dropna().unique():
+                    hosts.extend(separar_hostnames(valor))
+    return sorted(set(hosts))
+
+
+PRIMARIO = 'PRIMARY'
+STANDBY = 'STANDBY'
+
+
+def explodir_hosts(df: pd.DataFrame, primario: str, standby: str = None, unicos: bool = True,
+                   prioridade: pd.Series = None) -> pd.DataFrame:
+    """
+    Tabela estreita de servidores: Hostname, Papel (PRIMARY/STANDBY) e Linha
+    (índice da linha de ``df`` de onde o host veio).
+
+    Só as colunas de hostname passam pelo melt; os demais atributos do
+    inventário são buscados sob demanda com ``atributos_hosts``. Células com
+    vários standbys ("HOST2 e HOST3") viram uma linha por host e células sem
+    hostname válido (espaços, cabeçalhos repetidos) são descartadas.
+
+    ``unicos``: cada host conta uma vez — quem aparece como PRIMARY numa linha e
+    como STANDBY de outra (nós que se listam mutuamente) fica como PRIMARY.
+    ``prioridade`` (por linha de ``df``, menor vence; ex.: 0 para Ativo) decide
+    qual linha fica com o host repetido antes do papel e da ordem das linhas —
+    a linha "Descontinuado" de um host reaproveitado não leva o host da ativa.
+    """
+    papeis = {primario: PRIMARIO}
+    if standby and standby in df.columns:
+        papeis[standby] = STANDBY
+    longo = (df[list(papeis)].rename(columns=papeis)
+             .melt(ignore_index=False, var_name='Papel', value_name='Valor')
+             .dropna(subset=['Valor']))
+    # separar_hostnames roda uma vez por valor distinto
+    codigos, valores = pd.factorize(longo['Valor'].astype(str))
+    listas = [separar_hostnames(v) for v in valores]
+    longo = pd.DataFrame({
+        'Hostname': [listas[c] for c in codigos],
+        'Papel': longo['Papel'].to_numpy(),
+        'Linha': longo.index.to_numpy(),
+    }).explode('Hostname').dropna(subset=['Hostname'])
+    if unicos:
+        # melt põe todos os PRIMARY antes dos STANDBY: ordem estável por prioridade mantém o resto
+        rank = pd.Series(prioridade, index=df.index).reindex(longo['Linha']).to_numpy(dtype=float) \
+            if prioridade is not None else np.zeros(len(longo))
+        ordem = np.argsort(rank, kind='stable')
+        ficam = ordem[~longo['Hostname'].iloc[ordem].duplicated().to_numpy()]
+        longo = longo.iloc[np.sort(ficam)]
+    longo['Papel'] = pd.Categorical(longo['Papel'], categories=[PRIMARIO, STANDBY])
+    return longo.reset_index(drop=True)
+
+
+def atributos_hosts(hosts: pd.DataFrame, df: pd.DataFrame, colunas: list) -> pd.DataFrame:
+    """Junta às linhas de ``explodir_hosts`` só as ``colunas`` pedidas do inventário ``df``."""
+    atributos = df.loc[hosts['Linha'], [c for c in colunas if c in df.columns]].reset_index(drop=True)
+    return pd.concat([hosts.reset_index(drop=True), atributos], axis=1)
+
+
+class IndiceHosts:
+    """Índice de hostnames conhecidos: set exato + transposições + prefixos do padrão de nomes."""
+
+    def __init__(self, hosts):
+        self.hosts = sorted({h.upper() for h in hosts})
+        self._exatos = {h.lower(): h for h in self.hosts}
+        self._prefixos = {h[:TAMANHO_PREFIXO] for h in self._exatos if len(h) >= TAMANHO_MINIMO_HOST}
+        self._cache_aproximado = {}
+        self.nao_encontrados = Counter()
+
+    @classmethod
+    def da_planilha(cls, arquivo, abas=tuple(COLUNAS_HOSTS)) -> 'IndiceHosts':
+        """Monta o índice lendo as abas de inventário de uma planilha."""
+        dfs = {}
+        for aba in abas:
+            try:
+                dfs[aba] = pd.read_excel(arquivo, sheet_name=aba)
+            except Exception as e:
+                print(f"Erro ao ler aba {aba}: {e}")
+        return cls(hosts_do_inventario(dfs))
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def __contains__(self, host):
+        return str(host).lower() in self._exatos
+
+    def parece_host(self, token: str) -> bool:
+        """Token (minúsculo) com o padrão de nomes do inventário: prefixo conhecido e dígitos."""
+        return (len(token) >= TAMANHO_MINIMO_HOST and token[:TAMANHO_PREFIXO] in self._prefixos
+                and any(c.isdigit() for c in token))
+
+    def aproximado(self, token: str):
+        """Host conhecido que difere de ``token`` (minúsculo) por duas letras vizinhas trocadas (ou None)."""
+        if token in self._cache_aproximado:
+            return self._cache_aproximado[token]
+        candidatos = set()
+        for i in range(len(token) - 1):
+            if token[i] != token[i + 1] and not (token[i].isdigit() or token[i + 1].isdigit()):
+                trocado = token[:i] + token[i + 1] + token[i] + token[i + 2:]
+                if trocado in self._exatos:
+                    candidatos.add(self._exatos[trocado])
+        # Mais de um candidato: ambíguo, não adivinha
+        self._cache_aproximado[token] = candidatos.pop() if len(candidatos) == 1 else None
+        return self._cache_aproximado[token]
+
+    def extrair(self, titulo) -> list:
+        """Hostnames citados no título, na ordem em que aparecem (sem repetição)."""
+        if titulo is None or pd.isna(titulo):
+            return []
+        encontrados = []
+        for token in _TOKEN.findall(str(titulo).lower()):
+            host = self._exatos.get(token)
+            if host is None and self.parece_host(token):
+                host = self.aproximado(token)
+                if host is None:
+                    # Citado mas fora do inventário: conta como host e vai para revisão do cadastro
+                    host = token.upper()
+                    self.nao_encontrados[host] += 1
+            if host and host not in encontrados:
+                encontrados.append(host)
+        return encontrados
+
+    def fora_do_inventario(self, listas: pd.Series) -> pd.Series:
+        """Hosts das listas (ex.: coluna Hostnames) que não estão no inventário -> GMUDs que os citam."""
+        hosts = listas.explode().dropna().astype(str)
+        return hosts[~hosts.str.lower().isin(self._exatos)].value_counts().sort_index()
+
+    def extrair_serie(self, titulos: pd.Series) -> pd.Series:
+        """Aplica ``extrair`` uma vez por título distinto e redistribui para as linhas."""
+        codigos, unicos = pd.factorize(titulos)
+        listas = [self.extrair(t) for t in unicos] + [[]]
+        return pd.Series([listas[c] for c in codigos], index=titulos.index, name=titulos.name, dtype=object)
@@ -0,0 +1,161 @@
+"""
+KPIs declarativos em uma passada
+================================
+Cada KPI do relatório era uma máscara booleana própria sobre o DataFrame
+(``len(df[df['Status_Final'] == 'SUCESSO'])``, ``df[df['Quarters_Behind'] == 1]
+['Total Servidores'].sum()``...): ~20 varreduras completas.
+
+Aqui o KPI é declarado como dado — (filtro, medida, agregação) — e o motor
+agrupa as métricas por (coluna do filtro, medida). Para cada grupo é feito um
+único ``np.bincount`` sobre os códigos da coluna; os filtros são avaliados só
+sobre os valores distintos. Acrescentar KPIs numa coluna já usada não custa
+outra varredura.
+"""
+
+import operator
+from collections import defaultdict, namedtuple
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+# filtro: None (todas as linhas) ou (coluna, operador, valor)
+# agregacao: 'count' (linhas) ou 'sum' (soma de ``medida``)
+Metrica = namedtuple('Metrica', ['nome', 'filtro', 'medida', 'agregacao'], defaults=[None, None, 'count'])
+
+OPERADORES = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>=': operator.ge,
+    '>': operator.gt,
+    '<=': operator.le,
+    '<': operator.lt,
+    'in': lambda a, b: a in b,
+}
+
+
+def _codigos(serie: pd.Series):
+    """(códigos inteiros, valores distintos); nulos ficam com código -1."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), list(serie.cat.categories)
+    codigos, unicos = pd.factorize(serie)
+    return codigos, list(unicos)
+
+
+def _casa(valor, operador: str, alvo) -> bool:
+    try:
+        return bool(OPERADORES[operador](valor, alvo))
+    except TypeError:
+        return False
+
+
+def calcular_kpis(df: pd.DataFrame, metricas: list) -> dict:
+    """Calcula todas as ``metricas`` com um bincount por (coluna do filtro, medida)."""
+    grupos = defaultdict(list)
+    for m in metricas:
+        coluna = m.filtro[0] if m.filtro else None
+        medida = m.medida if m.agregacao == 'sum' else None
+        grupos[(coluna, medida)].append(m)
+
+    resultado = {}
+    for (coluna, medida), ms in grupos.items():
+        pesos = None
+        if medida is not None:
+            pesos = pd.to_numeric(df[medida], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            pesos = np.nan_to_num(pesos)
+        if coluna is None:
+            total = len(df) if pesos is None else pesos.sum()
+            for m in ms:
+                resultado[m.nome] = total
+            continue
+
+        codigos, unicos = _codigos(df[coluna])
+        # Nulos (código -1) caem no bin 0, que é descartado
+        somas = np.bincount(codigos + 1, weights=pesos, minlength=len(unicos) + 1)[1:]
+        for m in ms:
+            _, op, alvo = m.filtro
+            selecionados = np.fromiter((_casa(u, op, alvo) for u in unicos), dtype=bool, count=len(unicos))
+            resultado[m.nome] = somas[selecionados].sum()
+    return resultado
+
+
+class _Kpis:
+    """Base dos objetos de KPIs: cada campo é uma Metrica com o mesmo nome."""
+
+    METRICAS = []
+
+    @classmethod
+    def calcular(cls, df: pd.DataFrame, metricas: list = None):
+        valores = calcular_kpis(df, metricas or cls.METRICAS)
+        return cls(**{f.name: f.type(valores[f.name]) for f in fields(cls)})
+
+
+@dataclass(frozen=True)
+class KpisGmud(_Kpis):
+    """KPIs das GMUDs de PSU (espera Status_Final, Entorno e Num_Servers)."""
+
+    total: int
+    sucesso: int
+    canceladas: int
+    replanejadas: int
+    entorno_prod: int
+    entorno_hml: int
+    entorno_dev: int
+    atualizacoes: int
+
+    METRICAS = [
+        Metrica('total'),
+        Metrica('sucesso', ('Status_Final', '==', 'SUCESSO')),
+        Metrica('canceladas', ('Status_Final', '==', 'CANCELADA')),
+        Metrica('replanejadas', ('Status_Final', '==', 'REPLANEJADA')),
+        Metrica('entorno_prod', ('Entorno', '==', 'P')),
+        Metrica('entorno_hml', ('Entorno', '==', 'H')),
+        Metrica('entorno_dev', ('Entorno', '==', 'D')),
+        Metrica('atualizacoes', ('Status_Final', '==', 'SUCESSO'), 'Num_Servers', 'sum'),
+    ]
+
+    @property
+    def outras(self) -> int:
+        return self.total - self.sucesso - self.canceladas - self.replanejadas
+
+    @property
+    def taxa_sucesso(self) -> float:
+        return self.sucesso / self.total * 100 if self.total > 0 else 0
+
+
+def metricas_inventario(versao_atual: str, peso: str = 'Servidores') -> list:
+    """Métricas do inventário ativo, ponderadas pela quantidade de hosts (primary + standby) da linha."""
+    return [
+        Metrica('total_servidores', None, peso, 'sum'),
+        Metrica('atualizados', ('PSU_Version', '==', versao_atual), peso, 'sum'),
+        Metrica('atras_1q', ('Quarters_Behind', '==', 1), peso, 'sum'),
+        Metrica('atras_2q', ('Quarters_Behind', '==', 2), peso, 'sum'),
+        Metrica('atras_3q_mais', ('Quarters_Behind', '>=', 3), peso, 'sum'),
+        Metrica('prod', ('Entorno', '==', 'Produção'), peso, 'sum'),
+        Metrica('hml', ('Entorno', '==', 'Homologação'), peso, 'sum'),
+        Metrica('dev', ('Entorno', '==', 'Desenvolvimento'), peso, 'sum'),
+        Metrica('trans', ('Entorno', '==', 'Transacional'), peso, 'sum'),
+    ]
+
+
+@dataclass(frozen=True)
+class KpisInventario(_Kpis):
+    """KPIs do inventário (espera PSU_Version, Quarters_Behind, Entorno e Servidores)."""
+
+    total_servidores: int
+    atualizados: int
+    atras_1q: int
+    atras_2q: int
+    atras_3q_mais: int
+    prod: int
+    hml: int
+    dev: int
+    trans: int
+
+    @classmethod
+    def calcular(cls, df: pd.DataFrame, versao_atual: str):
+        return super().calcular(df, metricas_inventario(versao_atual))
+
+    @property
+    def pct_atualizados(self) -> float:
+        return self.atualizados / self.total_servidores * 100 if self.total_servidores > 0 else 0
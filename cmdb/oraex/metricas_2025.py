@@ -0,0 +1,272 @@
+"""
+Métricas PSU 2025 (planilha de consolidação GetTech)
+====================================================
+Etapa de cálculo dos relatórios 2025 (generate_report_v2…v6,
+generate_html_report): lê as abas mensais e o inventário, normaliza, calcula
+KPIs e quebras e grava tudo num artefato (ver ``oraex.artefato``).
+
+Tabelas do artefato:
+
+- ``gmuds``: GMUDs normalizadas (Status_Final, Versao_PSU, Responsavel_Norm,
+  Is_PSU, Hostnames, Num_Servers, Horas...), uma linha por CHG + título;
+- ``duplicadas``: CHGs repetidas entre abas e a linha mantida (ver
+  ``oraex.duplicidade``);
+- ``historico``: tabela longa host × GMUD (ver ``oraex.historico``);
+- ``inventario``: inventário GetNet normalizado (Situacao, Entorno,
+  PSU_Version, Quarters_Behind, Hostname, Servidores...);
+- ``versoes``, ``executores``, ``mensal``, ``entornos``, ``inv_versao``,
+  ``criticos``: quebras prontas para os gráficos dos relatórios (v2…v6 só
+  renderizam estas tabelas e ``metricas``, não recalculam);
+- ``riscos``: risco 0–100 e faixa de cada host ativo (ver ``oraex.risco``);
+  ``criticos`` são os ``TOP_CRITICOS`` de maior risco;
+- ``duracao``: quantis de duração por nível do modelo (ver ``oraex.duracao``);
+- ``conformidade``: % semanal de hosts no RU mais recente por entorno (ver
+  ``oraex.conformidade``);
+- ``carga_executores``: horas, horas noturnas e sobrepostas por executor ×
+  semana (ver ``oraex.capacidade``);
+- ``cobertura``: hosts ativos por entorno atualizados em cada trimestre, no
+  ano e nunca (bitsets, ver ``oraex.conjuntos``);
+- ``cubo``: agregados categoria × status × mês × entorno × executor × versão ×
+  cliente (ver ``oraex.cubo``), de onde saem ``versoes``, ``executores``,
+  ``mensal`` e ``entornos``.
+"""
+
+import os
+import re
+from dataclasses import asdict
+
+import pandas as pd
+
+from oraex import regras
+from oraex.agregados import ArmazemKpis
+from oraex.artefato import obter_artefato as _obter_artefato
+from oraex.cache import CacheNormalizacao, assinatura
+from oraex.capacidade import CargaExecutores
+from oraex.conformidade import serie_conformidade
+from oraex.conjuntos import ConjuntosHosts
+from oraex.cubo import CuboOlap
+from oraex.duplicidade import deduplicar
+from oraex.duracao import obter_modelo as obter_modelo_duracao
+from oraex.executores import ARQUIVO_ALIASES, NAO_ATRIBUIDO, carregar_aliases
+from oraex.historico import HistoricoPatches
+from oraex.hosts import IndiceHosts, atributos_hosts, explodir_hosts
+from oraex.kpis import KpisGmud, KpisInventario
+from oraex.normalizacao import (COLUNAS_DERIVADAS_GMUD, VERSAO_NORMALIZACAO, normalizar_gmuds,
+                                normalizar_inventario, tipar_gmuds)
+from oraex.numeros import coagir_numerico
+from oraex.risco import pontuar, top_k
+
+PASTA_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+PASTA_ARTEFATO = os.path.join(PASTA_CACHE, 'metricas_2025')
+
+ABAS_MENSAIS = [
+    'FEVEREIRO-25', 'MARÇO-25', 'ABRIL-25', 'MAIO-25', 'JUNHO-25',
+    'JULHO-25', 'AGOSTO-25', 'SETEMBRO-25', 'OUTUBRO-25', 'NOVEMBRO-25', 'DEZEMBRO-25'
+]
+MESES = [aba.replace('-25', '') for aba in ABAS_MENSAIS]
+PSU_ATUAL = '19.29'
+QUARTERS_2025 = ['19.25', '19.26', '19.27', '19.28', '19.29']
+ABA_INVENTARIO = 'GetNet - Oracle Databases'
+
+
+def _mapear_colunas(colunas) -> dict:
+    mapa = {}
+    for col in colunas:
+        col_lower = str(col).lower().strip()
+        if 'status' in col_lower and 'gmud' in col_lower: mapa[col] = 'Status'
+        elif col_lower == 'gmud': mapa[col] = 'GMUD_ID'
+        elif 'título' in col_lower or 'titulo' in col_lower: mapa[col] = 'Titulo'
+        elif 'entorno' in col_lower: mapa[col] = 'Entorno'
+        elif col_lower == 'cliente': mapa[col] = 'Cliente'
+        elif 'designado' in col_lower or 'responsável' in col_lower or 'responsavel' in col_lower: mapa[col] = 'Responsavel'
+        # Fev–Abr usam 'DATA INICIO' / 'DATA TÉRMINO' (sem acento no início), as demais 'Data Início'
+        elif col_lower.startswith('data') and ('início' in col_lower or 'inicio' in col_lower): mapa[col] = 'Data_Inicio'
+        elif col_lower.startswith('data') and ('término' in col_lower or 'termino' in col_lower): mapa[col] = 'Data_Termino'
+    return mapa
+
+
+def carregar_gmuds(arquivo: str) -> pd.DataFrame:
+    """GMUDs (linhas com CHG) de todas as abas mensais, com as colunas padronizadas."""
+    dfs = []
+    for aba in ABAS_MENSAIS:
+        try:
+            df = pd.read_excel(arquivo, sheet_name=aba, engine='openpyxl')
+        except Exception as e:
+            print(f"Erro em {aba}: {e}")
+            continue
+        df = df.rename(columns=_mapear_colunas(df.columns))
+        df['Mes'] = aba.replace('-25', '')
+        for col in ('Data_Inicio', 'Data_Termino'):
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        if 'GMUD_ID' in df.columns:
+            df = df[df['GMUD_ID'].notna()]
+            df = df[df['GMUD_ID'].astype(str).str.contains('CHG', case=False, na=False)]
+        dfs.append(df)
+    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+
+
+def _quarters_atras(versao):
+    if pd.isna(versao) or versao == 'Descontinuado':
+        return None
+    if versao in QUARTERS_2025:
+        return QUARTERS_2025.index(PSU_ATUAL) - QUARTERS_2025.index(versao)
+    return 5
+
+
+def carregar_inventario(arquivo: str) -> pd.DataFrame:
+    """Aba de inventário GetNet com Situacao/Entorno/PSU_Version normalizados."""
+    df = pd.read_excel(arquivo, sheet_name=ABA_INVENTARIO, engine='openpyxl')
+    df = df[df['PRIMARY HOSTNAME'].notna()]
+    df['Total Servidores'] = coagir_numerico(df['Total Servidores'])[0].fillna(0)
+    # Hosts contados a partir dos próprios hostnames (PRIMARY + cada STANDBY da célula),
+    # em vez de confiar no 'Total Servidores' preenchido à mão; host repetido fica na linha Ativa
+    df['Situacao'] = regras.SITUACAO.aplicar(df['SITUAÇÃO'])
+    hosts = explodir_hosts(df, 'PRIMARY HOSTNAME', 'STANDBY HOSTNAME', prioridade=df['Situacao'] != 'Ativo')
+    df['Servidores'] = hosts.groupby('Linha').size().reindex(df.index, fill_value=0)
+    divergentes = int((df['Servidores'] != df['Total Servidores']).sum())
+    if divergentes:
+        print(f"  'Total Servidores' diverge dos hostnames em {divergentes} linha(s) do inventário")
+    df['Entorno'] = regras.ENTORNO.aplicar(df['ENVIROMENT'])
+    df['PSU_Version'] = regras.PSU.aplicar(df['GRID/PSU VERSION'])
+    df['Quarters_Behind'] = df['PSU_Version'].map(_quarters_atras).astype(float)
+    df['Hostname'] = df['PRIMARY HOSTNAME'].apply(lambda x: re.sub(r'[^\w]', '', str(x).split()[0]) if pd.notna(x) else '')
+    return normalizar_inventario(df)
+
+
+def normalizar(df_gmuds: pd.DataFrame, arquivo: str) -> pd.DataFrame:
+    """Colunas derivadas das GMUDs; só linhas novas/alteradas são processadas (cache por hash)."""
+    indice_hosts = IndiceHosts.da_planilha(arquivo)
+
+    def normalizar_linhas(parte):
+        parte = normalizar_gmuds(parte)
+        parte['Hostnames'] = indice_hosts.extrair_serie(parte['Titulo'])
+        return parte
+
+    cache = CacheNormalizacao(
+        PASTA_CACHE, 'gmuds_2025',
+        colunas_brutas=['GMUD_ID', 'Status', 'Titulo', 'Responsavel'],
+        colunas_saida=COLUNAS_DERIVADAS_GMUD + ['Hostnames'],
+        # código, tabelas de regras, inventário e aliases: mudou qualquer um, o cache é refeito
+        versao=assinatura(VERSAO_NORMALIZACAO, regras.tabelas(), indice_hosts.hosts, carregar_aliases()),
+    )
+    df_gmuds = tipar_gmuds(cache.aplicar(df_gmuds, normalizar_linhas), meses=MESES)
+    print(f"  {cache.ultimos_recalculados} de {len(df_gmuds)} GMUDs normalizadas (restante do cache)")
+    df_gmuds['Num_Servers'] = df_gmuds['Hostnames'].apply(len)
+    fora = indice_hosts.fora_do_inventario(df_gmuds['Hostnames'])
+    if len(fora):
+        print(f"  {len(fora)} host(s) citado(s) nas GMUDs fora do inventário (contados; revisar cadastro): "
+              f"{', '.join(fora.index[:10])}{'...' if len(fora) > 10 else ''}")
+    df_gmuds['Is_Sucesso'] = df_gmuds['Status_Final'] == 'SUCESSO'
+    return df_gmuds
+
+
+def calcular(arquivo: str):
+    """Análise completa: devolve ``(metricas, tabelas)`` para o artefato."""
+    print("Calculando métricas 2025...")
+    # CHG copiada para outra aba depois de replanejada conta uma vez, com o último status
+    df_gmuds, duplicadas = deduplicar(normalizar(carregar_gmuds(arquivo), arquivo))
+    if len(duplicadas):
+        print(f"  {int(duplicadas['Ocorrencias'].sum()) - len(duplicadas)} linha(s) repetida(s) de "
+              f"{len(duplicadas)} CHG(s) descartada(s)")
+    df_inv = carregar_inventario(arquivo)
+    # Esforço: janela real da GMUD quando válida, senão a duração típica do modelo
+    modelo_duracao = obter_modelo_duracao(df_gmuds[df_gmuds['Is_PSU'] & df_gmuds['Is_Sucesso']], PASTA_CACHE)
+    df_gmuds['Horas'] = modelo_duracao.esforco(df_gmuds)
+    df_psu = df_gmuds[df_gmuds['Is_PSU']]
+
+    # KPIs declarados em oraex/kpis.py: um bincount por coluna, não uma máscara por KPI
+    kpis = KpisGmud.calcular(df_psu)
+    historico = HistoricoPatches.das_gmuds(df_gmuds)
+
+    # Quebras por versão/executor/mês vêm do cubo sobre o armazém incremental (só o delta de CHGs é aplicado)
+    armazem = ArmazemKpis(PASTA_CACHE, 'kpis_2025')
+    delta = armazem.sincronizar(df_gmuds)
+    print(f"  Armazém de KPIs: {delta['inseridas']} inseridas, {delta['alteradas']} alteradas, {delta['removidas']} removidas")
+    cubo = CuboOlap.de_agregados(armazem.agregados)
+
+    versoes = cubo.rollup('Versao', ['GMUDs', 'Sucessos'], Categoria='PSU').reset_index()
+    versoes.columns = ['Versao', 'Total', 'Sucesso']
+
+    executores = cubo.rollup('Executor', ['GMUDs', 'Sucessos', 'Servidores'], Categoria='PSU').reset_index()
+    executores.columns = ['Executor', 'Total_GMUDs', 'Sucesso', 'Servidores']
+    executores['Taxa'] = (executores['Sucesso'] / executores['Total_GMUDs'] * 100).round(1)
+    horas_executor = cubo.rollup('Executor', 'Horas', Categoria='PSU', Status='SUCESSO')['Horas']
+    executores['Horas'] = executores['Executor'].map(horas_executor).fillna(0).round()
+    executores = executores.sort_values('Total_GMUDs', ascending=False)
+    executores = executores[executores['Executor'] != NAO_ATRIBUIDO].head(8)
+
+    # Carga semanal dos executores do ranking: janelas agendadas (menos as canceladas) com o esforço estimado
+    agendadas = df_psu[df_psu['Status_Final'] != 'CANCELADA']
+    inicio = pd.to_datetime(agendadas['Data_Inicio'], errors='coerce')
+    carga = CargaExecutores(pd.DataFrame({
+        'Executor': agendadas['Responsavel_Norm'].astype(str),
+        'Inicio': inicio,
+        'Fim': inicio + pd.to_timedelta(agendadas['Horas'], unit='h'),
+    }), executores['Executor'])
+    executores = executores.join(carga.resumo(), on='Executor')
+
+    mensal = cubo.rollup(['Mes', 'Status'], 'GMUDs', Categoria='PSU')['GMUDs'].unstack(fill_value=0)
+    mensal = mensal.reindex(MESES).rename_axis('Mes').reset_index()
+    entornos = cubo.rollup('Entorno', 'GMUDs', Categoria='PSU').sort_values('GMUDs', ascending=False).reset_index()
+
+    # Inventário: "Servidores" conta PRIMARY + STANDBY (ver carregar_inventario)
+    df_ativos = df_inv[df_inv['Situacao'] == 'Ativo']
+    kpis_inv = KpisInventario.calcular(df_ativos, PSU_ATUAL)
+    inv_versao = df_ativos.groupby('PSU_Version', observed=True)['Servidores'].sum().sort_index()
+    inv_versao = inv_versao.rename_axis('Versao').reset_index(name='Servidores')
+
+    # Tendência: RU vigente de cada host ativo semana a semana, reconstruído das GMUDs concluídas
+    hosts_ativos = atributos_hosts(explodir_hosts(df_ativos, 'PRIMARY HOSTNAME', 'STANDBY HOSTNAME'),
+                                   df_ativos, ['Entorno', 'PSU_Version', 'DB VERSION'])
+    eventos = historico.filtrar(Is_PSU=True, Status_Final='SUCESSO').longo
+
+    # Risco por host (atraso de RU, entorno, suporte do banco, standby, tempo sem patch); críticos = top-K
+    ultimo_sucesso = eventos.groupby(eventos['Hostname'].astype(str))['Data_Inicio'].max()
+    riscos = pontuar(hosts_ativos.rename(columns={'PSU_Version': 'Versao', 'DB VERSION': 'Versao_DB'}),
+                     ultimo_sucesso, referencia=PSU_ATUAL, data_ref=eventos['Data_Inicio'].max())
+    criticos = top_k(riscos).rename(columns={'Versao': 'PSU_Version'})[
+        ['Hostname', 'PSU_Version', 'Entorno', 'Risco', 'Faixa']]
+
+    # Hosts como bitsets (trimestre × status do histórico, entorno do inventário): únicos, cobertura, nunca atualizados
+    conjuntos = ConjuntosHosts.montar(historico.filtrar(Is_PSU=True).longo, hosts_ativos[['Hostname', 'Entorno']])
+    servidores_unicos = len(conjuntos.com_gmud(Status_Final='SUCESSO'))
+    conformidade = serie_conformidade(
+        eventos.rename(columns={'Data_Inicio': 'Data', 'Versao_PSU': 'Versao'}),
+        hosts_ativos.rename(columns={'PSU_Version': 'Versao'}),
+    )
+
+    metricas = {
+        'gmud': {**asdict(kpis), 'outras': kpis.outras, 'taxa_sucesso': kpis.taxa_sucesso,
+                 'servidores_unicos': int(servidores_unicos),
+                 'horas_totais': int(round(df_psu.loc[df_psu['Is_Sucesso'], 'Horas'].sum()))},
+        'inventario': {**asdict(kpis_inv), 'pct_atualizados': kpis_inv.pct_atualizados,
+                       'nunca_atualizados': len(conjuntos.nunca_atualizados()),
+                       'criticos': int((riscos['Faixa'] == 'Crítico').sum()),
+                       'atualizados_todos_trimestres': len(conjuntos.em_todos() & conjuntos.inventario())},
+        'mensal': mensal.set_index('Mes').fillna(0).astype(int).to_dict(orient='index'),
+    }
+    tabelas = {
+        'gmuds': df_gmuds,
+        'duplicadas': duplicadas,
+        'historico': historico.longo,
+        'inventario': df_inv,
+        'versoes': versoes,
+        'executores': executores,
+        'mensal': mensal,
+        'entornos': entornos,
+        'inv_versao': inv_versao,
+        'criticos': criticos,
+        'riscos': riscos,
+        'conformidade': conformidade,
+        'cobertura': conjuntos.cobertura('Entorno').reset_index(),
+        'carga_executores': carga.tabela(),
+        'duracao': modelo_duracao.tabela,
+        'cubo': armazem.agregados,
+    }
+    return metricas, tabelas
+
+
+def obter_artefato(arquivo: str, pasta: str = PASTA_ARTEFATO, forcar: bool = False):
+    """Artefato 2025 de ``arquivo``; recalcula só se a planilha, os aliases, as regras ou o código mudaram."""
+    return _obter_artefato(pasta, [arquivo, ARQUIVO_ALIASES], lambda: calcular(arquivo), forcar=forcar)
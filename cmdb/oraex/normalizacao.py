@@ -0,0 +1,128 @@
+"""
+Camada de normalização dos DataFrames de GMUD e inventário
+==========================================================
+Status, entorno, mês, executor e versão PSU têm poucos valores distintos, então
+saem daqui como ``category`` (groupby / value_counts / máscaras trabalham sobre
+códigos inteiros). Títulos e textos livres viram strings Arrow quando o
+pyarrow está instalado.
+
+As regras de texto (status, versão) são avaliadas apenas sobre os valores
+distintos e depois redistribuídas para as linhas.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from oraex.executores import resolver_executores
+
+STATUS_FINAIS = ['SUCESSO', 'CANCELADA', 'REPLANEJADA', 'INSUCESSO', 'OUTROS', 'DESCONHECIDO']
+
+COLUNAS_CATEGORICAS_GMUD = ['Entorno', 'Cliente', 'TIPO DB']
+COLUNAS_TEXTO_GMUD = ['Titulo', 'OBSERVAÇÃO']
+# Colunas que normalizar_gmuds deriva das brutas (Status, Titulo, Responsavel)
+COLUNAS_DERIVADAS_GMUD = ['Status_Final', 'Versao_PSU', 'Responsavel_Norm', 'Is_PSU']
+# Suba quando a lógica de normalizar_gmuds (ou da extração de hostnames) mudar:
+# entra na versão dos caches de normalização, que são recalculados
+VERSAO_NORMALIZACAO = 2
+
+
+def tipo_texto() -> str:
+    """dtype de texto preferido: Arrow se o pyarrow existir, senão string do pandas."""
+    try:
+        import pyarrow  # noqa: F401
+        return 'string[pyarrow]'
+    except ImportError:
+        return 'string'
+
+
+def _status_final(status) -> str:
+    if pd.isna(status): return 'DESCONHECIDO'
+    status = str(status).strip().upper()
+    if 'ENCERRADA' in status or 'FECHADA' in status or '✅' in status: return 'SUCESSO'
+    elif 'CANCELADA' in status or '❌' in status or 'CANCELAR' in status: return 'CANCELADA'
+    elif 'REPLANEJAR' in status or '🔄' in status or 'REAGENDADA' in status: return 'REPLANEJADA'
+    elif 'INSUCESSO' in status: return 'INSUCESSO'
+    return 'OUTROS'
+
+
+def _versao_psu(titulo):
+    if pd.isna(titulo): return None
+    match = re.search(r'PSU\s*(19[.\d]+)', str(titulo), re.IGNORECASE)
+    if match: return match.group(1)
+    match2 = re.search(r'19\.(\d+)', str(titulo))
+    if match2: return f"19.{match2.group(1)}"
+    return None
+
+
+def mapear_unicos(serie: pd.Series, funcao, categorias: list = None, ordenado: bool = False) -> pd.Series:
+    """
+    Aplica ``funcao`` só aos valores distintos de ``serie`` e devolve um categórico.
+
+    Sem ``categorias`` explícitas, as categorias são os resultados distintos em
+    ordem alfabética. Resultados None viram NaN.
+    """
+    codigos, unicos = pd.factorize(serie)
+    resultados = [funcao(v) for v in unicos] + [funcao(None)]
+    if categorias is None:
+        categorias = sorted({r for r in resultados if r is not None})
+    posicao = {c: i for i, c in enumerate(categorias)}
+    tabela = np.array([posicao.get(r, -1) if r is not None else -1 for r in resultados], dtype=np.int64)
+    cat = pd.Categorical.from_codes(tabela[codigos], categories=categorias, ordered=ordenado)
+    return pd.Series(cat, index=serie.index, name=serie.name)
+
+
+def normalizar_status(serie: pd.Series) -> pd.Series:
+    """Status bruto da GMUD -> categórico com STATUS_FINAIS."""
+    return mapear_unicos(serie, _status_final, categorias=STATUS_FINAIS)
+
+
+def extrair_versao_psu(serie: pd.Series) -> pd.Series:
+    """Título da GMUD -> versão PSU (categórico, NaN quando não há versão)."""
+    return mapear_unicos(serie, _versao_psu)
+
+
+def otimizar_tipos(df: pd.DataFrame, categoricas: list = (), textos: list = ()) -> pd.DataFrame:
+    """Converte as colunas existentes para category / string Arrow (no próprio df)."""
+    texto = tipo_texto()
+    for col in categoricas:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in textos:
+        if col in df.columns:
+            df[col] = df[col].astype(texto)
+    return df
+
+
+def normalizar_gmuds(df: pd.DataFrame, meses: list = None) -> pd.DataFrame:
+    """
+    Adiciona as colunas normalizadas usadas pelos relatórios:
+    Status_Final, Versao_PSU, Responsavel_Norm (categóricos) e Is_PSU.
+
+    ``meses`` fixa a ordem da categoria 'Mes' (ex.: MONTH_ORDER).
+    """
+    df['Status_Final'] = normalizar_status(df['Status'])
+    df['Versao_PSU'] = extrair_versao_psu(df['Titulo'])
+    df['Responsavel_Norm'] = resolver_executores(df['Responsavel']) if 'Responsavel' in df.columns \
+        else pd.Categorical(['Não Atribuído'] * len(df))
+    df['Is_PSU'] = df['Titulo'].str.contains('PSU', case=False, na=False).astype(bool)
+    return tipar_gmuds(df, meses)
+
+
+def tipar_gmuds(df: pd.DataFrame, meses: list = None) -> pd.DataFrame:
+    """
+    Só a parte de tipos de ``normalizar_gmuds`` (Mes, Status_Final e colunas
+    categóricas/texto). Barata; usada quando as colunas derivadas vêm do cache.
+    """
+    if 'Status_Final' in df.columns:
+        df['Status_Final'] = pd.Categorical(df['Status_Final'], categories=STATUS_FINAIS)
+    if 'Mes' in df.columns:
+        df['Mes'] = pd.Categorical(df['Mes'], categories=meses, ordered=bool(meses)) if meses \
+            else df['Mes'].astype('category')
+    return otimizar_tipos(df, COLUNAS_CATEGORICAS_GMUD, COLUNAS_TEXTO_GMUD)
+
+
+def normalizar_inventario(df: pd.DataFrame) -> pd.DataFrame:
+    """Categoriza as colunas normalizadas do inventário (Situacao, Entorno, PSU_Version)."""
+    return otimizar_tipos(df, ['Situacao', 'Entorno', 'PSU_Version', 'DB VERSION'], ['OBSERVAÇÃO'])
@@ -0,0 +1,83 @@
+"""
+Coerção numérica com locale (pt-BR / en-US)
+===========================================
+Colunas como 'Total Rows', 'Total Servidores' ou '% Index Weight' chegam
+misturando números do Excel e textos formatados ("4.833.104.781",
+"1,234.5", "45,3%"). O locale é decidido uma vez por coluna e a conversão
+é feita num único passo vetorizado.
+
+Retorna sempre ``(valores, falhas)``: valores int64 (quando todos são inteiros
+e não há nulos) ou float64, e uma máscara bool (numpy) das células preenchidas que não
+puderam ser convertidas.
+"""
+
+import numpy as np
+import pandas as pd
+
+PT_BR = 'pt-BR'
+EN_US = 'en-US'
+
+_PADRAO_PT = r'-?\d{1,3}(?:\.\d{3})+(?:,\d+)?|-?\d+,\d+'
+_PADRAO_EN = r'-?\d{1,3}(?:,\d{3})+(?:\.\d+)?|-?\d+\.\d+'
+
+
+def detectar_locale(textos: pd.Series, padrao: str = PT_BR) -> str:
+    """
+    Decide o locale de uma coluna de textos numéricos.
+
+    Conta os valores que só fazem sentido em um dos formatos ("1.234,5" só é
+    pt-BR, "1,234.5" só é en-US). Empate (ex.: só inteiros) fica com ``padrao``.
+    """
+    pt = textos.str.fullmatch(_PADRAO_PT, na=False)
+    en = textos.str.fullmatch(_PADRAO_EN, na=False)
+    so_pt = int((pt & ~en).sum())
+    so_en = int((en & ~pt).sum())
+    if so_en > so_pt:
+        return EN_US
+    if so_pt > so_en:
+        return PT_BR
+    return padrao
+
+
+def coagir_numerico(serie: pd.Series, locale: str = 'auto', inteiro: bool = None):
+    """
+    Converte ``serie`` para número.
+
+    locale: 'pt-BR', 'en-US' ou 'auto' (detectado pelos próprios valores).
+    inteiro: força int64 (True, desde que não haja nulos), float64 (False)
+             ou decide sozinho (None).
+    Textos terminados em '%' são divididos por 100.
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        valores = serie.astype('float64')
+        falhas = pd.Series(False, index=serie.index)
+    else:
+        bruto = serie.astype(object)
+        # Células que já são números (float/int do Excel) não passam pelo parser
+        e_texto = bruto.map(lambda v: isinstance(v, str)).astype(bool)
+        numericos = pd.to_numeric(bruto.where(~e_texto), errors='coerce')
+        textos = bruto.where(e_texto).astype('string').str.strip().str.replace(r'\s+', '', regex=True)
+
+        if locale == 'auto':
+            locale = detectar_locale(textos)
+        if locale == PT_BR:
+            limpos = textos.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        else:
+            limpos = textos.str.replace(',', '', regex=False)
+
+        percentual = limpos.str.endswith('%', na=False)
+        convertidos = pd.to_numeric(limpos.str.rstrip('%'), errors='coerce').astype('float64')
+        convertidos = convertidos.where(~percentual, convertidos / 100)
+
+        valores = numericos.astype('float64').fillna(convertidos)
+        preenchido = bruto.notna() & textos.fillna('x').ne('')
+        # preenchido vem de dtype 'string' (boolean/bool[pyarrow]): máscara numpy nos dois caminhos
+        falhas = pd.Series((preenchido & valores.isna()).to_numpy(dtype=bool, na_value=False), index=serie.index)
+
+    valores_np = valores.to_numpy(dtype='float64', na_value=np.nan)
+    sem_nulos = not np.isnan(valores_np).any()
+    if inteiro is None:
+        inteiro = sem_nulos and bool(np.all(np.mod(valores_np, 1) == 0))
+    if inteiro and sem_nulos:
+        return pd.Series(valores_np.astype('int64'), index=serie.index, name=serie.name), falhas
+    return pd.Series(valores_np, index=serie.index, name=serie.name), falhas
@@ -0,0 +1,223 @@
+"""
+Ondas de promoção do RU (DEV → HML → PROD)
+==========================================
+Nada no planejamento garantia que um RU novo passasse por Desenvolvimento e
+Homologação, e ficasse em observação (soak), antes de chegar a Produção /
+Transacional, nem que o STANDBY de um par fosse atualizado antes do PRIMARY.
+
+O plano de uma onda (um RU) é um grafo acíclico de dependências:
+
+- um nó por host, com liberação (não antes de), duração e prazo (janela);
+- um nó "marco" por camada (DEV = 0, HML = 1, PROD = 2): todo host da camada
+  aponta para o marco, e o marco aponta para os hosts da camada seguinte com
+  atraso = soak da camada. Com os marcos, as arestas entre camadas são
+  O(hosts) em vez de O(hosts²); marcos também se encadeiam, para uma camada
+  vazia não encurtar o caminho;
+- STANDBY -> PRIMARY da mesma linha do inventário.
+
+A data mais cedo viável de cada host é o caminho mais longo até ele, numa
+única passada em ordem topológica:
+``inicio[v] = max(liberacao[v], max(inicio[u] + duracao[u] + atraso(u, v)))``.
+
+Quando uma GMUD escorrega (REPLANEJAR), ``replanejar`` muda a liberação de um
+host e recalcula só os descendentes dele, em ordem topológica (heap pela
+posição), em vez do grafo inteiro.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from oraex.conflitos import em_minutos
+from oraex.hosts import PRIMARIO, STANDBY
+
+# Camada de promoção por entorno (nome do inventário ou código das abas mensais)
+CAMADA_DO_ENTORNO = {
+    'Desenvolvimento': 0, 'D': 0,
+    'Homologação': 1, 'H': 1,
+    'Produção': 2, 'Transacional': 2, 'P': 2,
+}
+ULTIMA_CAMADA = 2
+# Dias de observação de cada camada antes de liberar a seguinte
+SOAK_DIAS = {0: 7, 1: 7}
+DURACAO_PADRAO = pd.Timedelta(hours=3)
+
+_MINUTOS_DIA = 24 * 60
+_SEM_DATA = np.iinfo(np.int64).min // 2
+
+
+def _sem_data(minutos) -> np.ndarray:
+    # Sem liberação: continua perto de _SEM_DATA mesmo somando durações e soaks
+    return np.asarray(minutos) < _SEM_DATA // 2
+
+
+def _minutos(serie: pd.Series, padrao: int) -> np.ndarray:
+    valores = pd.to_datetime(serie)
+    minutos = em_minutos(valores.fillna(pd.Timestamp(0)))
+    return np.where(valores.isna().to_numpy(), padrao, minutos)
+
+
+class PlanoOndas:
+    """
+    Datas mais cedo viáveis dos hosts de uma onda.
+
+    ``hosts``: um host por linha com Hostname, Entorno, Papel (PRIMARY/STANDBY)
+    e Linha; opcionais Liberacao (não antes de), Duracao (Timedelta) e Prazo
+    (fim da janela agendada). Sem Liberacao, vale ``inicio``.
+    """
+
+    def __init__(self, hosts: pd.DataFrame, inicio=None, soak: dict = None, duracao=DURACAO_PADRAO):
+        soak = SOAK_DIAS if soak is None else soak
+        self.hosts = hosts.reset_index(drop=True)
+        n = len(self.hosts)
+        self.n_hosts = n
+        self.indice = {h: i for i, h in enumerate(self.hosts['Hostname'])}
+        camada = self.hosts['Entorno'].map(CAMADA_DO_ENTORNO).fillna(ULTIMA_CAMADA).astype(int).to_numpy()
+        self.camada = camada
+
+        padrao = em_minutos(pd.Series([pd.Timestamp(inicio)]))[0] if inicio is not None else _SEM_DATA
+        self.liberacao = np.append(
+            _minutos(self.hosts['Liberacao'], padrao) if 'Liberacao' in self.hosts.columns else np.full(n, padrao),
+            np.full(ULTIMA_CAMADA, _SEM_DATA))
+        duracoes = (pd.to_timedelta(self.hosts['Duracao']).fillna(duracao) if 'Duracao' in self.hosts.columns
+                    else pd.Series(duracao, index=self.hosts.index))
+        # Marcos não têm duração: só juntam o fim da camada
+        self.duracao = np.append(duracoes.dt.total_seconds().to_numpy() // 60, np.zeros(ULTIMA_CAMADA)).astype(np.int64)
+        self.prazo = (_minutos(self.hosts['Prazo'], _SEM_DATA) if 'Prazo' in self.hosts.columns
+                      else np.full(n, _SEM_DATA))
+
+        self._montar_grafo(soak)
+        self.inicio = self.liberacao.copy()
+        for v in self.ordem:
+            self.inicio[v] = self._calcular(v)
+
+    # ----------------------------------------------------------- grafo
+    def _montar_grafo(self, soak: dict):
+        n = self.n_hosts
+        total = n + ULTIMA_CAMADA
+        self.sucessores = [[] for _ in range(total)]
+        self.predecessores = [[] for _ in range(total)]
+
+        def aresta(u, v, atraso=0):
+            self.sucessores[u].append(v)
+            self.predecessores[v].append((u, atraso))
+
+        marco = {k: n + k for k in range(ULTIMA_CAMADA)}
+        for k in range(ULTIMA_CAMADA):
+            espera = int(soak.get(k, 0) * _MINUTOS_DIA)
+            if k + 1 < ULTIMA_CAMADA:
+                aresta(marco[k], marco[k + 1], espera)
+            for v in np.flatnonzero(self.camada == k + 1).tolist():
+                aresta(marco[k], v, espera)
+        for v in np.flatnonzero(self.camada < ULTIMA_CAMADA).tolist():
+            aresta(v, marco[self.camada[v]])
+
+        # STANDBY antes do PRIMARY da mesma linha do inventário
+        papel = self.hosts['Papel'].astype(str).to_numpy()
+        linhas = self.hosts['Linha'].to_numpy()
+        primarios = {l: i for i, (l, p) in enumerate(zip(linhas, papel)) if p == PRIMARIO}
+        for i, (l, p) in enumerate(zip(linhas, papel)):
+            if p == STANDBY and l in primarios:
+                aresta(i, primarios[l])
+
+        # Ordem topológica (Kahn); a posição ordena o recálculo incremental
+        grau = np.array([len(p) for p in self.predecessores])
+        fila = [v for v in range(total) if grau[v] == 0]
+        ordem = []
+        while fila:
+            u = fila.pop()
+            ordem.append(u)
+            for v in self.sucessores[u]:
+                grau[v] -= 1
+                if grau[v] == 0:
+                    fila.append(v)
+        if len(ordem) != total:
+            raise ValueError("Dependências da onda formam um ciclo")
+        self.ordem = ordem
+        self.posicao = np.empty(total, dtype=np.int64)
+        self.posicao[ordem] = np.arange(total)
+
+    def _calcular(self, v: int) -> int:
+        inicio = self.liberacao[v]
+        for u, atraso in self.predecessores[v]:
+            inicio = max(inicio, self.inicio[u] + self.duracao[u] + atraso)
+        return inicio
+
+    # ----------------------------------------------------------- replanejamento
+    def replanejar(self, hostname: str, liberacao) -> pd.DataFrame:
+        """
+        Nova liberação de ``hostname`` (ex.: GMUD escorregou para outra data);
+        recalcula só os descendentes e devolve os hosts cuja data mudou.
+        """
+        v = self.indice[hostname]
+        self.liberacao[v] = em_minutos(pd.Series([pd.Timestamp(liberacao)]))[0]
+        antes = {}
+        fila = [(self.posicao[v], v)]
+        na_fila = {v}
+        while fila:
+            _, u = heapq.heappop(fila)
+            na_fila.discard(u)
+            novo = self._calcular(u)
+            if novo == self.inicio[u]:
+                continue
+            antes.setdefault(u, self.inicio[u])
+            self.inicio[u] = novo
+            for w in self.sucessores[u]:
+                if w not in na_fila:
+                    na_fila.add(w)
+                    heapq.heappush(fila, (self.posicao[w], w))
+        mudaram = [u for u in antes if u < self.n_hosts and antes[u] != self.inicio[u]]
+        return pd.DataFrame({
+            'Hostname': self.hosts['Hostname'].to_numpy()[mudaram],
+            'Antes': self._datas(np.array([antes[u] for u in mudaram], dtype=np.int64)),
+            'Depois': self._datas(self.inicio[mudaram]),
+        }).sort_values('Depois', kind='stable', ignore_index=True)
+
+    # ----------------------------------------------------------- saída
+    @staticmethod
+    def _datas(minutos: np.ndarray) -> pd.DatetimeIndex:
+        minutos = np.asarray(minutos, dtype=np.int64)
+        vazias = _sem_data(minutos)
+        return pd.to_datetime(np.where(vazias, 0, minutos), unit='m').where(~vazias)
+
+    def datas(self) -> pd.DataFrame:
+        """Data mais cedo viável (Inicio/Fim) de cada host; Atrasado = passa do prazo da janela agendada."""
+        n = self.n_hosts
+        inicio, fim = self.inicio[:n], self.inicio[:n] + self.duracao[:n]
+        return pd.DataFrame({
+            'Hostname': self.hosts['Hostname'].to_numpy(),
+            'Linha': self.hosts['Linha'].to_numpy(),
+            'Papel': self.hosts['Papel'].to_numpy(),
+            'Camada': self.camada,
+            'Liberacao': self._datas(self.liberacao[:n]),
+            'Inicio': self._datas(inicio),
+            'Fim': self._datas(fim),
+            'Prazo': self._datas(self.prazo),
+            'Atrasado': ~_sem_data(self.prazo) & ~_sem_data(inicio) & (fim > self.prazo),
+        })
+
+    def inicio_pares(self) -> pd.Series:
+        """Data mais cedo em que cada par (Linha) pode começar: a do seu primeiro host."""
+        return self.datas().dropna(subset=['Inicio']).groupby('Linha')['Inicio'].min()
+
+
+def hosts_da_agenda(agenda: pd.DataFrame, hosts: pd.DataFrame) -> pd.DataFrame:
+    """
+    Hosts das GMUDs de ``agenda`` (ver ``oraex.agendador``) para o ``PlanoOndas``:
+    liberação = início da janela, prazo = fim, duração = janela dividida entre os hosts do par.
+    """
+    longo = agenda[['Linha', 'Entorno', 'Inicio', 'Fim', 'Hostnames']].explode('Hostnames')
+    longo = longo.dropna(subset=['Hostnames']).rename(columns={'Hostnames': 'Hostname'})
+    por_par = longo.groupby(level=0)['Hostname'].transform('size')
+    inicio, fim = pd.to_datetime(longo['Inicio']), pd.to_datetime(longo['Fim'])
+    papel = dict(zip(hosts['Hostname'], hosts['Papel'].astype(str)))
+    return pd.DataFrame({
+        'Hostname': longo['Hostname'].to_numpy(),
+        'Entorno': longo['Entorno'].to_numpy(),
+        'Papel': longo['Hostname'].map(papel).fillna(PRIMARIO).to_numpy(),
+        'Linha': longo['Linha'].to_numpy(),
+        'Liberacao': inicio.to_numpy(),
+        'Prazo': fim.to_numpy(),
+        'Duracao': ((fim - inicio) / por_par).dt.floor('min').to_numpy(),
+    }).drop_duplicates('Hostname')
@@ -0,0 +1,159 @@
+"""
+Previsão de conformidade por Monte Carlo
+========================================
+"Quando a frota estará no RU mais recente?" só tinha como resposta o
+``pct_atualizados`` de hoje, um número estático.
+
+A previsão simula a execução das GMUDs planejadas (agenda das abas 2026)
+milhares de vezes, com os desfechos observados em 2025 no mesmo mês do ano:
+
+- SUCESSO: os hosts da GMUD ficam conformes na data da janela;
+- CANCELADA: a GMUD sai do plano (os hosts só entram numa próxima onda);
+- REPLANEJADA (ou INSUCESSO): a GMUD volta ``dias_replanejar`` dias depois e
+  sorteia de novo, até ``tentativas`` vezes.
+
+Todas as simulações andam juntas em matrizes simulação × GMUD (NumPy): um
+sorteio por tentativa, a data de conformidade de cada host é o mínimo das
+GMUDs que o citam (``minimum.reduceat``) e a data em que a frota atinge X% é
+a k-ésima menor data de host (``np.partition``). 10 mil simulações × mil hosts
+rodam em menos de um segundo.
+
+As taxas mensais são suavizadas pela taxa geral (``PESO_GERAL`` pseudo-GMUDs),
+para meses com poucas GMUDs, ou sem nenhuma, não ficarem com 0% ou 100%.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oraex.conflitos import em_minutos
+
+DESFECHOS = ['SUCESSO', 'CANCELADA', 'REPLANEJADA']
+# INSUCESSO volta para a fila como um replanejamento
+_DESFECHO = {'SUCESSO': 'SUCESSO', 'CANCELADA': 'CANCELADA', 'REPLANEJADA': 'REPLANEJADA', 'INSUCESSO': 'REPLANEJADA'}
+PESO_GERAL = 10
+DIAS_REPLANEJAR = 7
+MINIMO_AMOSTRAS = 5
+TENTATIVAS = 3
+SIMULACOES = 10_000
+
+_MINUTOS_DIA = 24 * 60
+
+
+def taxas_mensais(status: pd.Series, mes: pd.Series, peso: float = PESO_GERAL) -> pd.DataFrame:
+    """Probabilidade de cada desfecho por mês do ano (1–12), suavizada pela taxa geral."""
+    desfecho = status.map(_DESFECHO)
+    validas = desfecho.notna() & mes.notna()
+    contagem = pd.crosstab(mes[validas].astype(int), desfecho[validas])
+    contagem = contagem.reindex(index=range(1, 13), columns=DESFECHOS, fill_value=0)
+    geral = contagem.sum() / max(contagem.to_numpy().sum(), 1)
+    suavizada = contagem + peso * geral
+    return suavizada.div(suavizada.sum(axis=1), axis=0).fillna(0)
+
+
+def dias_replanejamento(inicio: pd.Series, nova_data: pd.Series, padrao: float = DIAS_REPLANEJAR) -> float:
+    """Mediana de dias entre a janela original e a nova data das GMUDs replanejadas."""
+    dias = (pd.to_datetime(nova_data, errors='coerce') - pd.to_datetime(inicio, errors='coerce')).dt.days
+    dias = dias[dias > 0]
+    return float(dias.median()) if len(dias) >= MINIMO_AMOSTRAS else padrao
+
+
+class PrevisaoConformidade:
+    """Data em que a frota atinge a meta em cada simulação (NaT = não atinge no horizonte)."""
+
+    def __init__(self, dias: np.ndarray, origem: pd.Timestamp, meta: float, conformes: float):
+        self.dias = dias
+        self.origem = origem
+        self.meta = meta
+        self.conformes = conformes
+
+    def __len__(self):
+        return len(self.dias)
+
+    def datas(self) -> pd.Series:
+        finitos = np.isfinite(self.dias)
+        datas = self.origem + pd.to_timedelta(np.where(finitos, self.dias, 0), unit='D')
+        return pd.Series(datas).where(finitos)
+
+    def probabilidade(self, ate=None) -> float:
+        """Fração das simulações que atingem a meta (até ``ate``, se informado)."""
+        if ate is None:
+            return float(np.isfinite(self.dias).mean())
+        limite = (pd.Timestamp(ate) - self.origem) / pd.Timedelta(days=1)
+        return float((self.dias <= limite).mean())
+
+    def quantis(self, quantis=(0.1, 0.5, 0.9)) -> pd.Series:
+        """Datas nos quantis pedidos; NaT quando menos que ``q`` das simulações atingem a meta."""
+        # inf ordena depois de qualquer data: o quantil cai em inf se a meta não é atingida
+        valores = np.quantile(self.dias, quantis, method='higher') if len(self.dias) else np.full(len(quantis), np.inf)
+        finitos = np.isfinite(valores)
+        datas = self.origem + pd.to_timedelta(np.where(finitos, valores, 0), unit='D')
+        return pd.Series(datas, index=[f'P{round(q * 100)}' for q in quantis]).where(finitos)
+
+    def curva(self, freq: str = 'W-MON') -> pd.DataFrame:
+        """Probabilidade acumulada de já ter atingido a meta em cada fronteira de período."""
+        datas = self.datas().dropna()
+        if datas.empty:
+            return pd.DataFrame(columns=['Data', 'Probabilidade'])
+        fronteiras = pd.date_range(self.origem.normalize(), datas.max() + pd.Timedelta(days=7), freq=freq)
+        acumulada = np.searchsorted(np.sort(datas.to_numpy()), fronteiras.to_numpy(), side='right') / len(self.dias)
+        return pd.DataFrame({'Data': fronteiras, 'Probabilidade': acumulada})
+
+
+def simular(gmuds: pd.DataFrame, frota: pd.DataFrame, taxas: pd.DataFrame, meta: float = 0.95,
+            simulacoes: int = SIMULACOES, dias_replanejar: float = DIAS_REPLANEJAR,
+            tentativas: int = TENTATIVAS, semente=None, origem=None) -> PrevisaoConformidade:
+    """
+    Distribuição da data em que ``meta`` (fração) da ``frota`` fica conforme.
+
+    ``gmuds``: GMUDs planejadas para o RU alvo (ou mais novo), com Inicio e Hostnames (lista).
+    ``frota``: um host por linha com Hostname e Conforme (já está no alvo).
+    ``taxas``: saída de ``taxas_mensais``.
+    """
+    rng = np.random.default_rng(semente)
+    frota = frota.drop_duplicates('Hostname').reset_index(drop=True)
+    conformes = frota['Conforme'].to_numpy(dtype=bool)
+    total = len(frota)
+    gmuds = gmuds.dropna(subset=['Inicio'])
+    inicio = pd.to_datetime(gmuds['Inicio'])
+    origem = pd.Timestamp(origem) if origem is not None else (inicio.min().normalize() if len(inicio) else
+                                                              pd.Timestamp.now().normalize())
+
+    # Quantos hosts ainda faltam; meta já atingida (ou impossível) não precisa de sorteio
+    faltam = int(np.ceil(meta * total - 1e-9)) - int(conformes.sum())
+    if faltam <= 0:
+        return PrevisaoConformidade(np.zeros(simulacoes), origem, meta, conformes.mean() if total else 0.0)
+
+    # Incidência GMUD × host (só hosts da frota ainda não conformes), ordenada por host
+    indice = pd.Index(frota['Hostname'])
+    longo = pd.DataFrame({'Gmud': np.arange(len(gmuds)), 'Hostname': gmuds['Hostnames'].to_numpy()}).explode('Hostname')
+    longo['Host'] = indice.get_indexer(longo['Hostname'].astype(str))
+    longo = longo[longo['Host'] >= 0]
+    longo = longo[~conformes[longo['Host'].to_numpy()]].sort_values('Host', kind='stable')
+    hosts_com_gmud = longo['Host'].nunique()
+    if faltam > hosts_com_gmud:
+        return PrevisaoConformidade(np.full(simulacoes, np.inf), origem, meta, conformes.mean())
+
+    # Data e probabilidades de cada tentativa de cada GMUD (tentativa r = janela + r × replanejamento)
+    base = ((em_minutos(inicio) - em_minutos(pd.Series([origem]))[0]) / _MINUTOS_DIA).astype(np.float32)
+    atraso = np.arange(tentativas, dtype=np.float32)[:, None] * np.float32(dias_replanejar)
+    dias_tentativa = base[None, :] + atraso
+    meses = (origem + pd.to_timedelta(dias_tentativa.ravel(), unit='D')).month.to_numpy().reshape(dias_tentativa.shape)
+    p_sucesso = taxas['SUCESSO'].reindex(range(1, 13)).to_numpy(dtype=np.float32)[meses - 1]
+    p_cancela = taxas['CANCELADA'].reindex(range(1, 13)).to_numpy(dtype=np.float32)[meses - 1]
+
+    n_gmuds = len(gmuds)
+    conforme_em = np.full((simulacoes, n_gmuds), np.inf, dtype=np.float32)
+    ativa = np.ones((simulacoes, n_gmuds), dtype=bool)
+    for r in range(tentativas):
+        sorteio = rng.random((simulacoes, n_gmuds), dtype=np.float32)
+        sucesso = ativa & (sorteio < p_sucesso[r])
+        conforme_em = np.where(sucesso, dias_tentativa[r], conforme_em)
+        # Sucesso ou cancelamento encerram a GMUD; replanejada segue para a próxima tentativa
+        ativa &= sorteio >= p_sucesso[r] + p_cancela[r]
+
+    # Data de cada host = primeira GMUD bem-sucedida que o cita
+    hosts = longo['Host'].to_numpy()
+    inicios = np.flatnonzero(np.r_[True, hosts[1:] != hosts[:-1]])
+    por_host = np.minimum.reduceat(conforme_em[:, longo['Gmud'].to_numpy()], inicios, axis=1)
+    dias = np.partition(por_host, faltam - 1, axis=1)[:, faltam - 1].astype(float)
+    return PrevisaoConformidade(dias, origem, meta, conformes.mean())
@@ -0,0 +1,99 @@
+"""
+Tabelas de regras para normalizar o inventário
+==============================================
+ENVIROMENT, SITUAÇÃO e GRID/PSU VERSION são textos livres com poucos valores
+distintos ("Produção", "Prod - Crítico", "Ativo ✅"...). As regras ficam aqui
+como dados — (prioridade, padrão, valor canônico) — e são avaliadas só sobre
+os valores distintos da coluna; o resultado volta para as linhas pelos
+códigos do categórico. O custo é O(valores distintos), não O(linhas).
+"""
+
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+from oraex.normalizacao import mapear_unicos
+
+# Menor prioridade vence. Com regex=True, ``valor`` é um template de
+# match.expand (ex.: r'19.\1'); caso contrário ``padrao`` é uma substring.
+Regra = namedtuple('Regra', ['prioridade', 'padrao', 'valor', 'regex'], defaults=[False])
+
+# Sentinela: sem regra aplicável, mantém o texto original (sem espaços nas pontas)
+MANTER = object()
+
+
+class TabelaRegras:
+    """Conjunto ordenado de regras substring/regex -> valor canônico."""
+
+    def __init__(self, regras: list, nulo=None, padrao=MANTER):
+        self.regras = sorted(regras, key=lambda r: r.prioridade)
+        self.nulo = nulo
+        self.padrao = padrao
+        self._compiladas = [re.compile(r.padrao) if r.regex else None for r in self.regras]
+
+    def avaliar(self, valor):
+        """Valor canônico de um único valor bruto."""
+        if valor is None or pd.isna(valor):
+            return self.nulo
+        texto = str(valor).strip()
+        for regra, compilada in zip(self.regras, self._compiladas):
+            if compilada is not None:
+                match = compilada.search(texto)
+                if match:
+                    return match.expand(regra.valor)
+            elif regra.padrao in texto:
+                return regra.valor
+        return texto if self.padrao is MANTER else self.padrao
+
+    def aplicar(self, serie: pd.Series) -> pd.Series:
+        """Normaliza a coluna inteira; devolve um categórico."""
+        return mapear_unicos(serie, self.avaliar)
+
+    def __repr__(self):
+        # Estável entre execuções (entra na versão dos caches): MANTER não usa o id do objeto
+        padrao = 'MANTER' if self.padrao is MANTER else repr(self.padrao)
+        return f'TabelaRegras({self.regras!r}, nulo={self.nulo!r}, padrao={padrao})'
+
+
+def tabelas() -> dict:
+    """Todas as tabelas deste módulo por nome (para versionar caches com ``cache.assinatura``)."""
+    return {nome: valor for nome, valor in sorted(globals().items()) if isinstance(valor, TabelaRegras)}
+
+
+SITUACAO = TabelaRegras([
+    Regra(1, 'Ativo', 'Ativo'),
+    Regra(2, 'Descontinuado', 'Descontinuado'),
+], nulo='Desconhecido')
+
+ENTORNO = TabelaRegras([
+    Regra(1, 'Prod', 'Produção'),
+    Regra(2, 'Homolog', 'Homologação'),
+    Regra(3, 'Desenv', 'Desenvolvimento'),
+    Regra(4, 'Trans', 'Transacional'),
+    # Coluna ENTORNO das abas de GMUD: só a inicial
+    Regra(5, r'^[Pp]$', 'Produção', regex=True),
+    Regra(6, r'^[Hh]$', 'Homologação', regex=True),
+    Regra(7, r'^[Dd]$', 'Desenvolvimento', regex=True),
+    Regra(8, r'^[Tt]$', 'Transacional', regex=True),
+], nulo='Outros', padrao='Outros')
+
+PSU = TabelaRegras([
+    Regra(1, 'Descontinuado', 'Descontinuado'),
+    Regra(2, r'19\.(\d+)', r'19.\1', regex=True),
+], nulo=None)
+
+# DB VERSION ('19c', '12c ', '21c'...) -> suporte da Oracle (ver oraex.risco)
+SUPORTE_DB = TabelaRegras([
+    Regra(1, r'^(19|23|26)', 'Suportado', regex=True),
+    Regra(2, r'^(1[0-8]|21)', 'Sem suporte', regex=True),
+], nulo=None, padrao=None)
+
+# TIPO DB (ou SERVICE/DESCRIPTION/PRODUCT da aba PagoNxt, que não tem a coluna) -> SGBD;
+# sem menção a nenhum = None (não entra na frota Oracle)
+TIPO_DB = TabelaRegras([
+    Regra(1, r'(?i)oracle', 'Oracle', regex=True),
+    Regra(2, r'(?i)postgre', 'PostgreSQL', regex=True),
+    Regra(3, r'(?i)sql ?server|mssql', 'SQL Server', regex=True),
+    Regra(4, r'(?i)mongo', 'MongoDB', regex=True),
+], nulo=None, padrao=None)
@@ -0,0 +1,151 @@
+"""
+Risco por host (top-K dos piores)
+=================================
+A lista de "críticos" tinha três definições que não batiam: o texto
+'Crítico' na coluna E da aba Servidores (alertas Slack), ``Quarters_Behind >= 4``
+com ``head(10)`` (artefato 2025) e o regex 'Desatualizado|Atenção|Baixo|Crítico'
+sobre a situação (relatório 2026). Nenhuma ordenava os hosts.
+
+Cada host do inventário recebe um risco de 0 a 100, calculado em arrays
+sobre o inventário inteiro:
+
+    risco = 100 × peso do entorno × Σ (peso × fator) / Σ pesos
+
+com os fatores em [0, 1]:
+
+- Atraso: quarters atrás do RU de referência, até ``TETO_QUARTERS`` (RU de
+  outra família, ex.: 12.0, conta o teto). A coluna Quarters_Atras fica sem
+  teto: é ela que desempata hosts com o mesmo risco (19.20 antes de 19.25);
+- Suporte: versão do banco sem suporte (``regras.SUPORTE_DB``);
+- Sem_Standby: o par do inventário não tem standby (sem contingência na janela);
+- Tempo: dias desde a última GMUD de sucesso no host, até ``TETO_DIAS``
+  (nunca atualizado = 1).
+
+Só o RU ou só a versão do banco não informados valem ``FATOR_DESCONHECIDO``.
+Sem nenhum dos dois (ex.: hosts SQL Server/PostgreSQL da PagoNxt) não há
+evidência nenhuma: o host não é pontuado (risco NaN, faixa ``SEM_DADOS``) e
+fica fora dos críticos e do top-K.
+
+RU 'Descontinuado' (versão fora de linha num host ativo) conta como atraso
+infinito: fator de atraso no teto e primeiro no desempate, para o host
+aparecer entre os críticos em vez de sumir deles. A faixa (Crítico, Alto,
+Médio, Baixo) vem de limiares fixos sobre o risco. Os K piores saem de
+``np.partition`` (O(n)); empates no corte entram todos e só esses candidatos
+são ordenados, por risco e depois ``DESEMPATE``, para o top-K não depender da
+ordem das linhas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from oraex import regras
+from oraex.conformidade import chave_versao
+
+PESOS = {'Atraso': 0.40, 'Tempo': 0.25, 'Suporte': 0.20, 'Sem_Standby': 0.15}
+PESO_ENTORNO = {'Produção': 1.0, 'Transacional': 1.0, 'Homologação': 0.7, 'Desenvolvimento': 0.5}
+PESO_ENTORNO_PADRAO = 0.5
+FATOR_SUPORTE = {'Suportado': 0.0, 'Sem suporte': 1.0}
+FATOR_DESCONHECIDO = 0.5
+TETO_QUARTERS = 4
+TETO_DIAS = 365
+# (risco mínimo, faixa), da mais alta para a mais baixa
+FAIXAS = [(60, 'Crítico'), (40, 'Alto'), (20, 'Médio'), (0, 'Baixo')]
+SEM_DADOS = 'Sem versão'
+TOP_CRITICOS = 10
+# Desempate do top-K, coluna -> valor de NaN: mais quarters atrás (RU desconhecido por último),
+# mais dias sem patch (nunca atualizado primeiro), hostname em ordem alfabética (None = texto)
+DESEMPATE = {'Quarters_Atras': -np.inf, 'Dias_Sem_Sucesso': np.inf, 'Hostname': None}
+
+
+def quarters_atras(versoes: pd.Series, referencia: str = None, teto: float = TETO_QUARTERS) -> np.ndarray:
+    """Quarters entre o RU de cada host e ``referencia`` (padrão: o RU mais novo da série), até ``teto``; NaN sem RU."""
+    chaves = chave_versao(versoes).to_numpy(dtype=float)
+    ref = chave_versao(pd.Series([referencia])).iloc[0] if referencia else \
+        (np.nanmax(chaves) if np.isfinite(chaves).any() else np.nan)
+    # RUs são trimestrais: 19.27 -> 19.29 são 2 quarters; outra família (12.x) não tem como comparar
+    mesma_familia = (chaves // 1000) == (ref // 1000)
+    atras = np.where(mesma_familia, np.clip(ref - chaves, 0, None), np.inf)
+    return np.where(np.isnan(chaves), np.nan, np.minimum(atras, teto))
+
+
+def faixa(risco) -> np.ndarray:
+    """Faixa de cada risco (``FAIXAS``); ``SEM_DADOS`` para risco NaN."""
+    risco = np.asarray(risco, dtype=float)
+    return np.select([np.isnan(risco)] + [risco >= minimo for minimo, _ in FAIXAS],
+                     [SEM_DADOS] + [nome for _, nome in FAIXAS], default=FAIXAS[-1][1])
+
+
+def pontuar(hosts: pd.DataFrame, ultimo_sucesso: pd.Series = None, referencia: str = None,
+            data_ref=None, pesos: dict = PESOS) -> pd.DataFrame:
+    """
+    Risco de cada host.
+
+    ``hosts``: um host por linha (ex.: ``atributos_hosts``) com Hostname, Linha
+    (par primary/standby), Entorno (canônico), Versao (RU) e, opcional, Versao_DB.
+    ``ultimo_sucesso``: data da última GMUD de sucesso, indexada por Hostname.
+    ``data_ref``: data de referência do fator Tempo (padrão: hoje).
+    Devolve ``hosts`` + Quarters_Atras (sem teto), Dias_Sem_Sucesso, um
+    Fator_<nome> por fator, Risco e Faixa, na ordem original.  Hosts sem RU e
+    sem versão do banco ficam com Risco NaN e Faixa ``SEM_DADOS``; RU
+    'Descontinuado' tem Quarters_Atras infinito.
+    """
+    hosts = hosts.reset_index(drop=True)
+    data_ref = pd.Timestamp(data_ref) if data_ref is not None else pd.Timestamp.now().normalize()
+
+    atras = quarters_atras(hosts['Versao'], referencia, teto=np.inf)
+    atras = np.where((hosts['Versao'].astype(str) == 'Descontinuado').to_numpy(), np.inf, atras)
+    suporte = regras.SUPORTE_DB.aplicar(hosts['Versao_DB']) if 'Versao_DB' in hosts.columns \
+        else pd.Series(None, index=hosts.index, dtype=object)
+    por_par = hosts.groupby('Linha')['Hostname'].transform('size').to_numpy() if 'Linha' in hosts.columns \
+        else np.ones(len(hosts))
+    ultimo = ultimo_sucesso.reindex(hosts['Hostname']) if ultimo_sucesso is not None \
+        else pd.Series(pd.NaT, index=hosts['Hostname'])
+    dias = (data_ref - pd.to_datetime(ultimo, errors='coerce')).dt.days.to_numpy(dtype=float, na_value=np.nan)
+
+    fatores = {
+        'Atraso': np.where(np.isnan(atras), FATOR_DESCONHECIDO, np.minimum(atras, TETO_QUARTERS) / TETO_QUARTERS),
+        'Tempo': np.where(np.isnan(dias), 1.0, np.clip(dias, 0, TETO_DIAS) / TETO_DIAS),
+        'Suporte': suporte.map(FATOR_SUPORTE).astype(float).fillna(FATOR_DESCONHECIDO).to_numpy(),
+        'Sem_Standby': (por_par < 2).astype(float),
+    }
+    soma = sum(pesos[f] * fatores[f] for f in pesos) / sum(pesos.values())
+    entorno = hosts['Entorno'].map(PESO_ENTORNO).astype(float).fillna(PESO_ENTORNO_PADRAO).to_numpy()
+    sem_versao = hosts['Versao'].isna().to_numpy() & \
+        (hosts['Versao_DB'].isna().to_numpy() if 'Versao_DB' in hosts.columns else True)
+    risco = np.where(sem_versao, np.nan, np.round(100 * entorno * soma, 1))
+
+    return hosts.assign(
+        Quarters_Atras=atras, Dias_Sem_Sucesso=dias,
+        **{f'Fator_{f}': np.round(v, 3) for f, v in fatores.items()},
+        Risco=risco, Faixa=faixa(risco),
+    )
+
+
+def _chave(valores: pd.Series, vazio) -> np.ndarray:
+    """Chave de ``np.lexsort``: números em ordem decrescente (NaN vale ``vazio``); texto (``vazio`` None) crescente."""
+    if vazio is None:
+        return np.unique(valores.astype(str).to_numpy(), return_inverse=True)[1]
+    numeros = valores.to_numpy(dtype=float, na_value=np.nan)
+    return -np.where(np.isnan(numeros), vazio, numeros)
+
+
+def top_k(riscos: pd.DataFrame, k: int = TOP_CRITICOS, coluna: str = 'Risco',
+          desempate: dict = DESEMPATE) -> pd.DataFrame:
+    """
+    As ``k`` linhas de maior ``coluna`` (NaN fora), da maior para a menor.
+
+    ``np.partition`` acha o k-ésimo valor em O(n); todas as linhas empatadas
+    nele entram como candidatas e só essas são ordenadas, por ``coluna`` e pelas
+    colunas de ``desempate`` presentes, antes de cortar em ``k``.
+    """
+    valores = riscos[coluna].to_numpy(dtype=float)
+    validos = np.flatnonzero(~np.isnan(valores))
+    k = min(k, len(validos))
+    if k <= 0:
+        return riscos.iloc[:0]
+    corte = np.partition(valores[validos], len(validos) - k)[len(validos) - k]
+    candidatos = validos[valores[validos] >= corte]
+    linhas = riscos.iloc[candidatos]
+    chaves = [_chave(linhas[c], vazio) for c, vazio in reversed(desempate.items()) if c in linhas.columns]
+    chaves.append(-valores[candidatos])
+    return linhas.iloc[np.lexsort(chaves)[:k]]
@@ -0,0 +1,68 @@
+"""
+Parser vetorizado de tamanhos de armazenamento
+==============================================
+Converte células como "806,04 GB", "1.234 MB", "72 KB" ou "512 bytes"
+(formato brasileiro: ponto de milhar, vírgula decimal) em números.
+
+Todas as colunas passam por um único ``str.extract``; a unidade vira índice
+numa tabela de fatores. Células que o Excel já entregou como número (mesmo
+no meio de uma coluna de texto) valem bytes e não passam pelo texto: "1536.0"
+perderia o ponto decimal como se fosse separador de milhar. Células
+preenchidas que não casam com o padrão (ou com unidade desconhecida) são
+sinalizadas em vez de virarem 0 em silêncio.
+"""
+
+import numbers
+
+import numpy as np
+import pandas as pd
+
+UNIDADES = ['B', 'KB', 'MB', 'GB', 'TB']
+FATORES = np.array([1024.0 ** i for i in range(len(UNIDADES))])  # em bytes
+
+COLUNAS_TAMANHO = ['Total Reserved Size', 'Unused', 'Data', 'Indexes']
+
+_PADRAO = r'^\s*(?P<numero>\d[\d.]*(?:,\d+)?)\s*(?P<unidade>[A-Za-z]*)\s*$'
+
+
+def parse_tamanhos(df: pd.DataFrame, colunas: list = None, unidade: str = 'KB'):
+    """
+    Converte as colunas de tamanho de ``df`` para a ``unidade`` pedida.
+
+    Retorna ``(valores, falhas)``: dois DataFrames com as mesmas colunas e
+    índice de ``df``. ``valores`` é float64 (NaN onde não converteu) e
+    ``falhas`` é booleano, True nas células preenchidas que não foram entendidas.
+    """
+    colunas = colunas or COLUNAS_TAMANHO
+    divisor = FATORES[UNIDADES.index(unidade.upper())]
+    n = len(df)
+
+    # Empilha as colunas (ordem Fortran: coluna a coluna) para um único extract
+    celulas = df[colunas].to_numpy(dtype=object).ravel(order='F')
+    numerico = np.fromiter((isinstance(v, numbers.Number) and not isinstance(v, bool) for v in celulas),
+                           dtype=bool, count=len(celulas))
+    bruto = pd.Series(np.where(numerico, None, celulas), dtype='string')
+    partes = bruto.str.extract(_PADRAO)
+
+    numero = pd.to_numeric(
+        partes['numero'].str.replace('.', '', regex=False).str.replace(',', '.', regex=False),
+        errors='coerce'
+    ).to_numpy(dtype='float64', na_value=np.nan)
+
+    # Sem unidade = bytes (como o parse_size original); "BYTES" também é B
+    sigla = partes['unidade'].str.upper().replace({'': 'B', 'BYTES': 'B', 'BYTE': 'B'})
+    codigos = pd.Categorical(sigla, categories=UNIDADES).codes
+    fator = np.where(codigos >= 0, FATORES[codigos], np.nan)
+
+    bytes_ = numero * fator
+    preenchido = bruto.str.strip().fillna('').ne('').to_numpy()
+
+    # Células numéricas do Excel são bytes
+    bytes_[numerico] = celulas[numerico].astype('float64')
+    preenchido[numerico] = ~np.isnan(bytes_[numerico])
+
+    valores = (bytes_ / divisor).reshape((n, len(colunas)), order='F')
+    falhas = preenchido.reshape((n, len(colunas)), order='F') & np.isnan(valores)
+
+    return (pd.DataFrame(valores, index=df.index, columns=colunas),
+            pd.DataFrame(falhas, index=df.index, columns=colunas))
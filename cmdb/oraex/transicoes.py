@@ -0,0 +1,192 @@
+"""
+Transições de status entre revisões da planilha
+===============================================
+As revisões da consolidação ((1).xlsm, (2).xlsm...) são retratos da mesma fila
+de GMUDs, mas nada media como as GMUDs andam entre status
+(PROGRAMADA → REPLANEJAR → ENCERRADA).
+
+O motor guarda em Parquet o último retrato (uma linha por CHG: status do
+fluxo, mês, executor, categoria) e o log de transições. A cada retrato novo:
+
+1. alinha CHG a CHG com o anterior por hash join: a chave de ``chaves_gmud``
+   (CHG + mês + ocorrência) vira um hash uint64 e ``Index.get_indexer`` casa as
+   linhas dos dois lados;
+2. CHG nova gera (NOVA → status); status diferente gera (de → para); CHG que
+   sumiu gera (status → REMOVIDA). Todas datadas pela data do retrato;
+3. as transições vão para o log e somam na matriz de contagem por mês ×
+   executor × categoria (agregado aditivo, como em ``oraex.agregados``).
+
+Só o retrato novo é comparado com o último; um retrato já ingerido (mesmo
+conteúdo) é ignorado. Sobre o log:
+
+- ``rotatividade``: quantas vezes as GMUDs entraram em replanejamento;
+- ``tempo_em_status``: dias entre a entrada num status e a transição seguinte
+  (na resolução dos retratos: GMUD que entrou e saiu entre dois retratos não aparece).
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from oraex.agregados import chaves_gmud
+from oraex.cache import hash_linhas
+from oraex.normalizacao import mapear_unicos, normalizar_status
+
+NOVA = 'NOVA'
+REMOVIDA = 'REMOVIDA'
+SEM_STATUS = 'SEM STATUS'
+DIMENSOES = ['Mes', 'Executor', 'Categoria']
+COLUNAS_RETRATO = ['_chave', 'GMUD_ID', 'Status'] + DIMENSOES
+COLUNAS_LOG = ['Retrato', 'Data', '_chave', 'GMUD_ID'] + DIMENSOES + ['De', 'Para']
+COLUNAS_MATRIZ = DIMENSOES + ['De', 'Para', 'Transicoes']
+COLUNAS_RETRATOS = ['Retrato', 'Origem', 'Data', 'GMUDs', 'Transicoes']
+
+# Status só com ícone (abas antigas) -> nome do status do fluxo
+_ICONES = {'✅': 'ENCERRADA', '🔄': 'REPLANEJAR', '🚫': 'CANCELADA', '❌': 'CANCELADA'}
+
+
+def _status_fluxo(status) -> str:
+    if status is None or pd.isna(status):
+        return SEM_STATUS
+    # O 📅 marca "data a confirmar" e não muda o status
+    status = str(status).replace('📅', '').strip().upper()
+    return _ICONES.get(status, status) or SEM_STATUS
+
+
+def status_fluxo(serie: pd.Series) -> pd.Series:
+    """Status bruto -> status do fluxo (PROGRAMADA, REPLANEJAR, ENCERRADA...), categórico."""
+    return mapear_unicos(serie, _status_fluxo)
+
+
+def retrato(df: pd.DataFrame) -> pd.DataFrame:
+    """GMUDs normalizadas -> uma linha por CHG com status do fluxo e dimensões (índice = hash da chave)."""
+    psu = df['Is_PSU'].fillna(False).astype(bool) if 'Is_PSU' in df.columns else pd.Series(False, index=df.index)
+    atual = pd.DataFrame({
+        '_chave': chaves_gmud(df).to_numpy(),
+        'GMUD_ID': df['GMUD_ID'].astype(str).str.strip().str.upper().to_numpy(),
+        'Status': status_fluxo(df['Status']).astype(str).to_numpy(),
+        'Mes': df['Mes'].astype(str).to_numpy(),
+        'Executor': df['Responsavel_Norm'].astype(str).to_numpy(),
+        'Categoria': np.where(psu, 'PSU', 'Outras'),
+    })
+    atual = atual.dropna(subset=['_chave']).drop_duplicates('_chave')
+    atual.index = pd.Index(pd.util.hash_array(atual['_chave'].to_numpy(dtype=object)), name='_hash')
+    return atual
+
+
+def data_do_retrato(df: pd.DataFrame):
+    """A planilha não guarda a data da revisão: vale a última DATA INICIO com desfecho (encerrada, cancelada...)."""
+    desfecho = ~df['Status_Final'].astype(str).isin(['OUTROS', 'DESCONHECIDO'])
+    data = pd.to_datetime(df.loc[desfecho, 'Data_Inicio'], errors='coerce').max()
+    return data.normalize() if pd.notna(data) else pd.Timestamp.now().normalize()
+
+
+class MotorTransicoes:
+    """Log e matriz de transições de status, alimentados retrato a retrato."""
+
+    def __init__(self, pasta: str, nome: str = 'transicoes'):
+        self.pasta = pasta
+        self.arquivos = {parte: os.path.join(pasta, f'{nome}_{parte}.parquet')
+                         for parte in ('retrato', 'log', 'matriz', 'retratos')}
+        self.ultimo = self._ler('retrato', COLUNAS_RETRATO)
+        self.ultimo.index = pd.Index(pd.util.hash_array(self.ultimo['_chave'].to_numpy(dtype=object)), name='_hash')
+        self.log = self._ler('log', COLUNAS_LOG)
+        self.matriz_acumulada = self._ler('matriz', COLUNAS_MATRIZ)
+        self.retratos = self._ler('retratos', COLUNAS_RETRATOS)
+
+    def _ler(self, parte: str, colunas: list) -> pd.DataFrame:
+        arquivo = self.arquivos[parte]
+        if os.path.exists(arquivo):
+            try:
+                return pd.read_parquet(arquivo)
+            except Exception as e:
+                print(f"Transições ignoradas ({arquivo}): {e}")
+        return pd.DataFrame(columns=colunas)
+
+    def _gravar(self):
+        os.makedirs(self.pasta, exist_ok=True)
+        try:
+            self.ultimo.to_parquet(self.arquivos['retrato'], index=False)
+            self.log.to_parquet(self.arquivos['log'], index=False)
+            self.matriz_acumulada.to_parquet(self.arquivos['matriz'], index=False)
+            self.retratos.to_parquet(self.arquivos['retratos'], index=False)
+        except Exception as e:
+            print(f"Não foi possível gravar as transições: {e}")
+
+    # ----------------------------------------------------------- ingestão
+    def ingerido(self, origem: str) -> bool:
+        """``origem`` (ex.: assinatura do arquivo) já foi ingerida? Evita até ler a planilha."""
+        return origem in set(self.retratos['Origem'].astype(str))
+
+    def ingerir(self, df: pd.DataFrame, data=None, origem: str = '') -> dict:
+        """
+        Compara as GMUDs normalizadas ``df`` (Status, Mes, Responsavel_Norm, Is_PSU)
+        com o último retrato e acumula as transições, datadas por ``data``.
+        """
+        data = pd.Timestamp(data) if data is not None else data_do_retrato(df)
+        atual = retrato(df)
+        conteudo = hashlib.sha1(np.sort(hash_linhas(atual, ['_chave', 'Status'])).tobytes()).hexdigest()[:12]
+        if conteudo in set(self.retratos['Retrato'].astype(str)):
+            return {'transicoes': 0, 'novas': 0, 'mudaram': 0, 'removidas': 0}
+        if len(self.retratos) and data < pd.Timestamp(self.retratos['Data'].max()):
+            raise ValueError(f"Retrato de {data:%d/%m/%Y} é anterior ao último ingerido "
+                             f"({pd.Timestamp(self.retratos['Data'].max()):%d/%m/%Y})")
+
+        # Hash join: posição de cada CHG atual no retrato anterior (-1 = nova)
+        posicao = self.ultimo.index.get_indexer(atual.index)
+        novas = posicao < 0
+        de = np.append(self.ultimo['Status'].to_numpy(dtype=object), NOVA)[posicao]
+        mudou = novas | (de != atual['Status'].to_numpy(dtype=object))
+        removidas = self.ultimo[~self.ultimo.index.isin(atual.index)]
+
+        transicoes = pd.concat([
+            atual[mudou].assign(De=de[mudou], Para=atual.loc[mudou, 'Status']),
+            removidas.assign(De=removidas['Status'], Para=REMOVIDA),
+        ], ignore_index=True)
+        transicoes = transicoes.assign(Retrato=conteudo, Data=data)[COLUNAS_LOG]
+
+        self.log = pd.concat([self.log, transicoes], ignore_index=True) if len(self.log) else transicoes
+        contagem = transicoes.groupby(DIMENSOES + ['De', 'Para']).size().rename('Transicoes').reset_index()
+        if len(contagem):
+            self.matriz_acumulada = (pd.concat([m for m in (self.matriz_acumulada, contagem) if len(m)])
+                                     .astype({'Transicoes': 'int64'})
+                                     .groupby(DIMENSOES + ['De', 'Para'], as_index=False)['Transicoes'].sum())
+        self.ultimo = atual
+        registro = pd.DataFrame([[conteudo, origem, data, len(atual), len(transicoes)]], columns=COLUNAS_RETRATOS)
+        self.retratos = pd.concat([self.retratos, registro], ignore_index=True) if len(self.retratos) else registro
+        self._gravar()
+        return {'transicoes': len(transicoes), 'novas': int(novas.sum()),
+                'mudaram': int((mudou & ~novas).sum()), 'removidas': len(removidas)}
+
+    # ----------------------------------------------------------- consultas
+    def matriz(self, incluir_novas: bool = False, **filtros) -> pd.DataFrame:
+        """Contagem de transições De × Para (ex.: ``Categoria='PSU'``, ``Executor=...``)."""
+        matriz = self.matriz_acumulada
+        if not incluir_novas:
+            matriz = matriz[matriz['De'] != NOVA]
+        for dim, valor in filtros.items():
+            matriz = matriz[matriz[dim] == str(valor)]
+        return matriz.pivot_table(index='De', columns='Para', values='Transicoes', aggfunc='sum', fill_value=0)
+
+    def rotatividade(self, por='Executor') -> pd.DataFrame:
+        """Entradas em replanejamento (REPLANEJAR, REAGENDADA...) por dimensão, inclusive a da 1ª ingestão."""
+        por = [por] if isinstance(por, str) else list(por)
+        replanejou = normalizar_status(self.log['Para']) == 'REPLANEJADA'
+        entradas = self.log[replanejou].groupby(por).agg(Replanejamentos=('_chave', 'size'),
+                                                         GMUDs_Replanejadas=('_chave', 'nunique'))
+        resultado = entradas.join(self.ultimo.groupby(por).size().rename('GMUDs'), how='outer').fillna(0).astype(int)
+        resultado['Por_GMUD'] = (resultado['Replanejamentos'] / resultado['GMUDs'].where(resultado['GMUDs'] > 0)).round(2)
+        return resultado.sort_values('Replanejamentos', ascending=False)
+
+    def tempo_em_status(self) -> pd.DataFrame:
+        """Dias em cada status até a transição seguinte; Em_Aberto = GMUDs nele no último retrato."""
+        log = self.log.sort_values(['_chave', 'Data'], kind='stable')
+        saida = log.groupby('_chave')['Data'].shift(-1)
+        dias = (pd.to_datetime(saida) - pd.to_datetime(log['Data'])).dt.total_seconds() / 86400
+        permanencias = pd.DataFrame({'Status': log['Para'], 'Dias': dias}).dropna()
+        permanencias = permanencias[permanencias['Status'] != REMOVIDA]
+        tabela = permanencias.groupby('Status')['Dias'].agg(Saidas='size', Dias_Mediana='median', Dias_Media='mean')
+        tabela = tabela.join(self.ultimo['Status'].value_counts().rename('Em_Aberto'), how='outer')
+        return tabela.fillna({'Saidas': 0, 'Em_Aberto': 0}).astype({'Saidas': int, 'Em_Aberto': int}).round(1)
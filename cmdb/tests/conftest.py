@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os scripts rodam de dentro de cmdb/ (``from oraex...``); os testes também
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from oraex.agendador import Agendador, agendar, preencher_abas
+
+VAGAS = pd.DataFrame({
+    'Inicio': pd.to_datetime(['2026-01-05 22:00', '2026-01-12 22:00']),
+    'Fim': pd.to_datetime(['2026-01-06 02:00', '2026-01-13 02:00']),
+    'Entorno': ['P', 'P'], 'Alvo': ['19.30', '19.30'],
+}, index=[10, 11])
+PARES = pd.DataFrame({
+    'Hostnames': [['PRD1', 'PRD1S'], ['TRX1'], ['ANTIGO'], ['HML1'], ['PRD2']],
+    'Entorno': ['Produção', 'Transacional', 'Produção', 'Homologação', 'Produção'],
+    'Versao': ['19.26', '19.28', '12.2', '19.20', '19.29'],
+}, index=[1, 2, 3, 4, 5])
+
+
+def test_par_mais_atrasado_primeiro_e_pendentes():
+    agendador = agendar(VAGAS, PARES, ['A', 'B'])
+    agenda = agendador.agenda()
+    assert agenda['Linha'].tolist() == [1, 2]
+    assert agenda['Atraso'].tolist() == [4, 2]
+    # PRD2 ficou sem vaga; 12.2 não é da família do RU das janelas e HML não tem janela
+    assert agendador.pendentes().index.tolist() == [5]
+
+
+def test_liberacao_e_executor_ocupado():
+    ocupacao = pd.DataFrame({'Executor': ['A'], 'Inicio': pd.to_datetime(['2026-01-05 20:00']),
+                             'Fim': pd.to_datetime(['2026-01-06 06:00'])})
+    agendador = Agendador(VAGAS, PARES, ['A', 'B'], ocupacao,
+                          liberacao={(1, '19.30'): pd.Timestamp('2026-01-10')}).gulosa()
+    agenda = agendador.agenda()
+    assert agenda['Linha'].tolist() == [2, 1]
+    assert agenda.loc[10, 'Executor'] == 'B'
+
+    abas = pd.DataFrame({'TÍTULO': ['GMUD PSU 19.30 | {HOSTNAME}', 'GMUD PSU 19.30 | {HOSTNAME}']}, index=[10, 11])
+    preenchidas = preencher_abas(abas, agenda)
+    assert preenchidas.loc[11, 'TÍTULO'] == 'GMUD PSU 19.30 | PRD1 e PRD1S'
+    assert preenchidas.loc[10, 'DESIGNADO A'] == 'B'
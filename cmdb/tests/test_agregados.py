@@ -0,0 +1,47 @@
+import pandas as pd
+
+from oraex.agregados import DIMENSOES, MEDIDAS, ArmazemKpis, agregar, chaves_gmud
+
+
+def _gmuds(ids, status):
+    n = len(ids)
+    return pd.DataFrame({
+        'GMUD_ID': ids, 'Status_Final': status, 'Is_PSU': [True] * n, 'Mes': ['JANEIRO'] * n,
+        'Entorno': ['P'] * n, 'Responsavel_Norm': ['Ana'] * n, 'Versao_PSU': ['19.28'] * n,
+        'Cliente': ['Getnet'] * n, 'Num_Servers': [2] * n, 'Horas': [3.0] * n,
+    })
+
+
+def _ordenado(df):
+    return df.sort_values(DIMENSOES).reset_index(drop=True)[DIMENSOES + MEDIDAS]
+
+
+def test_chaves_sem_id_sao_distintas_e_inteiras():
+    chaves = chaves_gmud(pd.DataFrame({'GMUD_ID': ['chg1 ', None, 'CHG1', None, '', pd.NA]}))
+    assert chaves.tolist() == ['CHG1#0', 'SEM-ID#0', 'CHG1#1', 'SEM-ID#1', 'SEM-ID#2', 'SEM-ID#3']
+    assert chaves.is_unique
+
+
+def test_sincronizar_com_linhas_sem_id(tmp_path):
+    armazem = ArmazemKpis(str(tmp_path))
+    df = _gmuds(['CHG1', None, None, None], ['SUCESSO', 'SUCESSO', 'CANCELADA', 'SUCESSO'])
+    assert armazem.sincronizar(df) == {'inseridas': 4, 'alteradas': 0, 'removidas': 0}
+
+    # Remove uma linha sem CHG e altera outra: antes quebrava com chaves NA repetidas
+    df2 = df.drop(index=3).reset_index(drop=True)
+    df2.loc[1, 'Status_Final'] = 'REPLANEJADA'
+    recarregado = ArmazemKpis(str(tmp_path))
+    assert recarregado.sincronizar(df2) == {'inseridas': 0, 'alteradas': 1, 'removidas': 1}
+    assert _ordenado(recarregado.agregados).equals(_ordenado(agregar(df2)))
+    assert recarregado.total('Sucessos') == 1
+
+
+def test_chg_incluida_em_outra_aba_nao_renumera_as_demais(tmp_path):
+    armazem = ArmazemKpis(str(tmp_path))
+    df = _gmuds(['CHG1', 'CHG1'], ['REPLANEJADA', 'SUCESSO']).assign(Mes=['JANEIRO', 'MARÇO'])
+    armazem.sincronizar(df)
+    # CHG1 replanejada também em fevereiro, numa linha acima da de março
+    novo = pd.concat([df.iloc[:1], df.iloc[:1].assign(Mes='FEVEREIRO'), df.iloc[1:]], ignore_index=True)
+    assert chaves_gmud(novo).tolist() == ['CHG1@JANEIRO#0', 'CHG1@FEVEREIRO#0', 'CHG1@MARÇO#0']
+    assert armazem.sincronizar(novo) == {'inseridas': 1, 'alteradas': 0, 'removidas': 0}
+    assert _ordenado(armazem.agregados).equals(_ordenado(agregar(novo)))
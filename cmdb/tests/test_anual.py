@@ -0,0 +1,56 @@
+import pandas as pd
+
+from oraex.anual import CuboAnual, canonizar, mes_da_linha, mes_do_texto
+
+
+def _fragmento(ano, status, meses, titulos, entornos):
+    return canonizar(ano, pd.Series(status), pd.Series(meses), pd.Series(titulos), pd.Series(entornos))
+
+
+def test_mes_do_texto_e_da_linha():
+    assert mes_do_texto(pd.Series(['MARÇO', 'Março-26', 'resumo'])).tolist()[:2] == [3, 3]
+    assert mes_do_texto(pd.Series(['resumo'])).isna().all()
+    datas = pd.Series(['2026-02-10', None])
+    assert mes_da_linha(datas, pd.Series(['MARÇO', 'MARÇO'])).tolist() == [2, 3]
+    assert mes_da_linha(None, pd.Series(['ABRIL'])).tolist() == [4]
+
+
+def test_canonizar_agrega_por_dimensoes():
+    fragmento = _fragmento(2025, ['Encerrada', 'Encerrada', 'Cancelada'], [1, 1, 2],
+                           ['PSU 19.26', 'PSU 19.26', 'Troca'], ['P', 'Produção', 'H'])
+    assert fragmento.to_dict('records') == [
+        {'Ano': 2025, 'Mes': 1, 'Status': 'SUCESSO', 'Categoria': 'PSU', 'Entorno': 'Produção', 'GMUDs': 2},
+        {'Ano': 2025, 'Mes': 2, 'Status': 'CANCELADA', 'Categoria': 'Outras', 'Entorno': 'Homologação', 'GMUDs': 1},
+    ]
+
+
+def test_delta_mesmo_periodo_e_fragmento_em_disco(tmp_path):
+    cubo = CuboAnual(str(tmp_path))
+    cubo.anexar(2025, _fragmento(2025, ['Encerrada'] * 2 + ['Cancelada'], [1, 1, 2], ['PSU'] * 3, ['P'] * 3))
+    origem = tmp_path / 'entrada.txt'
+    origem.write_text('x')
+    calculos = []
+
+    def calcular():
+        calculos.append(1)
+        return _fragmento(2026, ['Encerrada'] * 3, [1, 1, 3], ['PSU'] * 3, ['P'] * 3)
+
+    cubo.obter(2026, [str(origem)], calcular)
+    CuboAnual(str(tmp_path)).obter(2026, [str(origem)], calcular)
+    assert calculos == [1]
+
+    delta = cubo.delta(2026)
+    assert delta.loc[1].tolist() == [2, 2, 0, 0.0] and pd.isna(delta.loc[3, 'Delta_Pct'])
+    periodo = cubo.mesmo_periodo(2026, ate_mes=2, Categoria='PSU')
+    assert periodo.loc[2026, 'GMUDs'] == 2 and periodo.loc[2025, 'GMUDs'] == 3
+    assert periodo.loc[2025, 'Taxa_Sucesso'] == 66.7 and periodo.loc['Delta', 'CANCELADA'] == -1
+    assert cubo.acumulado().loc[12].tolist() == [3, 3]
+
+
+def test_delta_sem_o_ano_base_no_cubo():
+    cubo = CuboAnual()
+    cubo.anexar(2025, _fragmento(2025, ['Encerrada', 'Encerrada'], [1, 2], ['PSU'] * 2, ['P'] * 2))
+    delta = cubo.delta(2025)
+    assert delta[2024].sum() == 0 and delta.loc[1, 'Delta'] == 1
+    assert delta['Delta_Pct'].isna().all()
+    assert cubo.delta(2027)[2027].sum() == 0
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from oraex.artefato import obter_artefato
+
+
+def test_artefato_reaproveitado_ate_mudar_entrada_ou_data(tmp_path):
+    entrada = tmp_path / 'planilha.xlsx'
+    entrada.write_text('v1')
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return {'total': len(chamadas)}, {'t': pd.DataFrame({'a': [1, 2]})}
+
+    pasta = str(tmp_path / 'artefato')
+    a = obter_artefato(pasta, [str(entrada)], calcular, data_ref='2026-10-19')
+    b = obter_artefato(pasta, [str(entrada)], calcular, data_ref='2026-10-19')
+    assert len(chamadas) == 1 and b.metricas == {'total': 1}
+    assert b.tabela('t')['a'].tolist() == [1, 2]
+    # risco/dias sem patch dependem do dia: artefato de ontem não serve hoje
+    obter_artefato(pasta, [str(entrada)], calcular, data_ref='2026-10-20')
+    assert len(chamadas) == 2
+    entrada.write_text('v2 maior')
+    obter_artefato(pasta, [str(entrada)], calcular, data_ref='2026-10-20')
+    assert len(chamadas) == 3 and a.metricas == {'total': 1}
+
+
+def test_artefato_refeito_quando_regras_ou_codigo_mudam(tmp_path, monkeypatch):
+    from oraex import regras
+
+    entrada = tmp_path / 'planilha.xlsx'
+    entrada.write_text('v1')
+    script = tmp_path / 'relatorio.py'
+    script.write_text('x = 1\n')
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return {'total': len(chamadas)}, {}
+
+    pasta = str(tmp_path / 'artefato')
+    obter_artefato(pasta, [str(entrada)], calcular, codigo=[str(script)])
+    obter_artefato(pasta, [str(entrada)], calcular, codigo=[str(script)])
+    assert len(chamadas) == 1
+    # mesmo tamanho de arquivo, conteúdo diferente: só a assinatura do código percebe
+    script.write_text('x = 2\n')
+    obter_artefato(pasta, [str(entrada)], calcular, codigo=[str(script)])
+    assert len(chamadas) == 2
+    monkeypatch.setattr(regras, 'tabelas', lambda: {'SITUACAO': 'outra regra'})
+    obter_artefato(pasta, [str(entrada)], calcular, codigo=[str(script)])
+    assert len(chamadas) == 3
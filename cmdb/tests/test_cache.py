@@ -0,0 +1,31 @@
+import pandas as pd
+
+from oraex import regras
+from oraex.cache import CacheNormalizacao, assinatura
+
+
+def test_assinatura_muda_com_as_tabelas_de_regras():
+    base = assinatura(1, regras.tabelas())
+    assert base == assinatura(1, regras.tabelas())
+    assert base != assinatura(2, regras.tabelas())
+    alterada = dict(regras.tabelas(), PSU=regras.TabelaRegras([regras.Regra(1, 'x', 'y')]))
+    assert base != assinatura(1, alterada)
+    # sentinela MANTER não carrega o endereço do objeto
+    assert 'MANTER' in repr(regras.SITUACAO) and '0x' not in repr(regras.SITUACAO)
+
+
+def test_cache_recalcula_so_linhas_novas_e_versao_nova(tmp_path):
+    chamadas = []
+
+    def normalizar(parte):
+        chamadas.append(len(parte))
+        return parte.assign(Saida=parte['Bruto'].str.upper())
+
+    df = pd.DataFrame({'Bruto': ['a', 'b']})
+    CacheNormalizacao(str(tmp_path), 'teste', ['Bruto'], ['Saida'], versao='v1').aplicar(df.copy(), normalizar)
+    df2 = pd.DataFrame({'Bruto': ['a', 'b', 'c']})
+    saida = CacheNormalizacao(str(tmp_path), 'teste', ['Bruto'], ['Saida'], versao='v1').aplicar(df2, normalizar)
+    assert saida['Saida'].tolist() == ['A', 'B', 'C']
+    CacheNormalizacao(str(tmp_path), 'teste', ['Bruto'], ['Saida'], versao='v2').aplicar(df2.copy(), normalizar)
+    assert chamadas == [2, 1, 3]
+    assert [p.name for p in tmp_path.iterdir()] == ['teste-v2.parquet']
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from oraex.capacidade import CargaExecutores
+
+JANELAS = pd.DataFrame({
+    'Executor': ['A', 'A', 'B', None],
+    'Inicio': pd.to_datetime(['2025-01-05 22:00', '2025-01-06 02:00', '2025-01-07 10:00', '2025-01-07 10:00']),
+    'Fim': pd.to_datetime(['2025-01-06 04:00', '2025-01-06 03:00', '2025-01-07 12:00', '2025-01-07 11:00']),
+})
+
+
+def test_janela_cortada_na_virada_da_semana_noturnas_e_sobreposicao():
+    carga = CargaExecutores(JANELAS)
+    assert list(carga.executores) == ['A', 'B']
+    assert list(carga.semanas) == list(pd.to_datetime(['2024-12-30', '2025-01-06']))
+    np.testing.assert_allclose(carga.horas, [[2, 5], [0, 2]])
+    np.testing.assert_allclose(carga.noturnas, [[2, 5], [0, 0]])
+    np.testing.assert_allclose(carga.sobreposicao, [[0, 1], [0, 0]])
+    assert carga.janelas.tolist() == [[1, 1], [0, 1]]
+
+
+def test_consultas_e_reserva_por_executor_semana():
+    carga = CargaExecutores(JANELAS, executores={'A': 6, 'B': 40})
+    a, semana = carga.codigo('A'), 1
+    assert carga.disponivel(a, semana) == 1
+    assert carga.cabe(a, semana, 1) and not carga.cabe(a, semana, 2)
+    carga.reservar(a, semana, 2)
+    assert carga.utilizacao().loc['A'].tolist() == [33.3, 116.7]
+    resumo = carga.resumo()
+    assert resumo.loc['A', 'Semanas_Acima'] == 1 and resumo.loc['B', 'Pct_Noturno'] == 0
+    assert carga.codigo('C') == -1
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from oraex.conflitos import detectar_conflitos, pares_sobrepostos
+
+
+def _pares(chaves, inicio, fim):
+    i, j = pares_sobrepostos(np.array(chaves), np.array(inicio), np.array(fim))
+    return sorted(tuple(sorted(p)) for p in zip(i.tolist(), j.tolist()))
+
+
+def test_sobreposicao_so_na_mesma_chave_e_intervalo_aberto():
+    # [0,10) x [5,15) sobrepõem; [10,20) só encosta em [0,10); chave 1 é outra
+    assert _pares([0, 0, 0, 1], [0, 5, 10, 0], [10, 15, 20, 10]) == [(0, 1), (1, 2)]
+
+
+def test_confere_com_forca_bruta():
+    rng = np.random.default_rng(1)
+    chaves = rng.integers(0, 5, 200)
+    inicio = rng.integers(0, 1000, 200)
+    fim = inicio + rng.integers(1, 60, 200)
+    esperado = sorted((a, b) for a in range(200) for b in range(a + 1, 200)
+                      if chaves[a] == chaves[b] and inicio[a] < fim[b] and inicio[b] < fim[a])
+    assert _pares(chaves, inicio, fim) == esperado
+
+
+def test_detectar_conflitos_explode_hosts():
+    janelas = pd.DataFrame({
+        'Id': ['A', 'B', 'C'],
+        'Inicio': pd.to_datetime(['2026-01-05 22:00', '2026-01-05 23:00', '2026-01-06 22:00']),
+        'Fim': pd.to_datetime(['2026-01-06 02:00', '2026-01-06 01:00', '2026-01-07 02:00']),
+        'Hosts': [['H1', 'H2'], ['H2'], ['H1']],
+    })
+    conflitos = detectar_conflitos(janelas)
+    assert conflitos[['Tipo', 'Chave', 'Id_A', 'Id_B']].values.tolist() == [['Host', 'H2', 'A', 'B']]
+    assert conflitos['Horas_Sobreposicao'].iloc[0] == 2.0
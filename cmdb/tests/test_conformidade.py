@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from oraex.conformidade import alvo_por_adocao, chave_versao, serie_conformidade
+
+HOSTS = pd.DataFrame({'Hostname': [f'H{i}' for i in range(10)], 'Versao': ['19.26'] * 10, 'Entorno': ['Produção'] * 10})
+SEMANAS = pd.date_range('2025-01-06', periods=4, freq='W-MON')
+
+
+def test_chave_versao():
+    assert chave_versao(pd.Series(['19.29', 'GRID 19.5', 'x'])).tolist()[:2] == [19029.0, 19005.0]
+    assert np.isnan(chave_versao(pd.Series(['x'])).iloc[0])
+
+
+def test_piloto_isolado_nao_move_o_alvo():
+    # Um host no 19.27 na semana 1 (piloto); 3 hosts na semana 2 -> 30% de adoção, o alvo passa a ser 19.27
+    eventos = pd.DataFrame({'Hostname': ['H0', 'H1', 'H2'], 'Versao': '19.27',
+                            'Data': pd.to_datetime(['2025-01-07', '2025-01-14', '2025-01-15'])})
+    serie = serie_conformidade(eventos, HOSTS, fronteiras=SEMANAS)
+    assert serie['Alvo'].tolist() == ['19.26', '19.26', '19.27', '19.27']
+    # o host com GMUD estava antes do 19.26 até a GMUD; o piloto não derruba os outros 9
+    assert serie['Total'].tolist() == [70.0, 80.0, 30.0, 30.0]
+
+
+def test_alvo_nao_volta_atras_e_alvo_fixo():
+    chaves = np.array([[19026, 19027, 19027], [19026, 19026, 19026]], dtype=float)
+    assert alvo_por_adocao(chaves, minimo=0.5).tolist() == [19027.0, 19027.0]
+    eventos = pd.DataFrame({'Hostname': ['H0'], 'Versao': ['19.27'], 'Data': pd.to_datetime(['2025-01-07'])})
+    serie = serie_conformidade(eventos, HOSTS, alvo='19.27', fronteiras=SEMANAS)
+    assert serie['Total'].tolist() == [0.0, 10.0, 10.0, 10.0]
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from oraex.conjuntos import ConjuntosHosts, UniversoHosts
+
+
+def test_operacoes_e_complemento_respeitam_o_universo():
+    universo = UniversoHosts([f'H{i}' for i in range(70)])
+    a = universo.conjunto(['H0', 'H1', 'H65'])
+    b = universo.conjunto(['H1', 'H69', 'FORA'])
+    assert len(a & b) == 1 and len(a | b) == 4 and len(a - b) == 2 and len(a ^ b) == 3
+    # Complemento não inclui os bits de sobra da última palavra
+    assert len(~a) == 67
+    assert 'H65' in a and 'H2' not in a and 'FORA' not in a
+    assert list((a & b).hostnames()) == ['H1']
+
+
+def test_universos_diferentes_nao_se_misturam():
+    with pytest.raises(ValueError):
+        UniversoHosts(['A']).todos() | UniversoHosts(['A']).todos()
+
+
+def test_cobertura_e_nunca_atualizados():
+    longo = pd.DataFrame({
+        'Hostname': ['H1', 'H2', 'H1', 'H9'],
+        'Trimestre': ['Q1', 'Q1', 'Q2', 'Q2'],
+        'Status_Final': ['SUCESSO', 'CANCELADA', 'SUCESSO', 'SUCESSO'],
+    })
+    inventario = pd.DataFrame({'Hostname': ['H1', 'H2', 'H3'], 'Entorno': ['Produção', 'Produção', 'Homologação']})
+    conjuntos = ConjuntosHosts.montar(longo, inventario)
+    assert list(conjuntos.em_todos(['Q1', 'Q2']).hostnames()) == ['H1']
+    assert sorted(conjuntos.nunca_atualizados().hostnames()) == ['H2', 'H3']
+    cobertura = conjuntos.cobertura('Entorno')
+    assert cobertura.loc['Produção', ['Hosts', 'Atualizados', 'Nunca']].tolist() == [2, 1, 1]
+    assert cobertura.loc['Homologação', 'Pct_Coberto'] == 0.0
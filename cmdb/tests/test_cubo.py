@@ -0,0 +1,35 @@
+import pandas as pd
+
+from oraex.cubo import CuboOlap
+
+
+def _agregados():
+    return pd.DataFrame({
+        'Is_PSU': [True, True, False, True],
+        'Status_Final': ['SUCESSO', 'CANCELADA', 'SUCESSO', 'SUCESSO'],
+        'Mes': ['JANEIRO', 'FEVEREIRO', 'JULHO', 'AGOSTO'],
+        'Entorno': ['Produção', 'Produção', 'Homologação', ''],
+        'Responsavel_Norm': ['Ana', 'Bia', 'Ana', 'Ana'],
+        'Versao_PSU': ['19.28', '19.28', '', '19.29'],
+        'Cliente': ['Getnet'] * 4,
+        'GMUDs': [3, 1, 2, 4],
+        'Servidores': [6, 2, 2, 8],
+        'Sucessos': [3, 0, 2, 4],
+        'Horas': [9.0, 3.0, 4.0, 12.0],
+    })
+
+
+def test_rollup_confere_com_groupby():
+    cubo = CuboOlap.de_agregados(_agregados())
+    por_executor = cubo.rollup('Executor', ['GMUDs', 'Horas'], Categoria='PSU')
+    assert por_executor.to_dict(orient='index') == {'Ana': {'GMUDs': 7, 'Horas': 21.0}, 'Bia': {'GMUDs': 1, 'Horas': 3.0}}
+    # Trimestre derivado do mês; rótulo vazio fica fora do roll-up
+    assert cubo.rollup('Trimestre', 'GMUDs')['GMUDs'].to_dict() == {'Q1': 4, 'Q3': 6}
+    assert cubo.rollup('Entorno', 'GMUDs')['GMUDs'].to_dict() == {'Homologação': 2, 'Produção': 4}
+
+
+def test_total_e_fatia():
+    cubo = CuboOlap.de_agregados(_agregados())
+    assert cubo.total('Sucessos', Status='SUCESSO', Trimestre=['Q1', 'Q3']) == 9
+    assert len(cubo.fatia(Executor='Bia')) == 1
+    assert cubo.total('GMUDs', Executor='Ninguem') == 0
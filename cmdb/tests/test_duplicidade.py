@@ -0,0 +1,25 @@
+import pandas as pd
+
+from oraex.duplicidade import deduplicar
+
+
+def test_mantem_a_linha_mais_recente_da_chg():
+    df = pd.DataFrame({
+        'GMUD_ID': ['CHG1', 'chg1 ', 'CHG2', 'CHG1'],
+        'Titulo': ['PSU 19.28 host', 'PSU  19.28 HOST', 'PSU 19.28 host', 'PSU 19.29 host'],
+        'Mes': ['MARÇO', 'ABRIL', 'MARÇO', 'ABRIL'],
+        'Status': ['REPLANEJAR', 'ENCERRADA', 'ENCERRADA', 'ENCERRADA'],
+        'Data_Inicio': pd.to_datetime(['2025-03-10', '2025-04-07', '2025-03-11', '2025-04-08']),
+    })
+    unicas, relatorio = deduplicar(df)
+    # Mesmo título normalizado = mesma GMUD; outro RU = outra GMUD
+    assert sorted(unicas.index) == [1, 2, 3]
+    assert relatorio['Ocorrencias'].tolist() == [2]
+    assert relatorio['Status'].iloc[0] == 'REPLANEJAR → ENCERRADA'
+
+
+def test_sem_repetidas_devolve_o_proprio_df():
+    df = pd.DataFrame({'GMUD_ID': ['A', 'B'], 'Titulo': ['x', 'y'], 'Mes': ['M', 'M'], 'Status': ['s', 's']})
+    unicas, relatorio = deduplicar(df)
+    assert unicas is df
+    assert relatorio.empty
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from oraex.duracao import ModeloDuracao, faixa_hosts, horas_janela, obter_modelo
+
+
+def _gmuds(n, entorno, horas, servidores=1):
+    inicio = pd.Timestamp('2025-03-01 22:00')
+    return pd.DataFrame({'Entorno': entorno, 'Versao_PSU': '19.26', 'Responsavel_Norm': 'A', 'Num_Servers': servidores,
+                         'Data_Inicio': [inicio] * n, 'Data_Termino': [inicio + pd.Timedelta(hours=horas)] * n})
+
+
+def test_faixas_e_janelas_invalidas():
+    assert faixa_hosts(pd.Series([0, 1, 2, 4, 9, np.nan])).astype(str).tolist() == ['1', '1', '2', '3-4', '5+', '1']
+    df = pd.DataFrame({'Data_Inicio': pd.to_datetime(['2025-01-01 22:00'] * 3),
+                       'Data_Termino': pd.to_datetime(['2025-01-02 01:00', '2025-01-01 21:00', '2025-02-01 22:00'])})
+    assert horas_janela(df).tolist()[0] == 3 and horas_janela(df).iloc[1:].isna().all()
+
+
+def test_estimativa_cai_para_nivel_mais_geral_com_poucas_amostras(tmp_path):
+    treino = pd.concat([_gmuds(6, 'P', 4), _gmuds(6, 'H', 2)], ignore_index=True)
+    modelo = ModeloDuracao.ajustar(treino)
+    novos = pd.DataFrame({'Entorno': ['P', 'H', 'D'], 'Versao_PSU': ['19.26', '19.29', '19.26'],
+                          'Responsavel_Norm': ['A', 'B', 'A'], 'Num_Servers': [1, 1, 1]})
+    # P: nível mais específico; H com RU/executor sem amostras: nível Entorno × faixa; D: geral
+    assert modelo.estimar(novos).tolist() == [4.0, 2.0, 3.0]
+    real = _gmuds(1, 'P', 7)
+    assert modelo.esforco(real).tolist() == [7.0]
+
+    assert obter_modelo(treino, str(tmp_path)).tabela.equals(modelo.tabela)
+    assert len(list(tmp_path.glob('duracao-*.parquet'))) == 1
+
+
+def test_modelo_em_cache_refeito_quando_parametros_mudam(tmp_path, monkeypatch):
+    from oraex import duracao
+
+    treino = pd.concat([_gmuds(6, 'P', 4), _gmuds(6, 'H', 2)], ignore_index=True)
+    obter_modelo(treino, str(tmp_path))
+    antes = {p.name for p in tmp_path.glob('duracao-*.parquet')}
+    monkeypatch.setattr(duracao, 'LIMITE_HORAS', 3)
+    # mesmas linhas, outro limite: as janelas de 4 h saem do ajuste em vez de vir do cache
+    modelo = obter_modelo(treino, str(tmp_path))
+    assert {p.name for p in tmp_path.glob('duracao-*.parquet')}.isdisjoint(antes)
+    assert modelo.estimar(treino.head(1)).tolist() == [2.0]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from oraex.executores import NAO_ATRIBUIDO, ResolvedorExecutores
+
+EXECUTORES = {'Guilherme Fonseca': ['Guilherme', 'gfonseca'], 'Luca Mozart': ['Luca', 'lmozart']}
+
+
+def test_alias_token_e_fuzzy():
+    r = ResolvedorExecutores(EXECUTORES)
+    assert r.resolver('gfonseca') == 'Guilherme Fonseca'
+    assert r.resolver('Guilherme F.') == 'Guilherme Fonseca'
+    assert r.resolver('Guilerme') == 'Guilherme Fonseca'
+    # "Lucas" não é erro de digitação de "Luca"
+    assert r.resolver('Lucas') == 'Lucas'
+
+
+def test_vazios_viram_nao_atribuido():
+    r = ResolvedorExecutores(EXECUTORES)
+    assert r.resolver(None) == NAO_ATRIBUIDO
+    assert r.resolver('   ') == NAO_ATRIBUIDO
+
+
+def test_resolver_serie_categorico_com_nulos():
+    r = ResolvedorExecutores(EXECUTORES)
+    serie = pd.Series(['Luca', None, 'lmozart', 'guilherme'], index=[10, 11, 12, 13])
+    resolvido = r.resolver_serie(serie)
+    assert isinstance(resolvido.dtype, pd.CategoricalDtype)
+    assert list(resolvido.index) == [10, 11, 12, 13]
+    assert resolvido.tolist() == ['Luca Mozart', NAO_ATRIBUIDO, 'Luca Mozart', 'Guilherme Fonseca']
+
+
+def test_aliases_do_arquivo_juntam_nome_curto_e_completo():
+    r = ResolvedorExecutores.do_arquivo()
+    for curto, completo in [('Duda', 'Duda osmala'), ('Andre', 'André Spader'), ('Euripedes Jr', 'Euripedes Junior'),
+                            ('Igor', 'Igor Carvalho')]:
+        assert r.resolver(curto) == r.resolver(completo)
+    assert r.resolver('Duda') == 'Duda Osmala'
+    assert r.resolver('Andre Spider') == 'Andre Spader'
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from oraex.historico import HistoricoPatches, trimestre
+
+
+def _gmuds():
+    return pd.DataFrame({
+        'Hostnames': [['H1', 'H2'], ['H1'], []],
+        'Mes': ['MARÇO', 'JULHO-25', 'AGOSTO'],
+        'Versao_PSU': ['19.26', '19.28', '19.28'],
+        'GMUD_ID': ['CHG1', 'CHG2', 'CHG3'],
+        'Status_Final': ['SUCESSO', 'SUCESSO', 'CANCELADA'],
+    })
+
+
+def test_trimestre_do_mes():
+    assert trimestre(pd.Series(['MARÇO', 'abril-25', 'XX'])).astype(object).tolist()[:2] == ['Q1', 'Q2']
+
+
+def test_consultas_do_historico():
+    historico = HistoricoPatches.das_gmuds(_gmuds())
+    assert historico.atualizacoes() == 3
+    assert historico.servidores_unicos() == 2
+    assert historico.repatchados().to_dict() == {'H1': 2}
+    assert historico.ultimo_patch().loc['H1', 'Versao_PSU'] == '19.28'
+    matriz = historico.matriz()
+    assert matriz.loc['H2', 'Q1'] == '19.26' and pd.isna(matriz.loc['H2', 'Q3'])
@@ -0,0 +1,51 @@
+import pandas as pd
+
+from oraex.hosts import IndiceHosts, explodir_hosts, separar_hostnames
+
+INVENTARIO = ['GNCASNPL01029', 'GNCASNPL04273', 'GNCASSPL04272', 'GMSP1ZU2SQLL027']
+
+
+def test_separar_hostnames_de_celulas_sujas():
+    assert separar_hostnames('gncasspl04272.getnet.local e GNCASNPL04273 (RAC) ✅') == ['GNCASSPL04272', 'GNCASNPL04273']
+    assert separar_hostnames(None) == []
+
+
+def test_transposicao_corrige_mas_troca_de_letra_nao():
+    indice = IndiceHosts(INVENTARIO)
+    assert indice.extrair('PSU 19.28 | GNCASNLP04273') == ['GNCASNPL04273']
+    # Standby (S) não vira o primário (N) de mesmo número: é outro servidor, mantido e reportado
+    assert indice.extrair('PSU | GNCASSPL01029') == ['GNCASSPL01029']
+    assert indice.nao_encontrados == {'GNCASSPL01029': 1}
+    # Dígitos trocados também são outro servidor
+    assert indice.extrair('GNCASNPL04237') == ['GNCASNPL04237']
+
+
+def test_tokens_sem_padrao_de_host_sao_ignorados():
+    indice = IndiceHosts(INVENTARIO)
+    assert indice.extrair('Chamado PGDM-8509 / RITM00012345 | gncasnpl04273 e GNCASSPL04272') == \
+        ['GNCASNPL04273', 'GNCASSPL04272']
+    assert not indice.nao_encontrados
+
+
+def test_fora_do_inventario():
+    indice = IndiceHosts(INVENTARIO)
+    listas = indice.extrair_serie(pd.Series(['GNCASSTL02045 e GNCASNPL01029', 'GNCASSTL02045', None]))
+    assert listas.map(len).tolist() == [2, 1, 0]
+    assert indice.fora_do_inventario(listas).to_dict() == {'GNCASSTL02045': 2}
+
+
+def test_explodir_hosts_primary_e_standbys():
+    df = pd.DataFrame({'P': ['HOST0001', 'HOST0003'], 'S': ['HOST0002 e HOST0004', None]}, index=[7, 9])
+    hosts = explodir_hosts(df, 'P', 'S')
+    assert hosts[['Hostname', 'Linha']].values.tolist() == [
+        ['HOST0001', 7], ['HOST0003', 9], ['HOST0002', 7], ['HOST0004', 7]]
+    assert hosts['Papel'].astype(str).tolist() == ['PRIMARY', 'PRIMARY', 'STANDBY', 'STANDBY']
+
+
+def test_explodir_hosts_repetido_fica_na_linha_prioritaria():
+    df = pd.DataFrame({'P': ['GNCASSHL07593', 'GNCASNPA00547', 'GNCASSHL07593'],
+                       'S': [None, 'GNCASSPA00547', None]})
+    assert explodir_hosts(df, 'P', 'S')['Linha'].tolist() == [0, 1, 1]
+    hosts = explodir_hosts(df, 'P', 'S', prioridade=pd.Series([1, 0, 0]))
+    assert hosts['Linha'].tolist() == [1, 2, 1]
+    assert hosts['Hostname'].tolist() == ['GNCASNPA00547', 'GNCASSHL07593', 'GNCASSPA00547']
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from oraex.kpis import KpisGmud, KpisInventario, Metrica, calcular_kpis
+
+
+def test_calcular_kpis_contagem_soma_e_operadores():
+    df = pd.DataFrame({'Status': pd.Categorical(['A', 'B', 'A', None]), 'Q': [0, 1, 3, None], 'Peso': [1, 2, 3, 4]})
+    kpis = calcular_kpis(df, [
+        Metrica('total'),
+        Metrica('a', ('Status', '==', 'A')),
+        Metrica('peso_a', ('Status', '==', 'A'), 'Peso', 'sum'),
+        Metrica('q2', ('Q', '>=', 2)),
+        Metrica('ab', ('Status', 'in', {'A', 'B'})),
+        Metrica('peso', None, 'Peso', 'sum'),
+    ])
+    assert kpis == {'total': 4, 'a': 2, 'peso_a': 4.0, 'q2': 1, 'ab': 3, 'peso': 10.0}
+
+
+def test_kpis_gmud_e_inventario():
+    gmuds = pd.DataFrame({'Status_Final': ['SUCESSO', 'SUCESSO', 'CANCELADA', 'OUTROS'],
+                          'Entorno': ['P', 'H', 'P', 'D'], 'Num_Servers': [2, 1, 5, 1]})
+    kpis = KpisGmud.calcular(gmuds)
+    assert (kpis.total, kpis.sucesso, kpis.canceladas, kpis.outras, kpis.atualizacoes) == (4, 2, 1, 1, 3)
+    assert kpis.entorno_prod == 2 and kpis.taxa_sucesso == 50.0
+
+    inventario = pd.DataFrame({'PSU_Version': ['19.28', '19.27', '19.25'], 'Quarters_Behind': [0, 1, 3],
+                               'Entorno': ['Produção', 'Homologação', 'Produção'], 'Servidores': [2, 1, 1]})
+    inv = KpisInventario.calcular(inventario, '19.28')
+    assert (inv.total_servidores, inv.atualizados, inv.atras_1q, inv.atras_3q_mais, inv.prod) == (4, 2, 1, 1, 3)
+    assert inv.pct_atualizados == 50.0
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from oraex.metricas_2025 import ABA_INVENTARIO, carregar_gmuds, carregar_inventario
+
+
+def _planilha(caminho):
+    with pd.ExcelWriter(caminho, engine='openpyxl') as escritor:
+        pd.DataFrame({
+            'GMUD': ['CHG0001', 'CHG0002', None, 'nota'],
+            'Título': ['PSU 19.28 GNCASNPA00547', 'PSU 19.28 GNCASSHL07593', 'x', 'y'],
+            'STATUS GMUD': ['ENCERRADA', 'CANCELADA', None, None],
+            'DATA INICIO': ['2025-02-03 22:00', '2025-02-10 22:00', None, None],
+            'DATA TÉRMINO': ['2025-02-04 01:00', None, None, None],
+            'Designado a': ['gfonseca', 'Duda', None, None],
+        }).to_excel(escritor, sheet_name='FEVEREIRO-25', index=False)
+        pd.DataFrame({
+            'PRIMARY HOSTNAME': ['GNCASSHL07593', 'GNCASNPA00547', 'GNCASSHL07593'],
+            'STANDBY HOSTNAME': [None, 'GNCASSPA00547', None],
+            'Total Servidores': ['1', '2', '1'],
+            'SITUAÇÃO': ['Descontinuado', 'Ativo ✅', 'Ativo'],
+            'ENVIROMENT': ['Prod', 'Prod - Crítico', 'Homolog'],
+            'GRID/PSU VERSION': ['Descontinuado', 'GRID 19.25', '19.28.0'],
+        }).to_excel(escritor, sheet_name=ABA_INVENTARIO, index=False)
+
+
+def test_carregar_gmuds_mapeia_colunas_e_filtra_chg(tmp_path):
+    arquivo = tmp_path / 'consolidacao.xlsx'
+    _planilha(arquivo)
+    gmuds = carregar_gmuds(str(arquivo))
+    assert gmuds['GMUD_ID'].tolist() == ['CHG0001', 'CHG0002']
+    assert {'Status', 'Titulo', 'Responsavel', 'Data_Inicio', 'Data_Termino'} <= set(gmuds.columns)
+    assert gmuds['Mes'].unique().tolist() == ['FEVEREIRO']
+    assert pd.api.types.is_datetime64_any_dtype(gmuds['Data_Inicio'])
+
+
+def test_carregar_inventario_host_repetido_fica_na_linha_ativa(tmp_path):
+    arquivo = tmp_path / 'consolidacao.xlsx'
+    _planilha(arquivo)
+    inventario = carregar_inventario(str(arquivo))
+    assert inventario['Servidores'].tolist() == [0, 2, 1]
+    assert inventario['Situacao'].tolist() == ['Descontinuado', 'Ativo', 'Ativo']
+    assert inventario['Entorno'].tolist() == ['Produção', 'Produção', 'Homologação']
+    assert inventario['Quarters_Behind'].tolist()[1:] == [4.0, 1.0]
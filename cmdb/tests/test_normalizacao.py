@@ -0,0 +1,35 @@
+import pandas as pd
+
+from oraex.normalizacao import STATUS_FINAIS, extrair_versao_psu, mapear_unicos, normalizar_gmuds, normalizar_status
+
+
+def test_mapear_unicos_chama_a_funcao_uma_vez_por_valor():
+    chamadas = []
+
+    def upper(v):
+        chamadas.append(v)
+        return None if v is None else v.upper()
+
+    serie = pd.Series(['b', 'a', 'b', None, 'a'], index=[5, 6, 7, 8, 9])
+    resultado = mapear_unicos(serie, upper)
+    assert chamadas == ['b', 'a', None]
+    assert list(resultado.cat.categories) == ['A', 'B']
+    assert resultado.tolist()[:3] == ['B', 'A', 'B'] and resultado.isna().tolist()[3]
+    assert list(resultado.index) == [5, 6, 7, 8, 9]
+
+
+def test_status_e_versao():
+    status = normalizar_status(pd.Series(['Encerrada ✅', 'cancelada', 'Reagendada', 'INSUCESSO', 'em andamento', None]))
+    assert status.tolist() == ['SUCESSO', 'CANCELADA', 'REPLANEJADA', 'INSUCESSO', 'OUTROS', 'DESCONHECIDO']
+    assert list(status.cat.categories) == STATUS_FINAIS
+    versoes = extrair_versao_psu(pd.Series(['Aplicar PSU 19.27 GNCASNPA00547', 'GRID 19.28', 'Reboot']))
+    assert versoes.tolist()[:2] == ['19.27', '19.28'] and versoes.isna().tolist()[2]
+
+
+def test_normalizar_gmuds_colunas_derivadas():
+    df = pd.DataFrame({'Status': ['Encerrada', 'Cancelada'], 'Titulo': ['PSU 19.28 host', 'Troca de disco'],
+                       'Responsavel': ['gfonseca', None], 'Mes': ['Fevereiro', 'Janeiro']})
+    df = normalizar_gmuds(df, meses=['Janeiro', 'Fevereiro'])
+    assert df['Is_PSU'].tolist() == [True, False]
+    assert df['Responsavel_Norm'].tolist() == ['Guilherme Fonseca', 'Não Atribuído']
+    assert df['Mes'].cat.ordered and list(df['Mes'].cat.categories) == ['Janeiro', 'Fevereiro']
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from oraex.numeros import EN_US, PT_BR, coagir_numerico, detectar_locale
+
+
+def test_detectar_locale():
+    assert detectar_locale(pd.Series(['4.833.104.781', '1,5'])) == PT_BR
+    assert detectar_locale(pd.Series(['1,234.5', '10'])) == EN_US
+    assert detectar_locale(pd.Series(['10', '20']), padrao=EN_US) == EN_US
+
+
+def test_texto_misturado_com_numeros_do_excel():
+    valores, falhas = coagir_numerico(pd.Series(['4.833.104.781', 1536.0, '45,3%', 'n/d', None], dtype=object))
+    assert valores.iloc[0] == 4833104781
+    assert valores.iloc[1] == 1536.0
+    assert round(valores.iloc[2], 3) == 0.453
+    assert falhas.tolist() == [False, False, False, True, False]
+
+
+def test_mascara_de_falhas_tem_o_mesmo_dtype_nos_dois_caminhos():
+    texto = coagir_numerico(pd.Series(['1', 'x']))[1]
+    numerico = coagir_numerico(pd.Series([1.0, 2.0]))[1]
+    assert texto.dtype == numerico.dtype == bool
+    inteiros, _ = coagir_numerico(pd.Series(['1.000', '2']))
+    assert inteiros.dtype == 'int64' and inteiros.tolist() == [1000, 2]
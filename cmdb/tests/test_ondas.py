@@ -0,0 +1,31 @@
+import pandas as pd
+
+from oraex.ondas import PlanoOndas
+
+HOSTS = pd.DataFrame({
+    'Hostname': ['DEV1', 'HML1', 'PRD1P', 'PRD1S'],
+    'Entorno': ['Desenvolvimento', 'H', 'Produção', 'Produção'],
+    'Papel': ['PRIMARY', 'PRIMARY', 'PRIMARY', 'STANDBY'],
+    'Linha': [0, 1, 2, 2],
+})
+
+
+def test_camadas_com_soak_e_standby_antes_do_primary():
+    plano = PlanoOndas(HOSTS, inicio='2026-01-05')
+    inicio = plano.datas().set_index('Hostname')['Inicio']
+    assert inicio.to_dict() == {
+        'DEV1': pd.Timestamp('2026-01-05 00:00'), 'HML1': pd.Timestamp('2026-01-12 03:00'),
+        'PRD1P': pd.Timestamp('2026-01-19 09:00'), 'PRD1S': pd.Timestamp('2026-01-19 06:00'),
+    }
+    assert plano.inicio_pares()[2] == pd.Timestamp('2026-01-19 06:00')
+
+
+def test_replanejar_recalcula_so_descendentes_e_marca_atraso():
+    hosts = HOSTS.assign(Prazo=pd.to_datetime([None, None, '2026-01-20', None]))
+    plano = PlanoOndas(hosts, inicio='2026-01-05')
+    assert not plano.datas()['Atrasado'].any()
+    mudaram = plano.replanejar('HML1', '2026-01-14')
+    assert mudaram['Hostname'].tolist() == ['HML1', 'PRD1S', 'PRD1P']
+    assert mudaram['Depois'].tolist()[-1] == pd.Timestamp('2026-01-21 06:00')
+    assert plano.datas().set_index('Hostname').loc['PRD1P', 'Atrasado']
+    assert plano.replanejar('PRD1S', '2026-01-01').empty
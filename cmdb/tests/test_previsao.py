@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from oraex.previsao import DESFECHOS, dias_replanejamento, simular, taxas_mensais
+
+FROTA = pd.DataFrame({'Hostname': ['H0', 'H1', 'H2', 'H3'], 'Conforme': [True, False, False, False]})
+GMUDS = pd.DataFrame({'Inicio': pd.to_datetime(['2026-01-05 22:00', '2026-01-12 22:00']),
+                      'Hostnames': [['H1', 'H2'], ['H3', 'FORA']]})
+
+
+def _taxas(sucesso, cancela=0.0):
+    return pd.DataFrame({'SUCESSO': sucesso, 'CANCELADA': cancela, 'REPLANEJADA': 1 - sucesso - cancela},
+                        index=range(1, 13))
+
+
+def test_taxas_suavizadas_e_dias_de_replanejamento():
+    status = pd.Series(['SUCESSO', 'SUCESSO', 'INSUCESSO', 'CANCELADA', 'OUTROS'])
+    taxas = taxas_mensais(status, pd.Series([1, 1, 1, 2, 2]), peso=0)
+    assert list(taxas.columns) == DESFECHOS
+    assert taxas.loc[1].round(3).tolist() == [0.667, 0.0, 0.333]
+    assert taxas.loc[3].sum() == 0  # mês sem GMUD e sem suavização
+    assert np.allclose(taxas_mensais(status, pd.Series([1, 1, 1, 2, 2])).sum(axis=1), 1)
+    inicio = pd.Series(pd.to_datetime(['2025-01-01'] * 5))
+    assert dias_replanejamento(inicio, inicio + pd.to_timedelta([3, 5, 5, 9, 20], unit='D')) == 5.0
+    assert dias_replanejamento(inicio[:2], inicio[:2] + pd.Timedelta(days=3)) == 7
+
+
+def test_simulacao_deterministica_nos_extremos():
+    certa = simular(GMUDS, FROTA, _taxas(1.0), meta=1.0, simulacoes=50, semente=1)
+    assert certa.probabilidade() == 1.0
+    # dias em float32: precisão de segundos
+    assert certa.quantis()['P50'].round('min') == pd.Timestamp('2026-01-12 22:00')
+    # meta de 75% (3 de 4): basta a primeira GMUD
+    assert simular(GMUDS, FROTA, _taxas(1.0), meta=0.75, simulacoes=10).quantis()['P90'].round('min') == \
+        pd.Timestamp('2026-01-05 22:00')
+    nunca = simular(GMUDS, FROTA, _taxas(0.0, cancela=1.0), meta=1.0, simulacoes=50, semente=1)
+    assert nunca.probabilidade() == 0.0 and nunca.quantis().isna().all() and nunca.curva().empty
+    assert simular(GMUDS, FROTA, _taxas(1.0), meta=0.25, simulacoes=5).probabilidade() == 1.0
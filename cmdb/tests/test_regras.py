@@ -0,0 +1,24 @@
+import pandas as pd
+
+from oraex import regras
+
+
+def test_entorno_nomes_e_codigos_das_abas():
+    entrada = pd.Series(['Prod - Crítico', 'Homologação', 'D', 'p', 'White', None])
+    assert regras.ENTORNO.aplicar(entrada).astype(object).tolist() == [
+        'Produção', 'Homologação', 'Desenvolvimento', 'Produção', 'Outros', 'Outros']
+
+
+def test_psu_e_suporte_db():
+    assert regras.PSU.avaliar('GRID 19.28.0') == '19.28'
+    assert regras.PSU.avaliar('Descontinuado') == 'Descontinuado'
+    assert regras.SUPORTE_DB.avaliar('19c') == 'Suportado'
+    assert regras.SUPORTE_DB.avaliar('12c ') == 'Sem suporte'
+    assert regras.SUPORTE_DB.avaliar('PostgreSQL') is None
+
+
+def test_tipo_db_pelo_texto_da_aba():
+    texto = pd.Series(['cmm db oracle', 'base24 db postgresql', 'MSSQL', 'mongodb data pci', 'tef', None])
+    tipos = regras.TIPO_DB.aplicar(texto)
+    assert tipos[:4].tolist() == ['Oracle', 'PostgreSQL', 'SQL Server', 'MongoDB']
+    assert tipos[4:].isna().all()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from oraex.risco import SEM_DADOS, faixa, pontuar, quarters_atras, top_k
+
+
+def _hosts(**colunas):
+    n = len(colunas['Hostname'])
+    base = {'Linha': range(n), 'Entorno': ['Produção'] * n, 'Versao_DB': ['19c'] * n}
+    return pd.DataFrame({**base, **colunas})
+
+
+def test_quarters_atras_com_e_sem_teto():
+    versoes = pd.Series(['19.20', '19.25', '19.29', None, '12.2'])
+    assert quarters_atras(versoes, '19.29', teto=np.inf)[:3].tolist() == [9, 4, 0]
+    com_teto = quarters_atras(versoes, '19.29')
+    assert com_teto[:3].tolist() == [4, 4, 0] and np.isnan(com_teto[3]) and com_teto[4] == 4
+
+
+def test_empate_no_teto_desempata_pelo_atraso_real():
+    # 19.20 e 19.25 têm o mesmo risco (fator de atraso no teto); 19.20 está mais atrás e vem antes
+    hosts = _hosts(Hostname=['B', 'A', 'C', 'D'], Versao=['19.25', '19.25', '19.20', '19.28'])
+    riscos = pontuar(hosts, referencia='19.29', data_ref='2025-12-31')
+    assert riscos['Risco'].iloc[0] == riscos['Risco'].iloc[2]
+    assert top_k(riscos, 2)['Hostname'].tolist() == ['C', 'A']
+    # independe da ordem das linhas
+    assert top_k(riscos.iloc[::-1], 2)['Hostname'].tolist() == ['C', 'A']
+    assert top_k(riscos, 10)['Hostname'].tolist() == ['C', 'A', 'B', 'D']
+
+
+def test_desempate_por_dias_sem_patch():
+    hosts = _hosts(Hostname=['A', 'B', 'C'], Versao=['19.25'] * 3)
+    ultimo = pd.Series(pd.to_datetime(['2024-01-01', '2023-01-01']), index=['A', 'B'])
+    riscos = pontuar(hosts, ultimo, referencia='19.29', data_ref='2025-12-31')
+    # todos no teto de tempo (> 365 dias): C nunca atualizado vem primeiro, depois o mais antigo
+    assert top_k(riscos, 3)['Hostname'].tolist() == ['C', 'B', 'A']
+
+
+def test_host_sem_versao_nao_e_pontuado():
+    hosts = _hosts(Hostname=['ORA', 'PG', 'SO_DB'], Versao=['19.20', None, None], Versao_DB=['19c', None, '11g'])
+    riscos = pontuar(hosts, referencia='19.29', data_ref='2025-12-31')
+    assert np.isnan(riscos['Risco'].iloc[1]) and riscos['Faixa'].iloc[1] == SEM_DADOS
+    assert riscos['Faixa'].iloc[0] == 'Crítico'
+    assert not np.isnan(riscos['Risco'].iloc[2])
+    assert 'PG' not in top_k(riscos, 10)['Hostname'].tolist()
+
+
+def test_faixa():
+    assert faixa([75, 60, 45, 20, 0, np.nan]).tolist() == ['Crítico', 'Crítico', 'Alto', 'Médio', 'Baixo', SEM_DADOS]
+
+
+def test_ru_descontinuado_entra_nos_criticos():
+    hosts = _hosts(Hostname=['A', 'B', 'C'], Versao=['19.20', 'Descontinuado', '19.29'])
+    riscos = pontuar(hosts, referencia='19.29', data_ref='2025-12-31')
+    assert riscos['Fator_Atraso'].iloc[1] == 1 and riscos['Faixa'].iloc[1] == 'Crítico'
+    # mesmo risco do host no teto de atraso, mas na frente dele no desempate
+    assert riscos['Risco'].iloc[1] == riscos['Risco'].iloc[0]
+    assert top_k(riscos, 2)['Hostname'].tolist() == ['B', 'A']
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from oraex.tamanhos import parse_tamanhos
+
+
+def test_texto_no_formato_brasileiro():
+    df = pd.DataFrame({'Data': ['806,04 GB', '1.234 MB', '512 bytes', '72 KB', 'lixo', None]})
+    valores, falhas = parse_tamanhos(df, ['Data'], unidade='KB')
+    esperado = [806.04 * 1024 ** 2, 1234 * 1024, 0.5, 72]
+    assert np.allclose(valores['Data'].iloc[:4], esperado)
+    assert falhas['Data'].tolist() == [False, False, False, False, True, False]
+
+
+def test_numero_em_coluna_de_texto_vale_bytes():
+    # Célula numérica no meio de uma coluna object: 1536.0 bytes, não "15360"
+    df = pd.DataFrame({'Data': ['2 KB', 1536.0, 2048, np.nan]}, dtype=object)
+    valores, falhas = parse_tamanhos(df, ['Data'], unidade='KB')
+    assert valores['Data'].iloc[:3].tolist() == [2.0, 1.5, 2.0]
+    assert np.isnan(valores['Data'].iloc[3])
+    assert not falhas['Data'].any()
+
+
+def test_coluna_numerica_inteira():
+    df = pd.DataFrame({'Data': [1024.0, np.nan], 'Unused': ['1 MB', '']})
+    valores, falhas = parse_tamanhos(df, ['Data', 'Unused'], unidade='KB')
+    assert valores['Data'].iloc[0] == 1.0 and valores['Unused'].iloc[0] == 1024.0
+    assert not falhas.to_numpy().any()
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from oraex.transicoes import NOVA, REMOVIDA, MotorTransicoes, status_fluxo
+
+
+def _gmuds(status: dict):
+    return pd.DataFrame({'GMUD_ID': list(status), 'Status': list(status.values()), 'Mes': 'JANEIRO',
+                         'Responsavel_Norm': 'A', 'Is_PSU': True})
+
+
+def test_status_fluxo_icones_e_vazios():
+    assert status_fluxo(pd.Series(['✅', ' programada 📅', None, '🔄'])).tolist() == \
+        ['ENCERRADA', 'PROGRAMADA', 'SEM STATUS', 'REPLANEJAR']
+
+
+def test_ingestao_incremental_e_consultas(tmp_path):
+    motor = MotorTransicoes(str(tmp_path))
+    r1 = motor.ingerir(_gmuds({'CHG1': 'PROGRAMADA', 'CHG2': 'PROGRAMADA', 'CHG3': 'PROGRAMADA'}), data='2025-01-01')
+    assert r1 == {'transicoes': 3, 'novas': 3, 'mudaram': 0, 'removidas': 0}
+    segundo = _gmuds({'CHG1': 'REPLANEJAR', 'CHG2': 'PROGRAMADA', 'CHG4': 'PROGRAMADA'})
+    assert motor.ingerir(segundo, data='2025-01-11') == {'transicoes': 3, 'novas': 1, 'mudaram': 1, 'removidas': 1}
+    # mesmo conteúdo não é reprocessado; retrato mais antigo que o último é recusado
+    assert motor.ingerir(segundo, data='2025-01-12')['transicoes'] == 0
+    with pytest.raises(ValueError):
+        motor.ingerir(_gmuds({'CHG1': 'ENCERRADA'}), data='2024-12-31')
+
+    # o estado sobrevive ao recarregar do disco
+    motor = MotorTransicoes(str(tmp_path))
+    motor.ingerir(_gmuds({'CHG1': 'ENCERRADA', 'CHG2': 'PROGRAMADA', 'CHG4': 'PROGRAMADA'}), data='2025-01-21')
+    matriz = motor.matriz()
+    assert matriz.loc['PROGRAMADA', 'REPLANEJAR'] == 1 and matriz.loc['REPLANEJAR', 'ENCERRADA'] == 1
+    assert matriz.loc['PROGRAMADA', REMOVIDA] == 1 and NOVA not in matriz.index
+    assert motor.matriz(incluir_novas=True).loc[NOVA, 'PROGRAMADA'] == 4
+    assert motor.rotatividade().loc['A', 'Replanejamentos'] == 1
+    tempo = motor.tempo_em_status()
+    assert tempo.loc['REPLANEJAR', 'Dias_Mediana'] == 10 and tempo.loc['PROGRAMADA', 'Em_Aberto'] == 2
@@ -0,0 +1,78 @@
+"""
+Transições de status entre revisões da consolidação 2025
+========================================================
+Ingere as revisões da planilha ("ORAEX - Consolidação GetTech 2025 (N).xlsm",
+em ordem de N) no motor de transições (ver oraex/transicoes.py) e mostra a
+matriz de transições, a rotatividade de replanejamento e o tempo em cada
+status. Revisões já ingeridas (mesmo tamanho/data do arquivo) nem são lidas:
+cada execução só processa a revisão nova.
+
+USO:
+    python transicoes_gmud.py
+    python transicoes_gmud.py --por Mes
+    python transicoes_gmud.py --arquivos "rev_a.xlsm" "rev_b.xlsm"
+"""
+
+import argparse
+import glob
+import os
+import re
+
+import pandas as pd
+
+from oraex.artefato import assinatura_arquivos
+from oraex.cache import assinatura
+from oraex.duplicidade import deduplicar
+from oraex.metricas_2025 import MESES, PASTA_CACHE, carregar_gmuds
+from oraex.normalizacao import normalizar_gmuds
+from oraex.transicoes import DIMENSOES, MotorTransicoes
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PADRAO_REVISOES = os.path.join(BASE_DIR, 'ORAEX - Consolidação GetTech 2025 (*).xlsm')
+
+
+def revisoes() -> list:
+    """Revisões da consolidação em ordem do número entre parênteses."""
+    def numero(caminho):
+        achado = re.search(r'\((\d+)\)', os.path.basename(caminho))
+        return int(achado.group(1)) if achado else 0
+    return sorted(glob.glob(PADRAO_REVISOES), key=numero)
+
+
+def ingerir_revisoes(arquivos: list, motor: MotorTransicoes):
+    for arquivo in arquivos:
+        origem = assinatura(assinatura_arquivos(arquivo))
+        if motor.ingerido(origem):
+            print(f"{os.path.basename(arquivo)}: já ingerida")
+            continue
+        df, _ = deduplicar(normalizar_gmuds(carregar_gmuds(arquivo), meses=MESES))
+        delta = motor.ingerir(df, origem=origem)
+        print(f"{os.path.basename(arquivo)}: {delta['transicoes']} transições "
+              f"({delta['novas']} novas, {delta['mudaram']} mudaram de status, {delta['removidas']} removidas)")
+
+
+def main(arquivos: list, por: str):
+    motor = MotorTransicoes(PASTA_CACHE, 'transicoes_2025')
+    ingerir_revisoes(arquivos, motor)
+    if motor.log.empty:
+        print("Nenhuma revisão ingerida")
+        return
+
+    datas = ', '.join(f"{pd.Timestamp(d):%d/%m/%Y}" for d in motor.retratos['Data'])
+    print(f"\nRetratos: {len(motor.retratos)} ({datas})")
+    matriz = motor.matriz(Categoria='PSU')
+    if not matriz.empty:
+        print("\nTransições PSU entre retratos (de → para):")
+        print(matriz.to_string())
+    print(f"\nRotatividade de replanejamento por {por}:")
+    print(motor.rotatividade(por).head(15).to_string())
+    print("\nTempo em status (dias, entre retratos):")
+    print(motor.tempo_em_status().to_string())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Transições de status das GMUDs entre revisões da planilha 2025')
+    parser.add_argument('--arquivos', nargs='+', help='Revisões em ordem cronológica; padrão: (1), (2)... da pasta')
+    parser.add_argument('--por', choices=DIMENSOES, default='Executor', help='Dimensão da rotatividade')
+    args = parser.parse_args()
+    main(args.arquivos or revisoes(), args.por)
@@ -2,108 +2,42 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex.historico import HistoricoPatches
+from oraex.metricas_2025 import MESES, obter_artefato
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 OUTPUT_HTML = r"D:\antigravity\oraex\cmdb\relatorio_psu_2025.html"
 
-MONTHLY_SHEETS = [
-    'FEVEREIRO-25', 'MARÇO-25', 'ABRIL-25', 'MAIO-25', 'JUNHO-25',
-    'JULHO-25', 'AGOSTO-25', 'SETEMBRO-25', 'OUTUBRO-25', 'NOVEMBRO-25', 'DEZEMBRO-25'
-]
-
-MONTH_ORDER = ['FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO', 'JULHO', 
-               'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
-
-def extract_hostnames(title):
-    if pd.isna(title):
-        return []
-    pattern = r'(gncas[a-z0-9]+)'
-    matches = re.findall(pattern, str(title).lower())
-    return [m.upper() for m in matches]
-
-def normalize_status(status):
-    if pd.isna(status):
-        return 'DESCONHECIDO'
-    status = str(status).strip().upper()
-    if 'ENCERRADA' in status or 'FECHADA' in status or '✅' in status:
-        return 'SUCESSO'
-    elif 'CANCELADA' in status or '❌' in status or 'CANCELAR' in status:
-        return 'CANCELADA'
-    elif 'REPLANEJAR' in status or '🔄' in status or 'REAGENDADA' in status:
-        return 'REPLANEJADA'
-    elif 'INSUCESSO' in status:
-        return 'INSUCESSO'
-    elif 'ANDAMENTO' in status or 'EXECUÇÃO' in status or 'IMPLEMENT' in status:
-        return 'EM ANDAMENTO'
-    elif 'PROGRAM' in status or 'NOVO' in status or 'AUTORIZAR' in status or 'CAB' in status or 'AVALIAR' in status:
-        return 'PENDENTE'
-    else:
-        return 'OUTROS'
-
-def load_all_gmuds():
-    all_data = []
-    for sheet in MONTHLY_SHEETS:
-        try:
-            df = pd.read_excel(FILE_PATH, sheet_name=sheet, engine='openpyxl')
-            col_mapping = {}
-            for col in df.columns:
-                col_lower = str(col).lower().strip()
-                if 'status' in col_lower and 'gmud' in col_lower:
-                    col_mapping[col] = 'Status'
-                elif col_lower == 'gmud':
-                    col_mapping[col] = 'GMUD_ID'
-                elif 'título' in col_lower or 'titulo' in col_lower:
-                    col_mapping[col] = 'Titulo'
-                elif 'data' in col_lower and 'início' in col_lower:
-                    col_mapping[col] = 'Data_Inicio'
-                elif 'entorno' in col_lower:
-                    col_mapping[col] = 'Entorno'
-                elif 'designado' in col_lower:
-                    col_mapping[col] = 'Responsavel'
-            
-            df = df.rename(columns=col_mapping)
-            df['Mes'] = sheet.replace('-25', '')
-            
-            if 'GMUD_ID' in df.columns:
-                df = df[df['GMUD_ID'].notna()]
-                df = df[df['GMUD_ID'].astype(str).str.contains('CHG', case=False, na=False)]
-            
-            all_data.append(df)
-        except Exception as e:
-            print(f"Erro em {sheet}: {e}")
-    
-    return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
-
-def generate_executive_report(df):
-    # Enrich data
-    df['Status_Final'] = df['Status'].apply(normalize_status)
-    df['Hostnames'] = df['Titulo'].apply(extract_hostnames)
-    df['Num_Servers'] = df['Hostnames'].apply(len)
+def generate_executive_report(artefato):
+    # Cálculo fica em cmdb/oraex/metricas_2025.py; aqui só se renderiza o artefato (todas as GMUDs, não só PSU)
+    cubo = artefato.tabela('cubo')
+    status_counts = cubo.groupby('Status_Final', observed=True)['GMUDs'].sum()
+    status_counts = status_counts[status_counts > 0].sort_values(ascending=False)
     
     # Metrics
-    total_gmuds = len(df)
-    sucesso = len(df[df['Status_Final'] == 'SUCESSO'])
-    canceladas = len(df[df['Status_Final'] == 'CANCELADA'])
-    replanejadas = len(df[df['Status_Final'] == 'REPLANEJADA'])
-    insucesso = len(df[df['Status_Final'] == 'INSUCESSO'])
-    pendentes = len(df[df['Status_Final'] == 'PENDENTE'])
+    total_gmuds = int(status_counts.sum())
+    sucesso = int(status_counts.get('SUCESSO', 0))
+    canceladas = int(status_counts.get('CANCELADA', 0))
+    replanejadas = int(status_counts.get('REPLANEJADA', 0))
+    insucesso = int(status_counts.get('INSUCESSO', 0))
     
-    all_hosts = []
-    for h in df['Hostnames']:
-        all_hosts.extend(h)
-    unique_servers = len(set(all_hosts))
-    total_updates = len(all_hosts)
+    historico = HistoricoPatches(artefato.tabela('historico'))
+    unique_servers = historico.servidores_unicos()
+    total_updates = historico.atualizacoes()
     
     success_rate = (sucesso / total_gmuds * 100) if total_gmuds > 0 else 0
     
     # Monthly chart data
-    monthly_status = df.groupby(['Mes', 'Status_Final']).size().unstack(fill_value=0)
-    monthly_status = monthly_status.reindex(MONTH_ORDER)
+    monthly_status = cubo.pivot_table(index='Mes', columns='Status_Final', values='GMUDs',
+                                      aggfunc='sum', fill_value=0, observed=True)
+    monthly_status = monthly_status.reindex(MESES)
     
     # Create charts
     # Chart 1: Status Distribution (Donut)
-    status_counts = df['Status_Final'].value_counts()
     colors_map = {
         'SUCESSO': '#22c55e', 'CANCELADA': '#ef4444', 'REPLANEJADA': '#f59e0b',
         'INSUCESSO': '#dc2626', 'PENDENTE': '#6b7280', 'EM ANDAMENTO': '#3b82f6', 'OUTROS': '#9ca3af'
@@ -409,10 +343,9 @@ def generate_executive_report(df):
 """
     
     # Add monthly rows
-    monthly_summary = df.groupby('Mes')['Status_Final'].value_counts().unstack(fill_value=0)
-    for mes in MONTH_ORDER:
-        if mes in monthly_summary.index:
-            row = monthly_summary.loc[mes]
+    for mes in MESES:
+        if mes in monthly_status.index and monthly_status.loc[mes].sum() > 0:
+            row = monthly_status.loc[mes]
             total_mes = row.sum()
             suc = row.get('SUCESSO', 0)
             rep = row.get('REPLANEJADA', 0)
@@ -454,13 +387,8 @@ def generate_executive_report(df):
         f.write(html)
     
     print(f"✅ Relatório HTML gerado: {OUTPUT_HTML}")
-    return df
 
 if __name__ == "__main__":
     print("Carregando dados...")
-    df = load_all_gmuds()
-    if not df.empty:
-        generate_executive_report(df)
-        print("\n🎯 Para converter em PDF, abra o HTML no navegador e use Ctrl+P > Salvar como PDF")
-    else:
-        print("Erro: Nenhum dado encontrado!")
+    generate_executive_report(obter_artefato(FILE_PATH))
+    print("\n🎯 Para converter em PDF, abra o HTML no navegador e use Ctrl+P > Salvar como PDF")
@@ -1,6 +1,12 @@
 import pandas as pd
 import re
 from collections import Counter
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex.conjuntos import UniversoHosts
+from oraex.hosts import IndiceHosts
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 
@@ -9,15 +15,6 @@ MONTHLY_SHEETS = [
     'JULHO-25', 'AGOSTO-25', 'SETEMBRO-25', 'OUTUBRO-25', 'NOVEMBRO-25', 'DEZEMBRO-25'
 ]
 
-def extract_hostnames(title):
-    """Extract GNCAS... hostnames from GMUD title"""
-    if pd.isna(title):
-        return []
-    # Pattern: GNCAS followed by alphanumeric characters
-    pattern = r'(gncas[a-z0-9]+)'
-    matches = re.findall(pattern, str(title).lower())
-    return [m.upper() for m in matches]
-
 def normalize_status(status):
     """Normalize status values"""
     if pd.isna(status):
@@ -92,8 +89,12 @@ def generate_metrics(df):
     df['Status_Normalizado'] = df['Status'].apply(normalize_status)
     
     # Extract hostnames
-    df['Hostnames'] = df['Titulo'].apply(extract_hostnames)
+    indice_hosts = IndiceHosts.da_planilha(FILE_PATH)
+    df['Hostnames'] = indice_hosts.extrair_serie(df['Titulo'])
     df['Num_Servidores'] = df['Hostnames'].apply(len)
+    fora = indice_hosts.fora_do_inventario(df['Hostnames'])
+    if len(fora):
+        print(f"\n⚠️ {len(fora)} host(s) citado(s) nas GMUDs fora do inventário (contados): {', '.join(fora.index)}")
     
     # Basic counts
     total_gmuds = len(df)
@@ -107,11 +108,9 @@ def generate_metrics(df):
         print(f"   {status}: {count} ({pct:.1f}%)")
     
     # Unique servers
-    all_hostnames = []
-    for hosts in df['Hostnames']:
-        all_hostnames.extend(hosts)
-    unique_servers = len(set(all_hostnames))
-    total_server_updates = len(all_hostnames)
+    todos_hosts = df['Hostnames'].explode().dropna()
+    unique_servers = len(UniversoHosts(todos_hosts))
+    total_server_updates = int(df['Num_Servidores'].sum())
     
     print(f"\n🖥️ SERVIDORES:")
     print(f"   Servidores únicos atualizados: {unique_servers}")
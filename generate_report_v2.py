@@ -2,182 +2,42 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex.metricas_2025 import obter_artefato
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 OUTPUT_HTML = r"D:\antigravity\oraex\cmdb\relatorio_psu_2025_v2.html"
 
-MONTHLY_SHEETS = [
-    'FEVEREIRO-25', 'MARÇO-25', 'ABRIL-25', 'MAIO-25', 'JUNHO-25',
-    'JULHO-25', 'AGOSTO-25', 'SETEMBRO-25', 'OUTUBRO-25', 'NOVEMBRO-25', 'DEZEMBRO-25'
-]
-
-MONTH_ORDER = ['FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO', 'JULHO', 
-               'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
-
-ENTORNO_MAP = {
-    'P': 'Produção',
-    'H': 'Homologação', 
-    'D': 'Desenvolvimento',
-    'T': 'Transacional'
-}
-
-def extract_hostnames(title):
-    if pd.isna(title):
-        return []
-    pattern = r'(gncas[a-z0-9]+)'
-    matches = re.findall(pattern, str(title).lower())
-    return [m.upper() for m in matches]
-
-def extract_psu_version(title):
-    """Extrai versão PSU do título (ex: 19.25, 19.27, 19.28)"""
-    if pd.isna(title):
-        return None
-    # Padrões: PSU 19.25, PSU 19.27, 19c, etc
-    pattern = r'PSU\s*(19[.\d]+)'
-    match = re.search(pattern, str(title), re.IGNORECASE)
-    if match:
-        return match.group(1)
-    # Tentar padrão alternativo
-    pattern2 = r'19\.(\d+)'
-    match2 = re.search(pattern2, str(title))
-    if match2:
-        return f"19.{match2.group(1)}"
-    return None
-
-def normalize_status(status):
-    if pd.isna(status):
-        return 'DESCONHECIDO'
-    status = str(status).strip().upper()
-    if 'ENCERRADA' in status or 'FECHADA' in status or '✅' in status:
-        return 'SUCESSO'
-    elif 'CANCELADA' in status or '❌' in status or 'CANCELAR' in status:
-        return 'CANCELADA'
-    elif 'REPLANEJAR' in status or '🔄' in status or 'REAGENDADA' in status:
-        return 'REPLANEJADA'
-    elif 'INSUCESSO' in status:
-        return 'INSUCESSO'
-    elif 'ANDAMENTO' in status or 'EXECUÇÃO' in status or 'IMPLEMENT' in status:
-        return 'EM ANDAMENTO'
-    elif 'PROGRAM' in status or 'NOVO' in status or 'AUTORIZAR' in status or 'CAB' in status or 'AVALIAR' in status:
-        return 'PENDENTE'
-    else:
-        return 'OUTROS'
-
-def normalize_responsavel(resp):
-    """Normaliza nomes de responsáveis"""
-    if pd.isna(resp):
-        return 'Não Atribuído'
-    resp = str(resp).strip().title()
-    # Unificar variações
-    if 'Guilherme' in resp:
-        return 'Guilherme Fonseca'
-    if 'Bruno' in resp:
-        return 'Bruno Ferreira'
-    if 'Alcides' in resp:
-        return 'Alcides Souto'
-    if 'Kaue' in resp:
-        return 'Kaue Santos'
-    if 'Rafael' in resp:
-        return 'Rafael Rabello'
-    if 'Luca' in resp:
-        return 'Luca Mozart'
-    if 'Jonathan' in resp:
-        return 'Jonathan Ferreira'
-    return resp
-
-def load_all_gmuds():
-    all_data = []
-    for sheet in MONTHLY_SHEETS:
-        try:
-            df = pd.read_excel(FILE_PATH, sheet_name=sheet, engine='openpyxl')
-            col_mapping = {}
-            for col in df.columns:
-                col_lower = str(col).lower().strip()
-                if 'status' in col_lower and 'gmud' in col_lower:
-                    col_mapping[col] = 'Status'
-                elif col_lower == 'gmud':
-                    col_mapping[col] = 'GMUD_ID'
-                elif 'título' in col_lower or 'titulo' in col_lower:
-                    col_mapping[col] = 'Titulo'
-                elif 'entorno' in col_lower:
-                    col_mapping[col] = 'Entorno'
-                elif 'designado' in col_lower or 'responsável' in col_lower or 'responsavel' in col_lower:
-                    col_mapping[col] = 'Responsavel'
-            
-            df = df.rename(columns=col_mapping)
-            df['Mes'] = sheet.replace('-25', '')
-            
-            if 'GMUD_ID' in df.columns:
-                df = df[df['GMUD_ID'].notna()]
-                df = df[df['GMUD_ID'].astype(str).str.contains('CHG', case=False, na=False)]
-            
-            all_data.append(df)
-        except Exception as e:
-            print(f"Erro em {sheet}: {e}")
-    
-    return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
-
-def generate_report_v2(df):
+def generate_report_v2(artefato):
     print("Processando dados...")
-    
-    # Enriquecer dados
-    df['Status_Final'] = df['Status'].apply(normalize_status)
-    df['Hostnames'] = df['Titulo'].apply(extract_hostnames)
-    df['Num_Servers'] = df['Hostnames'].apply(len)
-    df['Versao_PSU'] = df['Titulo'].apply(extract_psu_version)
-    df['Responsavel_Norm'] = df['Responsavel'].apply(normalize_responsavel)
-    df['Entorno_Nome'] = df['Entorno'].map(ENTORNO_MAP).fillna('Outros')
-    df['Is_PSU'] = df['Titulo'].str.contains('PSU', case=False, na=False)
-    
-    # Filtrar apenas GMUDs de PSU
-    df_psu = df[df['Is_PSU']].copy()
+    # Cálculo fica em cmdb/oraex/metricas_2025.py; aqui só se renderiza o artefato
     
     # =============== MÉTRICAS GERAIS ===============
-    total_gmuds = len(df)
-    total_psu = len(df_psu)
-    
-    sucesso_total = len(df[df['Status_Final'] == 'SUCESSO'])
-    sucesso_psu = len(df_psu[df_psu['Status_Final'] == 'SUCESSO'])
+    kpis = artefato.metricas['gmud']
+    total_psu, sucesso_psu = kpis['total'], kpis['sucesso']
     
     # Servidores
-    all_hosts = []
-    for h in df_psu[df_psu['Status_Final'] == 'SUCESSO']['Hostnames']:
-        all_hosts.extend(h)
-    unique_servers_success = len(set(all_hosts))
-    total_updates_success = len(all_hosts)
+    unique_servers_success = kpis['servidores_unicos']
+    total_updates_success = kpis['atualizacoes']
     
-    # Horas trabalhadas (3h por servidor com sucesso)
-    horas_totais = total_updates_success * 3
+    # Horas de janela agendada das GMUDs com sucesso (não horas trabalhadas, ver oraex/duracao.py)
+    horas_totais = kpis['horas_totais']
     
     # =============== POR VERSÃO PSU ===============
-    versao_stats = df_psu.groupby('Versao_PSU').agg({
-        'GMUD_ID': 'count',
-        'Status_Final': lambda x: (x == 'SUCESSO').sum()
-    }).reset_index()
-    versao_stats.columns = ['Versao', 'Total', 'Sucesso']
-    versao_stats = versao_stats.dropna(subset=['Versao'])
-    versao_stats = versao_stats.sort_values('Versao')
+    versao_stats = artefato.tabela('versoes')
     
     # =============== POR ENTORNO ===============
-    entorno_stats = df_psu.groupby(['Entorno', 'Status_Final']).size().unstack(fill_value=0)
+    entorno_totals = artefato.tabela('entornos').set_index('Entorno')['GMUDs']
     
     # =============== POR EXECUTOR ===============
-    executor_stats = df_psu.groupby('Responsavel_Norm').agg({
-        'GMUD_ID': 'count',
-        'Status_Final': lambda x: (x == 'SUCESSO').sum(),
-        'Num_Servers': 'sum'
-    }).reset_index()
-    executor_stats.columns = ['Executor', 'Total_GMUDs', 'Sucesso', 'Servidores']
+    executor_stats = artefato.tabela('executores')
     executor_stats['Insucesso'] = executor_stats['Total_GMUDs'] - executor_stats['Sucesso']
-    executor_stats['Taxa_Sucesso'] = (executor_stats['Sucesso'] / executor_stats['Total_GMUDs'] * 100).round(1)
-    executor_stats['Horas_Estimadas'] = executor_stats['Servidores'] * 3
-    executor_stats = executor_stats.sort_values('Total_GMUDs', ascending=False)
-    executor_stats = executor_stats[executor_stats['Executor'] != 'Não Atribuído'].head(10)
     
     # =============== POR MÊS ===============
-    monthly_psu = df_psu.groupby(['Mes', 'Status_Final']).size().unstack(fill_value=0)
-    monthly_psu = monthly_psu.reindex(MONTH_ORDER)
+    monthly_psu = artefato.tabela('mensal').set_index('Mes')
     
     # =============== GRÁFICOS ===============
     # Chart 1: Versões PSU (Treemap)
@@ -195,9 +55,8 @@ def generate_report_v2(df):
     fig_versao.update_coloraxes(showscale=False)
     
     # Chart 2: Entorno (Donut)
-    entorno_totals = df_psu['Entorno'].value_counts()
     fig_entorno = go.Figure(data=[go.Pie(
-        labels=[ENTORNO_MAP.get(e, e) for e in entorno_totals.index],
+        labels=entorno_totals.index,
         values=entorno_totals.values,
         hole=0.6,
         marker_colors=['#ef4444', '#f59e0b', '#22c55e', '#3b82f6']
@@ -376,7 +235,7 @@ def generate_report_v2(df):
             <h3>📋 Resumo Executivo</h3>
             <p>Durante o ano de 2025, a equipe Oraex executou <strong>{total_psu:,} GMUDs de atualização PSU Oracle</strong>, 
             resultando em <strong>{unique_servers_success:,} servidores únicos atualizados com sucesso</strong>. 
-            O esforço total estimado foi de <strong>{horas_totais:,} horas de trabalho técnico</strong>.</p>
+            As janelas agendadas dessas GMUDs somam <strong>{horas_totais:,} horas</strong> (duração da janela, não horas efetivamente trabalhadas).</p>
         </div>
         
         <!-- KPIs PRINCIPAIS -->
@@ -403,7 +262,7 @@ def generate_report_v2(df):
             </div>
             <div class="kpi-card yellow">
                 <div class="kpi-value">{horas_totais:,}h</div>
-                <div class="kpi-label">Horas Trabalhadas</div>
+                <div class="kpi-label">Horas de Janela</div>
                 <div class="kpi-sub">Estimativa (3h/servidor)</div>
             </div>
         </div>
@@ -465,21 +324,21 @@ def generate_report_v2(df):
                             <div style="width: 40px; height: 40px; background: #ef4444; border-radius: 8px; display: flex; align-items: center; justify-content: center; font-weight: bold;">P</div>
                             <div>
                                 <div style="font-weight: 600;">Produção</div>
-                                <div style="color: #94a3b8; font-size: 0.85rem;">{len(df_psu[df_psu['Entorno'] == 'P'])} GMUDs - Ambiente crítico/transacional</div>
+                                <div style="color: #94a3b8; font-size: 0.85rem;">{kpis['entorno_prod']} GMUDs - Ambiente crítico/transacional</div>
                             </div>
                         </div>
                         <div style="display: flex; align-items: center; gap: 15px;">
                             <div style="width: 40px; height: 40px; background: #f59e0b; border-radius: 8px; display: flex; align-items: center; justify-content: center; font-weight: bold;">H</div>
                             <div>
                                 <div style="font-weight: 600;">Homologação</div>
-                                <div style="color: #94a3b8; font-size: 0.85rem;">{len(df_psu[df_psu['Entorno'] == 'H'])} GMUDs - Ambiente de testes</div>
+                                <div style="color: #94a3b8; font-size: 0.85rem;">{kpis['entorno_hml']} GMUDs - Ambiente de testes</div>
                             </div>
                         </div>
                         <div style="display: flex; align-items: center; gap: 15px;">
                             <div style="width: 40px; height: 40px; background: #22c55e; border-radius: 8px; display: flex; align-items: center; justify-content: center; font-weight: bold;">D</div>
                             <div>
                                 <div style="font-weight: 600;">Desenvolvimento</div>
-                                <div style="color: #94a3b8; font-size: 0.85rem;">{len(df_psu[df_psu['Entorno'] == 'D'])} GMUDs - Ambiente de dev</div>
+                                <div style="color: #94a3b8; font-size: 0.85rem;">{kpis['entorno_dev']} GMUDs - Ambiente de dev</div>
                             </div>
                         </div>
                     </div>
@@ -507,7 +366,7 @@ def generate_report_v2(df):
                     <h4 style="margin-bottom: 15px; color: #cbd5e1;">Ranking de Executores</h4>
                     <table>
                         <thead>
-                            <tr><th>Executor</th><th>GMUDs</th><th>✅</th><th>❌</th><th>Taxa</th><th>Horas</th></tr>
+                            <tr><th>Executor</th><th>GMUDs</th><th>✅</th><th>❌</th><th>Taxa</th><th title="Soma das janelas agendadas, não horas trabalhadas">Horas de janela</th></tr>
                         </thead>
                         <tbody>
 """
@@ -519,8 +378,8 @@ def generate_report_v2(df):
                                 <td>{int(row['Total_GMUDs'])}</td>
                                 <td><span class="badge green">{int(row['Sucesso'])}</span></td>
                                 <td><span class="badge red">{int(row['Insucesso'])}</span></td>
-                                <td>{row['Taxa_Sucesso']:.0f}%</td>
-                                <td>{int(row['Horas_Estimadas'])}h</td>
+                                <td>{row['Taxa']:.0f}%</td>
+                                <td>{int(row['Horas'])}h</td>
                             </tr>
 """
     
@@ -552,12 +411,9 @@ def generate_report_v2(df):
         f.write(html)
     
     print(f"\n✅ Relatório V2 gerado: {OUTPUT_HTML}")
-    return df_psu
 
 if __name__ == "__main__":
     print("="*60)
     print("GERANDO RELATÓRIO PSU 2025 - VERSÃO DETALHADA")
     print("="*60)
-    df = load_all_gmuds()
-    if not df.empty:
-        generate_report_v2(df)
+    generate_report_v2(obter_artefato(FILE_PATH))
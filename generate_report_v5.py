@@ -1,21 +1,17 @@
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-import re
 import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex.metricas_2025 import obter_artefato
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 LOGO_PATH = r"D:\antigravity\oraex\cmdb\oraex_logo.png"
 OUTPUT_HTML = r"D:\antigravity\oraex\cmdb\relatorio_psu_2025_v5_oraex.html"
 
-MONTHLY_SHEETS = [
-    'FEVEREIRO-25', 'MARÇO-25', 'ABRIL-25', 'MAIO-25', 'JUNHO-25',
-    'JULHO-25', 'AGOSTO-25', 'SETEMBRO-25', 'OUTUBRO-25', 'NOVEMBRO-25', 'DEZEMBRO-25'
-]
-
-MONTH_ORDER = ['FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO', 'JULHO', 
-               'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
-
 # Converter logo para base64 para embutir no HTML
 def get_logo_base64():
     try:
@@ -24,117 +20,28 @@ def get_logo_base64():
     except:
         return None
 
-def extract_hostnames(title):
-    if pd.isna(title): return []
-    return [m.upper() for m in re.findall(r'(gncas[a-z0-9]+)', str(title).lower())]
-
-def extract_psu_version(title):
-    if pd.isna(title): return None
-    match = re.search(r'PSU\s*(19[.\d]+)', str(title), re.IGNORECASE)
-    if match: return match.group(1)
-    match2 = re.search(r'19\.(\d+)', str(title))
-    if match2: return f"19.{match2.group(1)}"
-    return None
-
-def normalize_status(status):
-    if pd.isna(status): return 'DESCONHECIDO'
-    status = str(status).strip().upper()
-    if 'ENCERRADA' in status or 'FECHADA' in status or '✅' in status: return 'SUCESSO'
-    elif 'CANCELADA' in status or '❌' in status or 'CANCELAR' in status: return 'CANCELADA'
-    elif 'REPLANEJAR' in status or '🔄' in status or 'REAGENDADA' in status: return 'REPLANEJADA'
-    elif 'INSUCESSO' in status: return 'INSUCESSO'
-    return 'OUTROS'
-
-def normalize_responsavel(resp):
-    if pd.isna(resp): return 'Não Atribuído'
-    resp = str(resp).strip().title()
-    if 'Guilherme' in resp: return 'Guilherme Fonseca'
-    if 'Bruno' in resp: return 'Bruno Ferreira'
-    if 'Alcides' in resp: return 'Alcides Souto'
-    if 'Kaue' in resp: return 'Kaue Santos'
-    if 'Rafael' in resp: return 'Rafael Rabello'
-    if 'Luca' in resp: return 'Luca Mozart'
-    if 'Jonathan' in resp: return 'Jonathan Ferreira'
-    return resp
-
-def load_all_gmuds():
-    all_data = []
-    for sheet in MONTHLY_SHEETS:
-        try:
-            df = pd.read_excel(FILE_PATH, sheet_name=sheet, engine='openpyxl')
-            col_mapping = {}
-            for col in df.columns:
-                col_lower = str(col).lower().strip()
-                if 'status' in col_lower and 'gmud' in col_lower: col_mapping[col] = 'Status'
-                elif col_lower == 'gmud': col_mapping[col] = 'GMUD_ID'
-                elif 'título' in col_lower or 'titulo' in col_lower: col_mapping[col] = 'Titulo'
-                elif 'entorno' in col_lower: col_mapping[col] = 'Entorno'
-                elif 'designado' in col_lower or 'responsável' in col_lower or 'responsavel' in col_lower: col_mapping[col] = 'Responsavel'
-            df = df.rename(columns=col_mapping)
-            df['Mes'] = sheet.replace('-25', '')
-            if 'GMUD_ID' in df.columns:
-                df = df[df['GMUD_ID'].notna()]
-                df = df[df['GMUD_ID'].astype(str).str.contains('CHG', case=False, na=False)]
-            all_data.append(df)
-        except: pass
-    return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
-
-def generate_oraex_blue_report(df):
+def generate_oraex_blue_report(artefato):
     print("Processando dados...")
     
     logo_b64 = get_logo_base64()
     
-    df['Status_Final'] = df['Status'].apply(normalize_status)
-    df['Hostnames'] = df['Titulo'].apply(extract_hostnames)
-    df['Num_Servers'] = df['Hostnames'].apply(len)
-    df['Versao_PSU'] = df['Titulo'].apply(extract_psu_version)
-    df['Responsavel_Norm'] = df['Responsavel'].apply(normalize_responsavel)
-    df['Is_PSU'] = df['Titulo'].str.contains('PSU', case=False, na=False)
-    
-    df_psu = df[df['Is_PSU']].copy()
+    # Cálculo fica em cmdb/oraex/metricas_2025.py; aqui só se renderiza o artefato
+    kpis = artefato.metricas['gmud']
     
     # Métricas
-    total_psu = len(df_psu)
-    sucesso_psu = len(df_psu[df_psu['Status_Final'] == 'SUCESSO'])
-    canceladas = len(df_psu[df_psu['Status_Final'] == 'CANCELADA'])
-    replanejadas = len(df_psu[df_psu['Status_Final'] == 'REPLANEJADA'])
-    
-    all_hosts = []
-    for h in df_psu[df_psu['Status_Final'] == 'SUCESSO']['Hostnames']:
-        all_hosts.extend(h)
-    unique_servers = len(set(all_hosts))
-    total_updates = len(all_hosts)
-    horas_totais = total_updates * 3
-    taxa_sucesso = sucesso_psu / total_psu * 100 if total_psu > 0 else 0
+    total_psu, sucesso_psu = kpis['total'], kpis['sucesso']
+    unique_servers = kpis['servidores_unicos']
+    total_updates = kpis['atualizacoes']
+    horas_totais = kpis['horas_totais']
+    taxa_sucesso = kpis['taxa_sucesso']
     
     # Entornos
-    entorno_prod = len(df_psu[df_psu['Entorno'] == 'P'])
-    entorno_hml = len(df_psu[df_psu['Entorno'] == 'H'])
-    entorno_dev = len(df_psu[df_psu['Entorno'] == 'D'])
-    
-    # Versões
-    versao_stats = df_psu.groupby('Versao_PSU').agg({
-        'GMUD_ID': 'count',
-        'Status_Final': lambda x: (x == 'SUCESSO').sum()
-    }).reset_index()
-    versao_stats.columns = ['Versao', 'Total', 'Sucesso']
-    versao_stats = versao_stats.dropna(subset=['Versao']).sort_values('Versao')
-    
-    # Executores
-    executor_stats = df_psu.groupby('Responsavel_Norm').agg({
-        'GMUD_ID': 'count',
-        'Status_Final': lambda x: (x == 'SUCESSO').sum(),
-        'Num_Servers': 'sum'
-    }).reset_index()
-    executor_stats.columns = ['Executor', 'Total_GMUDs', 'Sucesso', 'Servidores']
-    executor_stats['Taxa'] = (executor_stats['Sucesso'] / executor_stats['Total_GMUDs'] * 100).round(1)
-    executor_stats['Horas'] = executor_stats['Servidores'] * 3
-    executor_stats = executor_stats.sort_values('Total_GMUDs', ascending=False)
-    executor_stats = executor_stats[executor_stats['Executor'] != 'Não Atribuído'].head(8)
+    entorno_prod, entorno_hml, entorno_dev = kpis['entorno_prod'], kpis['entorno_hml'], kpis['entorno_dev']
     
-    # Mensal
-    monthly_psu = df_psu.groupby(['Mes', 'Status_Final']).size().unstack(fill_value=0)
-    monthly_psu = monthly_psu.reindex(MONTH_ORDER)
+    # Versões, executores (top 8) e mensal
+    versao_stats = artefato.tabela('versoes')
+    executor_stats = artefato.tabela('executores')
+    monthly_psu = artefato.tabela('mensal').set_index('Mes')
     
     # Cor Azul Oraex (extraída da logo)
     oraex_blue = '#0000FF'
@@ -633,7 +540,7 @@ def generate_oraex_blue_report(df):
                 <div class="kpi-icon">⏱️</div>
                 <div class="kpi-value" data-count="{horas_totais}">{horas_totais:,}h</div>
                 <div class="kpi-label">Esforço</div>
-                <div class="kpi-sub">Horas trabalhadas</div>
+                <div class="kpi-sub">Horas de janela agendada</div>
             </div>
         </div>
         
@@ -733,7 +640,7 @@ def generate_oraex_blue_report(df):
                                 <th>Executor</th>
                                 <th>Total</th>
                                 <th>Taxa</th>
-                                <th>Horas</th>
+                                <th title="Soma das janelas agendadas, não horas trabalhadas">Horas de janela</th>
                             </tr>
                         </thead>
                         <tbody>
@@ -805,6 +712,4 @@ if __name__ == "__main__":
     print("="*60)
     print("GERANDO RELATÓRIO PSU 2025 - V5 ORAEX AZUL/BRANCO")
     print("="*60)
-    df = load_all_gmuds()
-    if not df.empty:
-        generate_oraex_blue_report(df)
+    generate_oraex_blue_report(obter_artefato(FILE_PATH))
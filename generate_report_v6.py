@@ -1,21 +1,19 @@
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-import re
 import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex.metricas_2025 import obter_artefato, PSU_ATUAL as LATEST_PSU
+from oraex.capacidade import HORAS_SEMANA
+from oraex.conformidade import ADOCAO_MINIMA
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 LOGO_PATH = r"D:\antigravity\oraex\cmdb\oraex_logo.png"
 OUTPUT_HTML = r"D:\antigravity\oraex\cmdb\relatorio_psu_2025_v6_completo.html"
 
-MONTHLY_SHEETS = [
-    'FEVEREIRO-25', 'MARÇO-25', 'ABRIL-25', 'MAIO-25', 'JUNHO-25',
-    'JULHO-25', 'AGOSTO-25', 'SETEMBRO-25', 'OUTUBRO-25', 'NOVEMBRO-25', 'DEZEMBRO-25'
-]
-MONTH_ORDER = ['FEVEREIRO', 'MARÇO', 'ABRIL', 'MAIO', 'JUNHO', 'JULHO', 'AGOSTO', 'SETEMBRO', 'OUTUBRO', 'NOVEMBRO', 'DEZEMBRO']
-LATEST_PSU = '19.29'
-QUARTERS_2025 = ['19.25', '19.26', '19.27', '19.28', '19.29']
-
 def get_logo_base64():
     try:
         with open(LOGO_PATH, "rb") as f:
@@ -23,174 +21,44 @@ def get_logo_base64():
     except:
         return None
 
-def extract_hostnames(title):
-    if pd.isna(title): return []
-    return [m.upper() for m in re.findall(r'(gncas[a-z0-9]+)', str(title).lower())]
-
-def extract_psu_version(title):
-    if pd.isna(title): return None
-    match = re.search(r'PSU\s*(19[.\d]+)', str(title), re.IGNORECASE)
-    if match: return match.group(1)
-    match2 = re.search(r'19\.(\d+)', str(title))
-    if match2: return f"19.{match2.group(1)}"
-    return None
-
-def normalize_status(status):
-    if pd.isna(status): return 'DESCONHECIDO'
-    status = str(status).strip().upper()
-    if 'ENCERRADA' in status or 'FECHADA' in status or '✅' in status: return 'SUCESSO'
-    elif 'CANCELADA' in status or '❌' in status or 'CANCELAR' in status: return 'CANCELADA'
-    elif 'REPLANEJAR' in status or '🔄' in status or 'REAGENDADA' in status: return 'REPLANEJADA'
-    elif 'INSUCESSO' in status: return 'INSUCESSO'
-    return 'OUTROS'
-
-def normalize_responsavel(resp):
-    if pd.isna(resp): return 'Não Atribuído'
-    resp = str(resp).strip().title()
-    names = {'Guilherme': 'Guilherme Fonseca', 'Bruno': 'Bruno Ferreira', 'Alcides': 'Alcides Souto',
-             'Kaue': 'Kaue Santos', 'Rafael': 'Rafael Rabello', 'Luca': 'Luca Mozart', 'Jonathan': 'Jonathan Ferreira'}
-    for key, val in names.items():
-        if key in resp: return val
-    return resp
-
-def load_gmuds():
-    all_data = []
-    for sheet in MONTHLY_SHEETS:
-        try:
-            df = pd.read_excel(FILE_PATH, sheet_name=sheet, engine='openpyxl')
-            col_mapping = {}
-            for col in df.columns:
-                col_lower = str(col).lower().strip()
-                if 'status' in col_lower and 'gmud' in col_lower: col_mapping[col] = 'Status'
-                elif col_lower == 'gmud': col_mapping[col] = 'GMUD_ID'
-                elif 'título' in col_lower or 'titulo' in col_lower: col_mapping[col] = 'Titulo'
-                elif 'entorno' in col_lower: col_mapping[col] = 'Entorno'
-                elif 'designado' in col_lower or 'responsável' in col_lower or 'responsavel' in col_lower: col_mapping[col] = 'Responsavel'
-            df = df.rename(columns=col_mapping)
-            df['Mes'] = sheet.replace('-25', '')
-            if 'GMUD_ID' in df.columns:
-                df = df[df['GMUD_ID'].notna()]
-                df = df[df['GMUD_ID'].astype(str).str.contains('CHG', case=False, na=False)]
-            all_data.append(df)
-        except: pass
-    return pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
-
-def load_inventory():
-    df = pd.read_excel(FILE_PATH, sheet_name='GetNet - Oracle Databases', engine='openpyxl')
-    df = df[df['PRIMARY HOSTNAME'].notna()]
-    
-    def get_situacao(val):
-        if pd.isna(val): return 'Desconhecido'
-        return 'Ativo' if 'Ativo' in str(val) else ('Descontinuado' if 'Descontinuado' in str(val) else str(val))
-    
-    def get_entorno(val):
-        if pd.isna(val): return 'Outros'
-        val = str(val).strip()
-        if 'Prod' in val: return 'Produção'
-        if 'Homolog' in val: return 'Homologação'
-        if 'Desenv' in val: return 'Desenvolvimento'
-        if 'Trans' in val: return 'Transacional'
-        return 'Outros'
-    
-    def get_psu(val):
-        if pd.isna(val): return None
-        val = str(val).strip()
-        if 'Descontinuado' in val: return 'Descontinuado'
-        match = re.search(r'19\.(\d+)', val)
-        return f"19.{match.group(1)}" if match else val
-    
-    def quarters_behind(version):
-        if version is None or version == 'Descontinuado': return None
-        try:
-            if version in QUARTERS_2025:
-                return QUARTERS_2025.index(LATEST_PSU) - QUARTERS_2025.index(version)
-            return 5
-        except: return None
-    
-    df['Situacao'] = df['SITUAÇÃO'].apply(get_situacao)
-    df['Entorno'] = df['ENVIROMENT'].apply(get_entorno)
-    df['PSU_Version'] = df['GRID/PSU VERSION'].apply(get_psu)
-    df['Quarters_Behind'] = df['PSU_Version'].apply(quarters_behind)
-    df['Hostname'] = df['PRIMARY HOSTNAME'].apply(lambda x: re.sub(r'[^\w]', '', str(x).split()[0]) if pd.notna(x) else '')
-    
-    return df
-
 def generate_complete_report():
-    print("Carregando dados...")
-    df_gmuds = load_gmuds()
-    df_inv = load_inventory()
+    print("Carregando métricas...")
+    # Cálculo fica em cmdb/oraex/metricas_2025.py; aqui só se renderiza o artefato
+    artefato = obter_artefato(FILE_PATH)
     logo_b64 = get_logo_base64()
     
     # ========== MÉTRICAS GMUDs ==========
-    df_gmuds['Status_Final'] = df_gmuds['Status'].apply(normalize_status)
-    df_gmuds['Hostnames'] = df_gmuds['Titulo'].apply(extract_hostnames)
-    df_gmuds['Num_Servers'] = df_gmuds['Hostnames'].apply(len)
-    df_gmuds['Versao_PSU'] = df_gmuds['Titulo'].apply(extract_psu_version)
-    df_gmuds['Responsavel_Norm'] = df_gmuds['Responsavel'].apply(normalize_responsavel)
-    df_gmuds['Is_PSU'] = df_gmuds['Titulo'].str.contains('PSU', case=False, na=False)
-    
-    df_psu = df_gmuds[df_gmuds['Is_PSU']].copy()
-    
-    total_psu = len(df_psu)
-    sucesso_psu = len(df_psu[df_psu['Status_Final'] == 'SUCESSO'])
-    canceladas_psu = len(df_psu[df_psu['Status_Final'] == 'CANCELADA'])
-    replanejadas_psu = len(df_psu[df_psu['Status_Final'] == 'REPLANEJADA'])
-    outras_psu = total_psu - sucesso_psu - canceladas_psu - replanejadas_psu
-    all_hosts = []
-    for h in df_psu[df_psu['Status_Final'] == 'SUCESSO']['Hostnames']:
-        all_hosts.extend(h)
-    unique_servers = len(set(all_hosts))
-    total_updates = len(all_hosts)
-    horas_totais = total_updates * 3
-    taxa_sucesso = sucesso_psu / total_psu * 100 if total_psu > 0 else 0
+    kpis = artefato.metricas['gmud']
+    total_psu, sucesso_psu = kpis['total'], kpis['sucesso']
+    canceladas_psu, replanejadas_psu, outras_psu = kpis['canceladas'], kpis['replanejadas'], kpis['outras']
+    unique_servers = kpis['servidores_unicos']
+    total_updates = kpis['atualizacoes']
+    horas_totais = kpis['horas_totais']
+    taxa_sucesso = kpis['taxa_sucesso']
     
     # Entornos GMUDs
-    entorno_prod_gmud = len(df_psu[df_psu['Entorno'] == 'P'])
-    entorno_hml_gmud = len(df_psu[df_psu['Entorno'] == 'H'])
-    entorno_dev_gmud = len(df_psu[df_psu['Entorno'] == 'D'])
-    
-    # Versões GMUDs
-    versao_stats = df_psu.groupby('Versao_PSU').agg({'GMUD_ID': 'count', 'Status_Final': lambda x: (x == 'SUCESSO').sum()}).reset_index()
-    versao_stats.columns = ['Versao', 'Total', 'Sucesso']
-    versao_stats = versao_stats.dropna(subset=['Versao']).sort_values('Versao')
+    entorno_prod_gmud, entorno_hml_gmud, entorno_dev_gmud = kpis['entorno_prod'], kpis['entorno_hml'], kpis['entorno_dev']
     
-    # Executores
-    executor_stats = df_psu.groupby('Responsavel_Norm').agg({'GMUD_ID': 'count', 'Status_Final': lambda x: (x == 'SUCESSO').sum(), 'Num_Servers': 'sum'}).reset_index()
-    executor_stats.columns = ['Executor', 'Total_GMUDs', 'Sucesso', 'Servidores']
-    executor_stats['Taxa'] = (executor_stats['Sucesso'] / executor_stats['Total_GMUDs'] * 100).round(1)
-    executor_stats['Horas'] = executor_stats['Servidores'] * 3
-    executor_stats = executor_stats.sort_values('Total_GMUDs', ascending=False)
-    executor_stats = executor_stats[executor_stats['Executor'] != 'Não Atribuído'].head(8)
-    
-    # Mensal
-    monthly_psu = df_psu.groupby(['Mes', 'Status_Final']).size().unstack(fill_value=0)
-    monthly_psu = monthly_psu.reindex(MONTH_ORDER)
+    versao_stats = artefato.tabela('versoes')
+    executor_stats = artefato.tabela('executores')
+    # Horas por executor × semana (janelas agendadas), para o heatmap de utilização
+    carga_executores = artefato.tabela('carga_executores')
+    monthly_psu = artefato.tabela('mensal').set_index('Mes')
     
     # ========== MÉTRICAS INVENTÁRIO ==========
-    # Usar coluna "Total Servidores" para contar PRIMARY + STANDBY corretamente
-    df_ativos = df_inv[df_inv['Situacao'] == 'Ativo'].copy()
-    
-    # Total real usando a coluna "Total Servidores" (inclui standby)
-    total_servidores = int(df_ativos['Total Servidores'].sum())
-    
-    # Para as versões, multiplicamos pela quantidade de servidores em cada linha
-    srv_atualizados = int(df_ativos[df_ativos['PSU_Version'] == LATEST_PSU]['Total Servidores'].sum())
-    srv_1q_atras = int(df_ativos[df_ativos['Quarters_Behind'] == 1]['Total Servidores'].sum())
-    srv_2q_atras = int(df_ativos[df_ativos['Quarters_Behind'] == 2]['Total Servidores'].sum())
-    srv_3q_mais = int(df_ativos[df_ativos['Quarters_Behind'] >= 3]['Total Servidores'].sum())
-    pct_atualizados = srv_atualizados / total_servidores * 100 if total_servidores > 0 else 0
-    
-    # Entornos inventário (usando Total Servidores)
-    inv_prod = int(df_ativos[df_ativos['Entorno'] == 'Produção']['Total Servidores'].sum())
-    inv_hml = int(df_ativos[df_ativos['Entorno'] == 'Homologação']['Total Servidores'].sum())
-    inv_dev = int(df_ativos[df_ativos['Entorno'] == 'Desenvolvimento']['Total Servidores'].sum())
-    inv_trans = int(df_ativos[df_ativos['Entorno'] == 'Transacional']['Total Servidores'].sum())
-    
-    # Versões inventário (usando Total Servidores para contar corretamente)
-    inv_versao = df_ativos.groupby('PSU_Version')['Total Servidores'].sum().sort_index()
-    
-    # Servidores críticos
-    criticos = df_ativos[df_ativos['Quarters_Behind'] >= 4][['Hostname', 'PSU_Version', 'Entorno']].head(10)
+    # "Servidores" conta PRIMARY + STANDBY a partir dos hostnames; versões e entornos são ponderados por ele
+    kpis_inv = artefato.metricas['inventario']
+    total_servidores = kpis_inv['total_servidores']
+    srv_atualizados = kpis_inv['atualizados']
+    srv_1q_atras, srv_2q_atras, srv_3q_mais = kpis_inv['atras_1q'], kpis_inv['atras_2q'], kpis_inv['atras_3q_mais']
+    pct_atualizados = kpis_inv['pct_atualizados']
+    inv_prod, inv_hml, inv_dev, inv_trans = kpis_inv['prod'], kpis_inv['hml'], kpis_inv['dev'], kpis_inv['trans']
+    
+    inv_versao = artefato.tabela('inv_versao').set_index('Versao')['Servidores']
+    criticos = artefato.tabela('criticos')
+    # % semanal de hosts no RU mais recente, reconstruído do histórico de GMUDs
+    conformidade = artefato.tabela('conformidade').set_index('Semana')
+    cobertura = artefato.tabela('cobertura')
     
     # ===== GRÁFICOS =====
     oraex_blue = '#0000FF'
@@ -244,6 +112,19 @@ def generate_complete_report():
         xaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.06)'), yaxis=dict(showgrid=False),
         legend=dict(orientation="h", y=1.08, x=0.5, xanchor='center'), margin=dict(l=130, t=40, b=30), bargap=0.25)
     
+    # Heatmap de utilização semanal (% das horas da semana), executores na ordem do ranking
+    utilizacao = carga_executores.pivot_table(index='Executor', columns='Semana', values='Utilizacao', fill_value=0)
+    utilizacao = utilizacao.reindex(executor_stats['Executor'].head(6)).fillna(0)
+    fig_carga = go.Figure(go.Heatmap(
+        z=utilizacao.to_numpy(), x=utilizacao.columns, y=utilizacao.index,
+        colorscale=[[0, '#F3F4F6'], [0.5, '#93C5FD'], [1, oraex_blue]], zmin=0, zmax=100,
+        colorbar=dict(title='%', thickness=12),
+        hovertemplate='%{y}<br>Semana de %{x|%d/%m}: %{z:.0f}%<extra></extra>'
+    ))
+    fig_carga.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#374151', family='Inter'), height=300,
+        xaxis=dict(showgrid=False), yaxis=dict(showgrid=False, autorange='reversed'), margin=dict(l=130, t=20, b=40))
+    
     # Gráfico inventário por versão
     fig_inv_versao = go.Figure()
     versions = []
@@ -278,6 +159,21 @@ def generate_complete_report():
     fig_inv_entorno.update_layout(paper_bgcolor='rgba(0,0,0,0)', font=dict(color='#374151', family='Inter'),
         height=300, margin=dict(t=20, b=20, l=20, r=20), showlegend=False)
     
+    # Tendência de conformidade (linha por ambiente + total)
+    fig_conformidade = go.Figure()
+    cores_conformidade = {'Produção': oraex_blue, 'Homologação': '#60A5FA', 'Desenvolvimento': '#93C5FD',
+                          'Transacional': '#A5B4FC', 'Total': '#10B981'}
+    for entorno, cor in cores_conformidade.items():
+        if entorno in conformidade.columns:
+            fig_conformidade.add_trace(go.Scatter(
+                x=conformidade.index, y=conformidade[entorno], name=entorno, mode='lines',
+                line=dict(color=cor, width=3 if entorno == 'Total' else 1.5)
+            ))
+    fig_conformidade.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#374151', family='Inter'), height=320,
+        xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor='rgba(0,0,0,0.06)', title='% no RU alvo', range=[0, 100]),
+        legend=dict(orientation="h", y=1.12, x=0.5, xanchor='center'), margin=dict(t=50, b=40))
+    
     logo_html = f'<img src="data:image/png;base64,{logo_b64}" alt="ORAEX" class="logo-img">' if logo_b64 else '<span class="logo-text">ORAEX</span>'
     
     # ===== HTML =====
@@ -424,7 +320,7 @@ def generate_complete_report():
             <div class="kpi-card"><div class="kpi-icon">✅</div><div class="kpi-value">{sucesso_psu:,}</div><div class="kpi-label">Concluídas</div><div class="kpi-sub">{taxa_sucesso:.1f}% de sucesso</div></div>
             <div class="kpi-card"><div class="kpi-icon">🖥️</div><div class="kpi-value">{unique_servers:,}</div><div class="kpi-label">Servidores</div><div class="kpi-sub">Hosts únicos</div></div>
             <div class="kpi-card"><div class="kpi-icon">🔄</div><div class="kpi-value">{total_updates:,}</div><div class="kpi-label">Atualizações</div><div class="kpi-sub">Total intervenções</div></div>
-            <div class="kpi-card"><div class="kpi-icon">⏱️</div><div class="kpi-value">{horas_totais:,}h</div><div class="kpi-label">Esforço</div><div class="kpi-sub">Horas trabalhadas</div></div>
+            <div class="kpi-card"><div class="kpi-icon">⏱️</div><div class="kpi-value">{horas_totais:,}h</div><div class="kpi-label">Esforço</div><div class="kpi-sub">Janela agendada, não horas trabalhadas</div></div>
         </div>
         
         <section class="section">
@@ -453,15 +349,16 @@ def generate_complete_report():
             <div class="two-col">
                 <div class="card"><div class="card-title">GMUDs por Executor</div><div id="chart-executor"></div></div>
                 <div class="card"><div class="card-title">Ranking Detalhado</div>
-                    <table><thead><tr><th>Executor</th><th>Total</th><th>Taxa</th><th>Horas</th></tr></thead><tbody>
+                    <table><thead><tr><th>Executor</th><th>Total</th><th>Taxa</th><th title="Soma das janelas agendadas, não horas trabalhadas">Horas de janela</th><th>Pico/sem</th><th>Noturno</th></tr></thead><tbody>
 """
     for _, row in executor_stats.head(6).iterrows():
-        html += f'<tr><td><strong>{row["Executor"]}</strong></td><td>{int(row["Total_GMUDs"])}</td><td><span class="badge blue">{row["Taxa"]:.0f}%</span></td><td style="color: var(--text-gray);">{int(row["Horas"])}h</td></tr>'
+        html += f'<tr><td><strong>{row["Executor"]}</strong></td><td>{int(row["Total_GMUDs"])}</td><td><span class="badge blue">{row["Taxa"]:.0f}%</span></td><td style="color: var(--text-gray);">{int(row["Horas"])}h</td><td style="color: var(--text-gray);">{row["Horas_Pico"]:.0f}h</td><td style="color: var(--text-gray);">{row["Pct_Noturno"]:.0f}%</td></tr>'
     
     html += f"""
                     </tbody></table>
                 </div>
             </div>
+            <div class="card"><div class="card-title">Utilização semanal por executor (% de {HORAS_SEMANA}h por semana)</div><div id="chart-carga"></div></div>
         </section>
         
         <hr class="section-divider">
@@ -510,6 +407,31 @@ def generate_complete_report():
                 <div class="card"><div class="card-title">Servidores por Ambiente</div><div id="chart-inv-entorno"></div></div>
             </div>
         </section>
+        
+        <section class="section">
+            <div class="section-header"><div class="section-line"></div><h2 class="section-title">Evolução da Conformidade</h2></div>
+            <div class="card"><div class="card-title">% de servidores no RU alvo (o mais novo já presente em {ADOCAO_MINIMA:.0%} da frota), semana a semana</div><div id="chart-conformidade"></div></div>
+        </section>
+"""
+    
+    if len(cobertura) > 0:
+        html += """
+        <section class="section">
+            <div class="section-header"><div class="section-line"></div><h2 class="section-title">Cobertura de Patches por Ambiente</h2></div>
+            <div class="card">
+                <table>
+                    <thead><tr><th>Ambiente</th><th>Servidores</th><th>Q1</th><th>Q2</th><th>Q3</th><th>Q4</th><th>Atualizados no Ano</th><th>Nunca Atualizados</th><th>% Coberto</th></tr></thead>
+                    <tbody>
+"""
+        for _, row in cobertura.iterrows():
+            html += (f'<tr><td><strong>{row["Entorno"]}</strong></td><td>{row["Hosts"]}</td>'
+                     + ''.join(f'<td>{row[t]}</td>' for t in ['Q1', 'Q2', 'Q3', 'Q4'])
+                     + f'<td>{row["Atualizados"]}</td><td>{row["Nunca"]}</td><td>{row["Pct_Coberto"]:.1f}%</td></tr>')
+        html += """
+                    </tbody>
+                </table>
+            </div>
+        </section>
 """
     
     if len(criticos) > 0:
@@ -517,12 +439,14 @@ def generate_complete_report():
         <section class="section">
             <div class="section-header"><div class="section-line"></div><h2 class="section-title">Servidores com Atenção Necessária</h2></div>
             <div class="card">
+                <div class="card-title">Maior risco primeiro: atraso de RU, ambiente, suporte da versão, standby e tempo desde o último patch</div>
                 <table>
-                    <thead><tr><th>Hostname</th><th>Versão PSU</th><th>Ambiente</th><th>Status</th></tr></thead>
+                    <thead><tr><th>Hostname</th><th>Versão PSU</th><th>Ambiente</th><th>Risco</th><th>Faixa</th></tr></thead>
                     <tbody>
 """
+        cores_faixa = {'Crítico': 'red', 'Alto': 'yellow', 'Médio': 'blue', 'Baixo': 'green'}
         for _, row in criticos.iterrows():
-            html += f'<tr><td><strong>{row["Hostname"]}</strong></td><td>{row["PSU_Version"]}</td><td>{row["Entorno"]}</td><td><span class="badge red">Desatualizado</span></td></tr>'
+            html += f'<tr><td><strong>{row["Hostname"]}</strong></td><td>{row["PSU_Version"]}</td><td>{row["Entorno"]}</td><td>{row["Risco"]:.0f}</td><td><span class="badge {cores_faixa.get(row["Faixa"], "blue")}">{row["Faixa"]}</span></td></tr>'
         html += """
                     </tbody>
                 </table>
@@ -542,8 +466,10 @@ def generate_complete_report():
     <script>
         Plotly.newPlot('chart-monthly', {fig_monthly.to_json()}.data, {fig_monthly.to_json()}.layout, {{responsive: true, displayModeBar: false}});
         Plotly.newPlot('chart-executor', {fig_exec.to_json()}.data, {fig_exec.to_json()}.layout, {{responsive: true, displayModeBar: false}});
+        Plotly.newPlot('chart-carga', {fig_carga.to_json()}.data, {fig_carga.to_json()}.layout, {{responsive: true, displayModeBar: false}});
         Plotly.newPlot('chart-inv-versao', {fig_inv_versao.to_json()}.data, {fig_inv_versao.to_json()}.layout, {{responsive: true, displayModeBar: false}});
         Plotly.newPlot('chart-inv-entorno', {fig_inv_entorno.to_json()}.data, {fig_inv_entorno.to_json()}.layout, {{responsive: true, displayModeBar: false}});
+        Plotly.newPlot('chart-conformidade', {fig_conformidade.to_json()}.data, {fig_conformidade.to_json()}.layout, {{responsive: true, displayModeBar: false}});
         
         document.querySelectorAll('.kpi-value').forEach(el => {{
             const text = el.textContent;
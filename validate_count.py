@@ -1,4 +1,10 @@
 import pandas as pd
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cmdb'))
+from oraex import regras
+from oraex.numeros import coagir_numerico
 
 FILE_PATH = r"D:\antigravity\oraex\cmdb\ORAEX - Consolidação GetTech 2025 (1).xlsm"
 
@@ -14,6 +20,10 @@ for i, col in enumerate(df.columns):
 
 # Filtrar apenas registros válidos
 df_valid = df[df['PRIMARY HOSTNAME'].notna()].copy()
+if 'Total Servidores' in df_valid.columns:
+    df_valid['Total Servidores'], falhas_total = coagir_numerico(df_valid['Total Servidores'])
+    if falhas_total.any():
+        print(f"  ⚠️ {int(falhas_total.sum())} valor(es) de 'Total Servidores' não numéricos")
 
 print(f"\n📊 ANÁLISE DE CONTAGEM:")
 print("-"*70)
@@ -51,11 +61,7 @@ print(f"\n🎯 TOTAL REAL DE SERVIDORES: {int(total_real)}")
 print(f"\n📊 POR SITUAÇÃO:")
 print("-"*70)
 
-def get_situacao(val):
-    if pd.isna(val): return 'Desconhecido'
-    return 'Ativo' if 'Ativo' in str(val) else ('Descontinuado' if 'Descontinuado' in str(val) else str(val))
-
-df_valid['Situacao'] = df_valid['SITUAÇÃO'].apply(get_situacao)
+df_valid['Situacao'] = regras.SITUACAO.aplicar(df_valid['SITUAÇÃO'])
 
 for sit in df_valid['Situacao'].unique():
     subset = df_valid[df_valid['Situacao'] == sit]